@@ -4,30 +4,56 @@ Run: streamlit run app_ui.py
 """
 import sys
 import os
-import json
-import csv
-from io import StringIO
 
 # Ensure the project root is on the path so src.* imports resolve
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import json
+from collections import deque
 import streamlit as st
 
 from src.engine.tiers import Tier, tier_from_name
+from src.engine.calc_cents import pool_to_cents
 from src.engine.calc_pool import compute_pool
-from src.engine.calc_cast import compute_cast_cost, compute_cast_cost_with_quantity
-from src.engine.calc_hybrid import compute_hybrid_cost
-from src.engine.rounding import fmt_cost, fmt_pool
+from src.engine.cost_table import cost_table
+from src.engine.metrics import write_openmetrics
+from src.engine.rounding import fmt_cents, fmt_cost, fmt_pool
+from src.engine.ruleset import (
+    RULESETS, Ruleset, active_ruleset, resolve_ruleset, ruleset_from_dict, set_ruleset,
+)
+from src.ledger.afford import afford_index
+from src.ledger.entry import LedgerEntry, compact_entry
+from src.ledger.export import read_export
+from src.ledger.macros import (
+    cast_macro, compile_macro, delete_macro, dump_macros, load_macros, macro_library, save_macro,
+)
+from src.ledger.model import Ledger, parse_cost
+from src.ledger.planner import plan_casts
+from src.ledger.pricing import cast_cost, price_cast, price_entry
+from src.profiling import RerunProfiler, append_rolling, summarize
+from src.storage.log_store import LogSession, LogStore
+from src.storage.sqlite_store import SQLiteStore, SQLiteLedger
 from src.config import (
-    TIER_NAMES,
     TIER_NAMES_HIGH_FIRST,
-    TIER_ORDER,
     EFFICIENCY_NAMES,
-    TIER_VALUES,
-    NOVICE_EFFICIENCY_COSTS,
-    EFFICIENCY_BELOW_MULT,
+    COST_ENGINE,
 )
 
+# Set MANA_DB_PATH to persist characters and ledgers in SQLite, or MANA_LOG_DIR
+# to keep them as per-character append-only logs + snapshots (takes precedence);
+# unset keeps everything in session state (lost when the browser session ends).
+DB_PATH = os.environ.get("MANA_DB_PATH", "")
+LOG_DIR = os.environ.get("MANA_LOG_DIR", "")
+PERSIST = bool(DB_PATH or LOG_DIR)
+LEDGER_PAGE_SIZE = 50
+# With MANA_METRICS=1, engine metrics are written here (OpenMetrics text).
+METRICS_FILE = os.environ.get("MANA_METRICS_FILE", "")
+# Rerun profiler: MANA_PROFILE=1 (or ?profile=1) times each phase of the script
+# and appends one JSON line per rerun to MANA_PROFILE_FILE.  Only MANA_PROFILE
+# traces memory: tracemalloc is process-wide, so one URL must not turn it on.
+PROFILE = os.environ.get("MANA_PROFILE", "").lower() in ("1", "true", "yes", "on")
+PROFILE_FILE = os.environ.get("MANA_PROFILE_FILE", "profile/reruns.jsonl")
+
 # ── Page config ────────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="Antarok Mana Calculator",
@@ -35,28 +61,62 @@ st.set_page_config(
     layout="wide",
 )
 
+_profiler = RerunProfiler(PROFILE or st.query_params.get("profile") == "1", trace_memory=PROFILE)
+
 # ── Session state bootstrap ────────────────────────────────────────────────────
+def _new_character() -> dict:
+    return {"name": "New Character", "highest_tier": "Master", "arcana": []}
+
+def _reset_character_inputs():
+    """Drop sidebar widget state so the inputs pick up a newly loaded character."""
+    for key in ("char_name_input", "highest_tier_select", "ruleset_select"):
+        st.session_state.pop(key, None)
+
+def _store() -> SQLiteStore | LogStore:
+    if LOG_DIR:
+        return LogStore(LOG_DIR)  # ledgers are pooled per process
+    return SQLiteStore(DB_PATH)   # connection is pooled per process
+
+def _bind_character(character_id: int | None):
+    """Load a stored character (or create one) and open its stored ledger."""
+    store = _store()
+    character = store.load_character(character_id) if character_id is not None else None
+    if character is None:
+        character = _new_character()
+        character_id = store.create_character(character)
+    st.session_state.character = character
+    st.session_state.character_id = character_id
+    st.session_state.saved_character = json.dumps(character, sort_keys=True)
+    st.session_state.ledger = store.open_ledger(character_id, engine=COST_ENGINE)
+    st.session_state.next_id = st.session_state.ledger.next_id()
+    st.session_state.ledger_page = 1
+    _reset_character_inputs()
+    # Keep the id in the URL so a refresh or restart reopens the same character.
+    st.query_params["character"] = str(character_id)
+
 def _init_state():
+    if PERSIST and "character_id" not in st.session_state:
+        param = st.query_params.get("character")
+        _bind_character(int(param) if param and param.isdigit() else None)
     if "character" not in st.session_state:
-        st.session_state.character = {
-            "name": "New Character",
-            "highest_tier": "Master",
-            "arcana": [],
-        }
+        st.session_state.character = _new_character()
     if "ledger" not in st.session_state:
-        st.session_state.ledger = []
+        st.session_state.ledger = Ledger(engine=COST_ENGINE)
     if "next_id" not in st.session_state:
         st.session_state.next_id = 1
     if "ledger_open" not in st.session_state:
         st.session_state.ledger_open = True
+    if "ledger_page" not in st.session_state:
+        st.session_state.ledger_page = 1
 
+_profiler.mark("_init_state")
 _init_state()
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 def _char() -> dict:
     return st.session_state.character
 
-def _ledger() -> list:
+def _ledger() -> Ledger | SQLiteLedger | LogSession:
     return st.session_state.ledger
 
 def _highest_tier() -> Tier:
@@ -69,13 +129,6 @@ def _arcana_list() -> list[dict]:
         result.append({"name": a["name"], "tier": tier_from_name(a["tier"])})
     return result
 
-def _parse_cost(s: str) -> float:
-    """Parse a cost string — handles both '22.0' floats and legacy '34/100' fractions."""
-    if "/" in s:
-        num, den = s.split("/")
-        return int(num) / int(den)
-    return float(s)
-
 def _compute_pool() -> tuple[float, dict]:
     try:
         return compute_pool(_highest_tier(), _arcana_list())
@@ -83,17 +136,19 @@ def _compute_pool() -> tuple[float, dict]:
         return 0.0, {}
 
 def _pool_after_ledger() -> float:
-    """Remaining pool after all ledger casts."""
+    """Remaining pool after all ledger casts (cached per ledger version)."""
     total, _ = _compute_pool()
-    for entry in _ledger():
-        total -= _parse_cost(entry["exact_cost"])
-    return total
+    return _ledger().remaining(total)
 
 def _next_id() -> int:
     nid = st.session_state.next_id
     st.session_state.next_id += 1
     return nid
 
+def _sync_next_id():
+    """Keep new entry ids clear of every id an undo / redo brought back."""
+    st.session_state.next_id = max(st.session_state.next_id, _ledger().next_id())
+
 def _tier_names_for_character() -> list[str]:
     """Return tier names at or below the character's highest tier, high→low."""
     h = _highest_tier()
@@ -102,8 +157,54 @@ def _tier_names_for_character() -> list[str]:
 def _arcana_names() -> list[str]:
     return [a["name"] for a in _char()["arcana"]] or ["(no arcana)"]
 
+def _ruleset_key() -> str:
+    """The character's ruleset as a selectbox option: a built-in name or "house"."""
+    spec = _char().get("ruleset")
+    if isinstance(spec, dict):
+        return "house"
+    return str(spec or "wiki").lower()
+
+def _activate_ruleset() -> Ruleset:
+    """
+    Make the character's ruleset the active one.  Called by the full run and
+    by every fragment that prices: a fragment rerun starts in a fresh context.
+    """
+    spec = _char().get("ruleset")
+    cached = st.session_state.get("ruleset_cache")
+    if cached is None or cached[0] != spec:
+        try:
+            ruleset = resolve_ruleset(spec)
+        except ValueError:
+            ruleset = resolve_ruleset(None)
+        cached = st.session_state.ruleset_cache = (spec, ruleset)
+    set_ruleset(cached[1])
+    return cached[1]
+
+def _max_orders() -> int:
+    """The active ruleset's last Order of Expression (slider and editor limit)."""
+    return max(active_ruleset().orders_of_expression)
+
+@st.cache_data
+def _reference_matrix_rows(ruleset_hash: str) -> list[dict]:
+    """Tier × efficiency reference rows, formatted from the active ruleset's cost table."""
+    ruleset = active_ruleset()
+    table = cost_table(ruleset)
+    rows = []
+    for tier_name in TIER_NAMES_HIGH_FIRST:          # Ascendant → Novice
+        costs = table.matrix[tier_name]
+        rows.append({
+            "Tier":        tier_name,
+            "Pool Value":  fmt_pool(ruleset.tier_values[tier_name]),
+            "Standard":    fmt_pool(costs["Standard"]),
+            "Efficient":   fmt_pool(costs["Efficient"]),
+            "Optimal":     fmt_pool(costs["Optimal"]),
+            "Inefficient": fmt_pool(costs["Inefficient"]),
+            "Strenuous":   fmt_pool(costs["Strenuous"]),
+        })
+    return rows
+
 def _add_ledger_entry(entry: dict):
-    st.session_state.ledger.append(entry)
+    _ledger().append(entry)
 
 def _build_cast_entry(
     spell_name: str,
@@ -116,40 +217,14 @@ def _build_cast_entry(
     situational_str: str,
     is_hybrid: bool,
     hybrid_b: dict | None = None,
-) -> dict:
-    """Compute cost and build a ledger entry dict."""
-    h = _highest_tier()
-    spell_tier = tier_from_name(spell_tier_str)
-
-    sit_mod = None
-    if situational_str.strip():
-        try:
-            parts = situational_str.strip().split("/")
-            if len(parts) == 2:
-                sit_mod = int(parts[0]) / int(parts[1])
-            else:
-                sit_mod = float(parts[0])
-        except Exception:
-            sit_mod = None
-
-    if is_hybrid and hybrid_b:
-        spell_a_dict = {"tier": spell_tier, "efficiency": efficiency}
-        spell_b_tier = tier_from_name(hybrid_b["tier"])
-        spell_b_dict = {"tier": spell_b_tier, "efficiency": hybrid_b["efficiency"]}
-        raw_cost = compute_hybrid_cost(
-            h, spell_a_dict, spell_b_dict,
-            orders=orders,
-            situational_modifier=sit_mod,
-        )
-    else:
-        raw_cost = compute_cast_cost_with_quantity(
-            h, spell_tier, efficiency, orders,
-            quantity=quantity,
-            quantity_mode=quantity_mode,
-            situational_modifier=sit_mod,
-        )
+) -> LedgerEntry | dict:
+    """Compute cost and build a ledger entry (a compact LedgerEntry record)."""
+    raw_cost = price_cast(
+        _highest_tier(), spell_tier_str, efficiency, orders, quantity,
+        quantity_mode, situational_str, is_hybrid, hybrid_b,
+    )
 
-    return {
+    return compact_entry({
         "id": _next_id(),
         "spell_name": spell_name,
         "arcana_name": arcana_name,
@@ -163,10 +238,457 @@ def _build_cast_entry(
         "hybrid_b_tier": hybrid_b["tier"] if hybrid_b else "",
         "hybrid_b_efficiency": hybrid_b["efficiency"] if hybrid_b else "",
         "exact_cost": str(raw_cost),
+    })
+
+
+# ── Fragments ──────────────────────────────────────────────────────────────────
+# Sections that re-run on their own when their widgets change (st.fragment):
+# moving a preview slider, paging the ledger or ticking gzip no longer re-runs
+# the sidebar, the reference matrix and the other panels.  Their inputs are
+# passed in from the last full run; anything that changes other sections
+# (cast, import, clear, undo) calls st.rerun() for a full app rerun.
+
+@st.fragment
+def _cost_preview(remaining: float):
+    """Preview calculator — estimated cost and balance for the chosen spell."""
+    _activate_ruleset()
+    pv_tier = st.selectbox("Tier", _tier_names_for_character(), key="pv_tier")
+    pv_eff = st.selectbox("Efficiency", EFFICIENCY_NAMES, key="pv_eff")
+    pv_orders = st.slider("Orders", 0, _max_orders(), 0, key="pv_orders")
+    pv_qty = st.number_input("Qty", 1, 100, 1, key="pv_qty")
+    try:
+        pv_cost = cast_cost(
+            _highest_tier(), tier_from_name(pv_tier), pv_eff, pv_orders,
+            quantity=pv_qty, quantity_mode="bundled",
+        )
+        st.metric("Estimated Cost", fmt_cost(pv_cost))
+        remaining_after = remaining - pv_cost
+        st.metric("Remaining After Cast", fmt_pool(remaining_after))
+    except ValueError as e:
+        st.error(str(e))
+
+
+@st.fragment
+def _afford_panel(remaining: float):
+    """Every single cast the remaining pool still covers, with the most casts per mode."""
+    _activate_ruleset()
+    tier = st.selectbox("Spell tier", ["All tiers"] + _tier_names_for_character(), key="af_tier")
+    rows = afford_index(_highest_tier()).affordable(
+        pool_to_cents(remaining), None if tier == "All tiers" else tier_from_name(tier),
+    )
+    if not rows:
+        st.info("Nothing fits the remaining pool.")
+        return
+    st.dataframe(
+        [
+            {
+                "Tier": row["spell_tier"], "Efficiency": row["efficiency"],
+                "Orders": row["orders"], "Cost": fmt_cents(row["cost_cents"]),
+                "Max Qty (bundled)": row["max_bundled"],
+                "Max Qty (per_cast)": row["max_per_cast"],
+            }
+            for row in rows
+        ],
+        hide_index=True,
+    )
+
+
+@st.fragment
+def _export_tab(pool_total: float):
+    """Export downloads (built on click) and JSON import."""
+    # ── Export ────────────────────────────────────────────────
+    st.write("**Export ledger as JSON (audit-ready)**")
+
+    compress = st.checkbox(
+        "Compress downloads (gzip)", key="export_gzip",
+        help="Large ledgers download much smaller as .gz; Import accepts both.",
+    )
+    file_stem = f"{_char()['name'].replace(' ', '_')}_mana_ledger"
+    gz = ".gz" if compress else ""
+    # Exports are only built when a button is clicked (on Streamlit's download
+    # thread), never on a rerun.
+    ledger, character = _ledger(), json.loads(json.dumps(_char()))
+
+    st.download_button(
+        "⬇ Download JSON",
+        data=lambda: ledger.export_json(character, pool_total, compress=compress),
+        file_name=f"{file_stem}.json{gz}",
+        mime="application/gzip" if compress else "application/json",
+        on_click="ignore",
+    )
+
+    st.write("**Export ledger as CSV**")
+    if _ledger():
+        st.download_button(
+            "⬇ Download CSV",
+            data=lambda: ledger.export_csv(compress=compress),
+            file_name=f"{file_stem}.csv{gz}",
+            mime="application/gzip" if compress else "text/csv",
+            on_click="ignore",
+        )
+    else:
+        st.info("No ledger entries to export.")
+
+    st.divider()
+
+    # ── Import ────────────────────────────────────────────────
+    st.write("**Import from JSON**")
+    uploaded = st.file_uploader(
+        "Upload JSON file", type=["json", "gz"], key="import_upload"
+    )
+    if uploaded and st.button("✅ Load imported data"):
+        # Parsed incrementally, entry by entry, only when loading.
+        try:
+            data = read_export(uploaded)
+            if "character" in data:
+                st.session_state.character = data["character"]
+                _reset_character_inputs()
+            if "ledger" in data:
+                _ledger().replace(data["ledger"])
+                st.session_state.next_id = _ledger().next_id()
+            st.success("Data loaded successfully.")
+            st.rerun()
+        except Exception as e:
+            st.error(f"Failed to parse JSON: {e}")
+
+
+@st.fragment
+def _macros_tab(remaining: float):
+    """Macros — cast several spells as one ledger action; define, import and share them."""
+    _activate_ruleset()
+    library = macro_library(_char())
+    names = [m["name"] for m in library]
+    choice = st.selectbox("Macro", names, key="mc_choice")
+    macro = library[names.index(choice)]
+    if macro.get("description"):
+        st.caption(macro["description"])
+    try:
+        plan = compile_macro(_highest_tier(), macro)
+    except ValueError as e:
+        st.error(str(e))
+        plan = None
+
+    if plan:
+        st.dataframe(
+            [
+                {
+                    "Spell": e["spell_name"], "Arcana": e["arcana_name"] or "—",
+                    "Tier": e["spell_tier"], "Efficiency": e["efficiency"],
+                    "Orders": e["orders"], "Qty": e["quantity"],
+                    "Cost": fmt_cost(parse_cost(e["exact_cost"])),
+                }
+                for e in plan["entries"]
+            ],
+            hide_index=True,
+        )
+        m1, m2 = st.columns(2)
+        m1.metric("Macro Cost", fmt_cents(plan["cost_cents"]))
+        m2.metric("Remaining After Macro", fmt_cents(pool_to_cents(remaining) - plan["cost_cents"]))
+        arcana_name = ""
+        if any(not e["arcana_name"] for e in plan["entries"]):
+            arcana_name = st.selectbox("Arcana for the spells without one", _arcana_names(), key="mc_arcana")
+        if st.button(f"⚡ Cast {len(plan['entries'])} spells", type="primary", key="mc_cast"):
+            # One batched append: one version bump, one rerun, one store write.
+            first_id = st.session_state.next_id
+            cast_macro(_ledger(), plan, first_id, arcana_name if arcana_name != "(no arcana)" else "")
+            st.session_state.next_id = first_id + len(plan["entries"])
+            st.rerun()
+
+    user_names = [m["name"] for m in _char().get("macros", [])]
+    if choice in user_names and st.button("🗑 Delete this macro", key="mc_delete"):
+        delete_macro(_char(), choice)
+        st.rerun()
+
+    st.divider()
+    with st.expander("➕ New macro", expanded=False):
+        st.caption("Saving a macro with the name of one of yours replaces it.")
+        name = st.text_input("Macro name", key="mc_new_name")
+        description = st.text_input("Description", key="mc_new_desc")
+        tiers = _tier_names_for_character()
+        rows = st.data_editor(
+            [{"Spell": "", "Tier": tiers[0], "Efficiency": "Standard", "Orders": 0, "Qty": 1, "Rounding": "bundled"}],
+            num_rows="dynamic",
+            column_config={
+                "Tier": st.column_config.SelectboxColumn(options=tiers, required=True),
+                "Efficiency": st.column_config.SelectboxColumn(options=EFFICIENCY_NAMES, required=True),
+                "Orders": st.column_config.NumberColumn(min_value=0, max_value=_max_orders(), step=1, required=True),
+                "Qty": st.column_config.NumberColumn(min_value=1, step=1, required=True),
+                "Rounding": st.column_config.SelectboxColumn(options=["bundled", "per_cast"], required=True),
+            },
+            key="mc_new_rows",
+        )
+        if st.button("💾 Save macro", key="mc_save"):
+            try:
+                save_macro(_char(), {
+                    "name": name, "description": description,
+                    "spells": [
+                        {
+                            "spell_name": row["Spell"].strip(), "arcana_name": "",
+                            "tier": row["Tier"], "efficiency": row["Efficiency"],
+                            "orders": int(row["Orders"]), "quantity": int(row["Qty"]),
+                            "quantity_mode": row["Rounding"],
+                        }
+                        for row in rows if (row.get("Spell") or "").strip()
+                    ],
+                })
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
+    with st.expander("🔗 Share macros", expanded=False):
+        st.download_button(
+            "⬇ Download my macros",
+            data=dump_macros(_char().get("macros", [])),
+            file_name=f"{_char()['name'].replace(' ', '_')}_macros.json",
+            mime="application/json",
+            on_click="ignore",
+            disabled=not user_names,
+        )
+        uploaded = st.file_uploader("Import macros", type=["json"], key="mc_upload")
+        if uploaded and st.button("✅ Add imported macros", key="mc_import"):
+            try:
+                imported = load_macros(uploaded.getvalue())
+                for imported_macro in imported:
+                    save_macro(_char(), imported_macro)
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+
+
+@st.fragment
+def _planner_tab(remaining: float):
+    """Budget planner — best efficiency / orders / rounding for a spell list."""
+    _activate_ruleset()
+    st.caption(
+        "List the spells you want to cast this scene; the planner picks efficiency, "
+        "Orders of Expression and quantity rounding to fit the remaining pool."
+    )
+    tiers = _tier_names_for_character()
+    rows = st.data_editor(
+        [{"Spell": "", "Tier": tiers[0], "Qty": 1, "Max Orders": _max_orders(), "Required": False}],
+        num_rows="dynamic",
+        column_config={
+            "Tier": st.column_config.SelectboxColumn(options=tiers, required=True),
+            "Qty": st.column_config.NumberColumn(min_value=1, step=1, required=True),
+            "Max Orders": st.column_config.NumberColumn(
+                min_value=0, max_value=_max_orders(), step=1, required=True,
+            ),
+        },
+        key="plan_rows",
+    )
+    col_a, col_b = st.columns(2)
+    with col_a:
+        efficiencies = st.multiselect(
+            "Allowed efficiencies", EFFICIENCY_NAMES, default=EFFICIENCY_NAMES, key="plan_eff",
+        )
+        modes = st.multiselect(
+            "Quantity rounding", ["bundled", "per_cast"], default=["bundled", "per_cast"],
+            key="plan_modes",
+        )
+    with col_b:
+        objective = st.radio(
+            "Goal", ["casts", "spend"], key="plan_objective",
+            format_func={"casts": "Most casts that fit", "spend": "Cast all, least mana"}.get,
+        )
+        orders_cap = st.number_input(
+            "Orders budget (0 = no limit)", min_value=0, value=0, step=1, key="plan_orders",
+            help="Most Orders of Expression you are willing to write across the whole plan.",
+        )
+
+    spells = [
+        {
+            "spell_name": row["Spell"].strip(), "spell_tier": row["Tier"],
+            "quantity": int(row["Qty"]), "max_orders": int(row["Max Orders"]),
+            "required": bool(row["Required"]),
+            "efficiencies": efficiencies, "quantity_modes": modes,
+        }
+        for row in rows if (row.get("Spell") or "").strip() and row.get("Tier")
+    ]
+    if not st.button("🧮 Plan", key="plan_run", disabled=not (spells and efficiencies and modes)):
+        return
+    try:
+        plan = plan_casts(
+            _highest_tier(), spells, pool_to_cents(remaining), objective,
+            max_orders_total=orders_cap or None,
+        )
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Plan Cost", fmt_cents(plan["spent_cents"]))
+    m2.metric("Remaining After Plan", fmt_cents(pool_to_cents(remaining) - plan["spent_cents"]))
+    m3.metric("Orders to Write", plan["orders"])
+    if not plan["fits"]:
+        st.warning("Even the cheapest plan is over the remaining pool.")
+    st.dataframe(
+        [
+            {
+                "Spell": spell["spell_name"], "Tier": spell["spell_tier"], "Qty": spell["quantity"],
+                "Efficiency": choice["efficiency"] if choice else "—",
+                "Orders": choice["orders"] if choice else "—",
+                "Rounding": choice["quantity_mode"] if choice else "—",
+                "Cost": fmt_cents(choice["cost_cents"]) if choice else "left out",
+            }
+            for spell, choice in zip(spells, plan["choices"])
+        ],
+        hide_index=True,
+    )
+
+
+_SORT_LABELS = {
+    "position": "Cast order", "cost": "Cost", "spell_name": "Spell",
+    "arcana_name": "Arcana", "spell_tier": "Tier", "efficiency": "Efficiency",
+}
+
+
+def _ledger_filters() -> tuple[dict, str, bool]:
+    """Search / filter / sort controls for the ledger panel."""
+    with st.expander("🔍 Search & filter", expanded=False):
+        search = st.text_input("Spell name contains", key="lf_search")
+        col_a, col_b = st.columns(2)
+        with col_a:
+            arcana = st.selectbox("Arcana", ["All"] + _ledger().distinct("arcana_name"), key="lf_arcana")
+            tier = st.selectbox("Tier", ["All"] + _ledger().distinct("spell_tier"), key="lf_tier")
+            sort_by = st.selectbox(
+                "Sort by", list(_SORT_LABELS), format_func=_SORT_LABELS.get, key="lf_sort",
+            )
+        with col_b:
+            efficiency = st.selectbox("Efficiency", ["All"] + _ledger().distinct("efficiency"), key="lf_eff")
+            hybrid = st.selectbox("Hybrid", ["All", "Hybrid only", "Non-hybrid"], key="lf_hybrid")
+            descending = st.toggle("Descending", key="lf_desc")
+    filters = {
+        "search": search.strip(),
+        "arcana_name": None if arcana == "All" else arcana,
+        "spell_tier": None if tier == "All" else tier,
+        "efficiency": None if efficiency == "All" else efficiency,
+        "is_hybrid": {"All": None, "Hybrid only": True, "Non-hybrid": False}[hybrid],
     }
+    return {k: v for k, v in filters.items() if v not in (None, "")}, sort_by, descending
+
+
+def _ledger_corrections(count: int):
+    """Re-price or delete the entry at any ledger position."""
+    with st.expander("✏️ Correct an entry", expanded=False):
+        if st.session_state.get("fix_position", 1) > count:
+            st.session_state.fix_position = count
+        position = st.number_input(
+            "Position", min_value=1, max_value=count, step=1, key="fix_position",
+            help="1 = the first cast in the ledger.",
+        )
+        entry = _ledger()[position - 1]
+        st.caption(f"Entry #{entry['id']} — {entry['spell_name']}, cost {entry['exact_cost']}")
+        tiers = _tier_names_for_character()
+        with st.form("fix_form"):
+            spell_name = st.text_input("Spell Name", entry["spell_name"])
+            col_a, col_b = st.columns(2)
+            with col_a:
+                spell_tier = st.selectbox(
+                    "Spell Tier", tiers,
+                    index=tiers.index(entry["spell_tier"]) if entry["spell_tier"] in tiers else 0,
+                )
+                efficiency = st.selectbox(
+                    "Efficiency", EFFICIENCY_NAMES,
+                    index=EFFICIENCY_NAMES.index(entry["efficiency"])
+                    if entry["efficiency"] in EFFICIENCY_NAMES else 0,
+                )
+            with col_b:
+                orders = st.slider(
+                    "Orders of Expression", 0, _max_orders(),
+                    min(int(entry.get("orders", 0)), _max_orders()),
+                )
+                quantity = st.number_input("Quantity", min_value=1, value=int(entry.get("quantity", 1)))
+            situational = st.text_input("Situational Modifier", entry.get("situational", ""))
+            if st.form_submit_button("💾 Save & re-price"):
+                fixed = {
+                    **entry,
+                    "spell_name": spell_name.strip() or entry["spell_name"],
+                    "spell_tier": spell_tier,
+                    "efficiency": efficiency,
+                    "orders": orders,
+                    "quantity": quantity,
+                    "situational": situational,
+                }
+                try:
+                    fixed["exact_cost"] = str(price_entry(_highest_tier(), fixed))
+                except ValueError as e:
+                    st.error(f"Error: {e}")
+                else:
+                    _ledger().update(position - 1, fixed)
+                    st.rerun()
+        if st.button("🗑 Delete this entry", key="fix_delete"):
+            _ledger().delete(position - 1)
+            st.rerun()
+
+
+@st.fragment
+def _ledger_panel(pool_total: float):
+    """Cast ledger panel — filtered/sorted page of rows, Clear All / Undo / Redo."""
+    _activate_ruleset()
+    with st.container(border=True):
+        # Header row with close button
+        hdr_col, close_col = st.columns([5, 1])
+        with hdr_col:
+            cast_count = len(_ledger())
+            label = f"📋 Cast Ledger ({cast_count})" if cast_count else "📋 Cast Ledger"
+            st.subheader(label)
+        with close_col:
+            st.write("")  # vertical nudge
+            if st.button("✕", help="Collapse ledger", key="close_ledger"):
+                st.session_state.ledger_open = False
+                st.rerun()
+
+        if not _ledger():
+            st.caption("No casts recorded yet. Use **Cast Spell** to add entries.")
+        else:
+            filters, sort_by, descending = _ledger_filters()
+            # Only the visible page is built; balances come from prefix sums.
+            page = max(1, st.session_state.ledger_page)
+            rows, matches = _ledger().query(
+                pool_total, filters, sort_by, descending,
+                (page - 1) * LEDGER_PAGE_SIZE, LEDGER_PAGE_SIZE,
+            )
+            pages = max(1, -(-matches // LEDGER_PAGE_SIZE))
+            if page > pages:
+                st.session_state.ledger_page = page = pages
+                rows, matches = _ledger().query(
+                    pool_total, filters, sort_by, descending,
+                    (page - 1) * LEDGER_PAGE_SIZE, LEDGER_PAGE_SIZE,
+                )
+            if filters:
+                st.caption(f"{matches} of {cast_count} entries match.")
+            if pages > 1:
+                st.number_input(
+                    f"Page (of {pages})", min_value=1, max_value=pages,
+                    step=1, key="ledger_page",
+                )
+            st.dataframe(rows, width="stretch", hide_index=True)
+            _ledger_corrections(cast_count)
+
+        st.divider()
+
+        # Ledger controls
+        col_clear, col_undo, col_redo = st.columns(3)
+        with col_clear:
+            if st.button("🗑 Clear All", type="secondary", width="stretch"):
+                _ledger().clear()
+                st.session_state.next_id = 1
+                st.rerun()
+        with col_undo:
+            if st.button("↩ Undo", width="stretch", disabled=not _ledger().can_undo,
+                         help="Undo the last ledger change (cast, correction, clear or import)"):
+                if _ledger().undo():
+                    _sync_next_id()
+                    st.rerun()
+        with col_redo:
+            if st.button("↪ Redo", width="stretch", disabled=not _ledger().can_redo):
+                if _ledger().redo():
+                    _sync_next_id()
+                    st.rerun()
 
 
 # ── Sidebar — Character Editor ─────────────────────────────────────────────────
+_profiler.mark("sidebar")
 with st.sidebar:
     st.title("🔮 Mana Calculator")
     st.caption("Antarok RPG — Arcana System")
@@ -187,6 +709,38 @@ with st.sidebar:
     )
     _char()["highest_tier"] = highest_tier
 
+    # Rules — a built-in ruleset, or house rules loaded from JSON.  Stored on
+    # the character, so it is saved and exported with it.
+    rule_keys = list(RULESETS) + (["house"] if _ruleset_key() == "house" else [])
+    rule_choice = st.selectbox(
+        "Rules",
+        options=rule_keys,
+        index=rule_keys.index(_ruleset_key()) if _ruleset_key() in rule_keys else 0,
+        format_func=lambda key: RULESETS[key].name if key in RULESETS
+        else f"House: {_char()['ruleset'].get('name', 'House rules')}",
+        key="ruleset_select",
+    )
+    if rule_choice != _ruleset_key():
+        _char()["ruleset"] = rule_choice
+    with st.expander("House rules"):
+        house_file = st.file_uploader("Ruleset JSON", type=["json"], key="house_rules_upload")
+        if house_file and st.button("Use these rules", key="house_rules_apply"):
+            try:
+                house = ruleset_from_dict(json.loads(house_file.getvalue()))
+            except ValueError as e:
+                st.error(f"Not a ruleset: {e}")
+            else:
+                _char()["ruleset"] = house.to_dict()
+                st.session_state.pop("ruleset_select", None)
+                st.rerun()
+        st.download_button(
+            "⬇ Current rules (JSON)",
+            data=json.dumps(_activate_ruleset().to_dict(), indent=2),
+            file_name="ruleset.json",
+            mime="application/json",
+            key="house_rules_download",
+        )
+
     st.divider()
 
     # Arcana list
@@ -235,7 +789,8 @@ with st.sidebar:
                     {"name": "Zephyr",  "tier": "Master"},
                 ],
             }
-            st.session_state.ledger = []
+            _reset_character_inputs()
+            _ledger().clear()
             st.session_state.next_id = 1
             st.rerun()
     with col_serapis:
@@ -249,15 +804,48 @@ with st.sidebar:
                     {"name": "Syphon", "tier": "Journeyman"},
                 ],
             }
-            st.session_state.ledger = []
+            _reset_character_inputs()
+            _ledger().clear()
             st.session_state.next_id = 1
             st.rerun()
 
+    # Saved characters (with persistence only)
+    if PERSIST:
+        st.divider()
+        st.subheader("Saved Characters")
+        saved = _store().list_characters()
+        ids = [cid for cid, _ in saved]
+        names = dict(saved)
+        current = st.session_state.character_id
+        chosen = st.selectbox(
+            "Open",
+            options=ids,
+            index=ids.index(current) if current in ids else 0,
+            format_func=lambda cid: f"{names[cid] or 'Unnamed'} (#{cid})",
+            key=f"open_character_{current}",
+        )
+        if chosen != current:
+            _bind_character(chosen)
+            st.rerun()
+        if st.button("+ New Character", width="stretch"):
+            _bind_character(None)
+            st.rerun()
+
+# Persist character edits (name, tier, arcana, sample loads, imports).
+if PERSIST:
+    snapshot = json.dumps(_char(), sort_keys=True)
+    if snapshot != st.session_state.saved_character:
+        _store().save_character(st.session_state.character_id, _char())
+        st.session_state.saved_character = snapshot
+
 
 # ── Main content ───────────────────────────────────────────────────────────────
-# Compute pools once
+# Compute pools once, under the character's rules
+_profiler.mark("_compute_pool/_pool_after_ledger")
+ruleset = _activate_ruleset()
 pool_total, pool_breakdown = _compute_pool()
 remaining = _pool_after_ledger()
+_profiler.mark("layout")
 
 st.title(f"🔮 {_char()['name'] or 'Unnamed'} — Mana Calculator")
 
@@ -282,16 +870,22 @@ with col_main:
                 st.session_state.ledger_open = True
                 st.rerun()
     c1.metric("Total Pool", fmt_pool(pool_total))
-    c2.metric("Remaining", fmt_pool(remaining))
+    with c2:
+        st.metric("Remaining", fmt_pool(remaining))
+        with st.popover("💰 What can I afford?"):
+            _afford_panel(remaining)
     c3.metric("Highest Tier", _char()["highest_tier"])
 
     st.divider()
 
-    tab_pool, tab_cast, tab_export = st.tabs(["Pool", "Cast Spell", "Export"])
+    tab_pool, tab_cast, tab_macros, tab_plan, tab_export = st.tabs(
+        ["Pool", "Cast Spell", "Macros", "Planner", "Export"]
+    )
 
     # ============================================================
     # TAB 1: Pool
     # ============================================================
+    _profiler.mark("pool_matrix")
     with tab_pool:
         st.subheader("Mana Pool Breakdown")
 
@@ -312,36 +906,17 @@ with col_main:
             st.divider()
             st.subheader("Tier Value Reference")
             st.caption(
-                "Mana values from config. "
+                f"Mana values of the {ruleset.name} rules. "
                 "Standard = tier value. "
                 "Non-Standard = multiplier × tier below (Novice uses fixed decimals)."
             )
 
-            def _efficiency_cost(tier_name: str, efficiency: str) -> str:
-                """Compute display cost directly from TIER_NAMES / TIER_VALUES."""
-                if efficiency == "Standard":
-                    return fmt_pool(TIER_VALUES[tier_name])
-                if tier_name == "Novice":
-                    return fmt_pool(NOVICE_EFFICIENCY_COSTS[efficiency])
-                tier_below_name = TIER_ORDER[TIER_ORDER.index(tier_name) + 1]
-                return fmt_pool(EFFICIENCY_BELOW_MULT[efficiency] * TIER_VALUES[tier_below_name])
-
-            matrix_rows = []
-            for tier_name in TIER_NAMES_HIGH_FIRST:          # Ascendant → Novice
-                matrix_rows.append({
-                    "Tier":        tier_name,
-                    "Pool Value":  fmt_pool(TIER_VALUES[tier_name]),
-                    "Standard":    _efficiency_cost(tier_name, "Standard"),
-                    "Efficient":   _efficiency_cost(tier_name, "Efficient"),
-                    "Optimal":     _efficiency_cost(tier_name, "Optimal"),
-                    "Inefficient": _efficiency_cost(tier_name, "Inefficient"),
-                    "Strenuous":   _efficiency_cost(tier_name, "Strenuous"),
-                })
-            st.table(matrix_rows)
+            st.table(_reference_matrix_rows(ruleset.content_hash))
 
     # ============================================================
     # TAB 2: Cast Spell
     # ============================================================
+    _profiler.mark("cast_form")
     with tab_cast:
         st.subheader("Add Cast to Ledger")
 
@@ -358,9 +933,11 @@ with col_main:
                 efficiency = st.selectbox("Efficiency", EFFICIENCY_NAMES)
 
             with col2:
+                ruleset = active_ruleset()
                 orders = st.slider(
-                    "Orders of Expression", 0, 6, 0,
-                    help="Each order applies ~5% discount, max 30% at 6th order.",
+                    "Orders of Expression", 0, _max_orders(), 0,
+                    help=f"Each order applies a discount, max {float(ruleset.max_discount * 100):g}% "
+                         f"at order {_max_orders()}.",
                 )
                 quantity = st.number_input("Quantity", min_value=1, value=1, step=1)
                 qty_mode = st.radio(
@@ -396,6 +973,13 @@ with col_main:
                         "Spell B Efficiency", EFFICIENCY_NAMES, key="hb_eff"
                     )
 
+            ledger_size = len(_ledger())
+            position = st.number_input(
+                "Ledger Position", min_value=1, max_value=ledger_size + 1,
+                value=ledger_size + 1, step=1,
+                help="Leave at the end to append; a lower number inserts the cast before that entry.",
+            )
+
             submitted = st.form_submit_button("⚡ Add to Ledger", type="primary")
 
             if submitted:
@@ -420,10 +1004,13 @@ with col_main:
                             is_hybrid=is_hybrid,
                             hybrid_b=hybrid_b,
                         )
-                        _add_ledger_entry(entry)
+                        if position <= ledger_size:
+                            _ledger().insert(position - 1, entry)
+                        else:
+                            _add_ledger_entry(entry)
                         st.success(
                             f"Added **{spell_name}** — cost: "
-                            f"{fmt_cost(_parse_cost(entry['exact_cost']))}"
+                            f"{fmt_cost(parse_cost(entry['exact_cost']))}"
                         )
                         st.rerun()
                     except ValueError as e:
@@ -434,140 +1021,72 @@ with col_main:
         st.subheader("Cost Preview")
         st.caption("Fill in the form above and use this to preview before submitting.")
         with st.expander("Preview calculator", expanded=False):
-            pv_tier = st.selectbox("Tier", _tier_names_for_character(), key="pv_tier")
-            pv_eff = st.selectbox("Efficiency", EFFICIENCY_NAMES, key="pv_eff")
-            pv_orders = st.slider("Orders", 0, 6, 0, key="pv_orders")
-            pv_qty = st.number_input("Qty", 1, 100, 1, key="pv_qty")
-            try:
-                pv_cost = compute_cast_cost_with_quantity(
-                    _highest_tier(), tier_from_name(pv_tier), pv_eff, pv_orders,
-                    quantity=pv_qty, quantity_mode="bundled",
-                )
-                st.metric("Estimated Cost", fmt_cost(pv_cost))
-                remaining_after = remaining - pv_cost
-                st.metric("Remaining After Cast", fmt_pool(remaining_after))
-            except ValueError as e:
-                st.error(str(e))
+            _cost_preview(remaining)
 
     # ============================================================
-    # TAB 3: Export / Import
+    # TAB 3: Macros
     # ============================================================
-    with tab_export:
-        st.subheader("Export & Import")
+    _profiler.mark("macros")
+    with tab_macros:
+        st.subheader("Macros")
 
-        # ── Export ────────────────────────────────────────────────
-        st.write("**Export ledger as JSON (audit-ready)**")
+        _macros_tab(remaining)
 
-        export_data = {
-            "character": _char(),
-            "total_pool": str(pool_total),
-            "remaining": str(_pool_after_ledger()),
-            "ledger": _ledger(),
-        }
-        json_str = json.dumps(export_data, indent=2)
-        st.download_button(
-            "⬇ Download JSON",
-            data=json_str,
-            file_name=f"{_char()['name'].replace(' ', '_')}_mana_ledger.json",
-            mime="application/json",
-        )
+    # ============================================================
+    # TAB 4: Budget planner
+    # ============================================================
+    _profiler.mark("planner")
+    with tab_plan:
+        st.subheader("Budget Planner")
 
-        st.write("**Export ledger as CSV**")
-        if _ledger():
-            csv_buf = StringIO()
-            fieldnames = [
-                "id", "spell_name", "arcana_name", "spell_tier",
-                "efficiency", "orders", "quantity", "quantity_mode",
-                "situational", "is_hybrid", "hybrid_b_tier", "hybrid_b_efficiency",
-                "exact_cost",
-            ]
-            writer = csv.DictWriter(csv_buf, fieldnames=fieldnames, extrasaction="ignore")
-            writer.writeheader()
-            for row in _ledger():
-                writer.writerow(row)
-            st.download_button(
-                "⬇ Download CSV",
-                data=csv_buf.getvalue(),
-                file_name=f"{_char()['name'].replace(' ', '_')}_mana_ledger.csv",
-                mime="text/csv",
-            )
-        else:
-            st.info("No ledger entries to export.")
+        _planner_tab(remaining)
 
-        st.divider()
-
-        # ── Import ────────────────────────────────────────────────
-        st.write("**Import from JSON**")
-        uploaded = st.file_uploader("Upload JSON file", type="json", key="import_upload")
-        if uploaded:
-            try:
-                data = json.load(uploaded)
-                if st.button("✅ Load imported data"):
-                    if "character" in data:
-                        st.session_state.character = data["character"]
-                    if "ledger" in data:
-                        st.session_state.ledger = data["ledger"]
-                        st.session_state.next_id = (
-                            max((e.get("id", 0) for e in data["ledger"]), default=0) + 1
-                        )
-                    st.success("Data loaded successfully.")
-                    st.rerun()
-            except Exception as e:
-                st.error(f"Failed to parse JSON: {e}")
+    # ============================================================
+    # TAB 5: Export / Import
+    # ============================================================
+    # Downloads are built on click, outside any rerun: this phase is the
+    # tab's widgets plus parsing an uploaded import.
+    _profiler.mark("export_tab_widgets/import")
+    with tab_export:
+        st.subheader("Export & Import")
 
+        _export_tab(pool_total)
 
+_profiler.mark("ledger_panel")
 # ============================================================
 # RIGHT COLUMN — Collapsible Cast Ledger
 # ============================================================
 if st.session_state.ledger_open:
     with col_ledger:
-        with st.container(border=True):
-            # Header row with close button
-            hdr_col, close_col = st.columns([5, 1])
-            with hdr_col:
-                cast_count = len(_ledger())
-                label = f"📋 Cast Ledger ({cast_count})" if cast_count else "📋 Cast Ledger"
-                st.subheader(label)
-            with close_col:
-                st.write("")  # vertical nudge
-                if st.button("✕", help="Collapse ledger", key="close_ledger"):
-                    st.session_state.ledger_open = False
-                    st.rerun()
+        _ledger_panel(pool_total)
 
-            if not _ledger():
-                st.caption("No casts recorded yet. Use **Cast Spell** to add entries.")
-            else:
-                # Build display rows with running total
-                running = pool_total
-                rows = []
-                for entry in _ledger():
-                    cost_val = _parse_cost(entry["exact_cost"])
-                    running -= cost_val
-                    rows.append({
-                        "#":         entry["id"],
-                        "Spell":     entry["spell_name"],
-                        "Arcana":    entry["arcana_name"],
-                        "Tier":      entry["spell_tier"],
-                        "Eff.":      entry["efficiency"],
-                        "Ord.":      entry["orders"],
-                        "Qty":       entry["quantity"],
-                        "Hybrid":    "✓" if entry.get("is_hybrid") else "",
-                        "Cost":      fmt_cost(cost_val),
-                        "Remaining": fmt_pool(running),
-                    })
-                st.dataframe(rows, width="stretch", hide_index=True)
+# ── Rerun diagnostics (profiler mode only) ─────────────────────────────────────
+_record = _profiler.finish(ledger_entries=len(_ledger()))
+if _record is not None:
+    if "profile_history" not in st.session_state:
+        st.session_state.profile_history = deque(maxlen=50)
+    st.session_state.profile_history.append(_record)
+    append_rolling(PROFILE_FILE, _record)
+    with st.expander("🩺 Rerun diagnostics", expanded=False):
+        st.caption(
+            f"Last rerun: {1000 * _record['total_seconds']:.1f} ms, "
+            f"{_record['ledger_entries']} ledger entries. Logged to `{PROFILE_FILE}`."
+        )
+        st.dataframe(
+            [
+                {
+                    "Phase": p["phase"],
+                    "ms": round(1000 * p["seconds"], 2),
+                    "Peak KiB": None if p["peak_bytes"] is None else round(p["peak_bytes"] / 1024, 1),
+                }
+                for p in _record["phases"]
+            ],
+            hide_index=True,
+        )
+        st.write(f"**Last {len(st.session_state.profile_history)} reruns**")
+        st.dataframe(summarize(list(st.session_state.profile_history)), hide_index=True)
 
-            st.divider()
 
-            # Ledger controls
-            col_clear, col_undo = st.columns(2)
-            with col_clear:
-                if st.button("🗑 Clear All", type="secondary", width="stretch"):
-                    st.session_state.ledger = []
-                    st.session_state.next_id = 1
-                    st.rerun()
-            with col_undo:
-                if st.button("↩ Undo Last", width="stretch", disabled=not bool(_ledger())):
-                    if st.session_state.ledger:
-                        st.session_state.ledger.pop()
-                        st.rerun()
+# ── Metrics export (opt-in) ────────────────────────────────────────────────────
+if METRICS_FILE:
+    write_openmetrics(METRICS_FILE, min_interval=5.0)
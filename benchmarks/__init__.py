@@ -0,0 +1 @@
+"""Performance benchmarks for the mana engine, ledger and app rerun path."""
@@ -0,0 +1,68 @@
+"""
+Run the benchmark suite.
+
+Usage
+─────
+    python -m benchmarks                              # run all, compare to baseline
+    python -m benchmarks -k engine --quick            # subset, skip 10⁶ / large app cases
+    python -m benchmarks --save                       # overwrite the saved baseline
+    python -m benchmarks --baseline benchmarks/baselines/before.json --save
+
+Exits with status 1 when any benchmark regressed past --threshold.
+"""
+import argparse
+import os
+import sys
+from . import bench_engine, bench_ledger  # noqa: F401 — registers benchmarks
+from .harness import REGISTRY, compare, load_baseline, measure, report, save_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n")[1])
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Skip the slow cases (10⁶ replay, big app reruns)")
+    parser.add_argument("--no-app", action="store_true", help="Skip the Streamlit AppTest reruns")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Relative slowdown that counts as a regression (default: 0.20)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed batch (default: 0.2)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed batches per benchmark (default: 5)")
+    args = parser.parse_args(argv)
+
+    if not args.no_app:
+        try:
+            from . import bench_app  # noqa: F401
+        except ImportError as e:
+            print(f"Skipping app benchmarks: {e}", file=sys.stderr)
+
+    selected = [
+        b for name, b in REGISTRY.items()
+        if args.filter in name and not (args.quick and b.slow)
+        and not (args.no_app and b.group == "app")
+    ]
+    results = []
+    for bench in selected:
+        print(f"  {bench.name} …", file=sys.stderr, flush=True)
+        results.append(measure(bench, args.min_time, args.repeat))
+
+    rows = None
+    if os.path.exists(args.baseline) and not args.save:
+        rows = compare(results, load_baseline(args.baseline), args.threshold)
+    print(report(results, rows))
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+    regressed = [row["name"] for row in rows or [] if row["status"] == "regressed"]
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
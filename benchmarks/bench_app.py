@@ -0,0 +1,29 @@
+"""
+Full ``app_ui.py`` script reruns, driven by Streamlit's AppTest.
+
+Each timed call is one ``AppTest.run()`` — the whole script, as after any
+widget interaction — with the Kirin sample loaded and a ledger of N entries.
+"""
+import os
+from .harness import benchmark
+from .bench_ledger import _entries
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app_ui.py")
+
+
+def _app(n_entries: int):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    next(b for b in at.sidebar.button if b.label == "Kirin").click()
+    at.run()
+    if n_entries:
+        at.session_state.ledger.replace(_entries(n_entries))
+        at.run()
+    return (at,)
+
+
+for _n in (0, 1_000, 100_000):
+    @benchmark(f"app.rerun[ledger={_n}]", setup=lambda n=_n: _app(n), group="app", slow=_n >= 100_000)
+    def bench_rerun(at):
+        at.run()
@@ -0,0 +1,104 @@
+"""Engine benchmarks: base cost, cast cost, hybrid cost, pools, Fraction rounding."""
+from fractions import Fraction
+from src.engine.tiers import Tier
+from src.engine.calc_cast import get_spell_base_cost, compute_cast_cost_with_quantity
+from src.engine.calc_hybrid import compute_hybrid_cost
+from src.engine.calc_pool import compute_pool, compute_pool_batch
+from src.engine.rounding import ceil_to_hundredths, ceil_to_ones, round_cost, format_cost, format_pool
+from src.config import EFFICIENCY_NAMES
+from .harness import benchmark
+
+TIERS = list(Tier)
+# Every (tier, efficiency, orders) combination, plus one situational case per tier.
+CASES = [(t, e, o) for t in TIERS for e in EFFICIENCY_NAMES for o in range(7)]
+HYBRID_PAIRS = [
+    ({"tier": ta, "efficiency": ea}, {"tier": tb, "efficiency": eb})
+    for ta in TIERS for ea in EFFICIENCY_NAMES for tb in TIERS for eb in EFFICIENCY_NAMES
+]
+FRACTIONS = [Fraction(n, d) for n in range(1, 40) for d in (3, 7, 9, 100, 300)]
+
+
+def _roster(size: int) -> list[list[dict]]:
+    names = [t.name.title() for t in Tier]
+    return [
+        [{"name": f"arc{j}", "tier": names[(i + j) % len(names)]} for j in range(1 + i % 6)]
+        for i in range(size)
+    ]
+
+
+@benchmark("engine.get_spell_base_cost[all]", group="engine")
+def bench_base_cost():
+    for tier in TIERS:
+        for efficiency in EFFICIENCY_NAMES:
+            get_spell_base_cost(tier, efficiency)
+
+
+@benchmark("engine.cast_cost.bundled[210 cases]", group="engine")
+def bench_cast_bundled():
+    for tier, efficiency, orders in CASES:
+        compute_cast_cost_with_quantity(Tier.ASCENDANT, tier, efficiency, orders, 3, "bundled")
+
+
+@benchmark("engine.cast_cost.per_cast[210 cases]", group="engine")
+def bench_cast_per_cast():
+    for tier, efficiency, orders in CASES:
+        compute_cast_cost_with_quantity(Tier.ASCENDANT, tier, efficiency, orders, 3, "per_cast")
+
+
+@benchmark("engine.cast_cost.single[210 cases]", group="engine")
+def bench_cast_single():
+    for tier, efficiency, orders in CASES:
+        compute_cast_cost_with_quantity(Tier.ASCENDANT, tier, efficiency, orders)
+
+
+@benchmark("engine.cast_cost.situational[210 cases]", group="engine")
+def bench_cast_situational():
+    for tier, efficiency, orders in CASES:
+        compute_cast_cost_with_quantity(
+            Tier.ASCENDANT, tier, efficiency, orders, 2, "bundled", Fraction(1, 4),
+        )
+
+
+@benchmark("engine.hybrid_cost[900 pairs]", group="engine")
+def bench_hybrid():
+    for spell_a, spell_b in HYBRID_PAIRS:
+        compute_hybrid_cost(Tier.ASCENDANT, spell_a, spell_b, orders=2)
+
+
+for _size in (100, 10_000):
+    @benchmark(f"engine.compute_pool[roster={_size}]", setup=lambda n=_size: (_roster(n),), group="engine")
+    def bench_pool(roster):
+        for arcana in roster:
+            compute_pool(Tier.ASCENDANT, arcana)
+
+
+@benchmark("rounding.ceil_to_hundredths[195]", group="rounding")
+def bench_ceil_hundredths():
+    for value in FRACTIONS:
+        ceil_to_hundredths(value)
+
+
+@benchmark("rounding.ceil_to_ones[195]", group="rounding")
+def bench_ceil_ones():
+    for value in FRACTIONS:
+        ceil_to_ones(value)
+
+
+@benchmark("rounding.round_cost[195 × 3 modes]", group="rounding")
+def bench_round_cost():
+    for value in FRACTIONS:
+        for mode in ("ones", "hundreds", "fractions"):
+            round_cost(value, mode)
+
+
+@benchmark("rounding.format_cost_pool[195 × 3 modes]", group="rounding")
+def bench_format():
+    for value in FRACTIONS:
+        for mode in ("ones", "hundreds", "fractions"):
+            format_cost(value, mode)
+            format_pool(value, mode)
+
+
+@benchmark("engine.compute_pool_batch[roster=10000]", setup=lambda: (_roster(10_000),), group="engine")
+def bench_pool_batch(roster):
+    compute_pool_batch(roster)
@@ -0,0 +1,41 @@
+"""
+Ledger replay benchmarks, 10³ – 10⁶ entries.
+
+"Replay" is what the app does after an import or on a fresh session: load the
+entries, then build the running balances and the ledger panel rows.
+"""
+from src.ledger.model import Ledger
+from .harness import benchmark
+
+COSTS = ["28.05", "100", "9.9", "0.34", "22", "66.33", "1/3"]
+POOL = 10_000_000.0
+
+
+def _entries(n: int) -> list[dict]:
+    return [
+        {
+            "id": i, "spell_name": f"Spell {i}", "arcana_name": "Zephyr",
+            "spell_tier": "Expert", "efficiency": "Standard", "orders": i % 7,
+            "quantity": 1, "quantity_mode": "bundled", "situational": "",
+            "is_hybrid": False, "exact_cost": COSTS[i % len(COSTS)],
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def _replay(entries, engine):
+    ledger = Ledger(entries, engine=engine)
+    ledger.remaining(POOL)
+    ledger.running_rows(POOL)
+
+
+for _exp in (3, 4, 5, 6):
+    for _engine in ("float", "cents"):
+        @benchmark(
+            f"ledger.replay.{_engine}[10^{_exp}]",
+            setup=lambda n=10 ** _exp: (_entries(n),),
+            group="ledger",
+            slow=_exp == 6,
+        )
+        def bench_replay(entries, engine=_engine):
+            _replay(entries, engine)
@@ -0,0 +1,220 @@
+"""
+Benchmark registry, timing, and baseline comparison.
+
+Each benchmark is a zero-argument callable registered with ``@benchmark``;
+an optional ``setup`` builds its inputs once, outside the timed region.
+
+Timing
+──────
+Calls are batched with ``timeit.Timer.autorange`` until one batch takes at
+least ``min_time``; that batch is repeated ``repeat`` times with the garbage
+collector disabled.  The per-call minimum across repeats is the headline
+number (least disturbed by other load on the machine); median and spread are
+kept for context.
+
+Each timed batch is followed by a batch of ``REFERENCE`` — a fixed pure-Python
+workload that touches none of the app's code.  Absolute timings only mean
+something on the machine, and under the load, they were taken on; the time
+relative to a reference timed in the same moments does not, since a slower or
+busier machine slows both alike.  To pair them closely, each repeat is split
+into ``SLICES`` shorter batches, each followed by a reference batch of about
+the same length (at most ``min_time``); ``relative`` is the median of (batch time / the reference
+batch right after it), per call.
+
+Baselines
+─────────
+Results are saved as JSON ({"environment": …, "results": {name: {…}}}).
+``compare`` flags a benchmark as regressed when its ``relative`` time is more
+than ``threshold`` above the baseline's (its per-call minimum, for baselines
+recorded without a reference).
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from dataclasses import dataclass, field
+from operator import truediv
+from typing import Callable
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[..., object]
+    setup: Callable[[], tuple] | None = None
+    group: str = ""
+    slow: bool = False           # skipped by --quick
+
+
+REGISTRY: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, setup: Callable[[], tuple] | None = None, group: str = "", slow: bool = False):
+    """Register ``func(*setup())`` as benchmark *name*."""
+    def register(func):
+        if name in REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name!r}")
+        REGISTRY[name] = Benchmark(name, func, setup, group, slow)
+        return func
+    return register
+
+
+@dataclass
+class Result:
+    name: str
+    min: float                   # seconds per call
+    median: float
+    stdev: float
+    number: int                  # calls per repeat
+    repeat: int
+    group: str = ""
+    relative: float | None = None    # per-call time / REFERENCE per-call time
+    extra: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "min": self.min, "median": self.median, "stdev": self.stdev,
+            "number": self.number, "repeat": self.repeat, "group": self.group,
+            "relative": self.relative,
+        }
+
+
+def _reference_workload():
+    # String formatting, sorting, dict and int work: the interpreter
+    # operations the engine and ledger benchmarks spend their time on.
+    counts: dict[str, int] = {}
+    for key in sorted(f"{i * 7919 % 1000:03d}" for i in range(1000)):
+        counts[key[:2]] = counts.get(key[:2], 0) + int(key)
+    return counts
+
+
+REFERENCE = Benchmark("reference.interpreter", _reference_workload, group="reference")
+SLICES = 4
+
+
+def _calibrate(timer: timeit.Timer, min_time: float) -> tuple[int, float]:
+    number, elapsed = timer.autorange()
+    while elapsed < min_time:
+        number *= 2
+        elapsed = timer.timeit(number)
+    return number, elapsed
+
+
+def measure(
+    bench: Benchmark, min_time: float = 0.2, repeat: int = 5, reference: Benchmark | None = REFERENCE,
+) -> Result:
+    """Time one benchmark (interleaved with *reference*); see the module docstring."""
+    args = bench.setup() if bench.setup else ()
+    timer = timeit.Timer(lambda: bench.func(*args))
+    number, elapsed = _calibrate(timer, min_time)
+    # Expensive cases (a single batch far over min_time) get fewer repeats.
+    if elapsed > 10 * min_time:
+        repeat = min(repeat, 3)
+    if reference is not None:
+        if number >= SLICES:
+            number, repeat, elapsed = number // SLICES, repeat * SLICES, elapsed / SLICES
+        ref_timer = timeit.Timer(reference.func)
+        ref_number, _ = _calibrate(ref_timer, min(elapsed, min_time))
+    per_call, ref_per_call = [], []
+    for _ in range(repeat):
+        per_call.append(timer.timeit(number) / number)
+        if reference is not None:
+            ref_per_call.append(ref_timer.timeit(ref_number) / ref_number)
+    return Result(
+        name=bench.name,
+        min=min(per_call),
+        median=statistics.median(per_call),
+        stdev=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        number=number,
+        repeat=repeat,
+        group=bench.group,
+        relative=statistics.median(map(truediv, per_call, ref_per_call)) if ref_per_call else None,
+    )
+
+
+def environment() -> dict:
+    """Interpreter / machine description stored with a baseline."""
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+# ── Baselines ──────────────────────────────────────────────────────────────────
+
+def save_baseline(results: list[Result], path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "environment": environment(),
+            "results": {r.name: r.as_dict() for r in results},
+        }, f, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: list[Result], baseline: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    One row per result: name, current and baseline per-call minimum, ratio
+    (current / baseline: of ``relative`` when both have it, else of the
+    minimum) and status — "regressed", "improved", "ok" or "new".
+    """
+    base = baseline.get("results", {})
+    rows = []
+    for r in results:
+        old = base.get(r.name)
+        if old is None:
+            rows.append({"name": r.name, "current": r.min, "baseline": None, "ratio": None, "status": "new"})
+            continue
+        if r.relative and old.get("relative"):
+            ratio = r.relative / old["relative"]
+        else:
+            ratio = r.min / old["min"] if old["min"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regressed"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": r.name, "current": r.min, "baseline": old["min"], "ratio": ratio, "status": status})
+    return rows
+
+
+def fmt_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def report(results: list[Result], rows: list[dict] | None = None) -> str:
+    """Plain-text table of results, with the baseline comparison if given."""
+    by_name = {row["name"]: row for row in rows or []}
+    width = max((len(r.name) for r in results), default=4)
+    lines = [f"{'benchmark':<{width}}  {'min':>10}  {'median':>10}  {'baseline':>10}  {'ratio':>6}  status"]
+    for r in results:
+        row = by_name.get(r.name, {})
+        baseline = fmt_time(row["baseline"]) if row.get("baseline") else "-"
+        ratio = f"{row['ratio']:.2f}x" if row.get("ratio") else "-"
+        lines.append(
+            f"{r.name:<{width}}  {fmt_time(r.min):>10}  {fmt_time(r.median):>10}  "
+            f"{baseline:>10}  {ratio:>6}  {row.get('status', '')}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,344 @@
+"""
+Local HTTP JSON API for the mana engine.
+
+A small asyncio HTTP/1.1 server (stdlib only) for bots and GM tools that need
+one-line cost queries without a Streamlit rerun.
+
+Endpoints
+─────────
+    GET  /health   → {"ok": true}
+    GET  /metrics  → OpenMetrics text (engine metrics; empty unless MANA_METRICS=1)
+    POST /pool     {"highest_tier"?, "arcana": [{"name", "tier"}, …]}
+                   → {"total_pool": 200.0, "breakdown": {"Draoidh": 100.0, …}}
+    POST /cast     {"spell_tier", "efficiency"?, "orders"?, "quantity"?,
+                    "quantity_mode"?, "situational_modifier"?, "situational_insertion"?}
+                   → {"cost": 28.05}
+    POST /hybrid   {"spell_a": {"tier", "efficiency"?}, "spell_b": {…}, "orders"?,
+                    "situational_modifier"?, "situational_insertion"?}
+                   → {"cost": 29.34}
+    POST /batch    {"casts": [<cast or hybrid body>, …]}   (hybrids have "spell_b")
+                   → {"costs": [28.05, …]}
+
+Tiers are names ("Master"); situational modifiers are numbers or strings like
+"1/4".  Orders (within the ruleset's orders of expression) and quantities
+(at least 1) are JSON integers; quantity_mode is "bundled" or "per_cast", and
+situational_insertion "after_efficiency" or "after_expression".  Costs use the configured engine (``COST_ENGINE``, or ``--engine``).
+Any POST body may add ``"ruleset"`` — a built-in name ("wiki", "spreadsheet")
+or a house-rules object (``Ruleset.to_dict``); it applies to that request only.
+Invalid requests get a 400 with {"error": …}.
+
+Connections are kept alive (HTTP/1.1 default) until the client sends
+``Connection: close`` or stays idle past ``idle_timeout``; once a request line
+arrives, its headers and body must follow within ``request_timeout``.  At most
+``max_concurrency`` requests are in flight (priced on a worker thread, and
+their response being written) at once; up to ``max_queue`` more wait, and
+anything beyond that is answered 503 with ``Retry-After`` straight away rather
+than piling up.  Pricing never runs on the event loop, so slow requests do not
+stall reads and writes on other connections.
+
+Usage
+─────
+    python -m src.api                          # 127.0.0.1:8080
+    python -m src.api --host 0.0.0.0 --port 8080 --max-concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from .config import COST_ENGINE
+from .engine.calc_pool import compute_pool
+from .engine.metrics import openmetrics_text
+from .engine.ruleset import resolve_ruleset, use_ruleset
+from .engine.tiers import tier_from_name
+from .ledger.macros import check_cast_fields
+from .ledger.pricing import cast_cost, hybrid_cost, parse_situational
+
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 1000
+MAX_HEADERS = 100
+SITUATIONAL_INSERTIONS = ("after_efficiency", "after_expression")
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    """A request the API rejects; carries the HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ── Request handling ───────────────────────────────────────────────────────────
+
+def _modifier(value, engine: str) -> float | Fraction | None:
+    if isinstance(value, bool):
+        raise ValueError("situational_modifier must be a number or a string, not a boolean")
+    if value is None or isinstance(value, (int, float)):
+        return value
+    modifier = parse_situational(str(value), exact=engine == "cents")
+    if modifier is None and str(value).strip():
+        raise ValueError(f"situational_modifier {value!r} is not a number or fraction")
+    return modifier
+
+
+def _checked(body: dict) -> dict:
+    """*body* after the field checks macros use; ValueError on the first bad field."""
+    check_cast_fields(body)
+    if body.get("situational_insertion", "after_efficiency") not in SITUATIONAL_INSERTIONS:
+        raise ValueError(f"unknown situational_insertion {body.get('situational_insertion')!r}")
+    return body
+
+
+def _spell(body: dict) -> dict:
+    return {"tier": tier_from_name(body["tier"]), "efficiency": body.get("efficiency", "Standard")}
+
+
+def _hybrid(body: dict, engine: str) -> float:
+    body = _checked(body)
+    return hybrid_cost(
+        None, _spell(body["spell_a"]), _spell(body["spell_b"]),
+        orders=body.get("orders", 0),
+        situational_modifier=_modifier(body.get("situational_modifier"), engine),
+        situational_insertion=body.get("situational_insertion", "after_efficiency"),
+        engine=engine,
+    )
+
+
+def _cast(body: dict, engine: str) -> float:
+    body = _checked(body)
+    return cast_cost(
+        None, tier_from_name(body["spell_tier"]), body.get("efficiency", "Standard"),
+        body.get("orders", 0),
+        quantity=body.get("quantity", 1),
+        quantity_mode=body.get("quantity_mode", "bundled"),
+        situational_modifier=_modifier(body.get("situational_modifier"), engine),
+        situational_insertion=body.get("situational_insertion", "after_efficiency"),
+        engine=engine,
+    )
+
+
+def _pool(body: dict) -> dict:
+    arcana = [{"name": a["name"], "tier": tier_from_name(a["tier"])} for a in body["arcana"]]
+    total, breakdown = compute_pool(None, arcana)
+    return {"total_pool": total, "breakdown": breakdown}
+
+
+def _batch(body: dict, engine: str) -> dict:
+    casts = body["casts"]
+    if not isinstance(casts, list):
+        raise RequestError(400, '"casts" must be a list')
+    if len(casts) > MAX_BATCH:
+        raise RequestError(413, f"at most {MAX_BATCH} casts per batch")
+    costs = []
+    for i, cast in enumerate(casts):
+        try:
+            costs.append((_hybrid if "spell_b" in cast else _cast)(cast, engine))
+        except (KeyError, ValueError, TypeError, AttributeError, ArithmeticError) as e:
+            raise RequestError(400, f"casts[{i}]: {type(e).__name__}: {e}") from None
+    return {"costs": costs}
+
+
+def handle_request(method: str, path: str, body: bytes, engine: str = COST_ENGINE) -> tuple[int, dict | str]:
+    """Route one request; returns (status, JSON payload or text).  Never raises."""
+    path = path.split("?", 1)[0]
+    routes = {
+        "/pool": _pool,
+        "/cast": lambda data: {"cost": _cast(data, engine)},
+        "/hybrid": lambda data: {"cost": _hybrid(data, engine)},
+        "/batch": lambda data: _batch(data, engine),
+    }
+    try:
+        if path == "/health":
+            if method != "GET":
+                raise RequestError(405, "use GET")
+            return 200, {"ok": True}
+        if path == "/metrics":
+            if method != "GET":
+                raise RequestError(405, "use GET")
+            return 200, openmetrics_text()
+        route = routes.get(path)
+        if route is None:
+            raise RequestError(404, f"no endpoint {path}")
+        if method != "POST":
+            raise RequestError(405, "use POST")
+        try:
+            data = json.loads(body or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise RequestError(400, f"invalid JSON: {e}") from None
+        if not isinstance(data, dict):
+            raise RequestError(400, "request body must be a JSON object")
+        with use_ruleset(resolve_ruleset(data.get("ruleset"))):
+            return 200, route(data)
+    except RequestError as e:
+        return e.status, {"error": str(e)}
+    except (KeyError, ValueError, TypeError, AttributeError, ArithmeticError) as e:
+        return 400, {"error": f"{type(e).__name__}: {e}"}
+
+
+# ── HTTP server ────────────────────────────────────────────────────────────────
+
+class EngineServer:
+    """Keep-alive HTTP/1.1 front end for handle_request() with bounded concurrency."""
+
+    def __init__(
+        self,
+        engine: str = COST_ENGINE,
+        max_concurrency: int = 64,
+        max_queue: int = 256,
+        idle_timeout: float = 15.0,
+        request_timeout: float = 10.0,
+    ):
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._workers = ThreadPoolExecutor(max_concurrency, thread_name_prefix="mana-api")
+        self._admitted = 0            # requests running or waiting for a slot
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        return await asyncio.start_server(self._client, host, port)
+
+    def close(self):
+        """Stop the pricing threads (after the asyncio server is closed)."""
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """(method, path, version, headers, body), or None at end of stream."""
+        line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        if not line:
+            return None
+        return await asyncio.wait_for(self._read_rest(reader, line), self.request_timeout)
+
+    async def _read_rest(self, reader: asyncio.StreamReader, line: bytes):
+        """The headers and body following request *line*."""
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError(400, "malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise RequestError(400, "too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise RequestError(411, "chunked bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise RequestError(400, "bad Content-Length") from None
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, f"body over {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, version, headers, body
+
+    async def _respond(self, writer, status: int, payload: dict | str, keep_alive: bool, extra: str = ""):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), OPENMETRICS_TYPE
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"{extra}\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except RequestError as e:
+                    await self._respond(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, path, version, headers, body = request
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+                if self._admitted >= self.max_concurrency + self.max_queue:
+                    await self._respond(
+                        writer, 503, {"error": "server busy"}, keep_alive, "Retry-After: 1\r\n",
+                    )
+                else:
+                    # A slot is held until the response is drained, so slow
+                    # readers count against the limit as well as pricing work.
+                    self._admitted += 1
+                    try:
+                        async with self._slots:
+                            status, payload = await asyncio.get_running_loop().run_in_executor(
+                                self._workers, handle_request, method, path, body, self.engine,
+                            )
+                            await self._respond(writer, status, payload, keep_alive)
+                    finally:
+                        self._admitted -= 1
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host: str, port: int, **kwargs):
+    engine = EngineServer(**kwargs)
+    server = await engine.start(host, port)
+    print(f"Mana engine API on http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        engine.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.api",
+        description="Serve the mana engine as a local HTTP JSON API.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=64,
+                        help="Requests priced at once (default: 64)")
+    parser.add_argument("--max-queue", type=int, default=256,
+                        help="Requests allowed to wait for a slot before 503s (default: 256)")
+    parser.add_argument("--idle-timeout", type=float, default=15.0,
+                        help="Seconds an idle keep-alive connection stays open (default: 15)")
+    parser.add_argument("--request-timeout", type=float, default=10.0,
+                        help="Seconds to receive a request's headers and body (default: 10)")
+    parser.add_argument("--engine", choices=["float", "cents"], default=COST_ENGINE,
+                        help=f"Cost engine (default: {COST_ENGINE})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            engine=args.engine,
+            max_concurrency=args.max_concurrency,
+            max_queue=args.max_queue,
+            idle_timeout=args.idle_timeout,
+            request_timeout=args.request_timeout,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Bulk audit of exported ledger JSON files.
+
+Re-checks the Export tab's JSON artifacts (character, total_pool, remaining,
+ledger — plain or gzipped) against the engine:
+
+  • every entry's ``exact_cost`` is re-priced from its recorded fields
+    (compute_cast_cost_with_quantity / compute_hybrid_cost, or the cents
+    engine with ``--engine cents``);
+  • ``total_pool`` is recomputed with compute_pool();
+  • ``remaining`` is recomputed from the pool and the recorded costs.
+
+Each export is checked under the ruleset its character records (``"ruleset"``;
+the wiki rules if none), or under ``--ruleset`` for every file.  All
+comparisons are made in integer hundredths.  Files are spread across a process
+pool and one JSON result per file is streamed to the output as JSONL.
+
+Usage
+─────
+    python -m src.audit exports/                 # results to stdout
+    python -m src.audit exports/ -o audit.jsonl -j 8
+    python -m src.audit exports/ --ruleset house_rules.json
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from .config import COST_ENGINE
+from .engine.calc_cents import pool_to_cents, cost_to_cents
+from .engine.calc_pool import compute_pool
+from .engine.ruleset import Ruleset, load_ruleset, resolve_ruleset, use_ruleset
+from .engine.tiers import tier_from_name
+from .ledger.export import read_export
+from .ledger.model import Ledger
+from .ledger.pricing import price_entry
+
+
+def _cents(value) -> int:
+    """Recorded pool/remaining/cost value (str or number) → integer hundredths."""
+    if isinstance(value, str):
+        return cost_to_cents(value)
+    return pool_to_cents(float(value))
+
+
+def audit_export(data: dict, engine: str = COST_ENGINE, ruleset: Ruleset | None = None) -> dict:
+    """
+    Audit one parsed export, under *ruleset* or else the character's own.
+
+    Returns a dict with ``ok`` plus a ``mismatches`` list; each mismatch names
+    the field, the entry id (for ``exact_cost``), and the recorded vs expected
+    values as strings.
+    """
+    character = data.get("character", {})
+    with use_ruleset(ruleset or resolve_ruleset(character.get("ruleset"))):
+        return _audit(data, character, engine)
+
+
+def _audit(data: dict, character: dict, engine: str) -> dict:
+    entries = data.get("ledger", [])
+    mismatches = []
+
+    highest_tier = tier_from_name(character.get("highest_tier", "Master"))
+    total_pool, _ = compute_pool(highest_tier, character.get("arcana", []))
+
+    for entry in entries:
+        try:
+            expected = price_entry(highest_tier, entry, engine=engine)
+        except (KeyError, ValueError) as e:
+            mismatches.append({
+                "field": "exact_cost", "id": entry.get("id"),
+                "recorded": entry.get("exact_cost"), "error": f"{type(e).__name__}: {e}",
+            })
+            continue
+        if _cents(entry["exact_cost"]) != pool_to_cents(expected):
+            mismatches.append({
+                "field": "exact_cost", "id": entry.get("id"),
+                "recorded": entry["exact_cost"], "expected": str(expected),
+            })
+
+    if "total_pool" in data and _cents(data["total_pool"]) != pool_to_cents(total_pool):
+        mismatches.append({
+            "field": "total_pool", "recorded": data["total_pool"], "expected": str(total_pool),
+        })
+
+    if "remaining" in data:
+        remaining = Ledger(entries, engine="cents").remaining(total_pool)
+        if _cents(data["remaining"]) != pool_to_cents(remaining):
+            mismatches.append({
+                "field": "remaining", "recorded": data["remaining"], "expected": str(remaining),
+            })
+
+    return {
+        "character": character.get("name", ""),
+        "entries": len(entries),
+        "ok": not mismatches,
+        "mismatches": mismatches,
+    }
+
+
+def audit_file(path: str, engine: str = COST_ENGINE, ruleset: Ruleset | None = None) -> dict:
+    """Audit one export file; unreadable files are reported, not raised."""
+    try:
+        with open(path, "rb") as f:
+            data = read_export(f)
+        result = audit_export(data, engine=engine, ruleset=ruleset)
+    except Exception as e:
+        result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"file": path, **result}
+
+
+def _audit_file_task(args: tuple) -> dict:
+    return audit_file(*args)
+
+
+def find_exports(root: str) -> list[str]:
+    """Every *.json / *.json.gz file under *root* (or *root* itself), sorted."""
+    if os.path.isfile(root):
+        return [root]
+    return sorted(
+        str(p) for p in Path(root).rglob("*")
+        if p.name.endswith((".json", ".json.gz")) and p.is_file()
+    )
+
+
+def iter_audit(
+    paths: list[str],
+    workers: int | None = None,
+    engine: str = COST_ENGINE,
+    ruleset: Ruleset | None = None,
+):
+    """Yield audit results in input order, computed across a process pool."""
+    if workers == 1:
+        for path in paths:
+            yield audit_file(path, engine, ruleset)
+        return
+    chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_audit_file_task, [(p, engine, ruleset) for p in paths], chunksize=chunksize)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.audit",
+        description="Re-check exported ledger JSON files against the mana engine.",
+    )
+    parser.add_argument("path", help="Export file or directory of exports (searched recursively)")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--engine", choices=["float", "cents"], default=COST_ENGINE,
+                        help=f"Cost engine to re-price with (default: {COST_ENGINE})")
+    parser.add_argument("--ruleset", default=None,
+                        help="Built-in ruleset name or house-rules JSON for every file "
+                             "(default: each character's own)")
+    args = parser.parse_args(argv)
+
+    try:
+        ruleset = load_ruleset(args.ruleset) if args.ruleset else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    paths = find_exports(args.path)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for result in iter_audit(paths, args.workers, args.engine, ruleset):
+            failed += not result["ok"]
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Audited {len(paths)} file(s): {failed} with mismatches.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 """
 Global configuration for the Antarok Mana Calculator.
 Edit this file to adjust Orders of Expression discounts or other tunable values.
+The rule values below are the default (wiki) ruleset — see src/engine/ruleset.py
+for per-campaign house rules.
 """
 from fractions import Fraction
 
@@ -31,6 +33,18 @@ def get_order_discount(order: int) -> Fraction:
     return ORDERS_OF_EXPRESSION.get(order, MAX_ORDER_DISCOUNT)
 
 
+# ── Cost engine ────────────────────────────────────────────────────────────────
+# "float" — float pipeline (calc_cast / calc_hybrid), ceil to 2dp at the end.
+# "cents" — exact rationals ceiled to integer hundredths (calc_cents); ledger
+#           balances are accumulated as integers, so they never drift.
+COST_ENGINE: str = "float"
+
+# ── Ledger history ─────────────────────────────────────────────────────────────
+# Undo / redo steps kept per ledger.  A step holds references to entries (and,
+# for Clear All / import, to the replaced list), never copies.
+UNDO_HISTORY: int = 200
+
+
 # ── Spell Efficiency Names ─────────────────────────────────────────────────────
 EFFICIENCY_NAMES = ["Standard", "Optimal", "Efficient", "Inefficient", "Strenuous"]
 
@@ -73,7 +87,7 @@ EFFICIENCY_BELOW_MULT: dict[str, int] = {
     "Strenuous":   5,
 }
 
-# ── Legacy aliases (kept for spreadsheet_mode.py backward compat) ──────────────
+# ── Legacy aliases (kept for backward compat; see SPREADSHEET_RULES) ───────────
 SPREADSHEET_TIER_VALUES = TIER_VALUES
 SPREADSHEET_TIER_ORDER = TIER_ORDER
 SPREADSHEET_NOVICE_COSTS = NOVICE_EFFICIENCY_COSTS
@@ -23,11 +23,16 @@ Situational modifier (optional, e.g. Fraction(1,4) for grove):
     Applied after efficiency by default; configurable to after expression.
 
 All arithmetic uses floats; ceiling is applied at the quantity step.
+Base and discounted costs are read from the active ruleset's compiled table
+(cost_table.py); only casts with a situational modifier or out-of-range orders
+are recomputed.
 """
 import math
 from fractions import Fraction
-from .tiers import Tier, tier_value, tier_below
-from ..config import TIER_VALUES, NOVICE_EFFICIENCY_COSTS, EFFICIENCY_BELOW_MULT, get_order_discount
+import numpy as np
+from .tiers import Tier
+from .cost_table import cost_table
+from .metrics import ENABLED as _METRICS, cache_access, timed
 
 
 def get_spell_base_cost(spell_tier: Tier, efficiency: str) -> float:
@@ -38,17 +43,10 @@ def get_spell_base_cost(spell_tier: Tier, efficiency: str) -> float:
     Others    → MULT × tier_below      (e.g. Expert Efficient = 2 × 11 = 22)
     Novice    → fixed decimal           (e.g. Novice Efficient = 0.66)
     """
-    if spell_tier == Tier.NOVICE:
-        return float(NOVICE_EFFICIENCY_COSTS[efficiency])
-
-    if efficiency == "Standard":
-        return tier_value(spell_tier)
-
-    below = tier_below(spell_tier)
-    mult = EFFICIENCY_BELOW_MULT[efficiency]
-    return float(mult * TIER_VALUES[below.name.title()])
+    return cost_table().base[(spell_tier, efficiency)]
 
 
+@timed
 def compute_cast_cost(
     highest_tier: Tier,                         # accepted for API compat; not used
     spell_tier: Tier,
@@ -73,12 +71,20 @@ def compute_cast_cost(
     -------
     float — unrounded cost.
     """
-    working = get_spell_base_cost(spell_tier, efficiency)
+    table = cost_table()
+    if situational_modifier is None:
+        cost = table.unrounded.get((spell_tier, efficiency, orders))
+        if _METRICS:
+            cache_access("cost_table.unrounded", cost is not None)
+        if cost is not None:
+            return cost
+
+    working = table.base[(spell_tier, efficiency)]
 
     if situational_modifier is not None and situational_insertion == "after_efficiency":
         working *= float(situational_modifier)
 
-    discount = float(get_order_discount(orders)) * working
+    discount = table.order_discount(orders) * working
     working -= discount
 
     if situational_modifier is not None and situational_insertion == "after_expression":
@@ -92,6 +98,7 @@ def _ceil2(value: float) -> float:
     return math.ceil(value * 100) / 100
 
 
+@timed
 def compute_cast_cost_with_quantity(
     highest_tier: Tier,                         # API compat; not used
     spell_tier: Tier,
@@ -109,6 +116,13 @@ def compute_cast_cost_with_quantity(
     bundled  (default): ceil(unrounded × N, 2dp) — ceiling applied once.
     per_cast           : ceil(unrounded, 2dp) × N — ceiling per individual cast.
     """
+    if situational_modifier is None and quantity == 1:
+        ceiled = cost_table().ceiled.get((spell_tier, efficiency, orders))
+        if _METRICS:
+            cache_access("cost_table.ceiled", ceiled is not None)
+        if ceiled is not None:
+            return ceiled
+
     unrounded = compute_cast_cost(
         highest_tier, spell_tier, efficiency, orders,
         situational_modifier, situational_insertion,
@@ -118,3 +132,110 @@ def compute_cast_cost_with_quantity(
         return _ceil2(unrounded * quantity)
     else:  # per_cast
         return _ceil2(unrounded) * quantity
+
+
+# ── Batch (NumPy) API ──────────────────────────────────────────────────────────
+
+_TIER_CODES: dict[str, int] = {t.name.title(): int(t) for t in Tier}
+
+_BATCH_FIELDS = (
+    "spell_tier", "efficiency", "orders", "quantity",
+    "quantity_mode", "situational_modifier", "situational_insertion",
+)
+
+
+def _name_codes(values, codes: dict[str, int], size: int) -> np.ndarray:
+    """Map a scalar or array of names (or ready-made int codes) to code array."""
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        codes_arr = arr.astype(np.intp)
+    else:
+        uniques, inverse = np.unique(arr.reshape(-1).astype(str), return_inverse=True)
+        lookup = np.array([codes[name] for name in uniques], dtype=np.intp)
+        codes_arr = lookup[inverse.reshape(-1)].reshape(arr.shape)
+    return np.broadcast_to(codes_arr, (size,))
+
+
+def _modifier_array(values, size: int) -> np.ndarray:
+    """Situational modifiers as float64; None (or NaN) means "no modifier"."""
+    if values is None:
+        return np.full(size, np.nan)
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        arr = np.array(
+            [np.nan if v is None else float(v) for v in arr.reshape(-1)], dtype=np.float64,
+        ).reshape(arr.shape)
+    return np.broadcast_to(arr.astype(np.float64), (size,))
+
+
+@timed
+def compute_cast_cost_batch(
+    spell_tier,
+    efficiency="Standard",
+    orders=0,
+    quantity=1,
+    quantity_mode="bundled",
+    situational_modifier=None,
+    situational_insertion="after_efficiency",
+) -> np.ndarray:
+    """
+    Vectorised compute_cast_cost_with_quantity() over many casts at once.
+
+    Every argument is either a scalar (broadcast to all rows) or a 1-D array
+    of the same length:
+
+    spell_tier            : Tier values / ints, or tier names
+    efficiency            : efficiency names, or codes into EFFICIENCY_NAMES
+    orders                : Orders of Expression (capped as in the scalar path)
+    quantity              : casts per row
+    quantity_mode         : "bundled" / "per_cast"
+    situational_modifier  : floats (NaN = none), or None for no modifiers
+    situational_insertion : "after_efficiency" / "after_expression"
+
+    *spell_tier* may instead be a NumPy structured array whose field names
+    match the parameters above; any missing fields take the defaults.
+
+    Returns
+    -------
+    float64 array — ROUNDED total costs, identical to the scalar function.
+    """
+    if isinstance(spell_tier, np.ndarray) and spell_tier.dtype.names:
+        records = spell_tier
+        defaults = dict(
+            efficiency=efficiency, orders=orders, quantity=quantity,
+            quantity_mode=quantity_mode, situational_modifier=situational_modifier,
+            situational_insertion=situational_insertion,
+        )
+        return compute_cast_cost_batch(**{
+            field: records[field] if field in records.dtype.names else defaults[field]
+            for field in _BATCH_FIELDS
+        })
+
+    size = int(np.broadcast(
+        *(np.asarray(v, dtype=object) if v is None else np.asarray(v)
+          for v in (spell_tier, efficiency, orders, quantity, quantity_mode,
+                    situational_modifier, situational_insertion))
+    ).size)
+
+    tiers = _name_codes(spell_tier, _TIER_CODES, size)
+    table = cost_table()
+    effs = _name_codes(efficiency, table.efficiency_codes, size)
+    working = table.base_array[tiers, effs]
+
+    order_idx = np.clip(np.asarray(orders), 0, len(table.discount_array) - 1)
+    discount = np.broadcast_to(table.discount_array[order_idx], (size,))
+
+    mods = _modifier_array(situational_modifier, size)
+    has_mod = ~np.isnan(mods)
+    insertion = np.asarray(situational_insertion)
+
+    # Same operation order as compute_cast_cost(), so results are bit-identical.
+    working = np.where(has_mod & (insertion == "after_efficiency"), working * mods, working)
+    working = working - discount * working
+    working = np.where(has_mod & (insertion == "after_expression"), working * mods, working)
+
+    qty = np.broadcast_to(np.asarray(quantity, dtype=np.float64), (size,))
+    per_cast = np.asarray(quantity_mode) != "bundled"
+    bundled_cost = np.ceil(working * qty * 100) / 100
+    per_cast_cost = (np.ceil(working * 100) / 100) * qty
+    return np.where(per_cast, per_cast_cost, bundled_cost)
@@ -0,0 +1,262 @@
+"""
+Fixed-point cost engine — exact rationals ceiled to integer hundredths.
+
+The float engine (calc_cast / calc_hybrid) ceils with
+``math.ceil(value * 100) / 100``, so float noise such as 28.050000000000004
+can tip a cost up by a cent.  This engine runs the same pipeline on exact
+``Fraction`` values and returns costs as integer hundredths ("cents"):
+
+    base      = TIER_VALUES / EFFICIENCY_BELOW_MULT × tier_below / Novice fixed
+    working   = base × situational (after_efficiency)
+    working   = working × (1 − order_discount)
+    working   = working × situational (after_expression)
+    bundled   → ceil(working × N × 100)
+    per_cast  → ceil(working × 100) × N
+
+Hybrid spells use (base_A + base_B) × 2/3 as the starting value.
+
+Novice fixed costs and float situational modifiers are converted through their
+decimal repr (0.66 → 66/100, 0.7 → 7/10), not their binary float value.
+
+Every (tier, efficiency, orders) combination, and every hybrid pair at every
+order, is precompiled — once per ruleset (ruleset.py) — to an integer
+numerator/denominator pair.  A situational modifier is carried as its own
+integer numerator/denominator (exact multiplication commutes, so where it is
+inserted cannot change the result), which keeps every path pure integer
+arithmetic.  Balances built from cents are exact however long the ledger is.
+
+Select this engine with ``COST_ENGINE = "cents"`` in ``src/config.py``.
+"""
+from fractions import Fraction
+from .tiers import Tier
+from .metrics import ENABLED as _METRICS, cache_access, timed
+from .ruleset import WIKI_RULES, Ruleset, active_ruleset
+from ..config import EFFICIENCY_NAMES
+
+_HYBRID_MULT = Fraction(2, 3)
+
+
+def to_fraction(value: Fraction | float | int) -> Fraction:
+    """Exact rational for *value*; floats go through their shortest decimal repr."""
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def _ceil_div(num: int, den: int) -> int:
+    return -(-num // den)
+
+
+def ceil_cents(value: Fraction) -> int:
+    """Ceiling of *value* in integer hundredths (e.g. 1/3 → 34)."""
+    return _ceil_div(value.numerator * 100, value.denominator)
+
+
+def _compile_base(ruleset: Ruleset = WIKI_RULES) -> dict[tuple[Tier, str], Fraction]:
+    base = {}
+    for tier in Tier:
+        for efficiency in EFFICIENCY_NAMES:
+            if tier == Tier.NOVICE:
+                cost = to_fraction(ruleset.novice_costs[efficiency])
+            elif efficiency == "Standard":
+                cost = to_fraction(ruleset.tier_values[tier.name.title()])
+            else:
+                below = Tier(int(tier) - 1)
+                cost = to_fraction(ruleset.below_mult[efficiency]) * to_fraction(
+                    ruleset.tier_values[below.name.title()]
+                )
+            base[(tier, efficiency)] = cost
+    return base
+
+
+def _compile_exact(ruleset: Ruleset) -> tuple[dict, dict, dict]:
+    """
+    (base, ratio, ceiled) for *ruleset*:
+
+    base   : (tier, efficiency) → exact base cost
+    ratio  : (tier, efficiency, orders) → (numerator × 100, denominator) of the discounted cost
+    ceiled : (tier, efficiency, orders) → ceiled cents for a single cast
+    """
+    base = _compile_base(ruleset)
+    ratio, ceiled = {}, {}
+    for (tier, eff), cost in base.items():
+        for order in ruleset.orders_of_expression:
+            discounted = cost * (1 - ruleset.order_discount(order))
+            ratio[(tier, eff, order)] = (discounted.numerator * 100, discounted.denominator)
+            ceiled[(tier, eff, order)] = ceil_cents(discounted)
+    return base, ratio, ceiled
+
+
+def _compile_hybrid(ruleset: Ruleset) -> dict[tuple[Tier, str, Tier, str, int], tuple[int, int]]:
+    """
+    (tier_a, eff_a, tier_b, eff_b, orders) → (numerator × 100, denominator)
+    of the discounted hybrid cost.
+    """
+    base = ruleset.compiled(_compile_exact)[0]
+    ratios = {}
+    for (tier_a, eff_a), cost_a in base.items():
+        for (tier_b, eff_b), cost_b in base.items():
+            combined = (cost_a + cost_b) * _HYBRID_MULT
+            for order in ruleset.orders_of_expression:
+                discounted = combined * (1 - ruleset.order_discount(order))
+                ratios[(tier_a, eff_a, tier_b, eff_b, order)] = (
+                    discounted.numerator * 100, discounted.denominator,
+                )
+    return ratios
+
+
+# The default ruleset's tables.
+EXACT_BASE, _CENTS_RATIO, _CEILED_CENTS = WIKI_RULES.compiled(_compile_exact)
+HYBRID_PAIR_CENTS = WIKI_RULES.compiled(_compile_hybrid)
+
+# Float modifiers → (numerator, denominator) of their decimal repr (bounded,
+# like the shared-cost cache in ledger/entry.py).
+_FLOAT_RATIOS: dict[float, tuple[int, int]] = {}
+_MAX_FLOAT_RATIOS = 1 << 12
+
+
+def _modifier_ratio(modifier: Fraction | float | int) -> tuple[int, int]:
+    if isinstance(modifier, Fraction):
+        return modifier.numerator, modifier.denominator
+    if isinstance(modifier, int):
+        return modifier, 1
+    ratio = _FLOAT_RATIOS.get(modifier)
+    if ratio is None:
+        exact = to_fraction(modifier)
+        ratio = (exact.numerator, exact.denominator)
+        if len(_FLOAT_RATIOS) < _MAX_FLOAT_RATIOS:
+            _FLOAT_RATIOS[modifier] = ratio
+    return ratio
+
+
+def _apply_modifiers(
+    working: Fraction,
+    discount: Fraction,
+    situational_modifier: Fraction | float | None,
+    situational_insertion: str,
+) -> Fraction:
+    if situational_modifier is not None and situational_insertion == "after_efficiency":
+        working *= to_fraction(situational_modifier)
+
+    working *= 1 - discount
+
+    if situational_modifier is not None and situational_insertion == "after_expression":
+        working *= to_fraction(situational_modifier)
+    return working
+
+
+def compute_cast_cost_exact(
+    highest_tier: Tier,                         # API compat; not used
+    spell_tier: Tier,
+    efficiency: str = "Standard",
+    orders: int = 0,
+    situational_modifier: Fraction | float | None = None,
+    situational_insertion: str = "after_efficiency",
+) -> Fraction:
+    """Return the exact, UNROUNDED cost of a single cast as a Fraction."""
+    ruleset = active_ruleset()
+    return _apply_modifiers(
+        ruleset.compiled(_compile_exact)[0][(spell_tier, efficiency)],
+        ruleset.order_discount(orders), situational_modifier, situational_insertion,
+    )
+
+
+@timed
+def compute_cast_cost_cents(
+    highest_tier: Tier,                         # API compat; not used
+    spell_tier: Tier,
+    efficiency: str = "Standard",
+    orders: int = 0,
+    quantity: int = 1,
+    quantity_mode: str = "bundled",             # "bundled" or "per_cast"
+    situational_modifier: Fraction | float | None = None,
+    situational_insertion: str = "after_efficiency",
+    display_mode: str = "ones",                 # API compat; not used
+) -> int:
+    """
+    Return the ROUNDED total cost for *quantity* casts in integer hundredths.
+
+    Same quantity semantics as compute_cast_cost_with_quantity():
+    bundled ceils once after multiplying, per_cast ceils each cast.
+    """
+    ruleset = active_ruleset()
+    _, ratios, ceileds = ruleset._compiled.get(_compile_exact) or ruleset.compiled(_compile_exact)
+    key = (spell_tier, efficiency, orders)
+    if situational_modifier is None:
+        if quantity == 1 or quantity_mode != "bundled":
+            ceiled = ceileds.get(key)
+            if _METRICS:
+                cache_access("cents_table", ceiled is not None)
+            if ceiled is not None:
+                return ceiled * quantity
+        else:
+            ratio = ratios.get(key)
+            if ratio is not None:
+                return _ceil_div(ratio[0] * quantity, ratio[1])
+    else:
+        ratio = ratios.get(key)
+        if ratio is not None:
+            mod_num, mod_den = _modifier_ratio(situational_modifier)
+            num, den = ratio[0] * mod_num, ratio[1] * mod_den
+            if quantity_mode == "bundled":
+                return _ceil_div(num * quantity, den)
+            return _ceil_div(num, den) * quantity
+
+    unrounded = compute_cast_cost_exact(
+        highest_tier, spell_tier, efficiency, orders,
+        situational_modifier, situational_insertion,
+    )
+    if quantity_mode == "bundled":
+        return ceil_cents(unrounded * quantity)
+    return ceil_cents(unrounded) * quantity
+
+
+@timed
+def compute_hybrid_cost_cents(
+    highest_tier: Tier,                         # API compat; not used
+    spell_a: dict,
+    spell_b: dict,
+    orders: int = 0,
+    situational_modifier: Fraction | float | None = None,
+    situational_insertion: str = "after_efficiency",
+    display_mode: str = "ones",                 # API compat; not used
+) -> int:
+    """Return the ROUNDED hybrid cost in integer hundredths (see calc_hybrid)."""
+    ruleset = active_ruleset()
+    ratios = ruleset._compiled.get(_compile_hybrid) or ruleset.compiled(_compile_hybrid)
+    key = (
+        spell_a["tier"], spell_a.get("efficiency", "Standard"),
+        spell_b["tier"], spell_b.get("efficiency", "Standard"),
+        orders,
+    )
+    ratio = ratios.get(key)
+    if ratio is None:
+        # Orders past the compiled table (or an unknown pair → KeyError).
+        base = ruleset.compiled(_compile_exact)[0]
+        hybrid = _apply_modifiers(
+            (base[key[:2]] + base[key[2:4]]) * _HYBRID_MULT, ruleset.order_discount(orders),
+            situational_modifier, situational_insertion,
+        )
+        return ceil_cents(hybrid)
+    if situational_modifier is None:
+        return _ceil_div(ratio[0], ratio[1])
+    mod_num, mod_den = _modifier_ratio(situational_modifier)
+    return _ceil_div(ratio[0] * mod_num, ratio[1] * mod_den)
+
+
+# ── Conversions ────────────────────────────────────────────────────────────────
+
+def cost_to_cents(s: str) -> int:
+    """
+    Parse a ledger ``exact_cost`` string into integer hundredths.
+
+    Handles '22.0' / '28.05' decimals and legacy '34/100' fractions.  Recorded
+    costs are already ceiled to hundredths, so trailing float noise
+    ('0.21000000000000002') is rounded away rather than ceiled.
+    """
+    return round(Fraction(s) * 100)
+
+
+def pool_to_cents(pool_total: float) -> int:
+    """Pool totals are sums of tier values; convert to hundredths exactly."""
+    return round(to_fraction(pool_total) * 100)
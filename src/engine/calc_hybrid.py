@@ -10,16 +10,42 @@ A Hybrid Spell combines two spells cast simultaneously:
   6. Apply ceiling rounding once at the end (2 decimal places).
 
 Both component spells must be the same tier (validated by caller/UI).
+
+Steps 1-3 depend only on the two (tier, efficiency) pairs, so they are
+precomputed for every pair from each ruleset's compiled cost table:
+
+    pair_base[(tier_a, eff_a, tier_b, eff_b)] = (cost_A + cost_B) × 2/3
+
+pair_array holds the same values as a float64 array indexed
+[tier_a, eff_code_a, tier_b, eff_code_b] for compute_hybrid_cost_batch().
+HYBRID_PAIR_BASE / HYBRID_PAIR_ARRAY are the default (wiki) ruleset's tables.
 """
-import math
 from fractions import Fraction
+import numpy as np
 from .tiers import Tier
-from .calc_cast import get_spell_base_cost, _ceil2
-from ..config import get_order_discount
+from .cost_table import cost_table
+from .ruleset import WIKI_RULES, Ruleset, active_ruleset
+from .metrics import timed
+from .calc_cast import _ceil2, _name_codes, _modifier_array, _TIER_CODES
 
 _HYBRID_MULT = 2 / 3
 
 
+def _compile_pairs(ruleset: Ruleset) -> tuple[dict[tuple[Tier, str, Tier, str], float], np.ndarray]:
+    table = cost_table(ruleset)
+    pair_base = {
+        (tier_a, eff_a, tier_b, eff_b): (cost_a + cost_b) * _HYBRID_MULT
+        for (tier_a, eff_a), cost_a in table.base.items()
+        for (tier_b, eff_b), cost_b in table.base.items()
+    }
+    pair_array = (table.base_array[:, :, None, None] + table.base_array[None, None, :, :]) * _HYBRID_MULT
+    return pair_base, pair_array
+
+
+HYBRID_PAIR_BASE, HYBRID_PAIR_ARRAY = WIKI_RULES.compiled(_compile_pairs)
+
+
+@timed
 def compute_hybrid_cost(
     highest_tier: Tier,                         # API compat; not used
     spell_a: dict,
@@ -52,20 +78,16 @@ def compute_hybrid_cost(
     eff_a = spell_a.get("efficiency", "Standard")
     eff_b = spell_b.get("efficiency", "Standard")
 
-    # Step 1: individual unrounded base costs (no orders/situational here)
-    cost_a = get_spell_base_cost(tier_a, eff_a)
-    cost_b = get_spell_base_cost(tier_b, eff_b)
-
-    # Step 2-3: combine and apply hybrid efficient modifier
-    combined = cost_a + cost_b
-    hybrid = combined * _HYBRID_MULT
+    # Step 1-3: base costs, combined, × hybrid efficient modifier (precomputed)
+    ruleset = active_ruleset()
+    hybrid = ruleset.compiled(_compile_pairs)[0][(tier_a, eff_a, tier_b, eff_b)]
 
     # Step 4: situational modifier (default: after_efficiency = after hybrid mult)
     if situational_modifier is not None and situational_insertion == "after_efficiency":
         hybrid *= float(situational_modifier)
 
     # Step 5: Orders of Expression
-    discount = float(get_order_discount(orders)) * hybrid
+    discount = cost_table(ruleset).order_discount(orders) * hybrid
     hybrid -= discount
 
     # Step 4 alt: after expression
@@ -74,3 +96,54 @@ def compute_hybrid_cost(
 
     # Step 6: ceiling rounding
     return _ceil2(hybrid)
+
+
+@timed
+def compute_hybrid_cost_batch(
+    tier_a,
+    efficiency_a,
+    tier_b,
+    efficiency_b,
+    orders=0,
+    situational_modifier=None,
+    situational_insertion="after_efficiency",
+) -> np.ndarray:
+    """
+    Vectorised compute_hybrid_cost() over many hybrid casts at once.
+
+    Each argument is a scalar (broadcast) or a 1-D array of equal length.
+    Tiers and efficiencies accept names or integer codes, situational
+    modifiers use NaN (or None) for "no modifier" — see
+    compute_cast_cost_batch() for the conventions.
+
+    Returns
+    -------
+    float64 array — ceiling-rounded hybrid costs, identical to the scalar path.
+    """
+    size = int(np.broadcast(
+        *(np.asarray(v, dtype=object) if v is None else np.asarray(v)
+          for v in (tier_a, efficiency_a, tier_b, efficiency_b, orders,
+                    situational_modifier, situational_insertion))
+    ).size)
+
+    ruleset = active_ruleset()
+    table = cost_table(ruleset)
+    hybrid = ruleset.compiled(_compile_pairs)[1][
+        _name_codes(tier_a, _TIER_CODES, size),
+        _name_codes(efficiency_a, table.efficiency_codes, size),
+        _name_codes(tier_b, _TIER_CODES, size),
+        _name_codes(efficiency_b, table.efficiency_codes, size),
+    ]
+
+    order_idx = np.clip(np.asarray(orders), 0, len(table.discount_array) - 1)
+    discount = np.broadcast_to(table.discount_array[order_idx], (size,))
+
+    mods = _modifier_array(situational_modifier, size)
+    has_mod = ~np.isnan(mods)
+    insertion = np.asarray(situational_insertion)
+
+    hybrid = np.where(has_mod & (insertion == "after_efficiency"), hybrid * mods, hybrid)
+    hybrid = hybrid - discount * hybrid
+    hybrid = np.where(has_mod & (insertion == "after_expression"), hybrid * mods, hybrid)
+
+    return np.ceil(hybrid * 100) / 100
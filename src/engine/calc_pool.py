@@ -1,17 +1,36 @@
 """
 Mana pool computation.
 
-Pool = Σ TIER_VALUES[arcana_tier]  for every arcana the character possesses.
+Pool = Σ tier_values[arcana_tier]  for every arcana the character possesses,
+with the tier values of the active ruleset (ruleset.py).
 
 Each arcana contributes its absolute tier value regardless of the character's
 highest tier.  (The highest_tier parameter is accepted for API compatibility
 but is no longer part of the pool calculation.)
 
 Tier values: Ascendant=300, Master=100, Expert=33, Journeyman=11, Apprentice=4, Novice=1
+
+Rosters
+───────
+For many characters at once (GM party views), ``compute_pool_batch`` and
+``compute_pool_columns`` reduce every character to a vector of per-tier arcana
+counts and take one matrix product with the tier values:
+
+    pools = counts[character, tier] @ tier_values[tier]
+
+The tier value vector is compiled once per ruleset (ruleset.py) and read from
+the active one; ``TIER_VALUE_ARRAY`` is the default (wiki) ruleset's.  With
+the integer tier values in config.py this is exact and equal to
+``compute_pool`` for every character.
 """
+from typing import Sequence
+import numpy as np
 from .tiers import Tier, tier_from_name, tier_value
+from .ruleset import WIKI_RULES, Ruleset, active_ruleset
+from .metrics import timed
 
 
+@timed
 def compute_pool(
     highest_tier: Tier,       # accepted for API compatibility; not used in calc
     arcana_list: list[dict],
@@ -50,3 +69,112 @@ def compute_pool(
         total += val
 
     return total, breakdown
+
+
+# ── Rosters ────────────────────────────────────────────────────────────────────
+
+def _compile_tier_values(ruleset: Ruleset) -> tuple[np.ndarray, list[float]]:
+    """Tier values indexed by int(Tier), low → high, as an array and a list."""
+    array = np.array([float(ruleset.tier_values[t.name.title()]) for t in Tier], dtype=np.float64)
+    return array, array.tolist()
+
+
+TIER_VALUE_ARRAY: np.ndarray = WIKI_RULES.compiled(_compile_tier_values)[0]
+
+_TIER_CODES: dict[str, int] = {t.name.title(): int(t) for t in Tier}
+
+
+def _tier_code(t) -> int:
+    """int(Tier) for a Tier, an int code, or a (case-insensitive) tier name."""
+    if isinstance(t, str):
+        code = _TIER_CODES.get(t)
+        return code if code is not None else int(tier_from_name(t))
+    return int(t)
+
+
+def tier_counts(roster: Sequence[list[dict]]) -> np.ndarray:
+    """
+    Per-tier arcana counts for each character in *roster*.
+
+    Returns an int64 array of shape (len(roster), len(Tier)); column i counts
+    the character's arcana of Tier(i).
+    """
+    n_tiers = len(Tier)
+    lengths = np.fromiter((len(arcana) for arcana in roster), dtype=np.intp, count=len(roster))
+    codes = np.fromiter(
+        (_tier_code(a["tier"]) for arcana in roster for a in arcana),
+        dtype=np.intp, count=int(lengths.sum()),
+    )
+    rows = np.repeat(np.arange(len(roster), dtype=np.intp), lengths)
+    counts = np.bincount(rows * n_tiers + codes, minlength=len(roster) * n_tiers)
+    return counts.reshape(len(roster), n_tiers).astype(np.int64)
+
+
+@timed
+def compute_pool_batch(
+    roster: Sequence[list[dict]],
+    breakdowns: bool = True,
+) -> tuple[np.ndarray, list[dict[str, float]] | None]:
+    """
+    ``compute_pool`` for every character in *roster* in one call.
+
+    Parameters
+    ----------
+    roster : sequence of arcana lists
+        One arcana list per character, as passed to compute_pool().
+    breakdowns : bool
+        Also build the {arcana_name: tier_value} dict for each character.
+
+    Returns
+    -------
+    totals : float64 array, one pool per character
+    breakdowns : list of dict, or None when *breakdowns* is False
+    """
+    array, values = active_ruleset().compiled(_compile_tier_values)
+    totals = tier_counts(roster) @ array
+    if not breakdowns:
+        return totals, None
+    return totals, [
+        {a["name"]: values[_tier_code(a["tier"])] for a in arcana}
+        for arcana in roster
+    ]
+
+
+@timed
+def compute_pool_columns(
+    character_id,
+    tier,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pools from columnar roster data — one row per arcana, no dicts.
+
+    Parameters
+    ----------
+    character_id : array-like
+        Owning character of each arcana row (any sortable ids).
+    tier : array-like
+        Tier of each arcana row, as int codes (int(Tier)) or tier names.
+
+    Returns
+    -------
+    ids : array
+        The distinct character ids, sorted.
+    totals : float64 array
+        Pool of each character in *ids*.
+    arcana_values : float64 array
+        Tier value of each input row (the per-arcana breakdown, row-aligned).
+    """
+    tier = np.asarray(tier)
+    if tier.dtype.kind in "iu":
+        codes = tier.astype(np.intp)
+    else:
+        uniques, inverse = np.unique(tier.astype(str), return_inverse=True)
+        lookup = np.array([_tier_code(name) for name in uniques], dtype=np.intp)
+        codes = lookup[inverse.reshape(-1)]
+    ids, owner = np.unique(np.asarray(character_id), return_inverse=True)
+    n_tiers = len(Tier)
+    counts = np.bincount(
+        owner.reshape(-1) * n_tiers + codes, minlength=len(ids) * n_tiers
+    ).reshape(len(ids), n_tiers)
+    values = active_ruleset().compiled(_compile_tier_values)[0]
+    return ids, counts @ values, values[codes]
@@ -0,0 +1,140 @@
+"""
+Compiled single-spell cost table.
+
+Every cost the engine can produce without a situational modifier depends only
+on (spell tier, efficiency, orders).  That space is tiny — 6 tiers × 5
+efficiencies × 7 orders — so it is computed once per ruleset (ruleset.py) and
+looked up afterwards instead of redoing the tier-name / multiplier /
+Fraction-to-float work on every call.
+
+The table is built with exactly the same float operations as the original
+pipeline in ``calc_cast.py``, so lookups are bit-for-bit identical to the
+values the engine used to recompute:
+
+    base      = tier value | MULT × tier_below value | Novice fixed cost
+    unrounded = base − float(order_discount) × base
+    ceiled    = ceil(unrounded × 100) / 100
+
+Orders outside the configured range (negative, or above the 6th order) are not
+tabled; ``CostTable.order_discount()`` resolves them with the same capping rule
+as ``Ruleset.order_discount()``.
+
+``cost_table()`` returns the table of the active ruleset; ``COST_TABLE`` is
+the default (wiki) ruleset's table.
+"""
+import math
+from fractions import Fraction
+from typing import Mapping
+import numpy as np
+from .tiers import Tier
+from .ruleset import WIKI_RULES, Ruleset, active_ruleset
+from ..config import EFFICIENCY_NAMES
+
+
+class CostTable:
+    """
+    Pre-computed base, unrounded and ceiled costs for one set of rule values.
+
+    Attributes
+    ----------
+    base      : {(Tier, efficiency): float}        — before orders/situational
+    discount  : {orders: float}                    — configured orders only
+    unrounded : {(Tier, efficiency, orders): float}
+    ceiled    : {(Tier, efficiency, orders): float} — ceil to 2 decimal places
+    matrix    : {tier_name: {efficiency: float}}   — base costs, for display
+
+    The same data is also laid out as NumPy arrays for the batch APIs:
+
+    efficiency_codes : {efficiency: int}           — column index into base_array
+    base_array       : float64[tier, efficiency_code]
+    discount_array   : float64[orders]             — 0 … max order, then the cap
+    """
+
+    def __init__(
+        self,
+        tier_values: Mapping[str, int | float],
+        novice_costs: Mapping[str, float],
+        below_mult: Mapping[str, int],
+        orders_of_expression: Mapping[int, Fraction],
+        max_discount: Fraction,
+        efficiency_names: list[str],
+    ):
+        self.max_discount = float(max_discount)
+        self.discount: dict[int, float] = {
+            order: float(frac) if order > 0 else 0.0
+            for order, frac in orders_of_expression.items()
+        }
+
+        self.base: dict[tuple[Tier, str], float] = {}
+        for tier in Tier:
+            for efficiency in efficiency_names:
+                if tier == Tier.NOVICE:
+                    cost = float(novice_costs[efficiency])
+                elif efficiency == "Standard":
+                    cost = float(tier_values[tier.name.title()])
+                else:
+                    below = Tier(int(tier) - 1)
+                    cost = float(below_mult[efficiency] * tier_values[below.name.title()])
+                self.base[(tier, efficiency)] = cost
+
+        self.unrounded: dict[tuple[Tier, str, int], float] = {}
+        self.ceiled: dict[tuple[Tier, str, int], float] = {}
+        for (tier, efficiency), cost in self.base.items():
+            for order, discount in self.discount.items():
+                unrounded = cost - discount * cost
+                self.unrounded[(tier, efficiency, order)] = unrounded
+                self.ceiled[(tier, efficiency, order)] = math.ceil(unrounded * 100) / 100
+
+        self.matrix: dict[str, dict[str, float]] = {
+            tier.name.title(): {
+                efficiency: self.base[(tier, efficiency)] for efficiency in efficiency_names
+            }
+            for tier in Tier
+        }
+
+        self.efficiency_codes: dict[str, int] = {
+            efficiency: code for code, efficiency in enumerate(efficiency_names)
+        }
+        self.base_array = np.array(
+            [[self.base[(tier, efficiency)] for efficiency in efficiency_names] for tier in Tier],
+            dtype=np.float64,
+        )
+        max_order = max(orders_of_expression)
+        self.discount_array = np.array(
+            [self.order_discount(order) for order in range(max_order + 2)],
+            dtype=np.float64,
+        )
+
+    def order_discount(self, orders: int) -> float:
+        """Float discount for *orders*, capped like ``Ruleset.order_discount()``."""
+        if orders <= 0:
+            return 0.0
+        discount = self.discount.get(orders)
+        if discount is None:
+            return self.max_discount
+        return discount
+
+
+def compile_cost_table(ruleset: Ruleset = WIKI_RULES) -> CostTable:
+    """Build a CostTable from *ruleset*'s values (default: the wiki rules in config.py)."""
+    return CostTable(
+        ruleset.tier_values,
+        ruleset.novice_costs,
+        ruleset.below_mult,
+        ruleset.orders_of_expression,
+        ruleset.max_discount,
+        EFFICIENCY_NAMES,
+    )
+
+
+def cost_table(ruleset: Ruleset | None = None) -> CostTable:
+    """The compiled CostTable of *ruleset* (default: the active ruleset), built once."""
+    if ruleset is None:
+        ruleset = active_ruleset()
+    # Inline fast path of Ruleset.compiled(): this runs on every priced cast.
+    table = ruleset._compiled.get(compile_cost_table)
+    return table if table is not None else ruleset.compiled(compile_cost_table)
+
+
+# The default ruleset's table.
+COST_TABLE: CostTable = cost_table(WIKI_RULES)
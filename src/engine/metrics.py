@@ -0,0 +1,172 @@
+"""
+Opt-in engine metrics with OpenMetrics export.
+
+Set ``MANA_METRICS=1`` in the environment before the engine is imported to
+record, per engine function, a call count and a latency histogram, plus hit /
+miss counts for the caches (the compiled cost table and the ledger's
+version-keyed memo).
+
+When the variable is unset the ``@timed`` decorator returns the function
+itself and the cache counters sit behind a module constant, so the disabled
+engine runs the same code as before — no wrappers, no clock reads.
+
+Export
+──────
+    openmetrics_text()            → text/plain OpenMetrics exposition
+    write_openmetrics(path)       → the same, written atomically to *path*
+
+The API server serves the text at ``GET /metrics``; the Streamlit app writes
+it to ``MANA_METRICS_FILE`` (if set) at most every few seconds.
+
+Metric families
+───────────────
+    mana_engine_calls_total{function}
+    mana_engine_latency_seconds{function}     histogram
+    mana_engine_cache_hits_total{cache}
+    mana_engine_cache_misses_total{cache}
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+
+ENABLED: bool = os.environ.get("MANA_METRICS", "").lower() in ("1", "true", "yes", "on")
+
+# Histogram upper bounds, seconds (100 ns … 1 s).
+LATENCY_BUCKETS: tuple[float, ...] = (
+    1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+    1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0,
+)
+
+
+class Histogram:
+    """Cumulative-export latency histogram over LATENCY_BUCKETS."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)   # last slot: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class Metrics:
+    """In-process registry of engine call latencies and cache hit counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[str, Histogram] = {}
+        self.cache: dict[str, list[int]] = {}          # name → [hits, misses]
+
+    def observe(self, function: str, seconds: float):
+        with self._lock:
+            hist = self.latency.get(function)
+            if hist is None:
+                hist = self.latency[function] = Histogram()
+            hist.observe(seconds)
+
+    def cache_access(self, cache: str, hit: bool):
+        with self._lock:
+            counts = self.cache.get(cache)
+            if counts is None:
+                counts = self.cache[cache] = [0, 0]
+            counts[0 if hit else 1] += 1
+
+    def hit_rate(self, cache: str) -> float | None:
+        hits, misses = self.cache.get(cache, (0, 0))
+        return hits / (hits + misses) if hits + misses else None
+
+    def reset(self):
+        with self._lock:
+            self.latency.clear()
+            self.cache.clear()
+
+    def openmetrics(self) -> str:
+        with self._lock:
+            latency = {name: (list(h.counts), h.count, h.sum) for name, h in sorted(self.latency.items())}
+            cache = {name: list(c) for name, c in sorted(self.cache.items())}
+
+        lines = ["# TYPE mana_engine_calls counter",
+                 "# HELP mana_engine_calls Engine function calls."]
+        for name, (_, count, _) in latency.items():
+            lines.append(f'mana_engine_calls_total{{function="{name}"}} {count}')
+
+        lines += ["# TYPE mana_engine_latency_seconds histogram",
+                  "# UNIT mana_engine_latency_seconds seconds",
+                  "# HELP mana_engine_latency_seconds Engine function latency."]
+        for name, (counts, count, total) in latency.items():
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, counts):
+                cumulative += n
+                lines.append(f'mana_engine_latency_seconds_bucket{{function="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'mana_engine_latency_seconds_bucket{{function="{name}",le="+Inf"}} {count}')
+            lines.append(f'mana_engine_latency_seconds_count{{function="{name}"}} {count}')
+            lines.append(f'mana_engine_latency_seconds_sum{{function="{name}"}} {total!r}')
+
+        for kind, index in (("hits", 0), ("misses", 1)):
+            lines += [f"# TYPE mana_engine_cache_{kind} counter",
+                      f"# HELP mana_engine_cache_{kind} Engine cache {kind}."]
+            for name, counts in cache.items():
+                lines.append(f'mana_engine_cache_{kind}_total{{cache="{name}"}} {counts[index]}')
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def instrument(func, name: str | None = None, registry: Metrics = METRICS):
+    """Wrap *func* so each call's latency is recorded under *name*."""
+    name = name or func.__name__
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.observe(name, clock() - start)
+    return wrapper
+
+
+def timed(func):
+    """Decorator: instrument *func* when metrics are enabled, else return it unchanged."""
+    return instrument(func) if ENABLED else func
+
+
+def cache_access(cache: str, hit: bool):
+    """Record one cache lookup.  Callers guard with ``if ENABLED``."""
+    METRICS.cache_access(cache, hit)
+
+
+def openmetrics_text() -> str:
+    return METRICS.openmetrics()
+
+
+_last_write = 0.0
+
+
+def write_openmetrics(path: str, min_interval: float = 0.0) -> bool:
+    """
+    Write the exposition to *path* (via a temp file and rename, so a scraper
+    never reads a partial file).  Skipped, returning False, if the previous
+    write was less than *min_interval* seconds ago.
+    """
+    global _last_write
+    now = time.monotonic()
+    if min_interval and now - _last_write < min_interval:
+        return False
+    _last_write = now
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(openmetrics_text())
+    os.replace(tmp, path)
+    return True
@@ -123,3 +123,18 @@ def fmt_cost(value: float) -> str:
 def fmt_pool(value: float) -> str:
     """Format a pool float (no ceiling — show what you have)."""
     return fmt_value(value)
+
+
+# ── Integer-hundredths helpers (cents engine) ──────────────────────────────────
+
+def fmt_cents(cents: int) -> str:
+    """
+    Format integer hundredths like fmt_value() formats the equivalent float:
+      • Whole amounts → integer string  (e.g. 10000 → "100")
+      • Otherwise     → 2 decimal places (e.g. 2805 → "28.05", 66 → "0.66")
+    """
+    whole, frac = divmod(abs(cents), 100)
+    sign = "-" if cents < 0 else ""
+    if frac == 0:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{frac:02d}"
@@ -0,0 +1,287 @@
+"""
+Rulesets — the rule values a campaign prices casts and pools with.
+
+A Ruleset is an immutable bundle of the values that decide what a cast costs
+and what a pool holds:
+
+    tier_values           {tier_name: value}          Standard cost, pool value
+    novice_costs          {efficiency: cost}          Novice fixed costs
+    below_mult            {efficiency: multiplier}    × the tier below
+    orders_of_expression  {order: Fraction}           discount per order
+    max_discount          Fraction                    past the last order
+
+Built-in rulesets
+─────────────────
+    WIKI_RULES          the values in ``src/config.py`` (the default)
+    SPREADSHEET_RULES   ManaFormula.xlsx — today the same values as the wiki
+
+House rules are derived from a built-in (``WIKI_RULES.replace(name="House",
+tier_values={...})``) or read back from the JSON ``Ruleset.to_dict`` writes
+(``ruleset_from_dict``).  A character keeps its choice under ``"ruleset"`` —
+a built-in name, or a house ruleset's dict — so it travels with the export.
+
+Compiled caches
+───────────────
+Each engine module compiles its own tables from a ruleset (the cost table,
+the exact cents tables, hybrid pairs, pool tier values) through
+``ruleset.compiled(build)``.  Tables are cached per (content hash, build):
+rulesets with the same values share them whatever their names, and compiling
+one campaign's house rules never touches another ruleset's tables.  The
+shared cache keeps the ``MAX_COMPILED_TABLES`` most recently used tables (any
+client of the API can send a new ruleset); a Ruleset object also keeps its
+own tables for as long as it lives, so the built-ins are never recompiled.
+
+Active ruleset
+──────────────
+The engine prices with ``active_ruleset()``, held in a ContextVar.  Every
+thread and every asyncio task sees its own value, so requests serving
+different campaigns never see each other's rules:
+
+    with use_ruleset(house):
+        cost = price_cast(...)
+"""
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from fractions import Fraction
+from types import MappingProxyType
+from typing import Callable, Mapping
+from ..config import (
+    EFFICIENCY_BELOW_MULT,
+    EFFICIENCY_NAMES,
+    MAX_ORDER_DISCOUNT,
+    NOVICE_EFFICIENCY_COSTS,
+    ORDERS_OF_EXPRESSION,
+    TIER_NAMES,
+    TIER_VALUES,
+)
+
+_FIELDS = ("tier_values", "novice_costs", "below_mult", "orders_of_expression", "max_discount")
+
+MAX_COMPILED_TABLES = 64
+_COMPILED: dict[tuple[str, Callable], object] = {}    # least recently used first
+_COMPILE_LOCK = threading.RLock()
+
+
+def _exact(value) -> Fraction:
+    """Exact rational for a rule value; floats go through their decimal repr."""
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def _number(value, where: str) -> int | float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where} must be a number, not {value!r}")
+    if value <= 0:
+        raise ValueError(f"{where} must be positive")   # a free cast has no budget limit
+    return value
+
+
+def _discount(value, where: str) -> Fraction:
+    try:
+        discount = _exact(value) if not isinstance(value, str) else Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        raise ValueError(f"{where} must be a fraction such as '1/20', not {value!r}") from None
+    if not 0 <= discount < 1:
+        raise ValueError(f"{where} must be at least 0 and below 1")
+    return discount
+
+
+def _values(mapping, names, where: str) -> MappingProxyType:
+    if not isinstance(mapping, Mapping) or set(mapping) != set(names):
+        raise ValueError(f"{where} needs exactly these keys: {', '.join(names)}")
+    return MappingProxyType({name: _number(mapping[name], f"{where}[{name!r}]") for name in names})
+
+
+class Ruleset:
+    """
+    One immutable set of rule values (see the module docstring).
+
+    ``content_hash`` is a SHA-256 over the values only — not the name — and
+    keys the compiled caches.
+    """
+
+    __slots__ = _FIELDS + ("name", "content_hash", "_compiled")
+
+    def __init__(
+        self,
+        name: str,
+        tier_values: Mapping[str, int | float],
+        novice_costs: Mapping[str, int | float],
+        below_mult: Mapping[str, int | float],
+        orders_of_expression: Mapping[int, Fraction | str],
+        max_discount: Fraction | str | None = None,
+    ):
+        orders = {}
+        for order, discount in dict(orders_of_expression).items():
+            try:
+                order = int(order)
+            except (TypeError, ValueError):
+                raise ValueError(f"Order {order!r} is not a whole number") from None
+            orders[order] = _discount(discount, f"orders_of_expression[{order}]")
+        if sorted(orders) != list(range(len(orders))) or orders.get(0) != 0:
+            raise ValueError("orders_of_expression must run 0, 1, 2, … with no discount at order 0")
+        set_ = object.__setattr__
+        set_(self, "name", str(name).strip() or "Custom")
+        set_(self, "tier_values", _values(tier_values, TIER_NAMES, "tier_values"))
+        set_(self, "novice_costs", _values(novice_costs, EFFICIENCY_NAMES, "novice_costs"))
+        set_(self, "below_mult", _values(below_mult, EFFICIENCY_NAMES[1:], "below_mult"))
+        set_(self, "orders_of_expression", MappingProxyType(dict(sorted(orders.items()))))
+        set_(self, "max_discount", orders[max(orders)] if max_discount is None
+             else _discount(max_discount, "max_discount"))
+        canonical = json.dumps({
+            "tier_values": {k: str(_exact(v)) for k, v in self.tier_values.items()},
+            "novice_costs": {k: str(_exact(v)) for k, v in self.novice_costs.items()},
+            "below_mult": {k: str(_exact(v)) for k, v in self.below_mult.items()},
+            "orders_of_expression": {str(k): str(v) for k, v in self.orders_of_expression.items()},
+            "max_discount": str(self.max_discount),
+        }, sort_keys=True)
+        set_(self, "content_hash", hashlib.sha256(canonical.encode()).hexdigest())
+        set_(self, "_compiled", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Ruleset is immutable; use replace() for a changed copy")
+
+    def __repr__(self) -> str:
+        return f"Ruleset({self.name!r}, {self.content_hash[:12]})"
+
+    def __reduce__(self):
+        # Worker processes get the values; each compiles its own tables.
+        return ruleset_from_dict, (self.to_dict(),)
+
+    def order_discount(self, orders: int) -> Fraction:
+        """Discount for *orders*, capped at ``max_discount`` past the last order."""
+        if orders <= 0:
+            return Fraction(0)
+        return self.orders_of_expression.get(orders, self.max_discount)
+
+    def replace(self, **changes) -> "Ruleset":
+        """
+        A new Ruleset with *changes* (any constructor argument) applied.  New
+        orders without a ``max_discount`` cap at their own last discount.
+        """
+        fields = {field: getattr(self, field) for field in ("name",) + _FIELDS}
+        if "orders_of_expression" in changes:
+            fields["max_discount"] = None
+        return Ruleset(**{**fields, **changes})
+
+    def to_dict(self) -> dict:
+        """JSON-ready dict; ``ruleset_from_dict`` reads it back."""
+        return {
+            "name": self.name,
+            "tier_values": dict(self.tier_values),
+            "novice_costs": dict(self.novice_costs),
+            "below_mult": dict(self.below_mult),
+            "orders_of_expression": {str(k): str(v) for k, v in self.orders_of_expression.items()},
+            "max_discount": str(self.max_discount),
+        }
+
+    def compiled(self, build: Callable[["Ruleset"], object]):
+        """
+        ``build(self)``, computed once per content hash and shared.
+
+        Engine modules pass their own compile function; its result must be
+        treated as read-only.
+        """
+        table = self._compiled.get(build)
+        if table is None:
+            key = (self.content_hash, build)
+            with _COMPILE_LOCK:
+                table = _COMPILED.pop(key, None)
+                if table is None:
+                    table = build(self)
+                    while len(_COMPILED) >= MAX_COMPILED_TABLES:
+                        del _COMPILED[next(iter(_COMPILED))]
+                _COMPILED[key] = table
+            self._compiled[build] = table
+        return table
+
+
+def ruleset_from_dict(data: dict) -> Ruleset:
+    """A Ruleset from ``Ruleset.to_dict`` JSON; ValueError if malformed."""
+    if not isinstance(data, dict):
+        raise ValueError("A ruleset must be a JSON object")
+    missing = [field for field in _FIELDS[:4] if field not in data]
+    if missing:
+        raise ValueError(f"Ruleset is missing {', '.join(missing)}")
+    return Ruleset(
+        data.get("name", "House rules"),
+        data["tier_values"],
+        data["novice_costs"],
+        data["below_mult"],
+        data["orders_of_expression"],
+        data.get("max_discount"),
+    )
+
+
+WIKI_RULES = Ruleset(
+    "Wiki",
+    TIER_VALUES,
+    NOVICE_EFFICIENCY_COSTS,
+    EFFICIENCY_BELOW_MULT,
+    ORDERS_OF_EXPRESSION,
+    MAX_ORDER_DISCOUNT,
+)
+SPREADSHEET_RULES = WIKI_RULES.replace(name="Spreadsheet")
+
+# Built-in rulesets by the name a character stores.
+RULESETS: dict[str, Ruleset] = {"wiki": WIKI_RULES, "spreadsheet": SPREADSHEET_RULES}
+
+
+def resolve_ruleset(spec) -> Ruleset:
+    """
+    The Ruleset a character's ``"ruleset"`` value names: blank → WIKI_RULES,
+    a built-in name, a house ruleset dict, or a Ruleset itself.
+    """
+    if isinstance(spec, Ruleset):
+        return spec
+    if not spec:
+        return WIKI_RULES
+    if isinstance(spec, dict):
+        return ruleset_from_dict(spec)
+    ruleset = RULESETS.get(str(spec).lower())
+    if ruleset is None:
+        raise ValueError(f"Unknown ruleset {spec!r} (built-in: {', '.join(RULESETS)})")
+    return ruleset
+
+
+def load_ruleset(spec: str) -> Ruleset:
+    """A built-in ruleset by name, or house rules from a JSON file (for ``--ruleset``)."""
+    if spec.lower() in RULESETS:
+        return RULESETS[spec.lower()]
+    try:
+        with open(spec, encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError:
+        raise ValueError(f"{spec!r} is neither a built-in ruleset ({', '.join(RULESETS)}) nor a file") from None
+    except ValueError as e:
+        raise ValueError(f"Not a ruleset file: {e}") from None
+    return ruleset_from_dict(data.get("ruleset", data) if isinstance(data, dict) else data)
+
+
+# ── Active ruleset ─────────────────────────────────────────────────────────────
+
+_ACTIVE: ContextVar[Ruleset] = ContextVar("ruleset", default=WIKI_RULES)
+
+
+# active_ruleset() → the ruleset the engine prices with in the current thread /
+# task.  Bound straight to ContextVar.get: it sits on every priced cast.
+active_ruleset: Callable[[], Ruleset] = _ACTIVE.get
+
+
+def set_ruleset(ruleset: Ruleset) -> Token:
+    """Make *ruleset* active for the rest of the current context."""
+    return _ACTIVE.set(ruleset)
+
+
+@contextmanager
+def use_ruleset(ruleset: Ruleset):
+    """Price with *ruleset* inside the ``with`` block."""
+    token = _ACTIVE.set(ruleset)
+    try:
+        yield ruleset
+    finally:
+        _ACTIVE.reset(token)
@@ -17,13 +17,16 @@ For non-Standard efficiency types (tiers above Novice):
 
 Novice has no tier below; fixed costs are used (0.66 / 0.33 / 1.33 / 1.66).
 Standard always costs the same-tier value.
+
+The values are those of ``SPREADSHEET_RULES`` (ruleset.py); select that
+ruleset to price the main engine with them too.
 """
-from ..config import (
-    SPREADSHEET_TIER_VALUES,
-    SPREADSHEET_TIER_ORDER,
-    SPREADSHEET_NOVICE_COSTS,
-    SPREADSHEET_EFFICIENCY_BELOW_MULT,
-)
+from .ruleset import SPREADSHEET_RULES
+from ..config import SPREADSHEET_TIER_ORDER
+
+SPREADSHEET_TIER_VALUES = SPREADSHEET_RULES.tier_values
+SPREADSHEET_NOVICE_COSTS = SPREADSHEET_RULES.novice_costs
+SPREADSHEET_EFFICIENCY_BELOW_MULT = SPREADSHEET_RULES.below_mult
 
 
 def _tier_below_value(tier_name: str) -> float | None:
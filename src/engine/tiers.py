@@ -6,11 +6,13 @@ Tiers are indexed low→high: Novice=0 … Ascendant=5.
 Primary values (used by the engine):
     Ascendant=300, Master=100, Expert=33, Journeyman=11, Apprentice=4, Novice=1
 
-Each tier is ~1/3 the cost of the one above it.
+Each tier is ~1/3 the cost of the one above it.  ``tier_value`` reads the
+active ruleset (ruleset.py), so a campaign's house rules change pool values too.
 """
 from enum import IntEnum
 from fractions import Fraction
-from ..config import TIER_VALUES, TIER_ORDER
+from .ruleset import active_ruleset
+from ..config import TIER_ORDER
 
 
 class Tier(IntEnum):
@@ -68,11 +70,11 @@ def base_value_matrix(highest_tier: Tier) -> dict[str, Fraction]:
 
 def tier_value(tier: Tier) -> float:
     """
-    Return the absolute mana value for a tier.
+    Return the absolute mana value for a tier under the active ruleset.
 
     Ascendant→300, Master→100, Expert→33, Journeyman→11, Apprentice→4, Novice→1
     """
-    return float(TIER_VALUES[tier.name.title()])
+    return float(active_ruleset().tier_values[tier.name.title()])
 
 
 def tier_below(tier: Tier) -> "Tier | None":
@@ -86,5 +88,6 @@ def tier_below(tier: Tier) -> "Tier | None":
 
 
 def tier_value_matrix() -> dict[str, float]:
-    """Return {tier_name: value} for all tiers, high → low."""
-    return {name: float(TIER_VALUES[name]) for name in TIER_ORDER}
+    """Return {tier_name: value} for all tiers, high → low (active ruleset)."""
+    values = active_ruleset().tier_values
+    return {name: float(values[name]) for name in TIER_ORDER}
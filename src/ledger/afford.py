@@ -0,0 +1,135 @@
+"""
+"What can I still afford" — reverse lookup from a budget to casts.
+
+An AffordIndex holds every single-spell cast a character can make — each
+(spell tier ≤ highest tier, efficiency, Orders of Expression) combination —
+sorted by its one-cast cost in integer hundredths.  A query for the remaining
+pool is one bisect into that list: everything before the cut is affordable.
+
+For each affordable combination the index also reports the most casts that
+fit under each quantity mode:
+
+    per_cast    every cast is ceiled, so the cost is linear:
+                budget // one-cast cost
+    bundled     ceil(unrounded × N) is monotonic in N and within a hundredth
+                of unrounded × N, so the answer is budget / unrounded to
+                within one cast; the neighbours are priced to settle it
+
+All prices come from ``cast_cost`` with the index's engine and ruleset — the
+ruleset active when it is built — so a quantity reported as affordable is
+exactly what the Cast Spell form would record.  Indexes are built once per
+(highest tier, engine, ruleset content hash) and shared; the
+``MAX_CACHED_INDEXES`` most recently used are kept.
+"""
+import bisect
+import threading
+from ..config import COST_ENGINE, EFFICIENCY_NAMES
+from ..engine.calc_cents import cost_to_cents
+from ..engine.cost_table import cost_table
+from ..engine.ruleset import Ruleset, active_ruleset, use_ruleset
+from ..engine.tiers import Tier
+from .pricing import cast_cost
+
+
+class AffordIndex:
+    """
+    Single casts for one highest tier, sorted by cost.
+
+    Attributes
+    ----------
+    costs  : [int]                                 — one-cast cents, ascending
+    combos : [(Tier, efficiency, orders)]          — same order as costs
+    """
+
+    def __init__(self, highest_tier: Tier, engine: str = COST_ENGINE, ruleset: Ruleset | None = None):
+        self.highest_tier = highest_tier
+        self.engine = engine
+        self.ruleset = ruleset or active_ruleset()
+        priced = sorted(
+            (self._price(tier, efficiency, orders, 1, "bundled"), tier, efficiency, orders)
+            for tier in Tier if tier <= highest_tier
+            for efficiency in EFFICIENCY_NAMES
+            for orders in self.ruleset.orders_of_expression
+        )
+        self.costs: list[int] = [cents for cents, *_ in priced]
+        self.combos: list[tuple[Tier, str, int]] = [tuple(combo) for _, *combo in priced]
+
+    def _price(self, tier: Tier, efficiency: str, orders: int, quantity: int, mode: str) -> int:
+        with use_ruleset(self.ruleset):
+            cost = cast_cost(
+                self.highest_tier, tier, efficiency, orders,
+                quantity=quantity, quantity_mode=mode, engine=self.engine,
+            )
+        return cost_to_cents(str(cost))
+
+    def count(self, budget_cents: int) -> int:
+        """Number of combinations whose single cast fits *budget_cents*."""
+        return bisect.bisect_right(self.costs, budget_cents)
+
+    def max_quantity(
+        self, budget_cents: int, tier: Tier, efficiency: str, orders: int, quantity_mode: str,
+    ) -> int:
+        """Most casts of one combination that fit *budget_cents* (0 if none)."""
+        one = self._price(tier, efficiency, orders, 1, quantity_mode)
+        if one > budget_cents:
+            return 0
+        if quantity_mode != "bundled":
+            return budget_cents // one
+        return self._max_bundled(budget_cents, tier, efficiency, orders)
+
+    def _max_bundled(self, budget_cents: int, tier: Tier, efficiency: str, orders: int) -> int:
+        unrounded = cost_table(self.ruleset).unrounded[(tier, efficiency, orders)] * 100
+        quantity = max(1, int(budget_cents / unrounded))
+        while quantity > 1 and self._price(tier, efficiency, orders, quantity, "bundled") > budget_cents:
+            quantity -= 1
+        while self._price(tier, efficiency, orders, quantity + 1, "bundled") <= budget_cents:
+            quantity += 1
+        return quantity
+
+    def affordable(self, budget_cents: int, spell_tier: Tier | None = None) -> list[dict]:
+        """
+        Every combination a single cast of which fits *budget_cents*, dearest
+        first, optionally for one *spell_tier* only.
+
+        Each row: spell_tier (name), efficiency, orders, cost_cents,
+        max_bundled, max_per_cast.
+        """
+        rows = []
+        for i in range(self.count(budget_cents) - 1, -1, -1):
+            tier, efficiency, orders = self.combos[i]
+            if spell_tier is not None and tier != spell_tier:
+                continue
+            rows.append({
+                "spell_tier": tier.name.title(),
+                "efficiency": efficiency,
+                "orders": orders,
+                "cost_cents": self.costs[i],
+                "max_bundled": self._max_bundled(budget_cents, tier, efficiency, orders),
+                "max_per_cast": budget_cents // self.costs[i],
+            })
+        return rows
+
+
+MAX_CACHED_INDEXES = 32
+_INDEXES: dict[tuple[Tier, str, str], AffordIndex] = {}     # least recently used first
+_INDEXES_LOCK = threading.Lock()
+
+
+def afford_index(highest_tier: Tier, engine: str = COST_ENGINE) -> AffordIndex:
+    """
+    The shared AffordIndex for *highest_tier* and *engine* under the active
+    ruleset (built on first use).
+    """
+    ruleset = active_ruleset()
+    key = (highest_tier, engine, ruleset.content_hash)
+    with _INDEXES_LOCK:
+        index = _INDEXES.pop(key, None)
+        if index is not None:
+            _INDEXES[key] = index
+            return index
+    index = AffordIndex(highest_tier, engine, ruleset)
+    with _INDEXES_LOCK:
+        while len(_INDEXES) >= MAX_CACHED_INDEXES:
+            del _INDEXES[next(iter(_INDEXES))]
+        _INDEXES[key] = index
+    return index
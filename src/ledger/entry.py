@@ -0,0 +1,187 @@
+"""
+Compact ledger entry records.
+
+A cast entry in the export schema is a 13-key dict whose cost is a string
+(``str(raw_cost)``).  Ledgers hold LedgerEntry records instead: one
+``__slots__`` object per entry, with
+
+    • the cost held as a float (``exact_cost`` is its ``repr``, which is exactly
+      the ``str(raw_cost)`` the cast form wrote), so reading it never re-parses;
+    • tier / efficiency / quantity-mode names interned — every entry shares the
+      same few string objects, as an enum would — and spell / arcana names
+      interned too, since a campaign repeats the same handful of spells;
+    • equal costs sharing one float object.
+
+A record is a read-only Mapping with the export schema's keys in export
+order, so ``entry["spell_name"]``, ``entry.get(…)``, ``dict(entry)`` and CSV
+export work unchanged, and ``dict(entry)`` gives back exactly the dict it was
+built from; ``as_dict()`` is the fast way to get that dict for JSON encoding.
+
+Only entries that convert losslessly become records: exactly the schema's keys
+in schema order, with the schema's value types.  Anything else — extra or
+missing keys, a legacy ``"34/100"`` or ``"100"`` cost string — is kept as the
+dict it came in as, so a ledger may mix both.
+"""
+import sys
+from collections.abc import Mapping
+
+# The export schema: its keys in export (and CSV column) order, and the type of
+# each value.
+ENTRY_FIELDS: tuple[str, ...] = (
+    "id", "spell_name", "arcana_name", "spell_tier",
+    "efficiency", "orders", "quantity", "quantity_mode",
+    "situational", "is_hybrid", "hybrid_b_tier", "hybrid_b_efficiency",
+    "exact_cost",
+)
+_TYPES = (int, str, str, str, str, int, int, str, str, bool, str, str, str)
+_SLOTS = ENTRY_FIELDS[:-1]            # everything but exact_cost, held as ``cost``
+_FIELD_SET = frozenset(_SLOTS)
+
+# Shared float objects for repeated costs (bounded: arbitrary situational
+# modifiers could otherwise grow it without limit).
+_COSTS: dict[float, float] = {}
+_MAX_SHARED_COSTS = 1 << 16
+
+
+def _shared_cost(cost: float) -> float:
+    shared = _COSTS.get(cost)
+    if shared is None:
+        if len(_COSTS) >= _MAX_SHARED_COSTS:
+            return cost
+        shared = _COSTS[cost] = cost
+    return shared
+
+
+class LedgerEntry(Mapping):
+    """One cast, as a compact read-only mapping over the export schema."""
+
+    __slots__ = _SLOTS + ("cost",)
+
+    def __init__(
+        self,
+        id: int,
+        spell_name: str,
+        arcana_name: str,
+        spell_tier: str,
+        efficiency: str,
+        orders: int,
+        quantity: int,
+        quantity_mode: str,
+        situational: str,
+        is_hybrid: bool,
+        hybrid_b_tier: str,
+        hybrid_b_efficiency: str,
+        cost: float,
+    ):
+        intern = sys.intern
+        self.id = id
+        self.spell_name = intern(spell_name)
+        self.arcana_name = intern(arcana_name)
+        self.spell_tier = intern(spell_tier)
+        self.efficiency = intern(efficiency)
+        self.orders = orders
+        self.quantity = quantity
+        self.quantity_mode = intern(quantity_mode)
+        self.situational = intern(situational)
+        self.is_hybrid = is_hybrid
+        self.hybrid_b_tier = intern(hybrid_b_tier)
+        self.hybrid_b_efficiency = intern(hybrid_b_efficiency)
+        self.cost = _shared_cost(cost)
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "LedgerEntry | None":
+        """The record for *entry*, or None if it would not convert losslessly."""
+        if not schema_exact(entry):
+            return None
+        values = tuple(entry.values())
+        text = values[-1]
+        try:
+            cost = float(text)
+        except ValueError:
+            return None
+        if repr(cost) != text:            # "100", "34/100", " 1.5": keep the dict
+            return None
+        return cls(*values[:-1], cost)
+
+    def to_dict(self) -> dict:
+        """The export-schema dict this record was built from."""
+        return {
+            "id": self.id,
+            "spell_name": self.spell_name,
+            "arcana_name": self.arcana_name,
+            "spell_tier": self.spell_tier,
+            "efficiency": self.efficiency,
+            "orders": self.orders,
+            "quantity": self.quantity,
+            "quantity_mode": self.quantity_mode,
+            "situational": self.situational,
+            "is_hybrid": self.is_hybrid,
+            "hybrid_b_tier": self.hybrid_b_tier,
+            "hybrid_b_efficiency": self.hybrid_b_efficiency,
+            "exact_cost": repr(self.cost),
+        }
+
+    def to_tuple(self) -> tuple:
+        """Plain field values (with the float cost), for compact serialization."""
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: tuple) -> "LedgerEntry":
+        return cls(*values)
+
+    # ── Mapping over the export schema ───────────────────────────────────────
+    def __getitem__(self, key: str):
+        if key == "exact_cost":
+            return repr(self.cost)
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        if key == "exact_cost":
+            return repr(self.cost)
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key) -> bool:
+        return key == "exact_cost" or key in _FIELD_SET
+
+    def __iter__(self):
+        return iter(ENTRY_FIELDS)
+
+    def __len__(self) -> int:
+        return len(ENTRY_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"LedgerEntry({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (self.from_tuple, (self.to_tuple(),))
+
+
+def schema_exact(entry: dict) -> bool:
+    """True if *entry* has exactly the schema's keys, in order, with the schema's value types."""
+    return tuple(entry) == ENTRY_FIELDS and tuple(map(type, entry.values())) == _TYPES
+
+
+def compact_entry(entry):
+    """A LedgerEntry for a schema-exact entry dict; anything else unchanged."""
+    if type(entry) is dict:
+        return LedgerEntry.from_dict(entry) or entry
+    return entry
+
+
+def as_dict(entry) -> dict:
+    """An entry as a plain export-schema dict (records converted, dicts as they are)."""
+    return entry if type(entry) is dict else entry.to_dict()
+
+
+def pack_entry(entry):
+    """Plain-data form of an entry (a tuple for records, the dict otherwise)."""
+    return entry.to_tuple() if isinstance(entry, LedgerEntry) else entry
+
+
+def unpack_entry(value):
+    """Inverse of pack_entry()."""
+    return LedgerEntry.from_tuple(value) if type(value) is tuple else compact_entry(value)
@@ -0,0 +1,221 @@
+"""
+Streaming ledger export and import.
+
+Exporters are generators that emit the JSON / CSV export a chunk (one ledger
+entry) at a time, so an export never has to exist as one big string unless
+the caller joins it.  The JSON stream is byte-for-byte what
+
+    json.dumps({"character": …, "total_pool": …, "remaining": …, "ledger": […]}, indent=2)
+
+produces, so existing audit tooling reads it unchanged.  ``gzip_chunks()``
+compresses any chunk stream on the fly.
+
+The importer parses an export incrementally: top-level values are decoded one
+at a time and the ``ledger`` array one entry at a time, holding at most one
+read chunk plus one value in memory beyond what the caller keeps.  Gzipped
+input is detected from its magic bytes.
+"""
+import csv
+import gzip
+import io
+import json
+import zlib
+from typing import IO, Iterable, Iterator
+from .entry import ENTRY_FIELDS, as_dict
+
+# Column order of the CSV export.
+CSV_FIELDNAMES: list[str] = list(ENTRY_FIELDS)
+
+_READ_CHUNK = 64 * 1024
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+
+def iter_export_json(
+    character: dict,
+    total_pool: str,
+    remaining: str,
+    entries: Iterable[dict],
+) -> Iterator[str]:
+    """Yield the audit-ready JSON export, one ledger entry per chunk."""
+    header = json.dumps(
+        {"character": character, "total_pool": total_pool, "remaining": remaining},
+        indent=2,
+    )
+    yield header[:-2] + ',\n  "ledger": ['          # drop the closing "\n}"
+
+    first = True
+    for entry in entries:
+        body = json.dumps(as_dict(entry), indent=2).replace("\n", "\n    ")
+        yield ("\n    " if first else ",\n    ") + body
+        first = False
+
+    yield "]\n}" if first else "\n  ]\n}"
+
+
+def iter_export_csv(entries: Iterable[dict]) -> Iterator[str]:
+    """Yield the CSV export: the header line, then one line per entry."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDNAMES, extrasaction="ignore")
+    writer.writeheader()
+    for entry in entries:
+        writer.writerow(as_dict(entry))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():                    # header only — no entries
+        yield buf.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = 6) -> Iterator[bytes]:
+    """Gzip-compress a stream of text chunks (UTF-8) without buffering it all."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)   # wbits=31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def write_export(chunks: Iterable[str], path: str, compress: bool | None = None):
+    """Write a chunk stream to *path*; gzip when *compress* (default: path ends in .gz)."""
+    if compress is None:
+        compress = path.endswith(".gz")
+    with open(path, "wb") as f:
+        if compress:
+            for data in gzip_chunks(chunks):
+                f.write(data)
+        else:
+            for chunk in chunks:
+                f.write(chunk.encode("utf-8"))
+
+
+# ── Import ─────────────────────────────────────────────────────────────────────
+
+def _open_text(source: IO) -> IO[str]:
+    """Wrap a binary or text file object as text, transparently un-gzipping."""
+    if isinstance(source, io.TextIOBase):
+        return source
+    if hasattr(source, "peek"):
+        magic = source.peek(2)[:2]
+    elif source.seekable():
+        start = source.tell()
+        magic = source.read(2)
+        source.seek(start)
+    else:
+        source = io.BufferedReader(source)
+        magic = source.peek(2)[:2]
+    if magic == b"\x1f\x8b":
+        source = gzip.GzipFile(fileobj=source)
+    return io.TextIOWrapper(source, encoding="utf-8")
+
+
+class _StreamDecoder:
+    """Minimal pull parser over a text stream, built on JSONDecoder.raw_decode."""
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(_READ_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON export, found {found!r}")
+        self._pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer edge may be a truncated number.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _iter_array(parser: _StreamDecoder) -> Iterator:
+    parser.expect("[")
+    if parser.peek() == "]":
+        parser.expect("]")
+        return
+    while True:
+        yield parser.value()
+        if parser.peek() == ",":
+            parser.expect(",")
+            continue
+        parser.expect("]")
+        return
+
+
+def iter_export(source: IO) -> Iterator[tuple[str, object]]:
+    """
+    Incrementally parse a JSON export (plain or gzipped).
+
+    Yields ``(key, value)`` for each top-level field, in file order.  For
+    ``ledger`` the value is an iterator over the entries, decoded one at a time
+    as it is consumed; it must be consumed before advancing to the next field
+    (whatever is left of it is skipped).
+    """
+    parser = _StreamDecoder(_open_text(source))
+    parser.expect("{")
+    if parser.peek() == "}":
+        return
+    while True:
+        key = parser.value()
+        parser.expect(":")
+        if key == "ledger" and parser.peek() == "[":
+            entries = _iter_array(parser)
+            yield key, entries
+            for _ in entries:
+                pass
+        else:
+            yield key, parser.value()
+        if parser.peek() == ",":
+            parser.expect(",")
+            continue
+        parser.expect("}")
+        return
+
+
+def read_export(source: IO) -> dict:
+    """
+    Parse an export into a dict, as ``json.load`` would.
+
+    Only one entry at a time is decoded, so peak memory is the resulting
+    entries plus one read chunk — never the raw text alongside the parse.
+    """
+    return {
+        key: list(value) if key == "ledger" else value
+        for key, value in iter_export(source)
+    }
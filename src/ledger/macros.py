@@ -0,0 +1,234 @@
+"""
+Macros — several casts logged as one action.
+
+A macro is a named list of spells that are cast together.  The built-in
+"Apparating" macro (DEFAULT_MACROS in config.py) is Frequency Up + Frequency
+Down, which have to be logged as two ledger entries.
+
+    {"name": str, "description": str, "spells": [
+        {"spell_name", "arcana_name", "tier", "efficiency", "orders", "quantity",
+         "quantity_mode", "situational", "is_hybrid", "hybrid_b_tier",
+         "hybrid_b_efficiency"},          # the last five optional
+        ...
+    ]}
+
+Compiled plans
+──────────────
+``compile_macro`` prices every spell once, for one highest tier and engine.
+The result is a plan: one entry template per spell (the export schema minus
+``id``, ``exact_cost`` filled in) and the total in integer hundredths.  Plans
+are cached per (macro contents, highest tier, engine, ruleset content hash),
+so showing or casting a macro again does no pricing, and a campaign on other
+rules never gets another's prices.
+
+``cast_macro`` stamps ids and an arcana onto the templates.  Spells whose
+``arcana_name`` is blank get the arcana chosen at cast time.  It appends them
+with ``Ledger.extend``: one version bump and one undo step, plus one log
+record or one SQLite transaction when the ledger is persisted.
+
+User macros
+───────────
+User-defined macros are kept in the character dict under ``"macros"``.  They
+are saved with the character in whichever store is active, and they travel in
+the JSON export.  ``dump_macros`` / ``load_macros`` write and read a
+shareable ``{"macros": [...]}`` file.
+"""
+import json
+from ..config import COST_ENGINE, DEFAULT_MACROS, EFFICIENCY_NAMES, TIER_NAMES
+from ..engine.calc_cents import cost_to_cents
+from ..engine.ruleset import active_ruleset
+from ..engine.tiers import Tier, tier_from_name
+from .pricing import price_cast
+
+QUANTITY_MODES = ("bundled", "per_cast")
+MAX_CACHED_PLANS = 256
+
+_PLANS: dict[tuple, dict] = {}
+
+
+def check_cast_fields(spell: dict):
+    """
+    ValueError unless the efficiency, orders, quantity and quantity mode of
+    *spell* (defaults where absent) are ones the active ruleset can price.
+    Shared by macros and the HTTP API.
+    """
+    if spell.get("efficiency", "Standard") not in EFFICIENCY_NAMES:
+        raise ValueError(f"unknown efficiency {spell.get('efficiency')!r}")
+    orders, quantity = spell.get("orders", 0), spell.get("quantity", 1)
+    orders_of_expression = active_ruleset().orders_of_expression
+    if type(orders) is not int or orders not in orders_of_expression:
+        raise ValueError(f"orders must be 0–{max(orders_of_expression)}")
+    if type(quantity) is not int or quantity < 1:
+        raise ValueError("quantity must be a whole number of at least 1")
+    if spell.get("quantity_mode", "bundled") not in QUANTITY_MODES:
+        raise ValueError(f"unknown quantity mode {spell.get('quantity_mode')!r}")
+
+
+def _spell(spell: dict, number: int) -> dict:
+    """One macro spell with every field present and checked."""
+    where = f"spell {number}"
+    name = str(spell.get("spell_name", "")).strip()
+    if not name:
+        raise ValueError(f"{where}: spell_name is required")
+    if spell.get("tier") not in TIER_NAMES:
+        raise ValueError(f"{where}: unknown tier {spell.get('tier')!r}")
+    try:
+        check_cast_fields(spell)
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}") from None
+    orders, quantity = spell.get("orders", 0), spell.get("quantity", 1)
+    is_hybrid = bool(spell.get("is_hybrid", False))
+    if is_hybrid and (spell.get("hybrid_b_tier") not in TIER_NAMES
+                      or spell.get("hybrid_b_efficiency", "Standard") not in EFFICIENCY_NAMES):
+        raise ValueError(f"{where}: a hybrid needs spell B's tier and efficiency")
+    return {
+        "spell_name": name,
+        "arcana_name": str(spell.get("arcana_name", "")),
+        "tier": spell["tier"],
+        "efficiency": spell.get("efficiency", "Standard"),
+        "orders": orders,
+        "quantity": quantity,
+        "quantity_mode": spell.get("quantity_mode", "bundled"),
+        "situational": str(spell.get("situational", "")),
+        "is_hybrid": is_hybrid,
+        "hybrid_b_tier": spell.get("hybrid_b_tier", "") if is_hybrid else "",
+        "hybrid_b_efficiency": spell.get("hybrid_b_efficiency", "Standard") if is_hybrid else "",
+    }
+
+
+def validate_macro(macro: dict) -> dict:
+    """A copy of *macro* with every spell field filled in; ValueError if malformed."""
+    if not isinstance(macro, dict):
+        raise ValueError("A macro must be a JSON object")
+    name = str(macro.get("name", "")).strip()
+    if not name:
+        raise ValueError("A macro needs a name")
+    spells = macro.get("spells")
+    if not isinstance(spells, list) or not spells:
+        raise ValueError(f"Macro {name!r} has no spells")
+    try:
+        return {
+            "name": name,
+            "description": str(macro.get("description", "")),
+            "spells": [_spell(spell, i) for i, spell in enumerate(spells, 1)],
+        }
+    except (ValueError, AttributeError, TypeError) as e:
+        raise ValueError(f"Macro {name!r}: {e}") from None
+
+
+def compile_macro(highest_tier: Tier, macro: dict, engine: str = COST_ENGINE) -> dict:
+    """
+    The priced plan for *macro* under the active ruleset (cached).
+
+    Returns ``{"name", "description", "entries", "cost_cents"}``; ``entries``
+    are the ledger entry templates, in cast order, without ids.  Treat the
+    plan as read-only — it is shared.
+    """
+    key = (json.dumps(macro, sort_keys=True), highest_tier, engine, active_ruleset().content_hash)
+    plan = _PLANS.get(key)
+    if plan is not None:
+        return plan
+
+    macro = validate_macro(macro)
+    entries = []
+    for spell in macro["spells"]:
+        if tier_from_name(spell["tier"]) > highest_tier:
+            raise ValueError(
+                f"{spell['spell_name']} is cast at {spell['tier']}, above the character's highest tier"
+            )
+        hybrid_b = (
+            {"tier": spell["hybrid_b_tier"], "efficiency": spell["hybrid_b_efficiency"]}
+            if spell["is_hybrid"] else None
+        )
+        cost = price_cast(
+            highest_tier, spell["tier"], spell["efficiency"], spell["orders"],
+            spell["quantity"], spell["quantity_mode"], spell["situational"],
+            spell["is_hybrid"], hybrid_b, engine=engine,
+        )
+        entries.append({
+            "spell_name": spell["spell_name"],
+            "arcana_name": spell["arcana_name"],
+            "spell_tier": spell["tier"],
+            "efficiency": spell["efficiency"],
+            "orders": spell["orders"],
+            "quantity": spell["quantity"],
+            "quantity_mode": spell["quantity_mode"],
+            "situational": spell["situational"],
+            "is_hybrid": spell["is_hybrid"],
+            "hybrid_b_tier": spell["hybrid_b_tier"],
+            "hybrid_b_efficiency": spell["hybrid_b_efficiency"],
+            "exact_cost": str(cost),
+        })
+
+    plan = {
+        "name": macro["name"],
+        "description": macro["description"],
+        "entries": entries,
+        "cost_cents": sum(cost_to_cents(e["exact_cost"]) for e in entries),
+    }
+    if len(_PLANS) >= MAX_CACHED_PLANS:
+        _PLANS.clear()
+    _PLANS[key] = plan
+    return plan
+
+
+def expand_macro(plan: dict, first_id: int, arcana_name: str = "") -> list[dict]:
+    """The plan's ledger entries, numbered from *first_id*; blank arcana get *arcana_name*."""
+    return [
+        {"id": first_id + i, **template, "arcana_name": template["arcana_name"] or arcana_name}
+        for i, template in enumerate(plan["entries"])
+    ]
+
+
+def cast_macro(ledger, plan: dict, first_id: int, arcana_name: str = "") -> list[dict]:
+    """Append the plan's entries to *ledger* as one batched mutation; returns them."""
+    entries = expand_macro(plan, first_id, arcana_name)
+    ledger.extend(entries)
+    return entries
+
+
+# ── Library: built-in + the character's own macros ────────────────────────────
+
+def macro_library(character: dict) -> list[dict]:
+    """Built-in macros, then the character's own."""
+    return DEFAULT_MACROS + list(character.get("macros", []))
+
+
+def save_macro(character: dict, macro: dict) -> dict:
+    """
+    Validate *macro* and store it on *character*, replacing a user macro of
+    the same name.  Built-in names are reserved.
+    """
+    macro = validate_macro(macro)
+    if any(m["name"] == macro["name"] for m in DEFAULT_MACROS):
+        raise ValueError(f"{macro['name']!r} is a built-in macro")
+    macros = [m for m in character.get("macros", []) if m["name"] != macro["name"]]
+    character["macros"] = macros + [macro]
+    return macro
+
+
+def delete_macro(character: dict, name: str) -> bool:
+    """Remove the character's macro called *name*; False if there is none."""
+    macros = character.get("macros", [])
+    kept = [m for m in macros if m["name"] != name]
+    if len(kept) == len(macros):
+        return False
+    character["macros"] = kept
+    return True
+
+
+def dump_macros(macros: list[dict]) -> str:
+    """Shareable JSON for *macros*."""
+    return json.dumps({"macros": macros}, indent=2)
+
+
+def load_macros(text: str | bytes) -> list[dict]:
+    """Macros from shared JSON (``{"macros": [...]}`` or a bare list), validated."""
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise ValueError(f"Not a macro file: {e}") from None
+    macros = data.get("macros") if isinstance(data, dict) else data
+    if not isinstance(macros, list):
+        raise ValueError('Not a macro file: expected {"macros": [...]}')
+    return [validate_macro(macro) for macro in macros]
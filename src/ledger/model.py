@@ -0,0 +1,506 @@
+"""
+Cast ledger model.
+
+The ledger is an ordered list of cast entries (built by the Cast Spell form /
+imported from JSON), held as compact LedgerEntry records (ledger/entry.py):
+read-only mappings over the export schema with the cost already parsed.
+Entries that would not convert losslessly stay plain dicts.
+
+Every mutation — append, a batched extend (a macro's casts), undo, clear, a
+wholesale replace on import, or a correction (insert / delete / update at any
+position) — bumps a monotonically increasing ``version``.
+
+Everything derived from the entries is cached against that version and only
+rebuilt after a mutation:
+
+    costs          parsed ``exact_cost`` values (parsed once per entry)
+    balances       running remaining-pool balance after each entry
+    running_rows   display rows for the ledger panel
+    index          secondary indexes for filtered/sorted page queries
+                   (ledger/query.py) — extended in place on append
+
+Exports are not cached: they are streamed (``iter_json`` / ``iter_csv``) or
+built by the caller that asked for them (the app's download buttons, on
+click), so no export blob outlives its use.
+
+Mid-ledger corrections
+──────────────────────
+The first correction (or ``balance_at``) builds a CostTree (ledger/tree.py)
+over the entry costs, which is then kept current by every mutation.  With it,
+a correction updates the remaining pool and the balance after any entry in
+O(log n), and the unfiltered ledger panel pages read their balances from the
+tree instead of rebuilding the running balances.
+
+Undo / redo
+───────────
+Every mutation is recorded as one reversible step in a bounded history
+(``UNDO_HISTORY`` steps, oldest dropped first).  Steps share the entries
+with the ledger: an append step is the appended entry; Clear All and import
+keep the replaced entry list itself (moved, not copied) — so recording a step
+and each ``undo()`` / ``redo()`` are O(1) whatever the ledger size (a
+mid-ledger correction costs what the correction itself costs).  A new
+mutation after an undo discards the redo steps.
+
+Derived values that also depend on the character (pool total, name) take it as
+part of the cache key, so sidebar edits invalidate them without a version bump.
+
+With ``engine="cents"`` costs are held as integer hundredths and balances are
+accumulated with integer arithmetic (see engine/calc_cents.py), so they stay
+exact however many entries the ledger holds.  ``balances_cents()`` gives the
+exact integer balances in either mode.
+"""
+import operator
+from itertools import accumulate
+from collections import deque
+from typing import Iterable, Iterator
+from ..config import UNDO_HISTORY
+from ..engine.calc_cents import cost_to_cents, pool_to_cents
+from ..engine.metrics import ENABLED as _METRICS, cache_access
+from ..engine.rounding import fmt_cost, fmt_pool, fmt_cents
+from .entry import LedgerEntry, compact_entry
+from .export import CSV_FIELDNAMES, iter_export_json, iter_export_csv, gzip_chunks
+from .query import LedgerIndex, display_row, normalize_filters
+from .tree import CostTree
+
+
+def parse_cost(s: str) -> float:
+    """Parse a cost string — handles both '22.0' floats and legacy '34/100' fractions."""
+    if "/" in s:
+        num, den = s.split("/")
+        return int(num) / int(den)
+    return float(s)
+
+
+class BaseLedger:
+    """
+    Version-keyed caching and exports shared by every ledger backend.
+
+    Subclasses provide ``version``, ``__len__``, ``__iter__`` (entries in cast
+    order), ``remaining(pool_total)`` and the unrecorded primitive mutations
+    (``_do_append``, ``_do_extend``, ``_do_pop``, ``_do_truncate``, ``_do_insert``,
+    ``_do_delete``, ``_do_update``, ``_do_replace``) with ``_snapshot`` /
+    ``_restore`` of the whole entry state;
+    the public mutations here record each one for undo / redo.
+    """
+
+    _memo: dict[str, tuple]
+
+    def _init_history(self, limit: int = UNDO_HISTORY):
+        self._undo: deque[tuple] = deque(maxlen=limit)
+        self._redo: list[tuple] = []
+        self._history_version = self.version
+
+    # ── Mutations (recorded for undo / redo) ─────────────────────────────────
+    def append(self, entry: dict):
+        self._do_append(entry)
+        self._record(("append", entry))
+
+    def extend(self, entries: Iterable[dict]):
+        """Append several entries as one mutation: one version bump, one undo step."""
+        entries = list(entries)
+        if entries:
+            self._do_extend(entries)
+            self._record(("extend", entries))
+
+    def pop(self) -> dict:
+        """Remove and return the last entry."""
+        entry = self._do_pop()
+        self._record(("pop", entry))
+        return entry
+
+    def insert(self, position: int, entry: dict):
+        """Insert *entry* before *position* (``position == len`` appends)."""
+        self._do_insert(position, entry)
+        self._record(("insert", position, entry))
+
+    def delete(self, position: int) -> dict:
+        """Remove and return the entry at *position*."""
+        entry = self._do_delete(position)
+        self._record(("delete", position, entry))
+        return entry
+
+    def update(self, position: int, entry: dict) -> dict:
+        """Replace the entry at *position* (a re-priced correction); returns the old one."""
+        old = self._do_update(position, entry)
+        self._record(("update", position, old, entry))
+        return old
+
+    def clear(self):
+        self.replace(())
+
+    def replace(self, entries: Iterable[dict]):
+        """Replace every entry at once (JSON import, Clear All)."""
+        before = self._snapshot()
+        self._do_replace(entries)
+        self._record(("replace", before, self._snapshot()))
+
+    # ── Undo / redo ──────────────────────────────────────────────────────────
+    def _record(self, step: tuple):
+        self._undo.append(step)
+        self._redo.clear()
+        self._history_version = self.version
+
+    def _in_sync(self) -> bool:
+        """False (and the history dropped) if the ledger changed behind our back."""
+        if self.version != self._history_version:
+            self._undo.clear()
+            self._redo.clear()
+            self._history_version = self.version
+            return False
+        return True
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> bool:
+        """Revert the most recent mutation; False if there is nothing to undo."""
+        if not self._in_sync() or not self._undo:
+            return False
+        step = self._undo.pop()
+        self._apply(step, forward=False)
+        self._redo.append(step)
+        self._history_version = self.version
+        return True
+
+    def redo(self) -> bool:
+        """Re-apply the most recently undone mutation; False if there is none."""
+        if not self._in_sync() or not self._redo:
+            return False
+        step = self._redo.pop()
+        self._apply(step, forward=True)
+        self._undo.append(step)
+        self._history_version = self.version
+        return True
+
+    def _apply(self, step: tuple, forward: bool):
+        kind = step[0]
+        if kind == "append":
+            self._do_append(step[1]) if forward else self._do_pop()
+        elif kind == "extend":
+            self._do_extend(step[1]) if forward else self._do_truncate(len(step[1]))
+        elif kind == "pop":
+            self._do_pop() if forward else self._do_append(step[1])
+        elif kind == "insert":
+            self._do_insert(step[1], step[2]) if forward else self._do_delete(step[1])
+        elif kind == "delete":
+            self._do_delete(step[1]) if forward else self._do_insert(step[1], step[2])
+        elif kind == "update":
+            self._do_update(step[1], step[3] if forward else step[2])
+        else:
+            self._restore(step[2] if forward else step[1])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def _cached(self, name: str, key, build):
+        hit = self._memo.get(name)
+        if _METRICS:
+            cache_access("ledger." + name, hit is not None and hit[0] == key)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        value = build()
+        self._memo[name] = (key, value)
+        return value
+
+    def iter_json(self, character: dict, pool_total: float) -> Iterator[str]:
+        """Stream the audit-ready JSON export (see ledger/export.py)."""
+        return iter_export_json(
+            character, str(pool_total), str(self.remaining(pool_total)), iter(self),
+        )
+
+    def iter_csv(self) -> Iterator[str]:
+        """Stream the CSV export (CSV_FIELDNAMES columns)."""
+        return iter_export_csv(iter(self))
+
+    def export_json(self, character: dict, pool_total: float, compress: bool = False):
+        """
+        Audit-ready JSON export: character, total_pool, remaining, ledger.
+
+        Returns the text, or gzip bytes when *compress* is set.
+        """
+        chunks = self.iter_json(character, pool_total)
+        return b"".join(gzip_chunks(chunks)) if compress else "".join(chunks)
+
+    def export_csv(self, compress: bool = False):
+        """CSV export of the ledger entries; gzip bytes when *compress* is set."""
+        chunks = self.iter_csv()
+        return b"".join(gzip_chunks(chunks)) if compress else "".join(chunks)
+
+
+class Ledger(BaseLedger):
+    """Ordered cast entries plus version-keyed caches of derived views."""
+
+    def __init__(self, entries: list[dict] | None = None, engine: str = "float"):
+        if engine not in ("float", "cents"):
+            raise ValueError(f"Unknown cost engine: {engine!r}")
+        self.engine = engine
+        self._entries: list[dict] = []
+        self._amounts: list = []          # float mana, or int cents for engine="cents"
+        self._memo: dict[str, tuple] = {}
+        self._tree: CostTree | None = None   # built by the first correction
+        self.version = 0
+        if entries:
+            self._do_replace(entries)
+        self._init_history()
+
+    # ── Read access ──────────────────────────────────────────────────────────
+    @property
+    def entries(self) -> list[dict]:
+        """The entries (LedgerEntry records or dicts), in cast order.  Treat as read-only."""
+        return self._entries
+
+    @property
+    def costs(self) -> list[float]:
+        """Parsed ``exact_cost`` of each entry, in cast order."""
+        if self.engine == "float":
+            return self._amounts
+        return self._cached("costs", self.version, lambda: [c / 100 for c in self._amounts])
+
+    def cents(self) -> list[int]:
+        """``exact_cost`` of each entry in integer hundredths."""
+        if self.engine == "cents":
+            return self._amounts
+        return self._cached(
+            "cents", self.version,
+            lambda: [cost_to_cents(e["exact_cost"]) for e in self._entries],
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __getitem__(self, index):
+        return self._entries[index]
+
+    # ── Primitive mutations (each bumps the version) ─────────────────────────
+    def _do_append(self, entry: dict):
+        entry = compact_entry(entry)
+        self._entries.append(entry)
+        self._amounts.append(self._amount(entry))
+        if self._tree is not None:
+            self._tree.append(self._cents(entry, -1))
+        hit = self._memo.get("index")
+        self._touch()
+        if hit is not None and hit[0] == self.version - 1:
+            # Keep the query index current instead of rebuilding it per cast.
+            index = hit[1]
+            index.append(entry, self._cents(entry, -1))
+            self._memo["index"] = (self.version, index)
+
+    def _do_extend(self, entries: list[dict]):
+        start = len(self._entries)
+        entries = list(map(compact_entry, entries))
+        self._entries.extend(entries)
+        self._amounts.extend(map(self._amount, entries))
+        if self._tree is not None:
+            for position in range(start, len(self._entries)):
+                self._tree.append(self._cents(self._entries[position], position))
+        hit = self._memo.get("index")
+        self._touch()
+        if hit is not None and hit[0] == self.version - 1:
+            index = hit[1]
+            for position in range(start, len(self._entries)):
+                index.append(self._entries[position], self._cents(self._entries[position], position))
+            self._memo["index"] = (self.version, index)
+
+    def _do_pop(self) -> dict:
+        entry = self._entries.pop()
+        self._amounts.pop()
+        if self._tree is not None:
+            self._tree.delete(len(self._entries))
+        self._touch()
+        return entry
+
+    def _do_truncate(self, count: int) -> list[dict]:
+        """Remove and return the last *count* entries."""
+        if not 0 <= count <= len(self._entries):
+            raise IndexError(f"cannot remove {count} of {len(self._entries)} entries")
+        start = len(self._entries) - count
+        removed = self._entries[start:]
+        del self._entries[start:], self._amounts[start:]
+        if self._tree is not None:
+            for position in range(start + count - 1, start - 1, -1):
+                self._tree.delete(position)
+        self._touch()
+        return removed
+
+    def _do_replace(self, entries: Iterable[dict]):
+        entries = list(map(compact_entry, entries))
+        self._restore((entries, [self._amount(e) for e in entries], None))
+
+    def _snapshot(self) -> tuple:
+        # The lists themselves: later in-place mutations are always undone
+        # before history steps back to (or past) this snapshot.
+        return self._entries, self._amounts, self._tree
+
+    def _restore(self, state: tuple):
+        self._entries, self._amounts, self._tree = state
+        self._touch()
+
+    # ── Corrections at any position ──────────────────────────────────────────
+    def _do_insert(self, position: int, entry: dict):
+        if not 0 <= position <= len(self._entries):
+            raise IndexError(f"ledger position {position} out of range")
+        entry = compact_entry(entry)
+        tree = self.cost_tree()
+        self._entries.insert(position, entry)
+        self._amounts.insert(position, self._amount(entry))
+        tree.insert(position, self._cents(entry, position))
+        self._touch()
+
+    def _do_delete(self, position: int) -> dict:
+        self._check_position(position)
+        self.cost_tree().delete(position)
+        del self._amounts[position]
+        entry = self._entries.pop(position)
+        self._touch()
+        return entry
+
+    def _do_update(self, position: int, entry: dict) -> dict:
+        self._check_position(position)
+        entry = compact_entry(entry)
+        tree = self.cost_tree()
+        old = self._entries[position]
+        self._entries[position] = entry
+        self._amounts[position] = self._amount(entry)
+        tree.set(position, self._cents(entry, position))
+        self._touch()
+        return old
+
+    def _check_position(self, position: int):
+        if not 0 <= position < len(self._entries):
+            raise IndexError(f"ledger position {position} out of range")
+
+    def next_id(self) -> int:
+        """The id following the highest id currently in the ledger."""
+        return max((e.get("id", 0) for e in self._entries), default=0) + 1
+
+    def _amount(self, entry: dict):
+        if self.engine == "cents":
+            return cost_to_cents(entry["exact_cost"])
+        if type(entry) is LedgerEntry:
+            return entry.cost                 # already parsed: no string round trip
+        return parse_cost(entry["exact_cost"])
+
+    def _cents(self, entry: dict, position: int) -> int:
+        """Cost of *entry* (already stored at *position*) in integer hundredths."""
+        if self.engine == "cents":
+            return self._amounts[position]
+        return cost_to_cents(entry["exact_cost"])
+
+    def _touch(self):
+        self.version += 1
+        self._memo.clear()
+
+    # ── Derived views ────────────────────────────────────────────────────────
+    def balances_cents(self, pool_total: float) -> list[int]:
+        """Exact remaining pool after each entry, in integer hundredths."""
+        def build():
+            out = list(accumulate(self.cents(), operator.sub, initial=pool_to_cents(pool_total)))
+            del out[0]
+            return out
+        return self._cached("balances_cents", (self.version, pool_total), build)
+
+    def balances(self, pool_total: float) -> list[float]:
+        """Remaining pool after each entry."""
+        if self.engine == "cents":
+            return self._cached(
+                "balances", (self.version, pool_total),
+                lambda: [b / 100 for b in self.balances_cents(pool_total)],
+            )
+
+        def build():
+            # Left-to-right running subtraction, as the ledger panel always did.
+            out = list(accumulate(self._amounts, operator.sub, initial=pool_total))
+            del out[0]
+            return out
+        return self._cached("balances", (self.version, pool_total), build)
+
+    def cost_tree(self) -> CostTree:
+        """The ledger's CostTree, built from the entry costs on first use."""
+        if self._tree is None:
+            self._tree = CostTree(self.cents())
+        return self._tree
+
+    def balance_at_cents(self, pool_total: float, position: int) -> int:
+        """Exact remaining pool after the entry at *position*, in O(log n)."""
+        self._check_position(position)
+        return pool_to_cents(pool_total) - self.cost_tree().prefix(position + 1)
+
+    def balance_at(self, pool_total: float, position: int) -> float:
+        """Remaining pool after the entry at *position*."""
+        return self.balance_at_cents(pool_total, position) / 100
+
+    def remaining(self, pool_total: float) -> float:
+        """Remaining pool after all ledger casts."""
+        if self._tree is not None:
+            # Exact in either engine, and O(1) after a correction.
+            return (pool_to_cents(pool_total) - self._tree.total) / 100
+        if self.engine == "cents":
+            balances = self.balances_cents(pool_total)
+            return balances[-1] / 100 if balances else pool_total
+        balances = self.balances(pool_total)
+        return balances[-1] if balances else pool_total
+
+    def running_rows(self, pool_total: float) -> list[dict]:
+        """Ledger panel rows with formatted cost and running balance."""
+        def build():
+            if self.engine == "cents":
+                costs = map(fmt_cents, self._amounts)
+                balances = map(fmt_cents, self.balances_cents(pool_total))
+            else:
+                costs = map(fmt_cost, self._amounts)
+                balances = map(fmt_pool, self.balances(pool_total))
+            return list(map(display_row, self._entries, costs, balances))
+        return self._cached("running_rows", (self.version, pool_total), build)
+
+    def page_rows(self, pool_total: float, offset: int, limit: int) -> list[dict]:
+        """One page of running_rows()."""
+        return self.running_rows(pool_total)[offset:offset + limit]
+
+    def index(self) -> LedgerIndex:
+        """Secondary indexes + cost prefix sums (see ledger/query.py)."""
+        return self._cached("index", self.version, lambda: LedgerIndex(self._entries, self.cents()))
+
+    def distinct(self, field: str) -> list:
+        """Distinct values of a filter field, for filter drop-downs."""
+        return self.index().distinct(field)
+
+    def query(
+        self,
+        pool_total: float,
+        filters: dict | None = None,
+        sort_by: str = "position",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[dict], int]:
+        """One page of filtered/sorted panel rows and the match count (ledger/query.py)."""
+        if self._tree is not None and sort_by == "position" and not normalize_filters(filters):
+            return self._tree_page(pool_total, descending, offset, limit), len(self)
+        return self.index().query(
+            pool_to_cents(pool_total), filters, sort_by, descending, offset, limit,
+        )
+
+    def _tree_page(self, pool_total: float, descending: bool, offset: int, limit: int) -> list[dict]:
+        """An unfiltered page in cast order, balances from the cost tree (O(log n + page))."""
+        n = len(self._entries)
+        if descending:
+            start, stop = max(0, n - offset - limit), max(0, n - offset)
+        else:
+            start, stop = min(offset, n), min(offset + limit, n)
+        running = pool_to_cents(pool_total) - self._tree.prefix(start)
+        rows = []
+        for position in range(start, stop):
+            entry = self._entries[position]
+            cents = self._cents(entry, position)
+            running -= cents
+            rows.append(display_row(entry, fmt_cents(cents), fmt_cents(running)))
+        return rows[::-1] if descending else rows
@@ -0,0 +1,174 @@
+"""
+Budget planner for a scene's spell list.
+
+Given the mana left in the pool and the spells a player wants to cast, choose
+for each spell its efficiency, Orders of Expression and quantity rounding
+(bundled / per_cast) so that the plan fits the budget and either
+
+    objective="casts"   casts as many of the spells as possible (counted by
+                        quantity), then spends as little as possible, or
+    objective="spend"   casts every spell for the least mana.
+
+Ties go to the plan with fewer Orders of Expression (less to write), then to
+the efficiencies and rounding modes in the order the spell lists them.
+``max_orders_total`` caps the orders written across the whole plan.
+
+Planned spells
+──────────────
+    spell_name, spell_tier      as on the Cast Spell form
+    quantity                    casts of this spell (default 1)
+    situational                 modifier string, e.g. "1/4" (default none)
+    efficiencies                allowed efficiencies (default: all)
+    min_orders, max_orders      allowed Orders of Expression (default 0–6)
+    quantity_modes              allowed rounding modes (default: both)
+    required                    always cast, under objective="casts" too
+
+Solver
+──────
+Every option is priced through ``price_cast`` (the same pipeline as the Cast
+Spell form, so a planned cost is exactly what casting records) and held in
+integer hundredths.  Per spell, only the cheapest option at each orders count
+survives, and only if it is cheaper than every option with fewer orders — at
+most seven options a spell.  A dynamic program over (casts planned, orders
+written) then keeps the least ``cost × K + orders`` per state (spend first,
+orders as the tie-break, in one integer), one NumPy pass per option.  Fifty
+spells solve in milliseconds.
+"""
+import numpy as np
+from ..config import COST_ENGINE, EFFICIENCY_NAMES
+from ..engine.calc_cents import cost_to_cents
+from ..engine.ruleset import active_ruleset
+from ..engine.tiers import Tier
+from .pricing import price_cast
+
+PLAN_OBJECTIVES = ("casts", "spend")
+QUANTITY_MODES = ("bundled", "per_cast")
+
+_INF = np.int64(1) << 62
+_SKIP = -1
+_UNREACHED = -2
+
+
+def spell_options(highest_tier: Tier, spell: dict, engine: str = COST_ENGINE) -> list[dict]:
+    """
+    The non-dominated ways to cast *spell*, fewest orders first.
+
+    Each option is ``{"efficiency", "orders", "quantity_mode", "cost_cents"}``;
+    costs strictly fall as orders rise.
+    """
+    quantity = spell.get("quantity", 1)
+    modes = list(spell.get("quantity_modes") or QUANTITY_MODES)
+    if quantity == 1:
+        modes = modes[:1]                 # both modes price one cast the same
+    efficiencies = spell.get("efficiencies") or EFFICIENCY_NAMES
+    low = spell.get("min_orders", 0)
+    high = spell.get("max_orders", max(active_ruleset().orders_of_expression))
+
+    options = []
+    for orders in range(low, high + 1):
+        best = None
+        for efficiency in efficiencies:
+            for mode in modes:
+                cost = price_cast(
+                    highest_tier, spell["spell_tier"], efficiency, orders, quantity,
+                    mode, spell.get("situational", ""), False, engine=engine,
+                )
+                cents = cost_to_cents(str(cost))
+                if best is None or cents < best["cost_cents"]:
+                    best = {
+                        "efficiency": efficiency, "orders": orders,
+                        "quantity_mode": mode, "cost_cents": cents,
+                    }
+        if best is not None and (not options or best["cost_cents"] < options[-1]["cost_cents"]):
+            options.append(best)
+    return options
+
+
+def plan_casts(
+    highest_tier: Tier,
+    spells: list[dict],
+    budget_cents: int,
+    objective: str = "casts",
+    max_orders_total: int | None = None,
+    engine: str = COST_ENGINE,
+) -> dict:
+    """
+    Plan *spells* against *budget_cents*.
+
+    Returns a dict:
+
+        fits           the plan is within budget (and the orders cap)
+        spent_cents    total cost of the planned casts
+        casts          casts planned (sum of quantities)
+        orders         Orders of Expression written in total
+        choices        per spell, in input order: the chosen option (see
+                       spell_options) or None if the spell is left out
+
+    With objective="spend", or required spells that cannot all fit, the plan
+    returned is the cheapest one even if it does not fit (``fits`` False).
+    """
+    if objective not in PLAN_OBJECTIVES:
+        raise ValueError(f"Unknown plan objective: {objective!r}")
+    if max_orders_total is not None and max_orders_total < 0:
+        raise ValueError("max_orders_total must be non-negative")
+
+    options = [spell_options(highest_tier, spell, engine) for spell in spells]
+    optional = [objective == "casts" and not spell.get("required") for spell in spells]
+    values = [spell.get("quantity", 1) if objective == "casts" else 0 for spell in spells]
+
+    # State: dp[casts, orders] → least cost × K + orders.  Without an orders cap
+    # the orders axis collapses (orders are only a tie-break inside the key).
+    key_scale = max((o["orders"] for opts in options for o in opts), default=0) * len(spells) + 1
+    n_values = sum(values) + 1
+    n_orders = max_orders_total + 1 if max_orders_total is not None else 1
+    dp = np.full((n_values, n_orders), _INF, dtype=np.int64)
+    dp[0, 0] = 0
+    choices = []
+
+    for spell_opts, skippable, value in zip(options, optional, values):
+        new = dp.copy() if skippable else np.full_like(dp, _INF)
+        choice = np.where(dp < _INF, _SKIP, _UNREACHED) if skippable \
+            else np.full(dp.shape, _UNREACHED, dtype=np.int64)
+        for k, option in enumerate(spell_opts):
+            shift = option["orders"] if max_orders_total is not None else 0
+            if shift >= n_orders or value >= n_values:
+                continue
+            source = dp[:n_values - value, :n_orders - shift]
+            target = new[value:, shift:]
+            candidate = source + (option["cost_cents"] * key_scale + option["orders"])
+            better = (source < _INF) & (candidate < target)
+            target[better] = candidate[better]
+            choice[value:, shift:][better] = k
+        dp = new
+        choices.append(choice.astype(np.int8))
+
+    reachable = dp < _INF
+    if not reachable.any():
+        raise ValueError("No spell has an allowed option (check orders and efficiencies)")
+    costs = np.where(reachable, dp // key_scale, _INF)
+    fitting = reachable & (costs <= budget_cents)
+    candidates = fitting if fitting.any() else reachable
+    if objective == "casts" and fitting.any():
+        v = int(np.flatnonzero(fitting.any(axis=1))[-1])       # most casts that fit
+    else:
+        v = int(np.unravel_index(np.argmin(np.where(candidates, dp, _INF)), dp.shape)[0])
+    o = int(np.argmin(np.where(candidates[v], dp[v], _INF)))     # then least spend, orders
+
+    chosen: list[dict | None] = [None] * len(spells)
+    for i in range(len(spells) - 1, -1, -1):
+        k = int(choices[i][v, o])
+        if k >= 0:
+            chosen[i] = options[i][k]
+            v -= values[i]
+            if max_orders_total is not None:
+                o -= chosen[i]["orders"]
+
+    planned = [c for c in chosen if c is not None]
+    spent = sum(c["cost_cents"] for c in planned)
+    return {
+        "fits": spent <= budget_cents,
+        "spent_cents": spent,
+        "casts": sum(spells[i].get("quantity", 1) for i, c in enumerate(chosen) if c is not None),
+        "orders": sum(c["orders"] for c in planned),
+        "choices": chosen,
+    }
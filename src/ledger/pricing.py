@@ -0,0 +1,111 @@
+"""
+Ledger entry pricing.
+
+Turns the fields of a Cast Spell form submission (or a stored ledger entry)
+into a rounded cost using the configured engine — the float pipeline
+(calc_cast / calc_hybrid) or the integer-hundredths engine (calc_cents).
+
+Shared by the Streamlit app, which prices new casts, and the bulk audit,
+which re-prices exported ledgers.
+"""
+from fractions import Fraction
+from ..config import COST_ENGINE
+from ..engine.tiers import Tier, tier_from_name
+from ..engine.calc_cast import compute_cast_cost_with_quantity
+from ..engine.calc_hybrid import compute_hybrid_cost
+from ..engine.calc_cents import compute_cast_cost_cents, compute_hybrid_cost_cents
+
+
+def parse_situational(situational_str: str, exact: bool = False) -> float | Fraction | None:
+    """
+    Parse the situational modifier field: '1/4', '0.5', '2' or blank → None.
+
+    *exact* returns a Fraction ('1/3' → 1/3, '0.7' → 7/10) for the cents
+    engine instead of a float.
+    """
+    if not situational_str.strip():
+        return None
+    try:
+        parts = situational_str.strip().split("/")
+        if len(parts) == 2:
+            if exact:
+                return Fraction(int(parts[0]), int(parts[1]))
+            return int(parts[0]) / int(parts[1])
+        return Fraction(parts[0].strip()) if exact else float(parts[0])
+    except Exception:
+        return None
+
+
+def cast_cost(*args, engine: str = COST_ENGINE, **kwargs) -> float:
+    """Rounded single-spell cost (compute_cast_cost_with_quantity signature)."""
+    if engine == "cents":
+        return compute_cast_cost_cents(*args, **kwargs) / 100
+    return compute_cast_cost_with_quantity(*args, **kwargs)
+
+
+def hybrid_cost(*args, engine: str = COST_ENGINE, **kwargs) -> float:
+    """Rounded hybrid cost (compute_hybrid_cost signature)."""
+    if engine == "cents":
+        return compute_hybrid_cost_cents(*args, **kwargs) / 100
+    return compute_hybrid_cost(*args, **kwargs)
+
+
+def price_cast(
+    highest_tier: Tier,
+    spell_tier_str: str,
+    efficiency: str,
+    orders: int,
+    quantity: int,
+    quantity_mode: str,
+    situational_str: str,
+    is_hybrid: bool,
+    hybrid_b: dict | None = None,
+    engine: str = COST_ENGINE,
+) -> float:
+    """
+    Price one cast from its form fields.
+
+    Hybrid casts need *hybrid_b* ({"tier": str, "efficiency": str}); a hybrid
+    without a second spell is priced as a single spell, as the form does.
+    """
+    spell_tier = tier_from_name(spell_tier_str)
+    sit_mod = parse_situational(situational_str, exact=engine == "cents")
+
+    if is_hybrid and hybrid_b:
+        spell_a_dict = {"tier": spell_tier, "efficiency": efficiency}
+        spell_b_dict = {
+            "tier": tier_from_name(hybrid_b["tier"]),
+            "efficiency": hybrid_b["efficiency"],
+        }
+        return hybrid_cost(
+            highest_tier, spell_a_dict, spell_b_dict,
+            orders=orders,
+            situational_modifier=sit_mod,
+            engine=engine,
+        )
+    return cast_cost(
+        highest_tier, spell_tier, efficiency, orders,
+        quantity=quantity,
+        quantity_mode=quantity_mode,
+        situational_modifier=sit_mod,
+        engine=engine,
+    )
+
+
+def price_entry(highest_tier: Tier, entry: dict, engine: str = COST_ENGINE) -> float:
+    """Re-price a stored ledger entry dict (export schema)."""
+    hybrid_b = None
+    if entry.get("hybrid_b_tier"):
+        hybrid_b = {"tier": entry["hybrid_b_tier"], "efficiency": entry["hybrid_b_efficiency"]}
+    return price_cast(
+        highest_tier,
+        entry["spell_tier"],
+        entry.get("efficiency", "Standard"),
+        entry.get("orders", 0),
+        entry.get("quantity", 1),
+        entry.get("quantity_mode", "bundled"),
+        entry.get("situational", ""),
+        bool(entry.get("is_hybrid")),
+        hybrid_b,
+        engine=engine,
+    )
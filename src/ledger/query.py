@@ -0,0 +1,188 @@
+"""
+Indexed ledger queries: filter, sort and paginate.
+
+Every ledger backend answers ``query(pool_total, filters, sort_by, descending,
+offset, limit)`` with ``(rows, total)``: the display rows of one page (same
+shape as the ledger panel rows) and the number of matching entries.
+
+Filters
+───────
+    spell_name, arcana_name, spell_tier, efficiency   exact, case-insensitive
+    is_hybrid                                          bool
+    search                                             substring of spell_name
+
+Sort keys: ``position`` (cast order, default), ``cost``, ``spell_name``,
+``arcana_name``, ``spell_tier`` (by tier rank) and ``efficiency``; ties keep
+cast order.
+
+The Remaining column is always the real running balance after that entry in
+the full ledger — not a balance over the filtered rows — taken from exact
+integer-hundredths prefix sums, so a page costs O(page) once the index exists.
+
+LedgerIndex is the in-memory implementation: posting lists (entry positions
+per distinct value) for each filter field, prefix sums of the costs, and
+lazily built sort permutations.  The SQLite backend answers the same query
+with expression indexes (storage/sqlite_store.py).
+"""
+from itertools import accumulate
+from ..engine.tiers import tier_from_name
+from ..engine.rounding import fmt_cents
+
+FILTER_FIELDS: tuple[str, ...] = ("spell_name", "arcana_name", "spell_tier", "efficiency", "is_hybrid")
+SORT_FIELDS: tuple[str, ...] = ("position", "cost", "spell_name", "arcana_name", "spell_tier", "efficiency")
+
+
+def display_row(entry: dict, cost: str, remaining: str) -> dict:
+    """One ledger panel row from an entry and its formatted cost / balance."""
+    return {
+        "#":         entry["id"],
+        "Spell":     entry["spell_name"],
+        "Arcana":    entry["arcana_name"],
+        "Tier":      entry["spell_tier"],
+        "Eff.":      entry["efficiency"],
+        "Ord.":      entry["orders"],
+        "Qty":       entry["quantity"],
+        "Hybrid":    "✓" if entry.get("is_hybrid") else "",
+        "Cost":      cost,
+        "Remaining": remaining,
+    }
+
+
+def normalize_filters(filters: dict | None) -> dict:
+    """Validate *filters*, drop empty values and fold case of text values."""
+    out = {}
+    for field, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        if field == "is_hybrid":
+            out[field] = bool(value)
+        elif field in FILTER_FIELDS or field == "search":
+            out[field] = str(value).lower()
+        else:
+            raise ValueError(f"Unknown ledger filter: {field!r}")
+    return out
+
+
+def _key(field: str, entry: dict):
+    if field == "is_hybrid":
+        return bool(entry.get("is_hybrid"))
+    return str(entry.get(field, "")).lower()
+
+
+def _tier_rank(name: str) -> int:
+    try:
+        return int(tier_from_name(name))
+    except KeyError:
+        return -1
+
+
+def sorted_distinct(field: str, values) -> list:
+    """Filter drop-down order: tiers by rank, everything else alphabetically."""
+    if field == "spell_tier":
+        return sorted(values, key=_tier_rank)
+    return sorted(values, key=lambda v: (str(v).lower(), str(v)))
+
+
+class LedgerIndex:
+    """Secondary indexes and cost prefix sums over a list of entries."""
+
+    def __init__(self, entries: list[dict], cents: list[int]):
+        self.entries = entries
+        self.cents = list(cents)
+        self.spent = list(accumulate(self.cents, initial=0))   # spent[k] = Σ cents[:k]
+        self.postings: dict[str, dict] = {field: {} for field in FILTER_FIELDS}
+        self.labels: dict[str, dict] = {field: {} for field in FILTER_FIELDS}
+        self._orders: dict[tuple[str, bool], list[int]] = {}
+        for position, entry in enumerate(entries):
+            self._post(position, entry)
+
+    def _post(self, position: int, entry: dict):
+        for field in FILTER_FIELDS:
+            key = _key(field, entry)
+            self.postings[field].setdefault(key, []).append(position)
+            self.labels[field].setdefault(key, entry.get(field))
+
+    def append(self, entry: dict, cents: int):
+        """Index one appended entry in O(1) (sort permutations are rebuilt lazily)."""
+        self._post(len(self.cents), entry)
+        self.cents.append(cents)
+        self.spent.append(self.spent[-1] + cents)
+        self._orders.clear()
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+    def distinct(self, field: str) -> list:
+        """Distinct values of *field* (as first written), sorted."""
+        return sorted_distinct(field, self.labels[field].values())
+
+    def positions(self, filters: dict) -> list[int] | range:
+        """Positions matching every normalized filter, ascending."""
+        lists = []
+        for field, value in filters.items():
+            if field == "search":
+                index = self.postings["spell_name"]
+                merged = [p for key, plist in index.items() if value in key for p in plist]
+                lists.append(sorted(merged))
+            else:
+                lists.append(self.postings[field].get(value, []))
+        if not lists:
+            return range(len(self.cents))
+        lists.sort(key=len)
+        matches = lists[0]
+        for other in lists[1:]:
+            keep = set(other)
+            matches = [p for p in matches if p in keep]
+        return matches
+
+    def order(self, sort_by: str, descending: bool = False) -> list[int]:
+        """
+        All positions sorted by a non-position key; ties keep cast order in
+        either direction (``sorted(reverse=True)`` is stable).
+        """
+        perm = self._orders.get((sort_by, descending))
+        if perm is None:
+            if sort_by == "cost":
+                keys = self.cents
+            elif sort_by == "spell_tier":
+                keys = [_tier_rank(e.get("spell_tier", "")) for e in self.entries]
+            else:
+                keys = [_key(sort_by, e) for e in self.entries]
+            perm = sorted(range(len(self.cents)), key=keys.__getitem__, reverse=descending)
+            self._orders[(sort_by, descending)] = perm
+        return perm
+
+    def query(
+        self,
+        pool_cents: int,
+        filters: dict | None = None,
+        sort_by: str = "position",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[dict], int]:
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unknown ledger sort key: {sort_by!r}")
+        filters = normalize_filters(filters)
+        matches = self.positions(filters)
+        total = len(matches)
+        if sort_by == "position":
+            if descending:
+                matches = matches[::-1]
+        elif filters:
+            keep = set(matches)
+            matches = [p for p in self.order(sort_by, descending) if p in keep]
+        else:
+            matches = self.order(sort_by, descending)
+        page = matches[offset:offset + limit]
+        rows = [
+            display_row(
+                self.entries[p],
+                fmt_cents(self.cents[p]),
+                fmt_cents(pool_cents - self.spent[p + 1]),
+            )
+            for p in page
+        ]
+        return rows, total
+
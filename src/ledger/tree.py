@@ -0,0 +1,203 @@
+"""
+Order-statistic cost tree for mid-ledger corrections.
+
+Running balances are prefix sums of entry costs.  A Fenwick tree answers those
+in O(log n) but is indexed by position, so inserting or deleting an entry in
+the middle of the ledger shifts every later index and means an O(n) rebuild.
+CostTree is an implicit treap instead: entries are ordered by position
+without storing it, and each node keeps its subtree size and cost sum, so
+
+    insert(k, cents) / delete(k) / set(k, cents)     O(log n) expected
+    prefix(k)       Σ cents of the first k entries     O(log n)
+    total                                              O(1)
+
+Costs are integer hundredths (engine/calc_cents.py), so every sum is exact.
+The tree only holds costs; Ledger keeps the entries themselves in its list.
+"""
+import random
+from typing import Iterable
+
+# Seeded per tree so the shape (and timing) of a given history is reproducible.
+_SEED = 0x4D414E41
+
+
+class _Node:
+    __slots__ = ("cents", "prio", "left", "right", "size", "sum")
+
+    def __init__(self, cents: int, prio: float):
+        self.cents = cents
+        self.prio = prio
+        self.left = None
+        self.right = None
+        self.size = 1
+        self.sum = cents
+
+
+def _pull(node: _Node):
+    size, total = 1, node.cents
+    if node.left is not None:
+        size += node.left.size
+        total += node.left.sum
+    if node.right is not None:
+        size += node.right.size
+        total += node.right.sum
+    node.size = size
+    node.sum = total
+
+
+def _split(node: _Node | None, k: int) -> tuple[_Node | None, _Node | None]:
+    """(first k entries, the rest)."""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if k <= left_size:
+        head, node.left = _split(node.left, k)
+        _pull(node)
+        return head, node
+    node.right, tail = _split(node.right, k - left_size - 1)
+    _pull(node)
+    return node, tail
+
+
+def _merge(a: _Node | None, b: _Node | None) -> _Node | None:
+    """Concatenate two trees (every entry of *a* before every entry of *b*)."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prio > b.prio:
+        a.right = _merge(a.right, b)
+        _pull(a)
+        return a
+    b.left = _merge(a, b.left)
+    _pull(b)
+    return b
+
+
+class CostTree:
+    """Entry costs (integer hundredths) in ledger order, with O(log n) prefix sums."""
+
+    def __init__(self, cents: Iterable[int] = ()):
+        self._random = random.Random(_SEED).random
+        self._root = self._build(cents)
+
+    def _build(self, cents: Iterable[int]) -> _Node | None:
+        """Linear-time treap construction from an ordered sequence (Cartesian tree)."""
+        spine: list[_Node] = []           # right spine, root first
+        for c in cents:
+            node = _Node(c, self._random())
+            last = None
+            while spine and spine[-1].prio < node.prio:
+                last = spine.pop()
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+        if not spine:
+            return None
+        # Sizes and sums bottom-up (children always come after their parent
+        # in this pre-order walk).
+        stack, order = [spine[0]], []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        for node in reversed(order):
+            _pull(node)
+        return spine[0]
+
+    def __len__(self) -> int:
+        return self._root.size if self._root is not None else 0
+
+    @property
+    def total(self) -> int:
+        """Σ cents of every entry."""
+        return self._root.sum if self._root is not None else 0
+
+    def _check(self, k: int, upper: int):
+        if not 0 <= k <= upper:
+            raise IndexError(f"ledger position {k} out of range")
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+    def prefix(self, k: int) -> int:
+        """Σ cents of the first *k* entries."""
+        self._check(k, len(self))
+        total, node = 0, self._root
+        while node is not None and k:
+            left_size = node.left.size if node.left is not None else 0
+            if k <= left_size:
+                node = node.left
+            else:
+                if node.left is not None:
+                    total += node.left.sum
+                total += node.cents
+                k -= left_size + 1
+                node = node.right
+        return total
+
+    def __getitem__(self, k: int) -> int:
+        """Cost of the entry at position *k*."""
+        return self._node(k).cents
+
+    def _node(self, k: int) -> _Node:
+        self._check(k, len(self) - 1)
+        node = self._root
+        while True:
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    def __iter__(self):
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.cents
+            node = node.right
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+    def insert(self, k: int, cents: int):
+        """Insert a cost before position *k* (``k == len`` appends)."""
+        self._check(k, len(self))
+        head, tail = _split(self._root, k)
+        self._root = _merge(_merge(head, _Node(cents, self._random())), tail)
+
+    def append(self, cents: int):
+        self._root = _merge(self._root, _Node(cents, self._random()))
+
+    def delete(self, k: int) -> int:
+        """Remove the entry at position *k*; returns its cost."""
+        self._check(k, len(self) - 1)
+        head, rest = _split(self._root, k)
+        node, tail = _split(rest, 1)
+        self._root = _merge(head, tail)
+        return node.cents
+
+    def set(self, k: int, cents: int):
+        """Change the cost at position *k*, updating the sums on its path."""
+        self._check(k, len(self) - 1)
+        path, node = [], self._root
+        while True:
+            path.append(node)
+            left_size = node.left.size if node.left is not None else 0
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                break
+            else:
+                k -= left_size + 1
+                node = node.right
+        delta = cents - node.cents
+        node.cents = cents
+        for ancestor in path:
+            ancestor.sum += delta
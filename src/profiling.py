@@ -0,0 +1,143 @@
+"""
+Per-phase profiler for Streamlit reruns of app_ui.py.
+
+Every interaction re-runs the whole script.  With ``MANA_PROFILE=1`` (or
+``?profile=1`` in the URL) the app splits each rerun into named phases and
+records, per phase, wall time (``time.perf_counter``) and the tracemalloc
+peak of memory allocated while it ran (above what was allocated when it began;
+tracemalloc is process-wide, so concurrent sessions show up in each other's
+peaks).  The app traces memory only under ``MANA_PROFILE=1``; ``?profile=1``
+times phases alone.
+
+Tracing is shared by every live profiler: the first one to trace starts
+tracemalloc and the last one to finish (or be garbage-collected, for a rerun
+cut short by ``st.rerun()``) stops it — unless tracing was already on when the
+first one started, in which case it is left on.
+
+Phases are sequential marks rather than nested blocks, so instrumenting a
+section of the script is one line:
+
+    prof = RerunProfiler(enabled)
+    prof.mark("sidebar")          # starts "sidebar"
+    …
+    prof.mark("pool")             # ends "sidebar", starts "pool"
+    …
+    record = prof.finish()        # ends the last phase
+
+Finished reruns are appended as JSON lines to a rolling file (rotated to
+``.1`` … ``.N`` past a size limit) and shown in the app's diagnostics panel.
+When profiling is off every call returns immediately.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+
+_TRACE_LOCK = threading.Lock()
+_tracers = 0                    # live profilers tracing memory
+_started_tracing = False        # whether those profilers started tracemalloc
+
+
+def _acquire_tracing():
+    global _tracers, _started_tracing
+    with _TRACE_LOCK:
+        if _tracers == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracers += 1
+
+
+def _release_tracing():
+    global _tracers, _started_tracing
+    with _TRACE_LOCK:
+        _tracers -= 1
+        if _tracers == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class RerunProfiler:
+    """Times consecutive phases of one script run."""
+
+    def __init__(self, enabled: bool, trace_memory: bool = True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.phases: list[dict] = []
+        self._current: str | None = None
+        self._start = 0.0
+        self._base = 0
+        self._release = None
+        if self.trace_memory:
+            _acquire_tracing()
+            self._release = weakref.finalize(self, _release_tracing)
+        self._run_start = time.perf_counter()
+
+    def mark(self, phase: str):
+        """End the current phase (if any) and start *phase*."""
+        if not self.enabled:
+            return
+        self._close()
+        self._current = phase
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+
+    def _close(self):
+        if self._current is None:
+            return
+        seconds = time.perf_counter() - self._start
+        # Peak above what was already allocated when the phase started.
+        peak = tracemalloc.get_traced_memory()[1] - self._base if self.trace_memory else None
+        self.phases.append({"phase": self._current, "seconds": seconds, "peak_bytes": peak})
+        self._current = None
+
+    def finish(self, **context) -> dict | None:
+        """End the last phase; returns the rerun record (None when disabled)."""
+        if not self.enabled:
+            return None
+        self._close()
+        if self._release is not None:
+            self._release()             # runs once; a later finish() is a no-op
+        return {
+            "timestamp": time.time(),
+            "total_seconds": time.perf_counter() - self._run_start,
+            "phases": self.phases,
+            **context,
+        }
+
+
+def append_rolling(path: str, record: dict, max_bytes: int = 1 << 20, backups: int = 3):
+    """Append *record* as a JSON line; rotate path → path.1 … path.N past *max_bytes*."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        for i in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """Per-phase mean / max time and max memory peak over *records*, slowest first."""
+    by_phase: dict[str, list[dict]] = {}
+    for record in records:
+        for phase in record["phases"]:
+            by_phase.setdefault(phase["phase"], []).append(phase)
+    rows = []
+    for name, samples in by_phase.items():
+        times = [s["seconds"] for s in samples]
+        peaks = [s["peak_bytes"] for s in samples if s["peak_bytes"] is not None]
+        rows.append({
+            "Phase": name,
+            "Runs": len(samples),
+            "Mean ms": round(1000 * sum(times) / len(times), 2),
+            "Max ms": round(1000 * max(times), 2),
+            "Peak KiB": round(max(peaks) / 1024, 1) if peaks else None,
+        })
+    rows.sort(key=lambda row: row["Mean ms"], reverse=True)
+    return rows
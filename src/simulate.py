@@ -0,0 +1,253 @@
+"""
+Monte Carlo encounter simulator — how long does a pool last?
+
+A casting profile describes what a character tends to cast, as independent
+weighted choices:
+
+    tiers            {"Expert": 3, "Master": 1}      spell tier   (default: highest tier)
+    efficiencies     {"Standard": 2, "Optimal": 1}   efficiency   (default: Standard)
+    orders           {"0": 1, "3": 1}                Orders of Expression (default: 0)
+    quantities       {"1": 4, "2": 1}                casts per entry (default: 1)
+    quantity_modes   {"bundled": 1}                  rounding (default: bundled)
+    hybrid           0.1                             chance a cast is a hybrid; spell B
+                                                     is the same tier, its efficiency
+                                                     drawn from ``efficiencies``
+
+Weights need not sum to 1.  A trial starts from the character's full pool
+(compute_pool) and draws casts until the next one no longer fits; it reports
+the casts made and the mana left over.
+
+Every outcome the profile allows is priced once through ``price_cast`` and the
+outcomes are merged by cost, so a trial is only NumPy work on integer
+hundredths: draw a block of casts for every trial with one ``searchsorted``
+into the cost distribution, take running sums, and count how many fit.
+Trials that are still going draw another block.  Trials are run in chunks
+across a process pool; each chunk has its own seed spawned from the run's
+seed, so a seeded run gives the same results for any worker count.
+
+Pool and prices follow the character's ruleset (``"ruleset"``; the wiki rules
+if none), or ``--ruleset``.
+
+Usage
+─────
+    python -m src.simulate kirin.json profile.json -n 50000 -j 8
+"""
+import argparse
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .config import COST_ENGINE
+from .engine.calc_cents import cost_to_cents, pool_to_cents
+from .engine.calc_pool import compute_pool
+from .engine.ruleset import Ruleset, load_ruleset, resolve_ruleset, use_ruleset
+from .engine.tiers import tier_from_name
+from .ledger.export import read_export
+from .ledger.pricing import price_cast
+
+CHUNK_TRIALS = 5000
+_BLOCK_CELLS = 2_000_000          # casts drawn per block, across a chunk's trials
+
+
+def _weights(profile: dict, key: str, default, cast=str) -> list[tuple]:
+    """(value, probability) pairs for one profile choice, weights normalised."""
+    raw = profile.get(key) or {default: 1}
+    pairs = [(cast(value), float(weight)) for value, weight in raw.items()]
+    for value, weight in pairs:
+        if not weight >= 0:          # negative or NaN
+            raise ValueError(f"Profile {key!r} weight for {value!r} must not be negative")
+    pairs = [(value, weight) for value, weight in pairs if weight > 0]
+    if not pairs:
+        raise ValueError(f"Profile {key!r} needs at least one positive weight")
+    total = sum(weight for _, weight in pairs)
+    return [(value, weight / total) for value, weight in pairs]
+
+
+def compile_profile(highest_tier_name: str, profile: dict, engine: str = COST_ENGINE) -> dict:
+    """
+    Price every outcome of *profile* and merge them by cost.
+
+    Returns ``{"costs": int64[k], "cdf": float64[k]}`` — distinct costs in
+    hundredths, ascending, and the cumulative probability of each.
+    """
+    highest_tier = tier_from_name(highest_tier_name)
+    tiers = _weights(profile, "tiers", highest_tier_name)
+    efficiencies = _weights(profile, "efficiencies", "Standard")
+    orders = _weights(profile, "orders", 0, int)
+    quantities = _weights(profile, "quantities", 1, int)
+    modes = _weights(profile, "quantity_modes", "bundled")
+    hybrid = float(profile.get("hybrid", 0))
+    if not 0 <= hybrid <= 1:
+        raise ValueError("Profile 'hybrid' must be a probability between 0 and 1")
+    if any(tier_from_name(tier) > highest_tier for tier, _ in tiers):
+        raise ValueError(f"Profile casts above the character's highest tier ({highest_tier_name})")
+    if any(quantity < 1 for quantity, _ in quantities):
+        raise ValueError("Profile quantities must be at least 1")
+
+    outcomes: dict[int, float] = {}
+    if hybrid < 1:
+        for (tier, pt), (eff, pe), (order, po), (qty, pq), (mode, pm) in itertools.product(
+            tiers, efficiencies, orders, quantities, modes,
+        ):
+            cost = price_cast(highest_tier, tier, eff, order, qty, mode, "", False, engine=engine)
+            cents = cost_to_cents(str(cost))
+            outcomes[cents] = outcomes.get(cents, 0.0) + (1 - hybrid) * pt * pe * po * pq * pm
+    if hybrid > 0:
+        for (tier, pt), (eff_a, pa), (eff_b, pb), (order, po) in itertools.product(
+            tiers, efficiencies, efficiencies, orders,
+        ):
+            cost = price_cast(
+                highest_tier, tier, eff_a, order, 1, "bundled", "", True,
+                {"tier": tier, "efficiency": eff_b}, engine=engine,
+            )
+            cents = cost_to_cents(str(cost))
+            outcomes[cents] = outcomes.get(cents, 0.0) + hybrid * pt * pa * pb * po
+
+    costs = np.array(sorted(outcomes), dtype=np.int64)
+    if costs[0] <= 0:
+        raise ValueError("Profile includes a cast that costs nothing; a trial would never end")
+    cdf = np.cumsum([outcomes[c] for c in costs.tolist()])
+    return {"costs": costs, "cdf": cdf / cdf[-1]}
+
+
+def run_trials(pool_cents: int, compiled: dict, trials: int, seed=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Run *trials* encounters from *pool_cents*.
+
+    Returns ``(casts, leftover_cents)`` — int64 arrays, one value per trial.
+    """
+    rng = np.random.default_rng(seed)
+    costs, cdf = compiled["costs"], compiled["cdf"]
+    mean_cost = float(np.diff(cdf, prepend=0.0) @ costs)
+    block = int(pool_cents / mean_cost * 1.25) + 8
+    block = max(8, min(block, _BLOCK_CELLS // max(trials, 1)))
+
+    casts = np.zeros(trials, dtype=np.int64)
+    spent = np.zeros(trials, dtype=np.int64)
+    active = np.arange(trials)
+    while active.size:
+        drawn = costs[np.minimum(np.searchsorted(cdf, rng.random((active.size, block)), side="right"),
+                                 len(costs) - 1)]
+        running = spent[active, None] + np.cumsum(drawn, axis=1)
+        made = (running <= pool_cents).sum(axis=1)     # running sums only rise
+        casts[active] += made
+        fitted = made > 0
+        spent[active[fitted]] = running[fitted, made[fitted] - 1]
+        active = active[made == block]
+    return casts, pool_cents - spent
+
+
+def _run_chunk(args: tuple) -> tuple[np.ndarray, np.ndarray]:
+    return run_trials(*args)
+
+
+def simulate(
+    character: dict,
+    profile: dict,
+    trials: int = 10000,
+    seed: int | None = None,
+    workers: int | None = None,
+    engine: str = COST_ENGINE,
+    ruleset: Ruleset | None = None,
+) -> dict:
+    """
+    Simulate *trials* encounters for *character* casting from *profile*.
+
+    Returns ``{"pool_cents", "trials", "casts", "leftover_cents"}`` with one
+    array value per trial.  *workers* is the process count (default: CPU
+    count; 1 = no pool).  Prices and pool use *ruleset*, or else the
+    character's own.
+    """
+    highest = character.get("highest_tier", "Master")
+    with use_ruleset(ruleset or resolve_ruleset(character.get("ruleset"))):
+        pool, _ = compute_pool(tier_from_name(highest), character.get("arcana", []))
+        compiled = compile_profile(highest, profile, engine)
+    pool_cents = pool_to_cents(pool)
+
+    sizes = [min(CHUNK_TRIALS, trials - start) for start in range(0, trials, CHUNK_TRIALS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(pool_cents, compiled, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    if workers == 1 or len(tasks) <= 1:
+        results = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_chunk, tasks))
+
+    return {
+        "pool_cents": pool_cents,
+        "trials": trials,
+        "casts": np.concatenate([c for c, _ in results]) if results else np.zeros(0, np.int64),
+        "leftover_cents": np.concatenate([l for _, l in results]) if results else np.zeros(0, np.int64),
+    }
+
+
+def _distribution(values: np.ndarray, scale: float = 1.0) -> dict:
+    percentiles = np.percentile(values, [5, 25, 50, 75, 95]) / scale
+    return {
+        "mean": float(values.mean() / scale),
+        "std": float(values.std() / scale),
+        "min": float(values.min() / scale),
+        **{f"p{p}": float(v) for p, v in zip((5, 25, 50, 75, 95), percentiles)},
+        "max": float(values.max() / scale),
+    }
+
+
+def summarize_simulation(result: dict) -> dict:
+    """
+    JSON-ready summary of a simulate() result: distributions of casts until
+    empty and of leftover mana, plus a histogram of the cast counts.
+    """
+    casts = result["casts"]
+    if not casts.size:
+        return {"trials": 0, "pool": result["pool_cents"] / 100}
+    counts = np.bincount(casts - casts.min())
+    return {
+        "trials": result["trials"],
+        "pool": result["pool_cents"] / 100,
+        "casts": _distribution(casts),
+        "leftover": _distribution(result["leftover_cents"], 100),
+        "casts_histogram": {
+            str(value): int(count) for value, count in enumerate(counts.tolist(), int(casts.min())) if count
+        },
+    }
+
+
+def _load_json(path: str) -> dict:
+    with open(path, "rb") as f:
+        return read_export(f)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.simulate",
+        description="Monte Carlo estimate of how many casts a character's pool lasts.",
+    )
+    parser.add_argument("character", help="Character JSON, or an Export tab JSON (.json / .json.gz)")
+    parser.add_argument("profile", help="Casting profile JSON (see src/simulate.py)")
+    parser.add_argument("-n", "--trials", type=int, default=10000, help="Encounter trials (default: 10000)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs")
+    parser.add_argument("--engine", choices=["float", "cents"], default=COST_ENGINE,
+                        help=f"Cost engine to price casts with (default: {COST_ENGINE})")
+    parser.add_argument("--ruleset", default=None,
+                        help="Built-in ruleset name or house-rules JSON (default: the character's own)")
+    args = parser.parse_args(argv)
+
+    data = _load_json(args.character)
+    character = data.get("character", data)
+    with open(args.profile, encoding="utf-8") as f:
+        profile = json.load(f)
+    try:
+        ruleset = load_ruleset(args.ruleset) if args.ruleset else None
+        result = simulate(character, profile, args.trials, args.seed, args.workers, args.engine, ruleset)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(json.dumps(summarize_simulation(result), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
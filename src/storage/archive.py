@@ -0,0 +1,452 @@
+"""
+Memory-mapped binary archives of closed campaign ledgers.
+
+A finished campaign's JSON export is packed once into a read-only archive file;
+opening it maps the file instead of parsing it, so answering one question about
+a years-long ledger (an entry, a balance, every cast of one spell) touches only
+the pages that hold the answer.
+
+Layout
+──────
+    header    magic, format version, record size, record count, section offsets
+    records   one fixed-width 56-byte record per entry, in cast order
+    strings   string table: ``<u32 length><UTF-8>``, each distinct string once
+    meta      JSON: character, total_pool, remaining, enum vocabularies
+
+Each record (little-endian) holds
+
+    id, cost in integer hundredths, quantity          int64
+    orders                                             int32
+    spell_name, arcana_name, situational               u32 string-table offsets
+    cost_text, raw                                     u32 offsets (0xFFFFFFFF: none)
+    spell_tier, efficiency, quantity_mode,
+    hybrid_b_tier, hybrid_b_efficiency                 u8 codes into the vocabularies
+    flags                                              u8 (bit 0: is_hybrid)
+
+Conversion is lossless: an entry's ``exact_cost`` string is rebuilt from the
+hundredths when that gives back the same text (``repr(cents / 100)``) and is
+kept in the string table otherwise (``"34/100"``).  An entry that is not
+exactly the export schema (extra / missing keys, other value types) is also
+stored whole as JSON in the string table (``raw``) — its columns are still
+filled in as far as they apply, so scans and filters see it too.  Unpacking an
+app export gives back the same bytes.
+
+Reading
+───────
+``LedgerArchive`` maps the file read-only.  ``archive[i]`` decodes one record
+in place; ``scan()`` / slicing walk a range; ``cents()``, ``spent_cents()`` and
+``positions()`` are numpy views straight over the mapped records (no copy, no
+per-record decode).
+
+Usage
+─────
+    python -m src.storage.archive pack kirin.json.gz kirin.mla
+    python -m src.storage.archive unpack kirin.mla kirin.json
+    python -m src.storage.archive info kirin.mla
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import IO, Iterable, Iterator
+import numpy as np
+from ..engine.calc_cents import cost_to_cents, pool_to_cents
+from ..ledger.entry import as_dict, schema_exact
+from ..ledger.export import iter_export, iter_export_json, write_export
+
+_MAGIC = b"MANALAR\x00"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQ")     # magic, version, record size, count, records / strings / meta offsets
+_RECORD = struct.Struct("<qqqiIIIII5BBxx")
+_NONE = 0xFFFFFFFF                       # no string
+_NO_CODE = 0xFF                          # value not in the vocabulary
+_HYBRID = 1                              # flags bit
+
+_NAME_FIELDS = ("spell_name", "arcana_name", "situational")
+_ENUM_FIELDS = ("spell_tier", "efficiency", "quantity_mode", "hybrid_b_tier", "hybrid_b_efficiency")
+_INT64 = 1 << 63
+_INT32 = 1 << 31
+
+# The record as a numpy structured dtype, for vectorized scans over the map.
+RECORD_DTYPE = np.dtype({
+    "names": ["id", "cents", "quantity", "orders", *_NAME_FIELDS, "cost_text", "raw", *_ENUM_FIELDS, "flags"],
+    "formats": ["<i8", "<i8", "<i8", "<i4", "<u4", "<u4", "<u4", "<u4", "<u4", "u1", "u1", "u1", "u1", "u1", "u1"],
+    "offsets": [0, 8, 16, 24, 28, 32, 36, 40, 44, 48, 49, 50, 51, 52, 53],
+    "itemsize": _RECORD.size,
+})
+
+
+# ── Writing ────────────────────────────────────────────────────────────────────
+
+def _int(value, bound: int) -> int | None:
+    """*value* if it is an int that fits a signed field of magnitude *bound*."""
+    if type(value) is int and -bound <= value < bound:
+        return value
+    return None
+
+
+class _Packer:
+    """Accumulates the string table and vocabularies while records are written."""
+
+    def __init__(self):
+        self.strings = bytearray()
+        self._offsets: dict[str, int] = {}
+        self.vocab: dict[str, dict[str, int]] = {field: {} for field in _ENUM_FIELDS}
+
+    def string(self, value: str) -> int:
+        offset = self._offsets.get(value)
+        if offset is None:
+            data = value.encode("utf-8")
+            offset = self._offsets[value] = len(self.strings)
+            if offset >= _NONE:
+                raise ValueError("archive string table is full (4 GiB)")
+            self.strings += struct.pack("<I", len(data)) + data
+        return offset
+
+    def code(self, field: str, value) -> int | None:
+        if type(value) is not str:
+            return None
+        codes = self.vocab[field]
+        code = codes.get(value)
+        if code is None:
+            if len(codes) >= _NO_CODE:
+                return None
+            code = codes[value] = len(codes)
+        return code
+
+    def record(self, entry) -> bytes:
+        entry = as_dict(entry)
+        exact = schema_exact(entry)
+
+        cost = entry.get("exact_cost")
+        try:
+            cents = cost_to_cents(cost) if isinstance(cost, str) else pool_to_cents(float(cost))
+        except (TypeError, ValueError, ZeroDivisionError):
+            cents, exact = 0, False
+        numbers = [
+            _int(entry.get("id", 0), _INT64),
+            _int(cents, _INT64),
+            _int(entry.get("quantity", 1), _INT64),
+            _int(entry.get("orders", 0), _INT32),
+        ]
+        codes = [self.code(field, entry.get(field, "")) for field in _ENUM_FIELDS]
+        if None in numbers or None in codes:
+            exact = False
+        names = []
+        for field in _NAME_FIELDS:
+            value = entry.get(field, "")
+            names.append(self.string(value) if type(value) is str else _NONE)
+
+        cost_text = _NONE
+        if exact and repr(cents / 100) != cost:
+            cost_text = self.string(cost)
+        raw = _NONE if exact else self.string(json.dumps(entry))
+        return _RECORD.pack(
+            *(0 if n is None else n for n in numbers),
+            *names, cost_text, raw,
+            *(_NO_CODE if c is None else c for c in codes),
+            _HYBRID if entry.get("is_hybrid") is True else 0,
+        )
+
+
+def write_archive(
+    path: str,
+    character: dict,
+    total_pool,
+    remaining,
+    entries: Iterable[dict],
+) -> int:
+    """
+    Pack a ledger (export fields + entries) into an archive at *path*.
+
+    Entries are consumed one at a time, so a streamed import never holds the
+    whole ledger.  Returns the number of entries written.
+    """
+    fields = {"character": character, "total_pool": total_pool, "remaining": remaining}
+    return _write(path, entries, fields)
+
+
+def pack_export(source: IO, path: str) -> int:
+    """Pack a JSON export (plain or gzipped file object) into an archive, streaming."""
+    fields: dict = {}
+
+    def entries():
+        for key, value in iter_export(source):
+            if key == "ledger":
+                yield from value
+            else:
+                fields[key] = value
+
+    return _write(path, entries(), fields)
+
+
+def _write(path: str, entries: Iterable[dict], fields: dict) -> int:
+    # *fields* is read only after every entry is written, so an export whose
+    # other fields follow its ledger can still be packed in one pass.
+    packer = _Packer()
+    tmp = path + ".tmp"
+    count = 0
+    try:
+        with open(tmp, "wb") as f:
+            f.write(bytes(_HEADER.size))
+            buf = bytearray()
+            for entry in entries:
+                buf += packer.record(entry)
+                count += 1
+                if len(buf) >= 1 << 20:
+                    f.write(buf)
+                    buf.clear()
+            f.write(buf)
+            strings_offset = f.tell()
+            f.write(packer.strings)
+            meta_offset = f.tell()
+            meta = {
+                "character": fields.get("character"),
+                "total_pool": fields.get("total_pool"),
+                "remaining": fields.get("remaining"),
+                "vocab": {field: list(codes) for field, codes in packer.vocab.items()},
+            }
+            f.write(json.dumps(meta).encode("utf-8"))
+            f.seek(0)
+            f.write(_HEADER.pack(
+                _MAGIC, _FORMAT_VERSION, _RECORD.size, count,
+                _HEADER.size, strings_offset, meta_offset,
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return count
+
+
+# ── Reading ────────────────────────────────────────────────────────────────────
+
+class LedgerArchive:
+    """A read-only, memory-mapped archive; entries decode in place on access."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                  # empty file
+            self._file.close()
+            raise ValueError(f"not a ledger archive: {path}") from None
+        self._view = memoryview(self._map)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if len(self._view) < _HEADER.size:
+            raise ValueError(f"not a ledger archive: {self.path}")
+        magic, version, record_size, count, records, strings, meta = _HEADER.unpack_from(self._view)
+        if magic != _MAGIC:
+            raise ValueError(f"not a ledger archive: {self.path}")
+        if version != _FORMAT_VERSION or record_size != _RECORD.size:
+            raise ValueError(f"unsupported ledger archive format {version}: {self.path}")
+        if not records + count * record_size == strings <= meta <= len(self._view):
+            raise ValueError(f"truncated ledger archive: {self.path}")
+        self._count = count
+        self._meta_offset = meta
+        self._records = self._view[records:strings]
+        self._strings = self._view[strings:meta]
+        self._columns = np.frombuffer(self._records, dtype=RECORD_DTYPE, count=count)
+        info = json.loads(bytes(self._view[meta:]))
+        self.character = info["character"]
+        self.total_pool = info["total_pool"]
+        self.remaining = info["remaining"]
+        self._vocab: dict[str, list[str]] = info["vocab"]
+        self._decoded: dict[int, str] = {}
+        self._string_offsets: dict[str, int] | None = None
+
+    def close(self):
+        """
+        Unmap the file.  Decoded entries stay valid; numpy views from cents() /
+        columns keep the mapping alive until they are collected.
+        """
+        if self._map is None:
+            return
+        self._columns = None
+        try:
+            for view in ("_records", "_strings", "_view"):
+                held = getattr(self, view, None)
+                if held is not None:
+                    held.release()
+            self._map.close()
+        except BufferError:
+            pass                          # a numpy view is still in use
+        self._file.close()
+        self._map = None
+
+    def __enter__(self) -> "LedgerArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Entries ──────────────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, offset: int) -> str:
+        text = self._decoded.get(offset)
+        if text is None:
+            (length,) = struct.unpack_from("<I", self._strings, offset)
+            text = self._decoded[offset] = str(self._strings[offset + 4:offset + 4 + length], "utf-8")
+        return text
+
+    def _entry(self, record: tuple) -> dict:
+        (entry_id, cents, quantity, orders, spell, arcana, situational,
+         cost_text, raw, tier, efficiency, mode, b_tier, b_efficiency, flags) = record
+        if raw != _NONE:
+            return json.loads(self._string(raw))
+        vocab = self._vocab
+        return {
+            "id": entry_id,
+            "spell_name": self._string(spell),
+            "arcana_name": self._string(arcana),
+            "spell_tier": vocab["spell_tier"][tier],
+            "efficiency": vocab["efficiency"][efficiency],
+            "orders": orders,
+            "quantity": quantity,
+            "quantity_mode": vocab["quantity_mode"][mode],
+            "situational": self._string(situational),
+            "is_hybrid": bool(flags & _HYBRID),
+            "hybrid_b_tier": vocab["hybrid_b_tier"][b_tier],
+            "hybrid_b_efficiency": vocab["hybrid_b_efficiency"][b_efficiency],
+            "exact_cost": repr(cents / 100) if cost_text == _NONE else self._string(cost_text),
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f"archive position {index} out of range")
+        return self._entry(_RECORD.unpack_from(self._records, index * _RECORD.size))
+
+    def scan(self, start: int = 0, stop: int | None = None) -> Iterator[dict]:
+        """Entries at positions ``start:stop``, decoded one at a time."""
+        start, stop, _ = slice(start, stop).indices(self._count)
+        if start >= stop:
+            return
+        size = _RECORD.size
+        for record in _RECORD.iter_unpack(self._records[start * size:stop * size]):
+            yield self._entry(record)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.scan()
+
+    # ── Vectorized columns ───────────────────────────────────────────────────
+    @property
+    def columns(self) -> np.ndarray:
+        """The records as a structured array over the map (read-only, zero-copy)."""
+        return self._columns
+
+    def cents(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Entry costs in integer hundredths for positions ``start:stop`` (a view)."""
+        return self._columns["cents"][start:stop]
+
+    def spent_cents(self, start: int = 0, stop: int | None = None) -> int:
+        """Total cost in hundredths of the entries at positions ``start:stop``."""
+        return int(self.cents(start, stop).sum())
+
+    def balance_at_cents(self, pool_cents: int, position: int) -> int:
+        """Remaining pool (hundredths) after the entry at *position*."""
+        return pool_cents - self.spent_cents(0, position + 1)
+
+    def positions(self, **filters) -> np.ndarray:
+        """
+        Positions of the entries matching every ``field=value`` filter.
+
+        Filterable fields: spell_name, arcana_name, situational (string table),
+        spell_tier, efficiency, quantity_mode, hybrid_b_tier, hybrid_b_efficiency
+        (vocabulary codes), id, orders, quantity, is_hybrid.
+        """
+        mask = np.ones(self._count, dtype=bool)
+        for field, value in filters.items():
+            if field in _NAME_FIELDS:
+                if self._string_offsets is None:
+                    self._string_offsets = self._index_strings()
+                offset = self._string_offsets.get(value)
+                if offset is None:
+                    return np.empty(0, dtype=np.intp)
+                mask &= self._columns[field] == offset
+            elif field in _ENUM_FIELDS:
+                try:
+                    code = self._vocab[field].index(value)
+                except ValueError:
+                    return np.empty(0, dtype=np.intp)
+                mask &= self._columns[field] == code
+            elif field in ("id", "orders", "quantity"):
+                mask &= self._columns[field] == value
+            elif field == "is_hybrid":
+                mask &= ((self._columns["flags"] & _HYBRID) != 0) == bool(value)
+            else:
+                raise ValueError(f"cannot filter archive on {field!r}")
+        return np.flatnonzero(mask)
+
+    def _index_strings(self) -> dict[str, int]:
+        offsets, offset, end = {}, 0, len(self._strings)
+        while offset < end:
+            text = self._string(offset)
+            offsets.setdefault(text, offset)
+            (length,) = struct.unpack_from("<I", self._strings, offset)
+            offset += 4 + length
+        return offsets
+
+    # ── Export ───────────────────────────────────────────────────────────────
+    def iter_json(self) -> Iterator[str]:
+        """Stream the archive back out as the JSON export (see ledger/export.py)."""
+        return iter_export_json(self.character, self.total_pool, self.remaining, iter(self))
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.storage.archive",
+        description="Convert ledger JSON exports to and from memory-mapped archives.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="JSON export (.json / .json.gz) → archive")
+    pack.add_argument("source")
+    pack.add_argument("archive")
+    unpack = commands.add_parser("unpack", help="archive → JSON export (gzipped if .gz)")
+    unpack.add_argument("archive")
+    unpack.add_argument("output")
+    info = commands.add_parser("info", help="summary of an archive")
+    info.add_argument("archive")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        with open(args.source, "rb") as f:
+            count = pack_export(f, args.archive)
+        print(f"Packed {count} entries into {args.archive}.", file=sys.stderr)
+    elif args.command == "unpack":
+        with LedgerArchive(args.archive) as archive:
+            write_export(archive.iter_json(), args.output)
+            print(f"Unpacked {len(archive)} entries into {args.output}.", file=sys.stderr)
+    else:
+        with LedgerArchive(args.archive) as archive:
+            print(json.dumps({
+                "character": (archive.character or {}).get("name"),
+                "entries": len(archive),
+                "total_pool": archive.total_pool,
+                "remaining": archive.remaining,
+                "spent": archive.spent_cents() / 100,
+            }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,508 @@
+"""
+Append-only ledger logs with periodic snapshots.
+
+An alternative to the SQLite store: each character is a directory under the
+log root holding
+
+    character.json   the character (name, highest tier, arcana) — small, rewritten on save
+    ledger.snap      the whole ledger (entries + parsed costs) as of record ``seq``
+    ledger.log       every ledger mutation since that snapshot, one record each
+
+LogLedger is an in-memory ``Ledger`` whose primitive mutations (append,
+extend, pop, truncate, insert, delete, update — including the ones undo /
+redo apply) are appended to ``ledger.log`` as they happen; a batched extend
+(a macro's casts) is one record.  Clear All and import write a new snapshot
+instead of logging every entry, and so does every ``snapshot_every``-th
+record, which also empties the log (compaction).  Opening a character loads
+the snapshot and replays the log tail, so restoring it costs one binary read
+instead of re-parsing the JSON export.
+
+Records
+───────
+Each record is a frame ``<length u32><crc32 u32><payload>``; the payload is a
+pickled tuple ``(seq, op, *args)`` of plain dicts / lists / strings / numbers
+only — unpickling refuses any class reference, so a log can never run code.
+LedgerEntry records are written as plain field tuples (``pack_entry``).
+A torn or corrupt frame at the end (a crash mid-write) is dropped on open, as
+are records the snapshot already contains.
+
+Durability
+──────────
+Records reach the OS on every write (so a process crash loses nothing) and are
+fsync'd in batches: after ``fsync_batch`` records, or by a timer
+``fsync_interval`` seconds after the first unsynced record, whichever comes
+first — and on close / snapshot / interpreter exit.  Snapshots are written to
+a temp file, fsync'd and renamed into place.
+
+Sessions
+────────
+LogLedgers are pooled per process and directory, so every session editing a
+character shares one writer; an advisory lock (where the OS has fcntl) stops a
+second process from opening the same log.  ``LogStore.open_ledger`` wraps the
+pooled ledger in a LogSession per session: reads and writes go to the shared
+ledger, but each session keeps its own undo / redo history, and each public
+mutation (undo / redo included) runs whole under the shared ledger's lock.
+"""
+import atexit
+import io
+import json
+import os
+import pickle
+import shutil
+import struct
+import threading
+import zlib
+from typing import Iterable, Iterator
+from ..config import COST_ENGINE
+from ..ledger.entry import pack_entry, unpack_entry
+from ..ledger.model import BaseLedger, Ledger
+
+try:
+    import fcntl
+except ImportError:                  # Windows: no advisory locking
+    fcntl = None
+
+_FRAME = struct.Struct("<II")        # payload length, crc32
+_PICKLE_PROTOCOL = 5
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Only builtin containers and scalars — no classes, no callables."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"log records may not reference {module}.{name}")
+
+
+def _frame(value) -> bytes:
+    payload = pickle.dumps(value, protocol=_PICKLE_PROTOCOL)
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(data: bytes) -> tuple[list, int]:
+    """Decode consecutive frames; returns (values, bytes of intact frames)."""
+    values, offset = [], 0
+    while offset + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, offset)
+        start = offset + _FRAME.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        try:
+            values.append(_PlainUnpickler(io.BytesIO(payload)).load())
+        except (pickle.UnpicklingError, EOFError, ValueError):
+            break
+        offset = start + length
+    return values, offset
+
+
+def _fsync_dir(path: str):
+    if os.name == "posix":
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class LogLedger(Ledger):
+    """An in-memory Ledger that appends every mutation to a per-character log."""
+
+    def __init__(
+        self,
+        directory: str,
+        engine: str = COST_ENGINE,
+        fsync_batch: int = 32,
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 1000,
+    ):
+        super().__init__(engine=engine)
+        self.directory = directory
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._lock = threading.RLock()
+        self._file = None
+        self._seq = 0                 # last record written (or in the snapshot)
+        self._since_snapshot = 0
+        self._unsynced = 0
+        self._timer: threading.Timer | None = None   # pending interval fsync
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @property
+    def snap_path(self) -> str:
+        return os.path.join(self.directory, "ledger.snap")
+
+    @property
+    def log_path(self) -> str:
+        return os.path.join(self.directory, "ledger.log")
+
+    # ── Restore ──────────────────────────────────────────────────────────────
+    def _load(self):
+        snap_seq = 0
+        if os.path.exists(self.snap_path):
+            with open(self.snap_path, "rb") as f:
+                frames, _ = read_frames(f.read())
+            if not frames:
+                raise ValueError(f"corrupt ledger snapshot: {self.snap_path}")
+            snap_seq, engine, entries, amounts = frames[0]
+            entries = list(map(unpack_entry, entries))
+            if engine == self.engine:
+                self._restore((entries, amounts, None))     # costs already parsed
+            else:
+                Ledger._do_replace(self, entries)
+
+        self._file = open(self.log_path, "a+b", buffering=0)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise RuntimeError(f"{self.log_path} is open in another process") from None
+        self._file.seek(0)
+        records, intact = read_frames(self._file.read())
+        if intact < self._file.tell():
+            self._file.truncate(intact)           # torn tail from a crash
+        self._seq = snap_seq
+        for record in records:
+            if record[0] > snap_seq:
+                self._replay(record[1], record[2:])
+                self._seq = record[0]
+                self._since_snapshot += 1
+        self._init_history()
+
+    def _replay(self, op: str, args: tuple):
+        if op == "append":
+            Ledger._do_append(self, unpack_entry(args[0]))
+        elif op == "extend":
+            Ledger._do_extend(self, list(map(unpack_entry, args[0])))
+        elif op == "pop":
+            Ledger._do_pop(self)
+        elif op == "truncate":
+            Ledger._do_truncate(self, *args)
+        elif op == "insert":
+            Ledger._do_insert(self, args[0], unpack_entry(args[1]))
+        elif op == "delete":
+            Ledger._do_delete(self, *args)
+        elif op == "update":
+            Ledger._do_update(self, args[0], unpack_entry(args[1]))
+        else:
+            raise ValueError(f"unknown ledger log record: {op!r}")
+
+    # ── Logging ──────────────────────────────────────────────────────────────
+    def _log(self, op: str, *args):
+        self._seq += 1
+        self._file.write(_frame((self._seq, op, *args)))
+        self._unsynced += 1
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+        elif self._unsynced >= self.fsync_batch:
+            self.sync()
+        elif self._timer is None:
+            # The end of a burst is synced within fsync_interval, even if no
+            # further record is ever written.
+            self._timer = threading.Timer(self.fsync_interval, self.sync)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def sync(self):
+        """fsync any records written since the last sync."""
+        with self._lock:
+            if self._unsynced and self._file is not None:
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._cancel_timer()
+
+    def snapshot(self):
+        """Write the whole ledger as a snapshot and empty the log (compaction)."""
+        with self._lock:
+            tmp = self.snap_path + ".tmp"
+            with open(tmp, "wb") as f:
+                entries = list(map(pack_entry, self._entries))
+                f.write(_frame((self._seq, self.engine, entries, self._amounts)))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snap_path)
+            _fsync_dir(self.directory)
+            # A crash before the truncate only leaves records the snapshot
+            # already holds; they are skipped by sequence number on replay.
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._since_snapshot = 0
+            self._unsynced = 0
+            self._cancel_timer()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.sync()
+                self._file.close()
+                self._file = None
+
+    # ── Primitive mutations, logged ──────────────────────────────────────────
+    def _do_append(self, entry: dict):
+        with self._lock:
+            super()._do_append(entry)
+            self._log("append", pack_entry(self._entries[-1]))
+
+    def _do_extend(self, entries: list[dict]):
+        with self._lock:
+            start = len(self._entries)
+            super()._do_extend(entries)
+            self._log("extend", list(map(pack_entry, self._entries[start:])))
+
+    def _do_pop(self) -> dict:
+        with self._lock:
+            entry = super()._do_pop()
+            self._log("pop")
+            return entry
+
+    def _do_truncate(self, count: int) -> list[dict]:
+        with self._lock:
+            removed = super()._do_truncate(count)
+            self._log("truncate", count)
+            return removed
+
+    def _do_insert(self, position: int, entry: dict):
+        with self._lock:
+            super()._do_insert(position, entry)
+            self._log("insert", position, pack_entry(self._entries[position]))
+
+    def _do_delete(self, position: int) -> dict:
+        with self._lock:
+            entry = super()._do_delete(position)
+            self._log("delete", position)
+            return entry
+
+    def _do_update(self, position: int, entry: dict) -> dict:
+        with self._lock:
+            old = super()._do_update(position, entry)
+            self._log("update", position, pack_entry(self._entries[position]))
+            return old
+
+    def _restore(self, state: tuple):
+        # Clear All, import and their undo / redo: snapshot rather than log
+        # every entry.
+        with self._lock:
+            super()._restore(state)
+            if self._file is not None:
+                self._seq += 1
+                self.snapshot()
+
+
+class LogSession(BaseLedger):
+    """
+    One session's handle on a pooled LogLedger (see "Sessions" above).
+
+    Entries, versions and derived views are the shared ledger's; only the
+    undo / redo history is per session, so one session's undo never reverts
+    another's cast — a session whose ledger changed behind its back drops its
+    history instead (``BaseLedger._in_sync``).
+    """
+
+    def __init__(self, ledger: LogLedger):
+        self.ledger = ledger
+        self.engine = ledger.engine
+        self._memo: dict[str, tuple] = {}
+        self._init_history()
+
+    @property
+    def version(self) -> int:
+        return self.ledger.version
+
+    @property
+    def entries(self) -> list[dict]:
+        return self.ledger.entries
+
+    def __len__(self) -> int:
+        return len(self.ledger)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.ledger)
+
+    def __getitem__(self, index):
+        return self.ledger[index]
+
+    def __getattr__(self, name):
+        # Derived views (remaining, query, distinct, next_id, …) are the
+        # shared ledger's, read under its lock.
+        if name == "ledger":
+            raise AttributeError(name)
+        attr = getattr(self.ledger, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self.ledger._lock:
+                return attr(*args, **kwargs)
+        return locked
+
+    # ── Public mutations, each whole under the shared lock ───────────────────
+    def append(self, entry: dict):
+        with self.ledger._lock:
+            super().append(entry)
+
+    def extend(self, entries: Iterable[dict]):
+        with self.ledger._lock:
+            super().extend(entries)
+
+    def pop(self) -> dict:
+        with self.ledger._lock:
+            return super().pop()
+
+    def insert(self, position: int, entry: dict):
+        with self.ledger._lock:
+            super().insert(position, entry)
+
+    def delete(self, position: int) -> dict:
+        with self.ledger._lock:
+            return super().delete(position)
+
+    def update(self, position: int, entry: dict) -> dict:
+        with self.ledger._lock:
+            return super().update(position, entry)
+
+    def replace(self, entries: Iterable[dict]):
+        with self.ledger._lock:
+            super().replace(entries)
+
+    def undo(self) -> bool:
+        with self.ledger._lock:
+            return super().undo()
+
+    def redo(self) -> bool:
+        with self.ledger._lock:
+            return super().redo()
+
+    # ── Primitive mutations, on the shared ledger ────────────────────────────
+    def _do_append(self, entry: dict):
+        self.ledger._do_append(entry)
+
+    def _do_extend(self, entries: list[dict]):
+        self.ledger._do_extend(entries)
+
+    def _do_pop(self) -> dict:
+        return self.ledger._do_pop()
+
+    def _do_truncate(self, count: int) -> list[dict]:
+        return self.ledger._do_truncate(count)
+
+    def _do_insert(self, position: int, entry: dict):
+        self.ledger._do_insert(position, entry)
+
+    def _do_delete(self, position: int) -> dict:
+        return self.ledger._do_delete(position)
+
+    def _do_update(self, position: int, entry: dict) -> dict:
+        return self.ledger._do_update(position, entry)
+
+    def _do_replace(self, entries: Iterable[dict]):
+        self.ledger._do_replace(entries)
+
+    def _snapshot(self) -> tuple:
+        return self.ledger._snapshot()
+
+    def _restore(self, state: tuple):
+        self.ledger._restore(state)
+
+
+# ── Store ──────────────────────────────────────────────────────────────────────
+
+# (pid, absolute character directory) → LogLedger shared by every session.
+_LEDGERS: dict[tuple[int, str], LogLedger] = {}
+_LEDGERS_LOCK = threading.Lock()
+
+
+@atexit.register
+def _close_all():
+    for ledger in list(_LEDGERS.values()):
+        ledger.close()
+
+
+class LogStore:
+    """Characters as directories of character.json + ledger snapshot / log."""
+
+    def __init__(self, root: str, **ledger_options):
+        self.root = root
+        self.ledger_options = ledger_options
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, character_id: int) -> str:
+        return os.path.join(os.path.abspath(self.root), str(character_id))
+
+    def _ids(self) -> list[int]:
+        return sorted(int(name) for name in os.listdir(self.root) if name.isdigit())
+
+    def _write_character(self, character_id: int, character: dict):
+        path = os.path.join(self._dir(character_id), "character.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(character, f)
+        os.replace(tmp, path)
+
+    # ── Characters ───────────────────────────────────────────────────────────
+    def create_character(self, character: dict) -> int:
+        while True:
+            character_id = max(self._ids(), default=0) + 1
+            try:
+                os.mkdir(self._dir(character_id))
+            except FileExistsError:
+                continue                  # another session took this id
+            self._write_character(character_id, character)
+            return character_id
+
+    def save_character(self, character_id: int, character: dict):
+        self._write_character(character_id, character)
+
+    def load_character(self, character_id: int) -> dict | None:
+        try:
+            with open(os.path.join(self._dir(character_id), "character.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list_characters(self) -> list[tuple[int, str]]:
+        """(id, name) of every stored character, most recently updated first."""
+        found = []
+        for character_id in self._ids():
+            directory = self._dir(character_id)
+            character = self.load_character(character_id)
+            if character is None:
+                continue
+            updated = max(
+                os.path.getmtime(os.path.join(directory, name))
+                for name in os.listdir(directory)
+            )
+            found.append((updated, character_id, character.get("name", "")))
+        found.sort(key=lambda row: row[0], reverse=True)
+        return [(character_id, name) for _, character_id, name in found]
+
+    def delete_character(self, character_id: int):
+        directory = self._dir(character_id)
+        with _LEDGERS_LOCK:
+            ledger = _LEDGERS.pop((os.getpid(), directory), None)
+        if ledger is not None:
+            ledger.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # ── Ledgers ──────────────────────────────────────────────────────────────
+    def open_ledger(self, character_id: int, engine: str = COST_ENGINE) -> LogSession:
+        """A session on the character's ledger (one LogLedger shared per process)."""
+        key = (os.getpid(), self._dir(character_id))
+        with _LEDGERS_LOCK:
+            ledger = _LEDGERS.get(key)
+            if ledger is None:
+                ledger = _LEDGERS[key] = LogLedger(key[1], engine=engine, **self.ledger_options)
+        return LogSession(ledger)
+
+    def close_ledger(self, character_id: int):
+        with _LEDGERS_LOCK:
+            ledger = _LEDGERS.pop((os.getpid(), self._dir(character_id)), None)
+        if ledger is not None:
+            ledger.close()
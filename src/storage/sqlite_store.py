@@ -0,0 +1,758 @@
+"""
+SQLite persistence for characters and their cast ledgers.
+
+Layout
+──────
+    characters(id, name, data JSON, version, updated_at)
+    ledger_entries(character_id, entry_id, position, cost_cents, data JSON)
+        PRIMARY KEY (character_id, entry_id)
+        INDEX       (character_id, position)
+    ledger_snapshots(id, character_id)
+    ledger_snapshot_entries(snapshot_id, position, entry_id, cost_cents, data JSON)
+
+``version`` on the character row is bumped in the same transaction as every
+ledger mutation, so any session (or process) can tell whether its cached views
+of a ledger are stale with one indexed lookup.  ``cost_cents`` holds the
+entry's ``exact_cost`` in integer hundredths, so balances are exact SQL sums.
+
+The database runs in WAL mode, so readers never block the writer.  Each
+process keeps one pooled connection per database file (shared by its threads
+under a lock); appends are single-row transactions, and a batched extend (a
+macro's casts) is one multi-row transaction.
+
+SQLiteLedger wraps one character's ledger with the same interface as the
+in-memory ``Ledger`` but keeps no rows in memory — counts, balances and pages
+are read from the database on demand.  Mid-ledger corrections (insert /
+delete at an index) renumber the later positions in the same transaction, so
+positions stay dense and balances remain range sums over the position index.
+
+Entry ids are unique per character.  An entry whose id the ledger already
+holds — two sessions casting with the same ``next_id``, or a duplicate id in
+an import — is stored with the next free id, allocated inside the write
+transaction.
+
+Snapshots
+─────────
+Clear All and import move the replaced rows into a ledger snapshot (one
+INSERT … SELECT inside the replacing transaction) instead of reading them
+into memory, and undo / redo swap the live rows with a snapshot the same way.
+A SQLiteLedger's history only holds snapshot ids; snapshots are deleted once
+no history step refers to them, when the SQLiteLedger is garbage-collected,
+or with their character.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from ..config import COST_ENGINE
+from ..engine.calc_cents import cost_to_cents, pool_to_cents
+from ..engine.rounding import fmt_cents
+from ..engine.tiers import Tier
+from ..ledger.entry import as_dict
+from ..ledger.model import BaseLedger
+from ..ledger.query import SORT_FIELDS, display_row, normalize_filters, sorted_distinct
+
+# Indexed expressions for the ledger query filters (ledger/query.py).  Queries
+# must use exactly these expressions for SQLite to pick the indexes.
+_FIELD_EXPR: dict[str, str] = {
+    field: f"lower(json_extract(data, '$.{field}'))"
+    for field in ("spell_name", "arcana_name", "spell_tier", "efficiency")
+}
+_FIELD_EXPR["is_hybrid"] = "ifnull(json_extract(data, '$.is_hybrid'), 0)"
+
+_TIER_RANK_SQL = "CASE {} {} ELSE -1 END".format(
+    _FIELD_EXPR["spell_tier"],
+    " ".join(f"WHEN '{t.name.lower()}' THEN {int(t)}" for t in Tier),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    name        TEXT    NOT NULL,
+    data        TEXT    NOT NULL,
+    version     INTEGER NOT NULL DEFAULT 0,
+    updated_at  REAL    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ledger_entries (
+    character_id  INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE,
+    entry_id      INTEGER NOT NULL,
+    position      INTEGER NOT NULL,
+    cost_cents    INTEGER NOT NULL,
+    data          TEXT    NOT NULL,
+    PRIMARY KEY (character_id, entry_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ledger_snapshots (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    character_id  INTEGER NOT NULL REFERENCES characters(id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS ledger_snapshot_entries (
+    snapshot_id   INTEGER NOT NULL REFERENCES ledger_snapshots(id) ON DELETE CASCADE,
+    position      INTEGER NOT NULL,
+    entry_id      INTEGER NOT NULL,
+    cost_cents    INTEGER NOT NULL,
+    data          TEXT    NOT NULL,
+    PRIMARY KEY (snapshot_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ledger_entries_position_cost
+    ON ledger_entries (character_id, position, cost_cents);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS ledger_entries_{field}\n"
+    f"    ON ledger_entries (character_id, {expr}, position);\n"
+    for field, expr in _FIELD_EXPR.items()
+)
+
+# (pid, absolute path) → (connection, lock).  Keyed by pid so a forked worker
+# never reuses its parent's connection.
+_POOL: dict[tuple[int, str], tuple[sqlite3.Connection, threading.RLock]] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _pooled_connection(path: str) -> tuple[sqlite3.Connection, threading.RLock]:
+    key = (os.getpid(), os.path.abspath(path))
+    with _POOL_LOCK:
+        hit = _POOL.get(key)
+        if hit is None:
+            directory = os.path.dirname(key[1])
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(key[1], check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            # Gather planner statistics so the expression indexes get used.
+            conn.execute("PRAGMA optimize=0x10002")
+            hit = (conn, threading.RLock())
+            _POOL[key] = hit
+    return hit
+
+
+class SQLiteStore:
+    """Characters and ledger entries in one SQLite database file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn, self._lock = _pooled_connection(path)
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def _write(self):
+        """
+        One IMMEDIATE transaction; rolled back if the block raises.  A
+        constraint violation is re-raised as ValueError, which the app's
+        forms report.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except sqlite3.IntegrityError as e:
+                self._conn.execute("ROLLBACK")
+                raise ValueError(f"Ledger write rejected: {e}") from None
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, character_id: int):
+        conn.execute(
+            "UPDATE characters SET version = version + 1, updated_at = ? WHERE id = ?",
+            (time.time(), character_id),
+        )
+
+    # ── Characters ───────────────────────────────────────────────────────────
+    def create_character(self, character: dict) -> int:
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT INTO characters (name, data, updated_at) VALUES (?, ?, ?)",
+                (character.get("name", ""), json.dumps(character), time.time()),
+            )
+            return cur.lastrowid
+
+    def save_character(self, character_id: int, character: dict):
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE characters SET name = ?, data = ?, updated_at = ? WHERE id = ?",
+                (character.get("name", ""), json.dumps(character), time.time(), character_id),
+            )
+
+    def load_character(self, character_id: int) -> dict | None:
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT data FROM characters WHERE id = ?", (character_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_characters(self) -> list[tuple[int, str]]:
+        """(id, name) of every stored character, most recently updated first."""
+        with self._read() as conn:
+            return conn.execute(
+                "SELECT id, name FROM characters ORDER BY updated_at DESC"
+            ).fetchall()
+
+    def delete_character(self, character_id: int):
+        with self._write() as conn:
+            conn.execute("DELETE FROM characters WHERE id = ?", (character_id,))
+
+    # ── Ledger entries ───────────────────────────────────────────────────────
+    @staticmethod
+    def _rows(
+        conn: sqlite3.Connection,
+        character_id: int,
+        entries: Iterable[dict],
+        stored: bool = True,
+        keep_position: int | None = None,
+    ) -> Iterator[tuple[int, int, str]]:
+        """
+        (entry_id, cost_cents, data JSON) per entry, with each id already taken
+        (by a stored row when *stored*, except the one at *keep_position*, or
+        by an earlier entry) replaced by the next free id.
+
+        With *stored*, the stored ids among the entries' are looked up in one
+        query; otherwise *entries* is streamed.
+        """
+        stored_ids = set()
+        if stored:
+            entries = [as_dict(entry) for entry in entries]
+            stored_ids = {row[0] for row in conn.execute(
+                "SELECT entry_id FROM ledger_entries WHERE character_id = ? AND position IS NOT ? "
+                "AND entry_id IN (SELECT value FROM json_each(?))",
+                (character_id, keep_position, json.dumps([data["id"] for data in entries])),
+            )}
+        seen, next_free = set(), None
+        for entry in entries:
+            data = as_dict(entry)
+            entry_id = data["id"]
+            if entry_id in seen or entry_id in stored_ids:
+                if next_free is None:
+                    next_free = max(seen, default=0) + 1
+                    if stored:
+                        next_free = max(next_free, conn.execute(
+                            "SELECT COALESCE(MAX(entry_id), 0) + 1 FROM ledger_entries "
+                            "WHERE character_id = ?",
+                            (character_id,),
+                        ).fetchone()[0])
+                entry_id = next_free
+                data = {**data, "id": entry_id}
+            seen.add(entry_id)
+            if next_free is not None and entry_id >= next_free:
+                next_free = entry_id + 1
+            yield entry_id, cost_to_cents(data["exact_cost"]), json.dumps(data)
+
+    def ledger_version(self, character_id: int) -> int:
+        with self._read() as conn:
+            row = conn.execute(
+                "SELECT version FROM characters WHERE id = ?", (character_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def append_entry(self, character_id: int, entry: dict):
+        """Append one entry — a single-row transaction."""
+        with self._write() as conn:
+            (entry_id, cents, data), = self._rows(conn, character_id, [entry])
+            conn.execute(
+                "INSERT INTO ledger_entries (character_id, entry_id, position, cost_cents, data) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM ledger_entries "
+                "WHERE character_id = ?), ?, ?)",
+                (character_id, entry_id, character_id, cents, data),
+            )
+            self._bump(conn, character_id)
+
+    def append_entries(self, character_id: int, entries: list[dict]):
+        """Append several entries in one transaction (one version bump)."""
+        with self._write() as conn:
+            start = conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM ledger_entries WHERE character_id = ?",
+                (character_id,),
+            ).fetchone()[0]
+            rows = list(self._rows(conn, character_id, entries))
+            conn.executemany(
+                "INSERT INTO ledger_entries (character_id, entry_id, position, cost_cents, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (character_id, entry_id, position, cents, data)
+                    for position, (entry_id, cents, data) in enumerate(rows, start)
+                ),
+            )
+            self._bump(conn, character_id)
+
+    def pop_entry(self, character_id: int) -> dict | None:
+        """Remove and return the last entry, or None if the ledger is empty."""
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT entry_id, data FROM ledger_entries WHERE character_id = ? "
+                "ORDER BY position DESC LIMIT 1",
+                (character_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "DELETE FROM ledger_entries WHERE character_id = ? AND entry_id = ?",
+                (character_id, row[0]),
+            )
+            self._bump(conn, character_id)
+        return json.loads(row[1])
+
+    def truncate_entries(self, character_id: int, count: int) -> list[dict] | None:
+        """Remove and return the last *count* entries, or None if there are fewer."""
+        with self._write() as conn:
+            rows = conn.execute(
+                "SELECT position, data FROM ledger_entries WHERE character_id = ? "
+                "ORDER BY position DESC LIMIT ?",
+                (character_id, count),
+            ).fetchall()
+            if len(rows) < count:
+                return None
+            if rows:
+                conn.execute(
+                    "DELETE FROM ledger_entries WHERE character_id = ? AND position >= ?",
+                    (character_id, rows[-1][0]),
+                )
+            self._bump(conn, character_id)
+        return [json.loads(data) for _, data in reversed(rows)]
+
+    def _position_at(self, conn: sqlite3.Connection, character_id: int, index: int) -> int | None:
+        row = conn.execute(
+            "SELECT position FROM ledger_entries WHERE character_id = ? "
+            "ORDER BY position LIMIT 1 OFFSET ?",
+            (character_id, index),
+        ).fetchone()
+        return row[0] if row else None
+
+    def insert_entry(self, character_id: int, index: int, entry: dict):
+        """Insert *entry* before the *index*-th entry (later positions shift up by one)."""
+        with self._write() as conn:
+            position = self._position_at(conn, character_id, index)
+            if position is None:
+                position = conn.execute(
+                    "SELECT COALESCE(MAX(position), -1) + 1 FROM ledger_entries "
+                    "WHERE character_id = ?",
+                    (character_id,),
+                ).fetchone()[0]
+            else:
+                conn.execute(
+                    "UPDATE ledger_entries SET position = position + 1 "
+                    "WHERE character_id = ? AND position >= ?",
+                    (character_id, position),
+                )
+            (entry_id, cents, data), = self._rows(conn, character_id, [entry])
+            conn.execute(
+                "INSERT INTO ledger_entries (character_id, entry_id, position, cost_cents, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (character_id, entry_id, position, cents, data),
+            )
+            self._bump(conn, character_id)
+
+    def delete_entry(self, character_id: int, index: int) -> dict | None:
+        """Remove and return the *index*-th entry (later positions shift down)."""
+        with self._write() as conn:
+            position = self._position_at(conn, character_id, index)
+            if position is None:
+                return None
+            data = conn.execute(
+                "SELECT data FROM ledger_entries WHERE character_id = ? AND position = ?",
+                (character_id, position),
+            ).fetchone()[0]
+            conn.execute(
+                "DELETE FROM ledger_entries WHERE character_id = ? AND position = ?",
+                (character_id, position),
+            )
+            conn.execute(
+                "UPDATE ledger_entries SET position = position - 1 "
+                "WHERE character_id = ? AND position > ?",
+                (character_id, position),
+            )
+            self._bump(conn, character_id)
+        return json.loads(data)
+
+    def update_entry(self, character_id: int, index: int, entry: dict) -> dict | None:
+        """Replace the *index*-th entry in place; returns the old one."""
+        with self._write() as conn:
+            position = self._position_at(conn, character_id, index)
+            if position is None:
+                return None
+            data = conn.execute(
+                "SELECT data FROM ledger_entries WHERE character_id = ? AND position = ?",
+                (character_id, position),
+            ).fetchone()[0]
+            (entry_id, cents, new_data), = self._rows(
+                conn, character_id, [entry], keep_position=position,
+            )
+            conn.execute(
+                "UPDATE ledger_entries SET entry_id = ?, cost_cents = ?, data = ? "
+                "WHERE character_id = ? AND position = ?",
+                (entry_id, cents, new_data, character_id, position),
+            )
+            self._bump(conn, character_id)
+        return json.loads(data)
+
+    def clear_entries(self, character_id: int):
+        with self._write() as conn:
+            conn.execute("DELETE FROM ledger_entries WHERE character_id = ?", (character_id,))
+            self._bump(conn, character_id)
+
+    @staticmethod
+    def _stash(conn: sqlite3.Connection, character_id: int, snapshot_id: int):
+        """Move the live rows into snapshot *snapshot_id*."""
+        conn.execute(
+            "INSERT INTO ledger_snapshot_entries (snapshot_id, position, entry_id, cost_cents, data) "
+            "SELECT ?, position, entry_id, cost_cents, data FROM ledger_entries WHERE character_id = ?",
+            (snapshot_id, character_id),
+        )
+        conn.execute("DELETE FROM ledger_entries WHERE character_id = ?", (character_id,))
+
+    @staticmethod
+    def _new_snapshot(conn: sqlite3.Connection, character_id: int) -> int:
+        return conn.execute(
+            "INSERT INTO ledger_snapshots (character_id) VALUES (?)", (character_id,)
+        ).lastrowid
+
+    def replace_entries(
+        self, character_id: int, entries: Iterable[dict], snapshot: bool = False,
+    ) -> tuple[int, int] | None:
+        """
+        Replace the whole ledger in one transaction (JSON import, Clear All).
+
+        With *snapshot*, the replaced rows are moved into a new snapshot and
+        a second, empty one is reserved for the new rows; returns their ids
+        (before, after) for ``swap_snapshot``.
+        """
+        with self._write() as conn:
+            if snapshot:
+                ids = self._new_snapshot(conn, character_id), self._new_snapshot(conn, character_id)
+                self._stash(conn, character_id, ids[0])
+            else:
+                ids = None
+                conn.execute("DELETE FROM ledger_entries WHERE character_id = ?", (character_id,))
+            conn.executemany(
+                "INSERT INTO ledger_entries (character_id, entry_id, position, cost_cents, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (character_id, entry_id, position, cents, data)
+                    for position, (entry_id, cents, data)
+                    in enumerate(self._rows(conn, character_id, entries, stored=False))
+                ),
+            )
+            self._bump(conn, character_id)
+        return ids
+
+    def swap_snapshot(self, character_id: int, stash: int, restore: int):
+        """Move the live rows into snapshot *stash* and snapshot *restore*'s rows back (undo / redo)."""
+        with self._write() as conn:
+            self._stash(conn, character_id, stash)
+            conn.execute(
+                "INSERT INTO ledger_entries (character_id, entry_id, position, cost_cents, data) "
+                "SELECT ?, entry_id, position, cost_cents, data FROM ledger_snapshot_entries "
+                "WHERE snapshot_id = ?",
+                (character_id, restore),
+            )
+            conn.execute("DELETE FROM ledger_snapshot_entries WHERE snapshot_id = ?", (restore,))
+            self._bump(conn, character_id)
+
+    def drop_snapshots(self, snapshot_ids: Iterable[int]):
+        """Delete snapshots (and their rows) no history refers to any more."""
+        snapshot_ids = [(i,) for i in snapshot_ids]
+        if snapshot_ids:
+            with self._write() as conn:
+                conn.executemany("DELETE FROM ledger_snapshots WHERE id = ?", snapshot_ids)
+
+    def count_entries(self, character_id: int) -> int:
+        with self._read() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM ledger_entries WHERE character_id = ?", (character_id,)
+            ).fetchone()[0]
+
+    def max_entry_id(self, character_id: int) -> int:
+        with self._read() as conn:
+            return conn.execute(
+                "SELECT COALESCE(MAX(entry_id), 0) FROM ledger_entries WHERE character_id = ?",
+                (character_id,),
+            ).fetchone()[0]
+
+    def spent_cents(self, character_id: int, before: int | None = None) -> int:
+        """Sum of entry costs in hundredths, optionally only the first *before* entries."""
+        with self._read() as conn:
+            if before is None:
+                row = conn.execute(
+                    "SELECT COALESCE(SUM(cost_cents), 0) FROM ledger_entries "
+                    "WHERE character_id = ?",
+                    (character_id,),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT COALESCE(SUM(cost_cents), 0) FROM (SELECT cost_cents "
+                    "FROM ledger_entries WHERE character_id = ? ORDER BY position LIMIT ?)",
+                    (character_id, before),
+                ).fetchone()
+        return row[0]
+
+    def fetch_entries(self, character_id: int, offset: int, limit: int) -> list[tuple[dict, int]]:
+        """(entry, cost_cents) pairs for one page, in cast order."""
+        with self._read() as conn:
+            rows = conn.execute(
+                "SELECT data, cost_cents FROM ledger_entries WHERE character_id = ? "
+                "ORDER BY position LIMIT ? OFFSET ?",
+                (character_id, limit, offset),
+            ).fetchall()
+        return [(json.loads(data), cents) for data, cents in rows]
+
+    def query_entries(
+        self,
+        character_id: int,
+        filters: dict,
+        sort_by: str = "position",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[tuple[dict, int, int]], int]:
+        """
+        One page of (entry, cost_cents, spent_cents_through_entry) for normalized
+        *filters*, and the total match count.
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unknown ledger sort key: {sort_by!r}")
+        where, params = ["character_id = ?"], [character_id]
+        for field, value in filters.items():
+            if field == "search":
+                escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                where.append(f"{_FIELD_EXPR['spell_name']} LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+            else:
+                where.append(f"{_FIELD_EXPR[field]} = ?")
+                params.append(int(value) if field == "is_hybrid" else value)
+        where_sql = " AND ".join(where)
+        key = {
+            "position": None,
+            "cost": "cost_cents",
+            "spell_tier": _TIER_RANK_SQL,
+        }.get(sort_by, _FIELD_EXPR.get(sort_by))
+        direction = "DESC" if descending else "ASC"
+        order_sql = f"position {direction}" if key is None else f"{key} {direction}, position"
+
+        with self._read() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM ledger_entries WHERE {where_sql}", params
+            ).fetchone()[0]
+            page = conn.execute(
+                f"SELECT position, data, cost_cents FROM ledger_entries WHERE {where_sql} "
+                f"ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+            if not page:
+                return [], total
+            # Running totals at the page's positions: consecutive range sums
+            # over the covering (character_id, position, cost_cents) index.
+            spent, running, previous = {}, 0, -1
+            for position in sorted({row[0] for row in page}):
+                running += conn.execute(
+                    "SELECT COALESCE(SUM(cost_cents), 0) FROM ledger_entries "
+                    "WHERE character_id = ? AND position > ? AND position <= ?",
+                    (character_id, previous, position),
+                ).fetchone()[0]
+                spent[position] = running
+                previous = position
+        return [(json.loads(data), cents, spent[position]) for position, data, cents in page], total
+
+    def distinct_values(self, character_id: int, field: str) -> list:
+        """Distinct values of a filter field (as first written)."""
+        with self._read() as conn:
+            rows = conn.execute(
+                f"SELECT json_extract(data, '$.{field}'), MIN(position) FROM ledger_entries "
+                f"WHERE character_id = ? GROUP BY {_FIELD_EXPR[field]}",
+                (character_id,),
+            ).fetchall()
+        return sorted_distinct(field, [value for value, _ in rows])
+
+    def open_ledger(self, character_id: int, engine: str = COST_ENGINE) -> "SQLiteLedger":
+        return SQLiteLedger(self, character_id, engine)
+
+    def iter_entries(self, character_id: int, batch: int = 500) -> Iterator[dict]:
+        """Stream every entry in cast order, *batch* rows per query."""
+        offset = 0
+        while True:
+            page = self.fetch_entries(character_id, offset, batch)
+            for entry, _ in page:
+                yield entry
+            if len(page) < batch:
+                return
+            offset += batch
+
+
+class SQLiteLedger(BaseLedger):
+    """
+    One character's ledger, backed by SQLiteStore.
+
+    Same interface as ``Ledger`` for the operations the app uses; only the
+    character id and the undo history are held in memory (Clear All / import
+    steps refer to snapshots in the store).  Balances are exact (integer hundredths)
+    whichever cost engine priced the entries.
+    """
+
+    def __init__(self, store: SQLiteStore, character_id: int, engine: str = COST_ENGINE):
+        self.store = store
+        self.character_id = character_id
+        self.engine = engine
+        self._memo: dict[str, tuple] = {}
+        self._snapshots: set[int] = set()
+        weakref.finalize(self, store.drop_snapshots, self._snapshots)
+        self._init_history()
+
+    @property
+    def version(self) -> int:
+        return self.store.ledger_version(self.character_id)
+
+    def __len__(self) -> int:
+        return self.store.count_entries(self.character_id)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.store.iter_entries(self.character_id)
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += len(self)
+        page = self.store.fetch_entries(self.character_id, index, 1) if index >= 0 else []
+        if not page:
+            raise IndexError("ledger index out of range")
+        return page[0][0]
+
+    # ── Primitive mutations (recorded by BaseLedger) ─────────────────────────
+    def _do_append(self, entry: dict):
+        self.store.append_entry(self.character_id, entry)
+
+    def _do_extend(self, entries: list[dict]):
+        self.store.append_entries(self.character_id, entries)
+
+    def _do_pop(self) -> dict:
+        entry = self.store.pop_entry(self.character_id)
+        if entry is None:
+            raise IndexError("pop from empty ledger")
+        return entry
+
+    def _do_truncate(self, count: int) -> list[dict]:
+        removed = self.store.truncate_entries(self.character_id, count) if count >= 0 else None
+        if removed is None:
+            raise IndexError(f"cannot remove {count} entries")
+        return removed
+
+    def _do_insert(self, position: int, entry: dict):
+        if not 0 <= position <= len(self):
+            raise IndexError(f"ledger position {position} out of range")
+        self.store.insert_entry(self.character_id, position, entry)
+
+    def _do_delete(self, position: int) -> dict:
+        entry = self.store.delete_entry(self.character_id, position) if position >= 0 else None
+        if entry is None:
+            raise IndexError(f"ledger position {position} out of range")
+        return entry
+
+    def _do_update(self, position: int, entry: dict) -> dict:
+        old = self.store.update_entry(self.character_id, position, entry) if position >= 0 else None
+        if old is None:
+            raise IndexError(f"ledger position {position} out of range")
+        return old
+
+    def _do_replace(self, entries: Iterable[dict]):
+        self.store.replace_entries(self.character_id, entries)
+
+    # ── Clear All / import: snapshots by reference ───────────────────────────
+    def replace(self, entries: Iterable[dict]):
+        """Replace every entry at once; the replaced rows stay on disk for undo."""
+        before, after = self.store.replace_entries(self.character_id, entries, snapshot=True)
+        self._snapshots.update((before, after))
+        self._record(("replace", before, after))
+
+    def _apply(self, step: tuple, forward: bool):
+        if step[0] != "replace":
+            return super()._apply(step, forward)
+        stash, restore = (step[1], step[2]) if forward else (step[2], step[1])
+        self.store.swap_snapshot(self.character_id, stash, restore)
+
+    def _record(self, step: tuple):
+        super()._record(step)
+        self._drop_unused_snapshots()
+
+    def _in_sync(self) -> bool:
+        if super()._in_sync():
+            return True
+        self._drop_unused_snapshots()
+        return False
+
+    def _drop_unused_snapshots(self):
+        """Delete snapshots no undo / redo step refers to (cleared redo, history limit)."""
+        if not self._snapshots:
+            return
+        used = {i for step in (*self._undo, *self._redo) if step[0] == "replace" for i in step[1:]}
+        unused = self._snapshots - used
+        if unused:
+            self.store.drop_snapshots(unused)
+            self._snapshots -= unused
+
+    def next_id(self) -> int:
+        return self.store.max_entry_id(self.character_id) + 1
+
+    # ── Derived views ────────────────────────────────────────────────────────
+    def remaining(self, pool_total: float) -> float:
+        return self._cached(
+            "remaining", (self.version, pool_total),
+            lambda: (pool_to_cents(pool_total) - self.store.spent_cents(self.character_id)) / 100,
+        )
+
+    def balance_at_cents(self, pool_total: float, position: int) -> int:
+        """Exact remaining pool after the entry at *position* (an index range sum)."""
+        if not 0 <= position < len(self):
+            raise IndexError(f"ledger position {position} out of range")
+        return pool_to_cents(pool_total) - self.store.spent_cents(self.character_id, position + 1)
+
+    def balance_at(self, pool_total: float, position: int) -> float:
+        return self.balance_at_cents(pool_total, position) / 100
+
+    def page_rows(self, pool_total: float, offset: int, limit: int) -> list[dict]:
+        """One page of ledger panel rows; only that page is read from disk."""
+        def build():
+            running = pool_to_cents(pool_total) - self.store.spent_cents(self.character_id, offset)
+            rows = []
+            for entry, cents in self.store.fetch_entries(self.character_id, offset, limit):
+                running -= cents
+                rows.append(display_row(entry, fmt_cents(cents), fmt_cents(running)))
+            return rows
+        return self._cached("page_rows", (self.version, pool_total, offset, limit), build)
+
+    def distinct(self, field: str) -> list:
+        return self._cached(
+            "distinct_" + field, self.version,
+            lambda: self.store.distinct_values(self.character_id, field),
+        )
+
+    def query(
+        self,
+        pool_total: float,
+        filters: dict | None = None,
+        sort_by: str = "position",
+        descending: bool = False,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> tuple[list[dict], int]:
+        """One page of filtered/sorted panel rows and the match count (ledger/query.py)."""
+        filters = normalize_filters(filters)
+
+        def build():
+            pool_cents = pool_to_cents(pool_total)
+            page, total = self.store.query_entries(
+                self.character_id, filters, sort_by, descending, offset, limit,
+            )
+            rows = [
+                display_row(entry, fmt_cents(cents), fmt_cents(pool_cents - spent))
+                for entry, cents, spent in page
+            ]
+            return rows, total
+        key = (self.version, pool_total, tuple(sorted(filters.items())), sort_by, descending, offset, limit)
+        return self._cached("query", key, build)
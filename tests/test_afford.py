@@ -0,0 +1,72 @@
+"""Tests for ledger/afford.py — the "what can I still afford" index."""
+import random
+import pytest
+from src.engine.calc_cents import cost_to_cents
+from src.engine.tiers import Tier
+from src.ledger.afford import AffordIndex, afford_index
+from src.ledger.pricing import cast_cost
+
+
+def _price(tier, efficiency, orders, quantity, mode, engine) -> int:
+    cost = cast_cost(Tier.MASTER, tier, efficiency, orders,
+                     quantity=quantity, quantity_mode=mode, engine=engine)
+    return cost_to_cents(str(cost))
+
+
+def _brute_max(budget, tier, efficiency, orders, mode, engine) -> int:
+    quantity = 0
+    while _price(tier, efficiency, orders, quantity + 1, mode, engine) <= budget:
+        quantity += 1
+    return quantity
+
+
+class TestIndex:
+    def test_sorted_over_every_combination(self):
+        index = AffordIndex(Tier.EXPERT)
+        assert index.costs == sorted(index.costs)
+        assert len(index.costs) == 4 * 5 * 7
+        assert all(tier <= Tier.EXPERT for tier, _, _ in index.combos)
+        for cents, (tier, efficiency, orders) in zip(index.costs, index.combos):
+            assert cents == _price(tier, efficiency, orders, 1, "bundled", "float")
+
+    def test_bisect_cut(self):
+        index = AffordIndex(Tier.MASTER)
+        assert index.count(0) == 0
+        assert index.count(index.costs[-1]) == len(index.costs)
+        budget = index.costs[40]
+        rows = index.affordable(budget)
+        assert len(rows) == index.count(budget) and min(r["cost_cents"] for r in rows) == index.costs[0]
+        assert all(r["cost_cents"] <= budget for r in rows)
+        assert [r["cost_cents"] for r in rows] == sorted((r["cost_cents"] for r in rows), reverse=True)
+
+    def test_tier_filter(self):
+        rows = AffordIndex(Tier.MASTER).affordable(10 ** 6, Tier.JOURNEYMAN)
+        assert len(rows) == 35 and {r["spell_tier"] for r in rows} == {"Journeyman"}
+
+    def test_shared_per_tier_and_engine(self):
+        assert afford_index(Tier.MASTER) is afford_index(Tier.MASTER)
+        assert afford_index(Tier.MASTER) is not afford_index(Tier.EXPERT)
+        assert afford_index(Tier.MASTER, "cents") is not afford_index(Tier.MASTER, "float")
+
+
+class TestQuantities:
+    @pytest.mark.parametrize("engine", ["float", "cents"])
+    def test_matches_pricing_every_cast(self, engine):
+        index = AffordIndex(Tier.MASTER, engine)
+        rng = random.Random(engine)
+        for budget in [rng.randint(0, 6000) for _ in range(8)] + [2805, 100]:
+            for row in index.affordable(budget):
+                args = (Tier[row["spell_tier"].upper()], row["efficiency"], row["orders"])
+                assert row["max_bundled"] == _brute_max(budget, *args, "bundled", engine)
+                assert row["max_per_cast"] == _brute_max(budget, *args, "per_cast", engine)
+
+    def test_bundled_never_fewer_than_per_cast(self):
+        for row in AffordIndex(Tier.MASTER).affordable(17195):
+            assert row["max_bundled"] >= row["max_per_cast"] >= 1
+
+    def test_max_quantity(self):
+        index = AffordIndex(Tier.MASTER)
+        assert index.max_quantity(9999, Tier.MASTER, "Standard", 0, "bundled") == 0
+        assert index.max_quantity(10000, Tier.MASTER, "Standard", 0, "per_cast") == 1
+        assert index.max_quantity(10 ** 5, Tier.NOVICE, "Optimal", 6, "bundled") == \
+            _brute_max(10 ** 5, Tier.NOVICE, "Optimal", 6, "bundled", "float")
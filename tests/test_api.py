@@ -0,0 +1,236 @@
+"""Tests for api.py — HTTP JSON API over the engine."""
+import asyncio
+import json
+import threading
+import pytest
+import src.api as api
+from src.api import EngineServer, MAX_BATCH, handle_request
+from src.engine.calc_cast import compute_cast_cost_with_quantity
+from src.engine.calc_hybrid import compute_hybrid_cost
+from src.engine.ruleset import WIKI_RULES
+from src.engine.tiers import Tier
+
+
+def _post(path: str, payload, engine: str = "float") -> tuple[int, dict]:
+    return handle_request("POST", path, json.dumps(payload).encode(), engine)
+
+
+class TestHandleRequest:
+    def test_health(self):
+        assert handle_request("GET", "/health", b"") == (200, {"ok": True})
+
+    def test_metrics_page(self):
+        status, text = handle_request("GET", "/metrics", b"")
+        assert status == 200
+        assert text.endswith("# EOF\n")
+
+    def test_pool(self):
+        status, body = _post("/pool", {"arcana": [
+            {"name": "Exodus", "tier": "Master"},
+            {"name": "Fathom", "tier": "Master"},
+            {"name": "Syphon", "tier": "Journeyman"},
+        ]})
+        assert status == 200
+        assert body == {"total_pool": 211.0, "breakdown": {"Exodus": 100.0, "Fathom": 100.0, "Syphon": 11.0}}
+
+    def test_cast_matches_engine(self):
+        status, body = _post("/cast", {
+            "spell_tier": "Expert", "efficiency": "Efficient", "orders": 3,
+            "quantity": 4, "quantity_mode": "per_cast", "situational_modifier": "1/4",
+        })
+        assert status == 200
+        assert body["cost"] == compute_cast_cost_with_quantity(
+            Tier.MASTER, Tier.EXPERT, "Efficient", 3, 4, "per_cast", 0.25,
+        )
+
+    def test_cast_defaults(self):
+        assert _post("/cast", {"spell_tier": "Master"}) == (200, {"cost": 100.0})
+
+    def test_hybrid_matches_engine(self):
+        a = {"tier": "Master", "efficiency": "Standard"}
+        b = {"tier": "Expert", "efficiency": "Optimal"}
+        status, body = _post("/hybrid", {"spell_a": a, "spell_b": b, "orders": 2})
+        assert status == 200
+        assert body["cost"] == compute_hybrid_cost(
+            Tier.MASTER,
+            {"tier": Tier.MASTER, "efficiency": "Standard"},
+            {"tier": Tier.EXPERT, "efficiency": "Optimal"},
+            orders=2,
+        )
+
+    def test_batch_mixes_casts_and_hybrids(self):
+        casts = [
+            {"spell_tier": "Expert", "orders": 3},
+            {"spell_a": {"tier": "Master"}, "spell_b": {"tier": "Expert"}},
+            {"spell_tier": "Novice", "efficiency": "Efficient"},
+        ]
+        status, body = _post("/batch", {"casts": casts})
+        assert status == 200
+        assert body["costs"] == [
+            _post("/cast", casts[0])[1]["cost"],
+            _post("/hybrid", casts[1])[1]["cost"],
+            _post("/cast", casts[2])[1]["cost"],
+        ]
+
+    def test_cents_engine(self):
+        assert _post("/cast", {"spell_tier": "Expert", "orders": 3}, engine="cents") == (200, {"cost": 28.05})
+
+    def test_ruleset_per_request(self):
+        house = {"tier_values": {"Master": 120}}
+        assert _post("/cast", {"spell_tier": "Master", "ruleset": "spreadsheet"}) == (200, {"cost": 100.0})
+        assert _post("/cast", {"spell_tier": "Master", "ruleset": "homebrew"})[0] == 400
+        assert _post("/cast", {"spell_tier": "Master", "ruleset": house})[0] == 400
+        status, body = _post("/pool", {
+            "arcana": [{"name": "Zephyr", "tier": "Master"}],
+            "ruleset": {**WIKI_RULES.to_dict(), "tier_values": {**WIKI_RULES.tier_values, "Master": 120}},
+        })
+        assert (status, body["total_pool"]) == (200, 120.0)
+        assert _post("/cast", {"spell_tier": "Master"}) == (200, {"cost": 100.0})
+
+    def test_batch_limit(self):
+        status, _ = _post("/batch", {"casts": [{"spell_tier": "Master"}] * (MAX_BATCH + 1)})
+        assert status == 413
+
+    def test_batch_error_names_index(self):
+        status, body = _post("/batch", {"casts": [{"spell_tier": "Master"}, {"spell_tier": "Grand"}]})
+        assert status == 400
+        assert body["error"].startswith("casts[1]")
+
+    @pytest.mark.parametrize("method,path,body,status", [
+        ("POST", "/nope", b"{}", 404),
+        ("GET", "/cast", b"", 405),
+        ("POST", "/health", b"", 405),
+        ("POST", "/metrics", b"", 405),
+        ("POST", "/cast", b"{not json", 400),
+        ("POST", "/cast", b"[1, 2]", 400),
+        ("POST", "/cast", b'{"efficiency": "Standard"}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "efficiency": "Lazy"}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "situational_modifier": true}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "orders": 1e400}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "situational_modifier": 1e400}', 400),
+        ("POST", "/batch", b'{"casts": [{"spell_tier": "Master", "quantity": 1e400}]}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "quantity": -3}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "quantity": 0}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "orders": -2}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "orders": 7}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "quantity_mode": "each"}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "situational_insertion": "first"}', 400),
+        ("POST", "/cast", b'{"spell_tier": "Master", "situational_modifier": "1/0"}', 400),
+        ("POST", "/hybrid", b'{"spell_a": {"tier": "Expert"}, "spell_b": {"tier": "Expert"}, "orders": -1}', 400),
+    ])
+    def test_errors(self, method, path, body, status):
+        code, payload = handle_request(method, path, body)
+        assert code == status
+        assert "error" in payload
+
+
+async def _exchange(writer, reader, method, path, payload=None, headers=""):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\n{headers}\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    response_headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        response_headers[name.lower()] = value.strip()
+    data = await reader.readexactly(int(response_headers["content-length"]))
+    return int(status_line.split()[1]), response_headers, json.loads(data)
+
+
+class TestEngineServer:
+    def test_keep_alive_round_trips(self):
+        async def run():
+            server = await EngineServer(engine="float").start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            first = await _exchange(writer, reader, "POST", "/cast", {"spell_tier": "Expert", "orders": 3})
+            second = await _exchange(writer, reader, "GET", "/health")
+            last = await _exchange(writer, reader, "POST", "/pool", {"arcana": []},
+                                   headers="Connection: close\r\n")
+            closed = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return first, second, last, closed
+
+        first, second, last, closed = asyncio.run(run())
+        assert first[0] == 200 and first[2] == {"cost": 28.05}
+        assert first[1]["connection"] == "keep-alive"
+        assert second[2] == {"ok": True}
+        assert last[1]["connection"] == "close"
+        assert closed == b""
+
+    def test_busy_server_sheds_load(self):
+        async def run():
+            engine = EngineServer(engine="float", max_concurrency=1, max_queue=0)
+            server = await engine.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            engine._admitted = 1          # one request already in flight
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            busy = await _exchange(writer, reader, "GET", "/health")
+            engine._admitted = 0
+            ok = await _exchange(writer, reader, "GET", "/health")
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return busy, ok
+
+        busy, ok = asyncio.run(run())
+        assert busy[0] == 503
+        assert busy[1]["retry-after"] == "1"
+        assert ok[0] == 200
+
+    def test_oversized_body_rejected(self):
+        async def run():
+            server = await EngineServer().start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /batch HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n")
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return status_line
+
+        assert b" 413 " in asyncio.run(run())
+
+    def test_pricing_runs_off_the_event_loop(self, monkeypatch):
+        threads = []
+
+        def record(*args):
+            threads.append(threading.current_thread())
+            return 200, {"ok": True}
+
+        monkeypatch.setattr(api, "handle_request", record)
+
+        async def run():
+            server = await EngineServer().start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            response = await _exchange(writer, reader, "GET", "/health")
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return response
+
+        assert asyncio.run(run())[0] == 200
+        assert threads and threads[0] is not threading.main_thread()
+
+    def test_slow_headers_are_dropped(self):
+        async def run():
+            server = await EngineServer(request_timeout=0.1).start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /cast HTTP/1.1\r\nHost: x\r\n")    # headers never finish
+            await writer.drain()
+            closed = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return closed
+
+        assert asyncio.run(run()) == b""
@@ -0,0 +1,22 @@
+"""Tests for app_ui.py — whole-script reruns through Streamlit's AppTest."""
+import json
+import os
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app_ui.py")
+
+
+class TestProfilerMode:
+    def test_query_param_profiles_without_memory_tracing(self, tmp_path, monkeypatch):
+        log = tmp_path / "reruns.jsonl"
+        monkeypatch.delenv("MANA_PROFILE", raising=False)
+        monkeypatch.setenv("MANA_PROFILE_FILE", str(log))
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.query_params["profile"] = "1"
+        at.run()
+        assert not at.exception
+        assert any("Rerun diagnostics" in e.label for e in at.expander)
+        (record,) = [json.loads(line) for line in log.read_text().splitlines()]
+        assert all(p["peak_bytes"] is None for p in record["phases"])
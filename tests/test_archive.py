@@ -0,0 +1,169 @@
+"""Tests for storage/archive.py — memory-mapped ledger archives."""
+import gzip
+import io
+import json
+import os
+import pytest
+from src.ledger.model import Ledger
+from src.storage import archive as archive_mod
+from src.storage.archive import LedgerArchive, pack_export, write_archive
+
+CHARACTER = {"name": "Kirin", "highest_tier": "Master", "arcana": [{"name": "Zephyr", "tier": "Master"}]}
+
+
+def _entry(entry_id: int, cost: str = "28.05", **fields) -> dict:
+    entry = {
+        "id": entry_id, "spell_name": f"Gust {entry_id % 3}", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 3,
+        "quantity": 1, "quantity_mode": "bundled", "situational": "",
+        "is_hybrid": False, "hybrid_b_tier": "", "hybrid_b_efficiency": "",
+        "exact_cost": cost,
+    }
+    entry.update(fields)
+    return entry
+
+
+ODD_ENTRIES = [
+    _entry(1, "34/100"),                                   # legacy fraction
+    _entry(2, "100"),                                      # not repr(float)
+    _entry(3, "0.30000000000000004"),
+    _entry(4, is_hybrid=True, hybrid_b_tier="Adept", hybrid_b_efficiency="Efficient"),
+    _entry(5, note="hand-edited"),                         # extra key
+    {"id": 6, "spell_name": "Old", "exact_cost": "12.5"},  # pre-schema entry
+    _entry(7, orders=2.0),
+    _entry(2 ** 70),
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "campaign.mla")
+
+
+def _export(entries: list[dict]) -> str:
+    ledger = Ledger(entries)
+    return "".join(ledger.iter_json(CHARACTER, 200.0))
+
+
+class TestRoundTrip:
+    def test_app_export_unpacks_to_the_same_bytes(self, path):
+        entries = [_entry(i, f"{i}.35") for i in range(1, 50)] + ODD_ENTRIES
+        text = _export(entries)
+        assert pack_export(io.BytesIO(text.encode()), path) == len(entries)
+        with LedgerArchive(path) as archive:
+            assert "".join(archive.iter_json()) == text
+            assert list(archive) == entries
+
+    def test_gzipped_export(self, path):
+        text = _export([_entry(i) for i in range(1, 4)])
+        pack_export(io.BytesIO(gzip.compress(text.encode())), path)
+        with LedgerArchive(path) as archive:
+            assert "".join(archive.iter_json()) == text
+
+    def test_fields_after_the_ledger(self, path):
+        text = json.dumps({"ledger": [_entry(1)], "character": CHARACTER, "total_pool": "200", "remaining": "171.95"})
+        pack_export(io.BytesIO(text.encode()), path)
+        with LedgerArchive(path) as archive:
+            assert archive.character == CHARACTER and archive.remaining == "171.95"
+            assert archive[0] == _entry(1)
+
+    def test_import_into_ledger(self, path):
+        entries = [_entry(i, f"{i}.5") for i in range(1, 20)]
+        write_archive(path, CHARACTER, "200", "0", Ledger(entries))
+        with LedgerArchive(path) as archive:
+            ledger = Ledger(archive)
+        assert list(ledger) == entries
+
+    def test_empty_ledger(self, path):
+        write_archive(path, CHARACTER, "200", "200", [])
+        with LedgerArchive(path) as archive:
+            assert len(archive) == 0 and list(archive) == [] and archive.spent_cents() == 0
+
+
+class TestAccess:
+    @pytest.fixture
+    def archive(self, path):
+        entries = [_entry(i, f"{i}.25") for i in range(1, 101)]
+        entries[10] = _entry(11, "3.25", spell_tier="Master", is_hybrid=True,
+                             hybrid_b_tier="Adept", hybrid_b_efficiency="Efficient")
+        write_archive(path, CHARACTER, "5000", "0", entries)
+        with LedgerArchive(path) as archive:
+            yield archive
+
+    def test_random_access_and_slices(self, archive):
+        assert archive[0]["id"] == 1 and archive[-1]["id"] == 100
+        assert [e["id"] for e in archive[5:8]] == [6, 7, 8]
+        assert [e["id"] for e in archive.scan(95)] == [96, 97, 98, 99, 100]
+        assert [e["id"] for e in archive[::40]] == [1, 41, 81]
+        with pytest.raises(IndexError):
+            archive[100]
+
+    def test_range_sums(self, archive):
+        cents = [round(float(e["exact_cost"]) * 100) for e in archive]
+        assert archive.cents().tolist() == cents
+        assert archive.spent_cents(10, 20) == sum(cents[10:20])
+        assert archive.balance_at_cents(500000, 49) == 500000 - sum(cents[:50])
+
+    def test_positions(self, archive):
+        assert archive.positions(spell_name="Gust 0").tolist() == [i - 1 for i in range(1, 101) if i % 3 == 0]
+        assert archive.positions(spell_tier="Master").tolist() == [10]
+        assert archive.positions(is_hybrid=True, hybrid_b_efficiency="Efficient").tolist() == [10]
+        assert archive.positions(id=42).tolist() == [41]
+        assert archive.positions(spell_name="Nope").tolist() == []
+        with pytest.raises(ValueError):
+            archive.positions(exact_cost="1.25")
+
+    def test_columns_are_read_only_views(self, archive):
+        columns = archive.columns
+        assert not columns.flags.writeable
+        assert columns.base is not None
+
+
+class TestFileChecks:
+    def test_rejects_other_files(self, tmp_path):
+        bogus = tmp_path / "x.mla"
+        bogus.write_bytes(b"{}" * 64)
+        with pytest.raises(ValueError):
+            LedgerArchive(str(bogus))
+        empty = tmp_path / "empty.mla"
+        empty.write_bytes(b"")
+        with pytest.raises(ValueError):
+            LedgerArchive(str(empty))
+
+    def test_rejects_truncated(self, path):
+        write_archive(path, CHARACTER, "200", "0", [_entry(i) for i in range(1, 10)])
+        with open(path, "r+b") as f:
+            f.truncate(200)
+        with pytest.raises(ValueError):
+            LedgerArchive(path)
+
+    def test_failed_write_leaves_nothing(self, path):
+        def entries():
+            yield _entry(1)
+            raise RuntimeError("source went away")
+
+        with pytest.raises(RuntimeError):
+            write_archive(path, CHARACTER, "200", "0", entries())
+        assert not os.path.exists(path) and not os.path.exists(path + ".tmp")
+
+    def test_close_with_live_view(self, path):
+        write_archive(path, CHARACTER, "200", "0", [_entry(1)])
+        archive = LedgerArchive(path)
+        cents = archive.cents()
+        archive.close()
+        assert cents.tolist() == [2805]
+
+
+class TestCli:
+    def test_pack_unpack_info(self, tmp_path, capsys):
+        source = tmp_path / "kirin.json"
+        text = _export([_entry(i) for i in range(1, 4)])
+        source.write_text(text)
+        packed = str(tmp_path / "kirin.mla")
+        out = str(tmp_path / "out.json.gz")
+        assert archive_mod.main(["pack", str(source), packed]) == 0
+        assert archive_mod.main(["unpack", packed, out]) == 0
+        assert gzip.decompress(open(out, "rb").read()).decode() == text
+        assert archive_mod.main(["info", packed]) == 0
+        info = json.loads(capsys.readouterr().out)
+        assert info["entries"] == 3 and info["spent"] == 84.15
@@ -0,0 +1,97 @@
+"""Tests for audit.py — bulk audit of exported ledger JSON."""
+import json
+import pytest
+from src.audit import audit_export, audit_file, find_exports, iter_audit, main
+from src.engine.ruleset import WIKI_RULES
+from src.engine.tiers import Tier
+from src.ledger.model import Ledger
+from src.ledger.pricing import price_cast
+
+KIRIN = {
+    "name": "Kirin",
+    "highest_tier": "Master",
+    "arcana": [{"name": "Draoidh", "tier": "Master"}, {"name": "Zephyr", "tier": "Master"}],
+}
+
+
+def _export() -> dict:
+    ledger = Ledger()
+    casts = [
+        ("Expert", "Standard", 3, 1, "bundled", "", False, None),
+        ("Master", "Efficient", 0, 2, "per_cast", "1/4", False, None),
+        ("Expert", "Standard", 2, 1, "bundled", "", True, {"tier": "Expert", "efficiency": "Optimal"}),
+    ]
+    for i, (tier, eff, orders, qty, mode, sit, hybrid, b) in enumerate(casts, 1):
+        cost = price_cast(Tier.MASTER, tier, eff, orders, qty, mode, sit, hybrid, b)
+        ledger.append({
+            "id": i, "spell_name": f"Spell {i}", "arcana_name": "Zephyr",
+            "spell_tier": tier, "efficiency": eff, "orders": orders,
+            "quantity": qty, "quantity_mode": mode, "situational": sit,
+            "is_hybrid": hybrid,
+            "hybrid_b_tier": b["tier"] if b else "",
+            "hybrid_b_efficiency": b["efficiency"] if b else "",
+            "exact_cost": str(cost),
+        })
+    return json.loads(ledger.export_json(KIRIN, 200.0))
+
+
+class TestAuditExport:
+    def test_clean_export_passes(self):
+        result = audit_export(_export())
+        assert result["ok"]
+        assert result["entries"] == 3
+
+    def test_flags_exact_cost(self):
+        data = _export()
+        data["ledger"][1]["exact_cost"] = "99.0"
+        fields = [m["field"] for m in audit_export(data)["mismatches"]]
+        assert fields == ["exact_cost", "remaining"]
+
+    def test_flags_total_pool(self):
+        data = _export()
+        data["total_pool"] = "211.0"
+        (mismatch,) = audit_export(data)["mismatches"]
+        assert mismatch == {"field": "total_pool", "recorded": "211.0", "expected": "200.0"}
+
+    def test_unpriceable_entry_reported(self):
+        data = _export()
+        data["ledger"][0]["efficiency"] = "Sloppy"
+        assert "error" in audit_export(data)["mismatches"][0]
+
+    def test_uses_the_characters_ruleset(self):
+        house = WIKI_RULES.replace(name="House", tier_values={**WIKI_RULES.tier_values, "Expert": 30})
+        data = _export()
+        data["character"]["ruleset"] = house.to_dict()
+        fields = [m["field"] for m in audit_export(data)["mismatches"]]
+        assert fields == ["exact_cost"] * 3         # Master Efficient is 2 × Expert
+        data["character"]["ruleset"] = "spreadsheet"
+        assert audit_export(data)["ok"]
+        data["character"]["ruleset"] = house.to_dict()
+        assert audit_export(data, ruleset=WIKI_RULES)["ok"]
+
+
+class TestAuditFiles:
+    def test_broken_file_reported(self, tmp_path):
+        path = tmp_path / "broken.json"
+        path.write_text("{not json")
+        result = audit_file(str(path))
+        assert not result["ok"] and "error" in result
+
+    def test_pool_matches_serial(self, tmp_path):
+        for i in range(6):
+            data = _export()
+            if i == 4:
+                data["remaining"] = "0"
+            (tmp_path / f"export_{i}.json").write_text(json.dumps(data))
+        paths = find_exports(str(tmp_path))
+        serial = list(iter_audit(paths, workers=1))
+        pooled = list(iter_audit(paths, workers=2))
+        assert serial == pooled
+        assert [r["ok"] for r in serial] == [True, True, True, True, False, True]
+
+    def test_cli_writes_jsonl(self, tmp_path):
+        (tmp_path / "a.json").write_text(json.dumps(_export()))
+        out = tmp_path / "audit.jsonl"
+        assert main([str(tmp_path / "a.json"), "-o", str(out), "-j", "1"]) == 0
+        (line,) = out.read_text().splitlines()
+        assert json.loads(line)["ok"]
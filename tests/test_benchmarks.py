@@ -0,0 +1,51 @@
+"""Tests for benchmarks/harness.py — timing and baseline comparison."""
+from benchmarks.harness import SLICES, Benchmark, Result, compare, load_baseline, measure, report, save_baseline
+
+
+def _result(name: str, seconds: float) -> Result:
+    return Result(name=name, min=seconds, median=seconds, stdev=0.0, number=1, repeat=1)
+
+
+class TestMeasure:
+    def test_setup_runs_once_outside_timing(self):
+        calls = []
+        bench = Benchmark("noop", lambda x: x, setup=lambda: (calls.append(1) or 5,))
+        result = measure(bench, min_time=0.01, repeat=2)
+        assert calls == [1]
+        assert result.repeat == 2 * SLICES
+        assert result.number >= 1
+        assert 0 < result.min <= result.median
+        assert result.relative > 0
+
+
+class TestCompare:
+    BASELINE = {"results": {"a": {"min": 1.0}, "b": {"min": 1.0}, "c": {"min": 1.0}}}
+
+    def test_statuses(self):
+        rows = compare(
+            [_result("a", 1.5), _result("b", 0.5), _result("c", 1.05), _result("d", 1.0)],
+            self.BASELINE, threshold=0.10,
+        )
+        assert [row["status"] for row in rows] == ["regressed", "improved", "ok", "new"]
+        assert rows[0]["ratio"] == 1.5
+
+    def test_relative_to_the_reference(self):
+        baseline = {"results": {"a": {"min": 1.0, "relative": 1.0}, "b": {"min": 1.0, "relative": 1.0}}}
+        # A machine 1.8x slower across the board: only b slowed down.
+        a, b = _result("a", 1.8), _result("b", 2.7)
+        a.relative, b.relative = 1.0, 1.5
+        rows = compare([a, b], baseline, threshold=0.20)
+        assert [row["status"] for row in rows] == ["ok", "regressed"]
+        assert rows[1]["ratio"] == 1.5
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "baselines" / "b.json")
+        save_baseline([_result("a", 0.002)], path)
+        saved = load_baseline(path)
+        assert saved["results"]["a"]["min"] == 0.002
+        assert "python" in saved["environment"]
+        assert compare([_result("a", 0.002)], saved)[0]["status"] == "ok"
+
+    def test_report_lists_every_result(self):
+        text = report([_result("a", 2e-6), _result("d", 0.5)], compare([_result("a", 2e-6)], self.BASELINE))
+        assert "a" in text and "d" in text and "regressed" not in text
@@ -1,11 +1,16 @@
 """Tests for engine/calc_cast.py — spell cost pipeline."""
+import itertools
 import math
+from fractions import Fraction
+import numpy as np
 import pytest
+from src.config import EFFICIENCY_NAMES
 from src.engine.tiers import Tier
 from src.engine.calc_cast import (
     get_spell_base_cost,
     compute_cast_cost,
     compute_cast_cost_with_quantity,
+    compute_cast_cost_batch,
 )
 from src.engine.rounding import fmt_cost
 
@@ -192,3 +197,52 @@ class TestQuantityRounding:
             Tier.MASTER, Tier.EXPERT, "Efficient", quantity=3
         )
         assert cost == 66.0
+
+
+class TestComputeCastCostBatch:
+    """Vectorised path must match the scalar function to the cent."""
+
+    def test_matches_scalar_over_grid(self):
+        rows = list(itertools.product(
+            Tier, EFFICIENCY_NAMES, range(-1, 9), (0, 1, 3, 7),
+            ("bundled", "per_cast"), (None, 0.25, Fraction(1, 3)),
+            ("after_efficiency", "after_expression"),
+        ))
+        tiers, effs, orders, qtys, modes, mods, inserts = (list(c) for c in zip(*rows))
+        got = compute_cast_cost_batch(tiers, effs, orders, qtys, modes, mods, inserts)
+        expected = [
+            compute_cast_cost_with_quantity(Tier.MASTER, t, e, o, q, qm, m, i)
+            for t, e, o, q, qm, m, i in rows
+        ]
+        assert got.tolist() == expected
+
+    def test_scalars_broadcast(self):
+        # Expert Standard + 3rd order = 28.05 per cast
+        got = compute_cast_cost_batch(Tier.EXPERT, "Standard", 3, [1, 2, 3])
+        assert got.tolist() == [
+            compute_cast_cost_with_quantity(Tier.MASTER, Tier.EXPERT, "Standard", 3, q)
+            for q in (1, 2, 3)
+        ]
+
+    def test_tier_names_and_efficiency_codes(self):
+        # Efficiency code 2 = "Efficient" (index into EFFICIENCY_NAMES)
+        got = compute_cast_cost_batch(["Expert", "Master"], [0, 2])
+        assert got.tolist() == [33.0, 66.0]
+
+    def test_structured_array_input(self):
+        records = np.array(
+            [(int(Tier.EXPERT), "Standard", 3, 2, "per_cast")],
+            dtype=[("spell_tier", "i8"), ("efficiency", "U12"), ("orders", "i8"),
+                   ("quantity", "i8"), ("quantity_mode", "U10")],
+        )
+        expected = compute_cast_cost_with_quantity(
+            Tier.MASTER, Tier.EXPERT, "Standard", 3, 2, "per_cast"
+        )
+        assert compute_cast_cost_batch(records).tolist() == [expected]
+
+    def test_unknown_efficiency_raises(self):
+        with pytest.raises(KeyError):
+            compute_cast_cost_batch([Tier.EXPERT], ["Sloppy"])
+
+    def test_empty_batch(self):
+        assert compute_cast_cost_batch([]).shape == (0,)
@@ -0,0 +1,137 @@
+"""Tests for engine/calc_cents.py — exact integer-hundredths engine."""
+import itertools
+import math
+from fractions import Fraction
+import pytest
+from src.config import EFFICIENCY_NAMES
+from src.engine.tiers import Tier
+from src.engine.rounding import fmt_cents, fmt_value
+from src.engine.calc_cents import (
+    EXACT_BASE,
+    ceil_cents,
+    compute_cast_cost_exact,
+    compute_cast_cost_cents,
+    compute_hybrid_cost_cents,
+    cost_to_cents,
+    pool_to_cents,
+    to_fraction,
+)
+
+
+class TestExactBase:
+    def test_tier_values_exact(self):
+        assert EXACT_BASE[(Tier.EXPERT, "Standard")] == 33
+        assert EXACT_BASE[(Tier.MASTER, "Strenuous")] == 165   # 5 × 33
+
+    def test_novice_costs_from_decimal(self):
+        # 0.66 means 66/100, not the binary float 0.66000000000000003…
+        assert EXACT_BASE[(Tier.NOVICE, "Efficient")] == Fraction(66, 100)
+
+    def test_float_modifier_via_repr(self):
+        assert to_fraction(0.7) == Fraction(7, 10)
+        assert to_fraction(Fraction(1, 4)) == Fraction(1, 4)
+
+
+class TestCastCents:
+    def test_standard(self):
+        assert compute_cast_cost_cents(Tier.MASTER, Tier.EXPERT) == 3300
+
+    def test_third_order(self):
+        # 33 × 0.85 = 28.05 exactly
+        assert compute_cast_cost_cents(Tier.MASTER, Tier.EXPERT, orders=3) == 2805
+
+    def test_no_float_noise_tip(self):
+        # Novice Standard, 4th order, ×3 bundled: 1 × 0.8 × 3 = 2.40 exactly.
+        # The float engine computes 2.4000000000000004 and ceils to 2.41.
+        cost = compute_cast_cost_cents(Tier.MASTER, Tier.NOVICE, "Standard", 4, quantity=3)
+        assert cost == 240
+
+    def test_bundled_vs_per_cast(self):
+        # Novice Optimal 0.33, 3rd order → 0.2805 per cast
+        bundled = compute_cast_cost_cents(Tier.MASTER, Tier.NOVICE, "Optimal", 3, 3)
+        per_cast = compute_cast_cost_cents(
+            Tier.MASTER, Tier.NOVICE, "Optimal", 3, 3, quantity_mode="per_cast"
+        )
+        assert bundled == math.ceil(Fraction(2805, 10000) * 3 * 100)   # 85
+        assert per_cast == 29 * 3                                      # 87
+
+    def test_situational_positions(self):
+        after_eff = compute_cast_cost_cents(
+            Tier.MASTER, Tier.EXPERT, "Standard", 3, situational_modifier=0.25,
+        )
+        after_expr = compute_cast_cost_cents(
+            Tier.MASTER, Tier.EXPERT, "Standard", 3, situational_modifier=0.25,
+            situational_insertion="after_expression",
+        )
+        assert after_eff == after_expr == ceil_cents(Fraction(33) * Fraction(85, 100) / 4)
+
+    def test_situational_matches_exact_path(self):
+        for t, e, o, q, qm, mod in itertools.product(
+            Tier, EFFICIENCY_NAMES, range(8), (1, 3), ("bundled", "per_cast"),
+            (0.25, 0.7, Fraction(1, 3), 2),
+        ):
+            exact = compute_cast_cost_exact(Tier.MASTER, t, e, o, mod)
+            expected = ceil_cents(exact * q) if qm == "bundled" else ceil_cents(exact) * q
+            assert compute_cast_cost_cents(Tier.MASTER, t, e, o, q, qm, mod) == expected
+
+    def test_orders_capped(self):
+        assert compute_cast_cost_cents(Tier.MASTER, Tier.EXPERT, orders=9) == \
+            compute_cast_cost_cents(Tier.MASTER, Tier.EXPERT, orders=6)
+
+    def test_table_path_matches_exact_path(self):
+        for t, e, o, q, qm in itertools.product(
+            Tier, EFFICIENCY_NAMES, range(7), (1, 2, 7), ("bundled", "per_cast")
+        ):
+            exact = compute_cast_cost_exact(Tier.MASTER, t, e, o)
+            expected = ceil_cents(exact * q) if qm == "bundled" else ceil_cents(exact) * q
+            assert compute_cast_cost_cents(Tier.MASTER, t, e, o, q, qm) == expected
+
+    def test_unknown_efficiency_raises(self):
+        with pytest.raises(KeyError):
+            compute_cast_cost_cents(Tier.MASTER, Tier.EXPERT, "Sloppy")
+
+
+class TestHybridCents:
+    def test_expert_pair(self):
+        a = {"tier": Tier.EXPERT, "efficiency": "Standard"}
+        assert compute_hybrid_cost_cents(Tier.MASTER, a, a) == 4400
+
+    def test_master_pair_ceils(self):
+        a = {"tier": Tier.MASTER, "efficiency": "Standard"}
+        assert compute_hybrid_cost_cents(Tier.MASTER, a, a) == 13334   # 133.333…
+
+    def test_with_orders(self):
+        a = {"tier": Tier.EXPERT, "efficiency": "Standard"}
+        assert compute_hybrid_cost_cents(Tier.MASTER, a, a, orders=3) == 3740
+
+    def test_table_matches_exact_arithmetic(self):
+        pairs = list(itertools.product(Tier, EFFICIENCY_NAMES))
+        for (ta, ea), (tb, eb), o, mod in itertools.product(
+            pairs[::4], pairs[::3], range(8), (None, Fraction(1, 3), 0.7),
+        ):
+            combined = (EXACT_BASE[(ta, ea)] + EXACT_BASE[(tb, eb)]) * Fraction(2, 3)
+            expected = combined * (1 - Fraction(5 * min(o, 6), 100)) * (1 if mod is None else to_fraction(mod))
+            a, b = {"tier": ta, "efficiency": ea}, {"tier": tb, "efficiency": eb}
+            assert compute_hybrid_cost_cents(Tier.MASTER, a, b, o, mod) == ceil_cents(expected)
+
+    def test_unknown_efficiency_raises(self):
+        a = {"tier": Tier.EXPERT, "efficiency": "Sloppy"}
+        with pytest.raises(KeyError):
+            compute_hybrid_cost_cents(Tier.MASTER, a, a)
+
+
+class TestConversions:
+    def test_cost_strings(self):
+        assert cost_to_cents("28.05") == 2805
+        assert cost_to_cents("100.0") == 10000
+        assert cost_to_cents("34/100") == 34
+
+    def test_float_noise_rounded_away(self):
+        assert cost_to_cents(str(0.07 * 3)) == 21
+
+    def test_pool(self):
+        assert pool_to_cents(211.0) == 21100
+
+    def test_fmt_cents_matches_fmt_value(self):
+        for cents in (0, 5, 66, 2805, 10000, 13334, -150, -200):
+            assert fmt_cents(cents) == fmt_value(cents / 100)
@@ -0,0 +1,40 @@
+"""Tests for engine/cost_table.py — compiled single-spell cost table."""
+import math
+from src.engine.tiers import Tier
+from src.engine.cost_table import COST_TABLE, compile_cost_table
+from src.config import EFFICIENCY_NAMES, ORDERS_OF_EXPRESSION, get_order_discount
+
+
+class TestCostTable:
+    """Table values must equal the step-by-step float pipeline exactly."""
+
+    def test_covers_every_tier_efficiency_order(self):
+        assert len(COST_TABLE.unrounded) == len(Tier) * len(EFFICIENCY_NAMES) * len(ORDERS_OF_EXPRESSION)
+        assert COST_TABLE.unrounded.keys() == COST_TABLE.ceiled.keys()
+
+    def test_base_values(self):
+        assert COST_TABLE.base[(Tier.EXPERT, "Standard")] == 33.0
+        assert COST_TABLE.base[(Tier.MASTER, "Efficient")] == 66.0      # 2 × 33
+        assert COST_TABLE.base[(Tier.NOVICE, "Strenuous")] == 1.66
+
+    def test_unrounded_matches_pipeline(self):
+        for (tier, efficiency, order), value in COST_TABLE.unrounded.items():
+            base = COST_TABLE.base[(tier, efficiency)]
+            expected = base - float(get_order_discount(order)) * base
+            assert value == expected
+
+    def test_ceiled_matches_ceil2(self):
+        for key, value in COST_TABLE.ceiled.items():
+            assert value == math.ceil(COST_TABLE.unrounded[key] * 100) / 100
+
+    def test_order_discount_capped(self):
+        assert COST_TABLE.order_discount(-2) == 0.0
+        assert COST_TABLE.order_discount(3) == 0.15
+        assert COST_TABLE.order_discount(9) == COST_TABLE.order_discount(6)
+
+    def test_matrix_by_tier_name(self):
+        assert COST_TABLE.matrix["Journeyman"]["Optimal"] == 4.0       # 1 × Apprentice
+        assert COST_TABLE.matrix["Novice"]["Efficient"] == 0.66
+
+    def test_compile_is_deterministic(self):
+        assert compile_cost_table().unrounded == COST_TABLE.unrounded
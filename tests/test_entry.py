@@ -0,0 +1,139 @@
+"""Tests for ledger/entry.py — compact LedgerEntry records."""
+import csv
+import io
+import json
+import pickle
+import tracemalloc
+import pytest
+from src.ledger.entry import (
+    ENTRY_FIELDS,
+    LedgerEntry,
+    as_dict,
+    compact_entry,
+    pack_entry,
+    unpack_entry,
+)
+from src.ledger.export import iter_export_csv, iter_export_json
+from src.ledger.model import Ledger
+
+
+def _entry(entry_id: int = 1, cost: str = "28.05", **fields) -> dict:
+    entry = {
+        "id": entry_id, "spell_name": "Wind Gust", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 3,
+        "quantity": 1, "quantity_mode": "bundled", "situational": "",
+        "is_hybrid": False, "hybrid_b_tier": "", "hybrid_b_efficiency": "",
+        "exact_cost": cost,
+    }
+    entry.update(fields)
+    return entry
+
+
+class TestConversion:
+    @pytest.mark.parametrize("cost", ["28.05", "0.1", "1e-05", "171.95", "0.0", "-3.5"])
+    def test_round_trip_is_exact(self, cost):
+        entry = _entry(cost=cost)
+        record = compact_entry(entry)
+        assert isinstance(record, LedgerEntry)
+        assert record.to_dict() == entry
+        assert list(record.to_dict()) == list(ENTRY_FIELDS)
+        assert json.dumps(as_dict(record)) == json.dumps(entry)
+
+    def test_cost_held_numerically(self):
+        record = compact_entry(_entry(cost=str(0.1 + 0.2)))
+        assert record.cost == 0.1 + 0.2
+        assert record["exact_cost"] == "0.30000000000000004"
+
+    @pytest.mark.parametrize("entry", [
+        _entry(cost="100"),                     # not repr(float("100"))
+        _entry(cost="34/100"),                  # legacy fraction
+        _entry(cost=" 1.5"),
+        _entry(orders=3.0),
+        _entry(is_hybrid=0),
+        _entry(note="extra key"),
+        {k: v for k, v in _entry().items() if k != "situational"},
+        dict(reversed(list(_entry().items()))),
+    ])
+    def test_lossy_entries_stay_dicts(self, entry):
+        assert compact_entry(entry) is entry
+
+    def test_records_pass_through(self):
+        record = compact_entry(_entry())
+        assert compact_entry(record) is record
+
+    def test_names_and_costs_are_shared(self):
+        a = compact_entry(json.loads(json.dumps(_entry(1))))
+        b = compact_entry(json.loads(json.dumps(_entry(2))))
+        for field in ("spell_name", "arcana_name", "spell_tier", "efficiency", "quantity_mode"):
+            assert a[field] is b[field]
+        assert a.cost is b.cost
+
+    def test_pack_and_pickle(self):
+        record = compact_entry(_entry(cost="1.25"))
+        packed = pack_entry(record)
+        assert type(packed) is tuple
+        assert unpack_entry(packed) == record
+        assert pickle.loads(pickle.dumps(record)) == record
+        plain = _entry(cost="34/100")
+        assert pack_entry(plain) is plain and unpack_entry(plain) is plain
+
+
+class TestMapping:
+    def test_reads_like_the_dict(self):
+        entry = _entry(is_hybrid=True, hybrid_b_tier="Adept", hybrid_b_efficiency="Efficient")
+        record = compact_entry(entry)
+        assert record == entry and entry == record
+        assert dict(record) == entry
+        assert record["hybrid_b_tier"] == "Adept"
+        assert record.get("orders") == 3
+        assert record.get("missing", "x") == "x"
+        assert "exact_cost" in record and "missing" not in record
+        assert len(record) == len(entry)
+        assert {**record, "orders": 4}["orders"] == 4
+        with pytest.raises(KeyError):
+            record["missing"]
+
+    def test_read_only(self):
+        record = compact_entry(_entry())
+        with pytest.raises(TypeError):
+            record["orders"] = 4
+        with pytest.raises(AttributeError):
+            record.note = "x"
+
+
+class TestLedgerStorage:
+    def test_ledger_compacts_every_mutation(self):
+        ledger = Ledger([_entry(1), _entry(2, cost="34/100")])
+        ledger.append(_entry(3))
+        ledger.insert(0, _entry(4))
+        ledger.update(1, _entry(5, cost="2.5"))
+        kinds = [type(e) for e in ledger]
+        assert kinds == [LedgerEntry, LedgerEntry, dict, LedgerEntry]
+        assert ledger.costs == [28.05, 2.5, 0.34, 28.05]
+
+    @pytest.mark.parametrize("engine", ["float", "cents"])
+    def test_exports_unchanged(self, engine):
+        entries = [_entry(i, cost=f"{i}.35") for i in range(1, 6)] + [_entry(6, cost="100")]
+        ledger = Ledger(entries, engine=engine)
+        assert json.loads("".join(ledger.iter_json({}, 100.0)))["ledger"] == entries
+        body = "".join(ledger.iter_json({}, 100.0)).split('"ledger": ')[1]
+        assert body == "".join(iter_export_json({}, "", "", entries)).split('"ledger": ')[1]
+        csv_text = "".join(ledger.iter_csv())
+        assert csv_text == "".join(iter_export_csv(entries))
+        rows = list(csv.DictReader(io.StringIO(csv_text)))
+        assert [r["exact_cost"] for r in rows] == [e["exact_cost"] for e in entries]
+
+    def test_smaller_than_dicts(self):
+        text = json.dumps([_entry(i, cost=f"{i % 50}.25") for i in range(20000)])
+
+        def traced(build):
+            tracemalloc.start()
+            try:
+                kept = build()
+                return tracemalloc.get_traced_memory()[0], kept
+            finally:
+                tracemalloc.stop()
+
+        dicts, _ = traced(lambda: json.loads(text))
+        records, _ = traced(lambda: [compact_entry(e) for e in json.loads(text)])
+        assert records * 3 < dicts
@@ -0,0 +1,101 @@
+"""Tests for ledger/export.py — streaming export and incremental import."""
+import csv
+import gzip
+import io
+import json
+import pytest
+import src.ledger.export as export_mod
+from src.ledger.export import (
+    CSV_FIELDNAMES,
+    gzip_chunks,
+    iter_export,
+    iter_export_csv,
+    iter_export_json,
+    read_export,
+    write_export,
+)
+
+CHARACTER = {"name": "Kirin", "highest_tier": "Master", "arcana": [{"name": "Zephyr", "tier": "Master"}]}
+
+
+def _entries(n: int) -> list[dict]:
+    return [
+        {"id": i, "spell_name": f"Gust\n{i}", "orders": 3, "is_hybrid": False, "exact_cost": "28.05"}
+        for i in range(1, n + 1)
+    ]
+
+
+class TestJsonExport:
+    @pytest.mark.parametrize("n", [0, 1, 5])
+    def test_identical_to_json_dumps(self, n):
+        entries = _entries(n)
+        expected = json.dumps({
+            "character": CHARACTER, "total_pool": "100.0",
+            "remaining": "71.95", "ledger": entries,
+        }, indent=2)
+        assert "".join(iter_export_json(CHARACTER, "100.0", "71.95", entries)) == expected
+
+    def test_one_chunk_per_entry(self):
+        chunks = list(iter_export_json(CHARACTER, "1", "1", _entries(4)))
+        assert len(chunks) == 4 + 2
+
+
+class TestCsvExport:
+    def test_identical_to_dictwriter(self):
+        entries = _entries(3)
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=CSV_FIELDNAMES, extrasaction="ignore")
+        writer.writeheader()
+        for row in entries:
+            writer.writerow(row)
+        assert "".join(iter_export_csv(entries)) == buf.getvalue()
+
+    def test_header_only(self):
+        assert "".join(iter_export_csv([])).startswith("id,spell_name")
+
+
+class TestGzip:
+    def test_round_trip(self):
+        text = "".join(iter_export_json(CHARACTER, "1", "1", _entries(20)))
+        data = b"".join(gzip_chunks(iter_export_json(CHARACTER, "1", "1", _entries(20))))
+        assert gzip.decompress(data).decode("utf-8") == text
+
+    def test_write_export_by_suffix(self, tmp_path):
+        path = tmp_path / "ledger.json.gz"
+        write_export(iter_export_json(CHARACTER, "1", "1", _entries(2)), str(path))
+        assert path.read_bytes()[:2] == b"\x1f\x8b"
+
+
+class TestImport:
+    def test_round_trip_plain_and_gzip(self):
+        entries = _entries(10)
+        text = "".join(iter_export_json(CHARACTER, "100.0", "0", entries))
+        for source in (
+            io.BytesIO(text.encode("utf-8")),
+            io.BytesIO(gzip.compress(text.encode("utf-8"))),
+            io.StringIO(text),
+        ):
+            data = read_export(source)
+            assert data == json.loads(text)
+
+    def test_matches_json_load_with_tiny_chunks(self, monkeypatch):
+        monkeypatch.setattr(export_mod, "_READ_CHUNK", 3)
+        doc = {"a": [1, 2.5, None], "ledger": [{"n": 123456789, "t": True}] * 5, "z": "end"}
+        assert read_export(io.StringIO(json.dumps(doc))) == doc
+
+    def test_entries_decoded_lazily(self):
+        text = json.dumps({"character": CHARACTER, "ledger": _entries(3), "remaining": "1"})
+        stream = iter_export(io.StringIO(text))
+        assert next(stream) == ("character", CHARACTER)
+        key, entries = next(stream)
+        assert key == "ledger" and next(entries)["id"] == 1
+        # Unconsumed entries are skipped when moving on.
+        assert next(stream) == ("remaining", "1")
+
+    def test_empty_ledger_present(self):
+        assert read_export(io.StringIO('{"ledger": []}')) == {"ledger": []}
+
+    def test_truncated_raises(self):
+        text = "".join(iter_export_json(CHARACTER, "1", "1", _entries(3)))
+        with pytest.raises(ValueError):
+            read_export(io.StringIO(text[:-20]))
@@ -1,6 +1,15 @@
 """Tests for engine/calc_hybrid.py — hybrid spell cost pipeline."""
+import itertools
+from fractions import Fraction
+from src.config import EFFICIENCY_NAMES
 from src.engine.tiers import Tier
-from src.engine.calc_hybrid import compute_hybrid_cost
+from src.engine.calc_cast import get_spell_base_cost
+from src.engine.calc_hybrid import (
+    compute_hybrid_cost,
+    compute_hybrid_cost_batch,
+    HYBRID_PAIR_BASE,
+    HYBRID_PAIR_ARRAY,
+)
 from src.engine.rounding import fmt_cost
 
 
@@ -102,3 +111,44 @@ class TestHybridCost:
         spell_b = {"tier": Tier.EXPERT, "efficiency": "Standard"}
         cost = compute_hybrid_cost(Tier.MASTER, spell_a, spell_b)
         assert fmt_cost(cost) == "44"
+
+
+class TestHybridPairMatrix:
+    """Precomputed (cost_A + cost_B) × 2/3 for every pair."""
+
+    def test_pair_base_matches_components(self):
+        for (ta, ea, tb, eb), value in HYBRID_PAIR_BASE.items():
+            expected = (get_spell_base_cost(ta, ea) + get_spell_base_cost(tb, eb)) * (2 / 3)
+            assert value == expected
+
+    def test_array_matches_dict(self):
+        codes = {name: i for i, name in enumerate(EFFICIENCY_NAMES)}
+        for (ta, ea, tb, eb), value in HYBRID_PAIR_BASE.items():
+            assert HYBRID_PAIR_ARRAY[ta, codes[ea], tb, codes[eb]] == value
+
+    def test_expert_standard_pair(self):
+        assert HYBRID_PAIR_BASE[(Tier.EXPERT, "Standard", Tier.EXPERT, "Standard")] == 44.0
+
+
+class TestHybridCostBatch:
+    """Vectorised hybrid pricing must match compute_hybrid_cost exactly."""
+
+    def test_matches_scalar_over_grid(self):
+        rows = list(itertools.product(
+            Tier, EFFICIENCY_NAMES, EFFICIENCY_NAMES, (0, 3, 6, 9),
+            (None, 0.25, Fraction(1, 3)), ("after_efficiency", "after_expression"),
+        ))
+        tiers, effs_a, effs_b, orders, mods, inserts = (list(c) for c in zip(*rows))
+        got = compute_hybrid_cost_batch(tiers, effs_a, tiers, effs_b, orders, mods, inserts)
+        expected = [
+            compute_hybrid_cost(
+                Tier.MASTER, {"tier": t, "efficiency": ea}, {"tier": t, "efficiency": eb},
+                orders=o, situational_modifier=m, situational_insertion=i,
+            )
+            for t, ea, eb, o, m, i in rows
+        ]
+        assert got.tolist() == expected
+
+    def test_scalar_broadcast(self):
+        got = compute_hybrid_cost_batch(Tier.EXPERT, "Standard", Tier.EXPERT, "Standard", [0, 3])
+        assert got.tolist() == [44.0, 37.4]
@@ -0,0 +1,223 @@
+"""Tests for ledger/model.py — ledger model and version-keyed caches."""
+import gzip
+import json
+import pytest
+from src.ledger.model import Ledger, parse_cost, CSV_FIELDNAMES
+
+
+def _entry(entry_id: int, cost: str, **extra) -> dict:
+    entry = {
+        "id": entry_id, "spell_name": f"Spell {entry_id}", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 0,
+        "quantity": 1, "quantity_mode": "bundled", "situational": "",
+        "is_hybrid": False, "hybrid_b_tier": "", "hybrid_b_efficiency": "",
+        "exact_cost": cost,
+    }
+    entry.update(extra)
+    return entry
+
+
+class TestParseCost:
+    def test_float_string(self):
+        assert parse_cost("28.05") == 28.05
+
+    def test_legacy_fraction(self):
+        assert parse_cost("34/100") == 0.34
+
+
+class TestLedgerVersion:
+    def test_starts_at_zero(self):
+        assert Ledger().version == 0
+
+    def test_every_mutation_bumps_version(self):
+        ledger = Ledger()
+        ledger.append(_entry(1, "33.0"))
+        ledger.append(_entry(2, "22.0"))
+        ledger.pop()
+        ledger.clear()
+        ledger.replace([_entry(1, "11.0")])
+        assert ledger.version == 5
+
+    def test_next_id(self):
+        ledger = Ledger([_entry(3, "1.0"), _entry(7, "1.0")])
+        assert ledger.next_id() == 8
+        assert Ledger().next_id() == 1
+
+
+class TestLedgerDerived:
+    def test_remaining_matches_sequential_subtraction(self):
+        costs = ["28.05", "100.0", "9.9", "0.34", "34/100"]
+        ledger = Ledger([_entry(i, c) for i, c in enumerate(costs, 1)])
+        expected = 200.0
+        for c in costs:
+            expected -= parse_cost(c)
+        assert ledger.remaining(200.0) == expected
+
+    def test_empty_remaining_is_pool(self):
+        assert Ledger().remaining(211.0) == 211.0
+
+    def test_running_rows(self):
+        ledger = Ledger([_entry(1, "28.05"), _entry(2, "100.0", is_hybrid=True)])
+        rows = ledger.running_rows(200.0)
+        assert [r["Remaining"] for r in rows] == ["171.95", "71.95"]
+        assert [r["Cost"] for r in rows] == ["28.05", "100"]
+        assert rows[1]["Hybrid"] == "✓"
+
+    def test_views_cached_until_mutation(self):
+        ledger = Ledger([_entry(1, "33.0")])
+        rows = ledger.running_rows(200.0)
+        assert ledger.running_rows(200.0) is rows
+        ledger.append(_entry(2, "11.0"))
+        assert ledger.running_rows(200.0) is not rows
+
+    def test_pool_change_invalidates(self):
+        ledger = Ledger([_entry(1, "33.0")])
+        assert ledger.remaining(200.0) == 167.0
+        assert ledger.remaining(211.0) == 178.0
+
+
+class TestLedgerCentsEngine:
+    def test_balances_are_exact_integers(self):
+        ledger = Ledger([_entry(i, "0.1") for i in range(1, 10001)], engine="cents")
+        assert ledger.balances_cents(1000.0)[-1] == 0
+        assert ledger.remaining(1000.0) == 0.0
+
+    def test_float_engine_drifts_where_cents_does_not(self):
+        entries = [_entry(i, "0.1") for i in range(1, 10001)]
+        assert Ledger(entries).remaining(1000.0) != 0.0
+        assert Ledger(entries).balances_cents(1000.0)[-1] == 0
+
+    def test_running_rows_from_cents(self):
+        ledger = Ledger([_entry(1, "28.05"), _entry(2, "100.0")], engine="cents")
+        assert [r["Remaining"] for r in ledger.running_rows(200.0)] == ["171.95", "71.95"]
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            Ledger(engine="decimal")
+
+
+class TestLedgerExport:
+    def test_json_matches_export_schema(self):
+        character = {"name": "Kirin", "highest_tier": "Master", "arcana": []}
+        entries = [_entry(1, "33.0")]
+        ledger = Ledger(entries)
+        expected = json.dumps({
+            "character": character,
+            "total_pool": "200.0",
+            "remaining": "167.0",
+            "ledger": entries,
+        }, indent=2)
+        assert ledger.export_json(character, 200.0) == expected
+
+    def test_json_tracks_character_edits(self):
+        character = {"name": "Kirin", "highest_tier": "Master", "arcana": []}
+        ledger = Ledger()
+        first = ledger.export_json(character, 0.0)
+        character["name"] = "Serapis"
+        assert ledger.export_json(character, 0.0) != first
+
+    def test_exports_are_not_cached(self):
+        character = {"name": "Kirin", "highest_tier": "Master", "arcana": []}
+        ledger = Ledger([_entry(1, "33.0"), _entry(2, "22.0")])
+        assert gzip.decompress(ledger.export_json(character, 200.0, compress=True)).decode() == \
+            ledger.export_json(character, 200.0)
+        assert gzip.decompress(ledger.export_csv(compress=True)).decode() == ledger.export_csv()
+        assert not any(name.startswith("export") for name in ledger._memo)
+
+    def test_csv_header_and_rows(self):
+        ledger = Ledger([_entry(1, "33.0"), _entry(2, "22.0")])
+        lines = ledger.export_csv().splitlines()
+        assert lines[0] == ",".join(CSV_FIELDNAMES)
+        assert len(lines) == 3
+
+    def test_pop_empty_raises(self):
+        with pytest.raises(IndexError):
+            Ledger().pop()
+
+
+class TestLedgerHistory:
+    def _ids(self, ledger: Ledger) -> list[int]:
+        return [e["id"] for e in ledger]
+
+    def test_undo_redo_append(self):
+        ledger = Ledger()
+        ledger.append(_entry(1, "33.0"))
+        ledger.append(_entry(2, "22.0"))
+        assert ledger.undo()
+        assert self._ids(ledger) == [1]
+        assert ledger.redo()
+        assert self._ids(ledger) == [1, 2]
+        assert ledger.remaining(100.0) == 45.0
+
+    def test_undo_clear_restores_the_same_entries(self):
+        entries = [_entry(i, "1.0") for i in range(1, 501)]
+        ledger = Ledger(entries)
+        before = ledger.entries
+        ledger.clear()
+        assert not ledger
+        ledger.undo()
+        assert ledger.entries == entries
+        assert ledger.entries is before                  # shared, not copied
+        ledger.redo()
+        assert len(ledger) == 0
+
+    def test_undo_import_and_corrections(self):
+        ledger = Ledger([_entry(1, "10.0"), _entry(2, "20.0")], engine="cents")
+        ledger.replace([_entry(9, "1.0")])
+        ledger.insert(0, _entry(10, "2.0"))
+        ledger.update(1, _entry(9, "5.0"))
+        ledger.delete(0)
+        assert ledger.remaining(100.0) == 95.0
+        for expected in ([10, 9], [10, 9], [9], [1, 2]):
+            ledger.undo()
+            assert self._ids(ledger) == expected
+        assert ledger.remaining(100.0) == 70.0
+        assert not ledger.undo()
+        while ledger.redo():
+            pass
+        assert self._ids(ledger) == [9]
+        assert ledger.remaining(100.0) == 95.0
+
+    def test_extend_is_one_mutation(self):
+        ledger = Ledger([_entry(1, "10.0")])
+        ledger.cost_tree()
+        index = ledger.index()
+        ledger.extend([_entry(2, "20.0"), _entry(3, "30.0")])
+        assert ledger.version == 2 and self._ids(ledger) == [1, 2, 3]
+        assert ledger.balance_at(100.0, 2) == 40.0
+        assert ledger.index() is index                      # extended in place
+        assert ledger.query(100.0, {"search": "spell"})[1] == 3
+        ledger.undo()
+        assert self._ids(ledger) == [1] and ledger.remaining(100.0) == 90.0
+        ledger.redo()
+        assert self._ids(ledger) == [1, 2, 3] and ledger.remaining(100.0) == 40.0
+        ledger.extend([])
+        assert ledger.version == 4
+
+    def test_new_mutation_discards_redo(self):
+        ledger = Ledger()
+        ledger.append(_entry(1, "1.0"))
+        ledger.undo()
+        ledger.append(_entry(2, "2.0"))
+        assert not ledger.can_redo
+        assert not ledger.redo()
+
+    def test_history_is_bounded(self):
+        ledger = Ledger()
+        ledger._init_history(limit=3)
+        for i in range(1, 6):
+            ledger.append(_entry(i, "1.0"))
+        while ledger.undo():
+            pass
+        assert self._ids(ledger) == [1, 2]
+
+    def test_initial_entries_are_not_undoable(self):
+        assert not Ledger([_entry(1, "1.0")]).can_undo
+
+    def test_undo_bumps_version(self):
+        ledger = Ledger()
+        ledger.append(_entry(1, "1.0"))
+        rows = ledger.running_rows(10.0)
+        ledger.undo()
+        assert ledger.version == 2
+        assert ledger.running_rows(10.0) == [] != rows
@@ -0,0 +1,204 @@
+"""Tests for storage/log_store.py — append-only ledger logs with snapshots."""
+import os
+import pickle
+import struct
+import time
+import zlib
+import pytest
+from src.ledger.model import Ledger
+from src.storage import log_store
+from src.storage.log_store import LogLedger, LogStore, read_frames, _frame
+
+CHARACTER = {"name": "Kirin", "highest_tier": "Master", "arcana": [{"name": "Zephyr", "tier": "Master"}]}
+
+
+def _entry(entry_id: int, cost: str = "1.0") -> dict:
+    return {
+        "id": entry_id, "spell_name": f"Gust {entry_id}", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 3,
+        "quantity": 1, "is_hybrid": False, "exact_cost": cost,
+    }
+
+
+def _ids(ledger) -> list[int]:
+    return [e["id"] for e in ledger]
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "1")
+
+
+def _reopen(ledger: LogLedger, **options) -> LogLedger:
+    ledger.close()
+    return LogLedger(ledger.directory, engine=ledger.engine, **options)
+
+
+class TestLogLedger:
+    def test_restores_every_mutation(self, directory):
+        ledger = LogLedger(directory)
+        for i in range(1, 6):
+            ledger.append(_entry(i, f"{i}.5"))
+        ledger.pop()
+        ledger.insert(0, _entry(9))
+        ledger.delete(2)
+        ledger.update(1, _entry(1, "28.05"))
+        expected = list(ledger)
+        restored = _reopen(ledger)
+        assert list(restored) == expected
+        assert restored.remaining(200.0) == ledger.remaining(200.0)
+        restored.close()
+
+    def test_undo_and_redo_are_logged(self, directory):
+        ledger = LogLedger(directory)
+        ledger.append(_entry(1))
+        ledger.append(_entry(2))
+        ledger.undo()
+        ledger.insert(0, _entry(3))
+        ledger.undo()
+        ledger.redo()
+        restored = _reopen(ledger)
+        assert _ids(restored) == [3, 1]
+        assert not restored.can_undo          # history is per process, not persisted
+        restored.close()
+
+    def test_extend_is_one_record(self, directory):
+        ledger = LogLedger(directory)
+        ledger.extend([_entry(i) for i in range(1, 4)])
+        assert ledger._seq == 1
+        ledger.append(_entry(4))
+        ledger.undo()
+        ledger.undo()
+        ledger.redo()
+        restored = _reopen(ledger)
+        assert _ids(restored) == [1, 2, 3]
+        restored.close()
+
+    def test_clear_and_import_write_a_snapshot(self, directory):
+        ledger = LogLedger(directory)
+        ledger.append(_entry(1))
+        ledger.replace([_entry(i) for i in range(10, 20)])
+        assert os.path.getsize(ledger.log_path) == 0
+        ledger.clear()
+        ledger.undo()
+        restored = _reopen(ledger)
+        assert _ids(restored) == list(range(10, 20))
+        restored.close()
+
+    def test_interval_sync_without_further_writes(self, directory):
+        ledger = LogLedger(directory, fsync_interval=0.05)
+        ledger.append(_entry(1))
+        assert ledger._unsynced == 1
+        deadline = time.monotonic() + 5
+        while ledger._unsynced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ledger._unsynced == 0 and ledger._timer is None
+        ledger.close()
+
+    def test_compaction(self, directory):
+        ledger = LogLedger(directory, snapshot_every=10)
+        for i in range(1, 26):
+            ledger.append(_entry(i))
+        with open(ledger.log_path, "rb") as f:
+            records, _ = read_frames(f.read())
+        assert len(records) == 5
+        restored = _reopen(ledger, snapshot_every=10)
+        assert _ids(restored) == list(range(1, 26))
+        restored.close()
+
+    def test_records_already_in_snapshot_are_skipped(self, directory):
+        ledger = LogLedger(directory)
+        ledger.append(_entry(1))
+        ledger.append(_entry(2))
+        ledger.sync()
+        with open(ledger.log_path, "rb") as f:
+            log = f.read()
+        ledger.snapshot()
+        ledger.close()
+        # Crash between writing the snapshot and truncating the log.
+        with open(os.path.join(directory, "ledger.log"), "wb") as f:
+            f.write(log)
+        restored = LogLedger(directory)
+        assert _ids(restored) == [1, 2]
+        restored.close()
+
+    def test_torn_tail_is_dropped(self, directory):
+        ledger = LogLedger(directory)
+        ledger.append(_entry(1))
+        ledger.append(_entry(2))
+        ledger.close()
+        with open(os.path.join(directory, "ledger.log"), "r+b") as f:
+            f.truncate(os.path.getsize(f.name) - 3)
+        restored = LogLedger(directory)
+        assert _ids(restored) == [1]
+        restored.append(_entry(3))
+        reopened = _reopen(restored)
+        assert _ids(reopened) == [1, 3]
+        reopened.close()
+
+    def test_snapshot_in_other_engine(self, directory):
+        ledger = LogLedger(directory, engine="cents")
+        ledger.replace([_entry(1, "1/3"), _entry(2, "28.05")])
+        ledger.close()
+        restored = LogLedger(directory, engine="float")
+        assert restored.costs == Ledger([_entry(1, "1/3"), _entry(2, "28.05")]).costs
+        restored.close()
+
+    def test_second_writer_refused(self, directory):
+        ledger = LogLedger(directory)
+        if log_store.fcntl is not None:
+            with pytest.raises(RuntimeError):
+                LogLedger(directory)
+        ledger.close()
+
+    def test_records_cannot_reference_classes(self):
+        payload = pickle.dumps((2, "append", os.system))
+        framed = struct.pack("<II", len(payload), zlib.crc32(payload)) + payload
+        assert read_frames(_frame((1, "pop")) + framed) == ([(1, "pop")], len(_frame((1, "pop"))))
+
+
+class TestLogStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        yield LogStore(str(tmp_path / "logs"))
+        log_store._close_all()
+        log_store._LEDGERS.clear()
+
+    def test_character_round_trip(self, store):
+        cid = store.create_character(CHARACTER)
+        assert store.load_character(cid) == CHARACTER
+        store.save_character(cid, {**CHARACTER, "name": "Serapis"})
+        assert store.list_characters() == [(cid, "Serapis")]
+        assert store.load_character(999) is None
+
+    def test_ids_are_sequential(self, store):
+        assert [store.create_character(CHARACTER) for _ in range(3)] == [1, 2, 3]
+
+    def test_ledger_pooled_per_character(self, store):
+        cid = store.create_character(CHARACTER)
+        assert store.open_ledger(cid).ledger is store.open_ledger(cid).ledger
+
+    def test_sessions_keep_their_own_history(self, store):
+        cid = store.create_character(CHARACTER)
+        a, b = store.open_ledger(cid), store.open_ledger(cid)
+        a.append(_entry(1))
+        assert len(b) == 1 and not b.can_undo
+        assert not b.undo()
+        assert len(a) == 1
+        b.append(_entry(2))
+        assert not a.undo()                 # changed behind its back: history dropped
+        assert b.undo() and len(a) == 1 and b.redo() and len(a) == 2
+        assert a.remaining(200.0) == b.remaining(200.0) == 198.0
+
+    def test_ledger_survives_restart(self, store):
+        cid = store.create_character(CHARACTER)
+        store.open_ledger(cid).append(_entry(1, "28.05"))
+        store.close_ledger(cid)
+        assert store.open_ledger(cid).remaining(200.0) == 171.95
+
+    def test_delete_character(self, store):
+        cid = store.create_character(CHARACTER)
+        store.open_ledger(cid).append(_entry(1))
+        store.delete_character(cid)
+        assert store.list_characters() == []
+        assert len(store.open_ledger(store.create_character(CHARACTER))) == 0
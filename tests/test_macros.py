@@ -0,0 +1,127 @@
+"""Tests for ledger/macros.py — precompiled macros and batched casting."""
+import json
+import pytest
+from src.config import DEFAULT_MACROS
+from src.engine.ruleset import WIKI_RULES, use_ruleset
+from src.engine.tiers import Tier
+from src.ledger.entry import ENTRY_FIELDS, LedgerEntry
+from src.ledger.macros import (
+    cast_macro,
+    compile_macro,
+    delete_macro,
+    dump_macros,
+    expand_macro,
+    load_macros,
+    macro_library,
+    save_macro,
+    validate_macro,
+)
+from src.ledger.model import Ledger
+from src.ledger.pricing import price_cast
+
+APPARATING = DEFAULT_MACROS[0]
+
+RITUAL = {
+    "name": "Warding Ritual",
+    "description": "Seal the grove, then ward it.",
+    "spells": [
+        {"spell_name": "Seal", "arcana_name": "Draoidh", "tier": "Expert",
+         "efficiency": "Optimal", "orders": 3, "quantity": 2, "quantity_mode": "per_cast",
+         "situational": "1/4"},
+        {"spell_name": "Ward", "tier": "Master", "is_hybrid": True,
+         "hybrid_b_tier": "Master", "hybrid_b_efficiency": "Efficient"},
+    ],
+}
+
+
+class TestCompile:
+    def test_apparating(self):
+        plan = compile_macro(Tier.MASTER, APPARATING)
+        assert [e["spell_name"] for e in plan["entries"]] == ["Frequency Up", "Frequency Down"]
+        assert plan["cost_cents"] == 2200
+
+    def test_prices_match_the_cast_form(self):
+        plan = compile_macro(Tier.MASTER, RITUAL, engine="cents")
+        seal, ward = plan["entries"]
+        assert seal["exact_cost"] == str(price_cast(
+            Tier.MASTER, "Expert", "Optimal", 3, 2, "per_cast", "1/4", False, engine="cents",
+        ))
+        assert ward["exact_cost"] == str(price_cast(
+            Tier.MASTER, "Master", "Standard", 0, 1, "bundled", "", True,
+            {"tier": "Master", "efficiency": "Efficient"}, engine="cents",
+        ))
+        assert ward["hybrid_b_efficiency"] == "Efficient" and seal["hybrid_b_tier"] == ""
+
+    def test_compiled_once(self):
+        plan = compile_macro(Tier.MASTER, RITUAL)
+        assert compile_macro(Tier.MASTER, json.loads(json.dumps(RITUAL))) is plan
+        assert compile_macro(Tier.MASTER, RITUAL, engine="cents") is not plan
+
+    def test_tier_above_character(self):
+        with pytest.raises(ValueError):
+            compile_macro(Tier.EXPERT, RITUAL)
+
+    @pytest.mark.parametrize("macro", [
+        {"name": "", "spells": [{"spell_name": "A", "tier": "Novice"}]},
+        {"name": "Empty", "spells": []},
+        {"name": "X", "spells": [{"spell_name": "", "tier": "Novice"}]},
+        {"name": "X", "spells": [{"spell_name": "A", "tier": "Legendary"}]},
+        {"name": "X", "spells": [{"spell_name": "A", "tier": "Novice", "orders": 7}]},
+        {"name": "X", "spells": [{"spell_name": "A", "tier": "Novice", "quantity": 0}]},
+        {"name": "X", "spells": [{"spell_name": "A", "tier": "Novice", "quantity_mode": "each"}]},
+        {"name": "X", "spells": [{"spell_name": "A", "tier": "Novice", "is_hybrid": True}]},
+        {"name": "X", "spells": ["A"]},
+    ])
+    def test_rejects_malformed(self, macro):
+        with pytest.raises(ValueError):
+            validate_macro(macro)
+
+    def test_orders_follow_the_active_ruleset(self):
+        macro = {"name": "Deep", "spells": [{"spell_name": "A", "tier": "Novice", "orders": 8}]}
+        orders = {order: f"{order}/20" for order in range(9)}
+        with use_ruleset(WIKI_RULES.replace(orders_of_expression=orders)):
+            assert validate_macro(macro)["spells"][0]["orders"] == 8
+        with pytest.raises(ValueError):
+            validate_macro(macro)
+
+
+class TestCast:
+    def test_entries_follow_the_export_schema(self):
+        entries = expand_macro(compile_macro(Tier.MASTER, RITUAL), 7, "Zephyr")
+        assert [e["id"] for e in entries] == [7, 8]
+        assert [e["arcana_name"] for e in entries] == ["Draoidh", "Zephyr"]
+        assert all(tuple(e) == ENTRY_FIELDS for e in entries)
+
+    def test_one_batched_mutation(self):
+        ledger = Ledger([{"id": 1, "spell_name": "Gust", "exact_cost": "5.0"}])
+        plan = compile_macro(Tier.MASTER, APPARATING)
+        version = ledger.version
+        cast_macro(ledger, plan, 2, "Zephyr")
+        assert ledger.version == version + 1 and len(ledger) == 3
+        assert all(type(e) is LedgerEntry for e in ledger[1:])
+        assert ledger.remaining(200.0) == 173.0
+        ledger.undo()
+        assert len(ledger) == 1
+        assert plan["entries"][0]["arcana_name"] == ""          # templates untouched
+
+
+class TestLibrary:
+    def test_save_replace_delete(self):
+        character = {"name": "Kirin", "arcana": []}
+        save_macro(character, RITUAL)
+        save_macro(character, {**RITUAL, "description": "v2"})
+        assert [m["name"] for m in macro_library(character)] == [APPARATING["name"], "Warding Ritual"]
+        assert character["macros"][0]["description"] == "v2"
+        with pytest.raises(ValueError):
+            save_macro(character, {**APPARATING})
+        assert delete_macro(character, "Warding Ritual")
+        assert not delete_macro(character, "Warding Ritual")
+        assert macro_library(character) == DEFAULT_MACROS
+
+    def test_share_round_trip(self):
+        shared = dump_macros([validate_macro(RITUAL)])
+        assert load_macros(shared) == [validate_macro(RITUAL)]
+        assert load_macros(json.dumps([RITUAL]).encode()) == [validate_macro(RITUAL)]
+        for bad in ("not json", '{"spells": []}', '{"macros": [{"name": "X"}]}'):
+            with pytest.raises(ValueError):
+                load_macros(bad)
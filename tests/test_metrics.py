@@ -0,0 +1,112 @@
+"""Tests for engine/metrics.py — opt-in latency / cache metrics and OpenMetrics export."""
+import os
+import subprocess
+import sys
+import pytest
+import src.engine.metrics as metrics
+from src.engine.calc_cast import compute_cast_cost_with_quantity
+from src.engine.metrics import LATENCY_BUCKETS, Metrics, instrument, timed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestRegistry:
+    def test_instrument_records_calls(self):
+        registry = Metrics()
+        square = instrument(lambda x: x * x, "square", registry)
+        assert [square(i) for i in range(3)] == [0, 1, 4]
+        hist = registry.latency["square"]
+        assert hist.count == 3
+        assert sum(hist.counts) == 3
+        assert hist.sum >= 0
+
+    def test_instrument_records_raising_calls(self):
+        registry = Metrics()
+
+        def boom():
+            raise ValueError("no")
+        wrapped = instrument(boom, registry=registry)
+        try:
+            wrapped()
+        except ValueError:
+            pass
+        assert registry.latency["boom"].count == 1
+        assert wrapped.__name__ == "boom"
+
+    def test_histogram_buckets(self):
+        registry = Metrics()
+        registry.observe("f", LATENCY_BUCKETS[0] / 2)
+        registry.observe("f", LATENCY_BUCKETS[-1] * 2)
+        counts = registry.latency["f"].counts
+        assert counts[0] == 1 and counts[-1] == 1
+
+    def test_hit_rate(self):
+        registry = Metrics()
+        assert registry.hit_rate("table") is None
+        for hit in (True, True, True, False):
+            registry.cache_access("table", hit)
+        assert registry.hit_rate("table") == 0.75
+
+    def test_openmetrics_text(self):
+        registry = Metrics()
+        registry.observe("compute_pool", 3e-6)
+        registry.observe("compute_pool", 0.5)
+        registry.cache_access("cost_table.ceiled", True)
+        text = registry.openmetrics()
+        lines = text.splitlines()
+        assert lines[-1] == "# EOF"
+        assert 'mana_engine_calls_total{function="compute_pool"} 2' in lines
+        assert 'mana_engine_latency_seconds_bucket{function="compute_pool",le="5e-06"} 1' in lines
+        assert 'mana_engine_latency_seconds_bucket{function="compute_pool",le="+Inf"} 2' in lines
+        assert 'mana_engine_latency_seconds_count{function="compute_pool"} 2' in lines
+        assert 'mana_engine_cache_hits_total{cache="cost_table.ceiled"} 1' in lines
+        assert 'mana_engine_cache_misses_total{cache="cost_table.ceiled"} 0' in lines
+
+    def test_reset(self):
+        registry = Metrics()
+        registry.observe("f", 1e-6)
+        registry.cache_access("c", True)
+        registry.reset()
+        text = registry.openmetrics()
+        assert "function=" not in text and "cache=" not in text
+
+
+@pytest.mark.skipif(metrics.ENABLED, reason="MANA_METRICS is set")
+class TestDisabled:
+    def test_timed_is_identity_when_disabled(self):
+        def f():
+            return 1
+        assert timed(f) is f
+        assert compute_cast_cost_with_quantity.__module__ == "src.engine.calc_cast"
+        assert not hasattr(compute_cast_cost_with_quantity, "__wrapped__")
+
+
+class TestWriteFile:
+    def test_write_and_throttle(self, tmp_path):
+        path = str(tmp_path / "engine.prom")
+        assert metrics.write_openmetrics(path)
+        assert open(path).read().endswith("# EOF\n")
+        assert not metrics.write_openmetrics(path, min_interval=3600)
+        assert not os.path.exists(path + ".tmp")
+
+
+def test_enabled_engine_end_to_end():
+    """With MANA_METRICS=1 the engine functions report calls and cache hits."""
+    script = (
+        "from src.engine.tiers import Tier\n"
+        "from src.engine.calc_cast import compute_cast_cost_with_quantity\n"
+        "from src.engine.calc_pool import compute_pool\n"
+        "from src.engine.metrics import METRICS, openmetrics_text\n"
+        "compute_cast_cost_with_quantity(Tier.MASTER, Tier.EXPERT, 'Standard', 3)\n"
+        "compute_cast_cost_with_quantity(Tier.MASTER, Tier.EXPERT, 'Standard', 9)\n"
+        "compute_pool(Tier.MASTER, [{'name': 'Z', 'tier': Tier.MASTER}])\n"
+        "print(METRICS.hit_rate('cost_table.ceiled'))\n"
+        "print(openmetrics_text())\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "MANA_METRICS": "1"},
+    ).stdout
+    assert out.splitlines()[0] == "0.5"
+    assert 'mana_engine_calls_total{function="compute_cast_cost_with_quantity"} 2' in out
+    assert 'mana_engine_calls_total{function="compute_pool"} 1' in out
@@ -0,0 +1,129 @@
+"""Tests for ledger/planner.py — the budget planner."""
+import itertools
+import random
+import time
+import pytest
+from src.config import EFFICIENCY_NAMES
+from src.engine.calc_cents import cost_to_cents
+from src.engine.tiers import Tier
+from src.ledger.planner import plan_casts, spell_options
+from src.ledger.pricing import price_cast
+
+TIERS = ["Novice", "Apprentice", "Journeyman", "Expert", "Master"]
+
+
+def _spell(tier: str = "Expert", **fields) -> dict:
+    return {"spell_name": "Gust", "spell_tier": tier, **fields}
+
+
+def _brute_force(spells: list[dict], budget: int, objective: str, cap: int | None):
+    """(spent, casts, orders) of the best plan, by trying every combination."""
+    options = [spell_options(Tier.MASTER, s) for s in spells]
+    best = None
+    for combo in itertools.product(*(
+        ([None] if objective == "casts" and not s.get("required") else []) + opts
+        for s, opts in zip(spells, options)
+    )):
+        planned = [c for c in combo if c]
+        spent = sum(c["cost_cents"] for c in planned)
+        orders = sum(c["orders"] for c in planned)
+        if cap is not None and orders > cap:
+            continue
+        casts = sum(s.get("quantity", 1) for s, c in zip(spells, combo) if c)
+        fits = spent <= budget
+        key = (not fits, -casts if objective == "casts" and fits else 0, spent, orders)
+        if best is None or key < best[0]:
+            best = (key, (spent, casts, orders))
+    return best[1]
+
+
+class TestSpellOptions:
+    def test_prices_match_the_cast_form(self):
+        spell = _spell("Master", quantity=3)
+        for option in spell_options(Tier.MASTER, spell):
+            cost = price_cast(
+                Tier.MASTER, "Master", option["efficiency"], option["orders"], 3,
+                option["quantity_mode"], "", False,
+            )
+            assert option["cost_cents"] == cost_to_cents(str(cost))
+
+    def test_only_cheaper_options_with_more_orders(self):
+        options = spell_options(Tier.MASTER, _spell("Master"))
+        costs = [o["cost_cents"] for o in options]
+        assert costs == sorted(costs, reverse=True) and len(set(costs)) == len(costs)
+        assert options[0]["orders"] == 0 and options[0]["efficiency"] == "Optimal"
+
+    def test_respects_allowed_choices(self):
+        options = spell_options(Tier.MASTER, _spell(
+            "Expert", efficiencies=["Standard"], min_orders=2, max_orders=3, quantity_modes=["bundled"],
+        ))
+        assert [(o["efficiency"], o["orders"], o["quantity_mode"]) for o in options] == [
+            ("Standard", 2, "bundled"), ("Standard", 3, "bundled"),
+        ]
+        assert spell_options(Tier.MASTER, _spell(min_orders=4, max_orders=3)) == []
+
+
+class TestPlan:
+    def test_most_casts_within_budget(self):
+        spells = [_spell("Master", efficiencies=["Standard"]), _spell("Novice"), _spell("Expert")]
+        plan = plan_casts(Tier.MASTER, spells, 3000)
+        assert plan["fits"] and plan["choices"][0] is None
+        assert plan["casts"] == 2
+        assert plan["spent_cents"] == sum(c["cost_cents"] for c in plan["choices"] if c)
+
+    def test_fewest_orders_among_equal_spend(self):
+        # Orders are written when they lower the cost, and only then.
+        plan = plan_casts(Tier.MASTER, [_spell("Novice", efficiencies=["Standard"])], 10 ** 6, "spend")
+        assert plan["choices"][0]["orders"] == 6
+        plan = plan_casts(Tier.MASTER, [_spell("Novice", max_orders=0)], 10 ** 6, "spend")
+        assert plan["orders"] == 0
+
+    def test_orders_cap(self):
+        spells = [_spell("Master"), _spell("Master")]
+        uncapped = plan_casts(Tier.MASTER, spells, 10 ** 6, "spend")
+        capped = plan_casts(Tier.MASTER, spells, 10 ** 6, "spend", max_orders_total=3)
+        assert uncapped["orders"] == 12 and capped["orders"] == 3
+        assert capped["spent_cents"] > uncapped["spent_cents"]
+
+    def test_required_spells_and_shortfall(self):
+        spells = [_spell("Master", efficiencies=["Strenuous"], required=True), _spell("Novice")]
+        plan = plan_casts(Tier.MASTER, spells, 100)
+        assert not plan["fits"] and plan["choices"][0] is not None
+        spend = plan_casts(Tier.MASTER, [_spell("Master")], 100, "spend")
+        assert not spend["fits"] and spend["choices"][0] is not None
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            plan_casts(Tier.MASTER, [_spell()], 100, "cheapest")
+        with pytest.raises(ValueError):
+            plan_casts(Tier.MASTER, [_spell(min_orders=5, max_orders=1)], 100, "spend")
+
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_brute_force(self, seed):
+        rng = random.Random(seed)
+        for _ in range(25):
+            spells = [
+                _spell(
+                    rng.choice(TIERS), quantity=rng.randint(1, 3),
+                    efficiencies=rng.sample(EFFICIENCY_NAMES, rng.randint(1, 3)),
+                    max_orders=rng.randint(0, 3), required=rng.random() < 0.2,
+                )
+                for _ in range(rng.randint(1, 5))
+            ]
+            budget = rng.randint(0, 30000)
+            objective = rng.choice(["casts", "spend"])
+            cap = rng.choice([None, 0, 2, 5])
+            plan = plan_casts(Tier.MASTER, spells, budget, objective, cap)
+            assert (plan["spent_cents"], plan["casts"], plan["orders"]) == \
+                _brute_force(spells, budget, objective, cap)
+
+    def test_fifty_spells_well_under_a_second(self):
+        rng = random.Random(7)
+        spells = [
+            _spell(rng.choice(TIERS), quantity=rng.randint(1, 4), max_orders=rng.randint(0, 6))
+            for _ in range(50)
+        ]
+        start = time.perf_counter()
+        plan = plan_casts(Tier.MASTER, spells, 20000, max_orders_total=80)
+        assert time.perf_counter() - start < 1.0
+        assert plan["fits"] and plan["orders"] <= 80
@@ -1,6 +1,12 @@
 """Tests for engine/calc_pool.py — mana pool using absolute tier values."""
+import numpy as np
 from src.engine.tiers import Tier
-from src.engine.calc_pool import compute_pool
+from src.engine.calc_pool import (
+    compute_pool,
+    compute_pool_batch,
+    compute_pool_columns,
+    tier_counts,
+)
 from src.engine.rounding import fmt_pool
 
 
@@ -90,3 +96,64 @@ class TestComputePool:
         t1, _ = compute_pool(Tier.MASTER, arcana)
         t2, _ = compute_pool(Tier.ASCENDANT, arcana)
         assert t1 == t2 == 33.0
+
+
+class TestPoolRoster:
+    ROSTER = [
+        [{"name": "Draoidh", "tier": Tier.MASTER}, {"name": "Zephyr", "tier": "Master"}],
+        [],
+        [
+            {"name": "Exodus", "tier": "Master"},
+            {"name": "Fathom", "tier": Tier.MASTER},
+            {"name": "Syphon", "tier": "journeyman"},
+        ],
+        [{"name": "Spark", "tier": Tier.NOVICE}, {"name": "Crown", "tier": "Ascendant"}],
+    ]
+
+    def test_tier_counts(self):
+        counts = tier_counts(self.ROSTER)
+        assert counts.shape == (4, len(Tier))
+        assert counts[0].tolist() == [0, 0, 0, 0, 2, 0]
+        assert counts[2].tolist() == [0, 0, 1, 0, 2, 0]
+        assert counts[1].sum() == 0
+
+    def test_batch_matches_compute_pool(self):
+        totals, breakdowns = compute_pool_batch(self.ROSTER)
+        for arcana, total, breakdown in zip(self.ROSTER, totals, breakdowns):
+            assert (total, breakdown) == compute_pool(Tier.MASTER, arcana)
+        assert totals.tolist() == [200.0, 0.0, 211.0, 301.0]
+
+    def test_batch_without_breakdowns(self):
+        totals, breakdowns = compute_pool_batch(self.ROSTER, breakdowns=False)
+        assert breakdowns is None
+        assert totals.tolist() == [200.0, 0.0, 211.0, 301.0]
+
+    def test_empty_roster(self):
+        totals, breakdowns = compute_pool_batch([])
+        assert totals.shape == (0,)
+        assert breakdowns == []
+
+    def test_columns_with_names(self):
+        ids, totals, values = compute_pool_columns(
+            ["kirin", "serapis", "kirin", "serapis", "serapis"],
+            ["Master", "Master", "Master", "Master", "Journeyman"],
+        )
+        assert ids.tolist() == ["kirin", "serapis"]
+        assert totals.tolist() == [200.0, 211.0]
+        assert values.tolist() == [100.0, 100.0, 100.0, 100.0, 11.0]
+
+    def test_columns_with_codes(self):
+        ids, totals, values = compute_pool_columns(
+            np.array([7, 3, 7]), np.array([int(Tier.EXPERT), int(Tier.NOVICE), int(Tier.EXPERT)])
+        )
+        assert ids.tolist() == [3, 7]
+        assert totals.tolist() == [1.0, 66.0]
+        assert values.tolist() == [33.0, 1.0, 33.0]
+
+    def test_columns_match_batch(self):
+        character_id = [i for i, arcana in enumerate(self.ROSTER) for _ in arcana]
+        tiers = [a["tier"] if isinstance(a["tier"], str) else a["tier"].name.title()
+                 for arcana in self.ROSTER for a in arcana]
+        ids, totals, _ = compute_pool_columns(character_id, tiers)
+        batch, _ = compute_pool_batch(self.ROSTER)
+        assert totals.tolist() == batch[ids].tolist()
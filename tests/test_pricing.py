@@ -0,0 +1,68 @@
+"""Tests for ledger/pricing.py — pricing casts from form / entry fields."""
+from fractions import Fraction
+from src.engine.tiers import Tier
+from src.engine.calc_cast import compute_cast_cost_with_quantity
+from src.engine.calc_hybrid import compute_hybrid_cost
+from src.ledger.pricing import parse_situational, price_cast, price_entry
+
+
+class TestParseSituational:
+    def test_fraction(self):
+        assert parse_situational("1/4") == 0.25
+
+    def test_number(self):
+        assert parse_situational("2") == 2.0
+
+    def test_exact(self):
+        assert parse_situational("1/3", exact=True) == Fraction(1, 3)
+        assert parse_situational("0.7", exact=True) == Fraction(7, 10)
+        assert parse_situational("1/0", exact=True) is None
+
+    def test_blank_and_garbage(self):
+        assert parse_situational("  ") is None
+        assert parse_situational("grove") is None
+
+
+class TestPriceCast:
+    def test_single_spell(self):
+        cost = price_cast(Tier.MASTER, "Expert", "Standard", 3, 2, "per_cast", "1/4", False)
+        assert cost == compute_cast_cost_with_quantity(
+            Tier.MASTER, Tier.EXPERT, "Standard", 3, 2, "per_cast", 0.25,
+        )
+
+    def test_hybrid(self):
+        cost = price_cast(
+            Tier.MASTER, "Expert", "Standard", 3, 1, "bundled", "", True,
+            {"tier": "Expert", "efficiency": "Optimal"},
+        )
+        assert cost == compute_hybrid_cost(
+            Tier.MASTER,
+            {"tier": Tier.EXPERT, "efficiency": "Standard"},
+            {"tier": Tier.EXPERT, "efficiency": "Optimal"},
+            orders=3,
+        )
+
+    def test_cents_engine_prices_thirds_exactly(self):
+        # 33 × 1/3 = 11 exactly; the float 0.333… would ceil to 11.01.
+        assert price_cast(Tier.MASTER, "Expert", "Standard", 0, 1, "bundled", "1/3", False,
+                          engine="cents") == 11.0
+
+    def test_hybrid_without_spell_b_prices_single(self):
+        assert price_cast(Tier.MASTER, "Expert", "Standard", 0, 1, "bundled", "", True) == 33.0
+
+    def test_cents_engine(self):
+        # Float engine tips 2.4000000000000004 up to 2.41; cents engine does not.
+        assert price_cast(Tier.MASTER, "Novice", "Standard", 4, 3, "bundled", "", False) == 2.41
+        assert price_cast(
+            Tier.MASTER, "Novice", "Standard", 4, 3, "bundled", "", False, engine="cents",
+        ) == 2.4
+
+
+class TestPriceEntry:
+    def test_entry_fields(self):
+        entry = {
+            "spell_tier": "Expert", "efficiency": "Standard", "orders": 3,
+            "quantity": 1, "quantity_mode": "bundled", "situational": "",
+            "is_hybrid": True, "hybrid_b_tier": "Expert", "hybrid_b_efficiency": "Standard",
+        }
+        assert price_entry(Tier.MASTER, entry) == 37.4
@@ -0,0 +1,75 @@
+"""Tests for profiling.py — per-phase rerun profiler and rolling log."""
+import gc
+import json
+import os
+import tracemalloc
+from src.profiling import RerunProfiler, append_rolling, summarize
+
+
+class TestRerunProfiler:
+    def test_disabled_records_nothing(self):
+        prof = RerunProfiler(False)
+        prof.mark("a")
+        prof.mark("b")
+        assert prof.finish() is None
+        assert prof.phases == []
+
+    def test_phases_in_order(self):
+        prof = RerunProfiler(True)
+        prof.mark("a")
+        prof.mark("b")
+        prof.mark("c")
+        record = prof.finish(ledger_entries=3)
+        assert [p["phase"] for p in record["phases"]] == ["a", "b", "c"]
+        assert record["ledger_entries"] == 3
+        assert all(p["seconds"] >= 0 for p in record["phases"])
+        assert record["total_seconds"] >= sum(p["seconds"] for p in record["phases"])
+
+    def test_memory_peak_per_phase(self):
+        prof = RerunProfiler(True)
+        prof.mark("small")
+        prof.mark("big")
+        blob = bytearray(4 << 20)
+        del blob
+        small, big = prof.finish()["phases"]
+        assert big["peak_bytes"] >= 4 << 20
+        assert small["peak_bytes"] < 1 << 20
+
+    def test_tracing_stops_with_the_last_profiler(self):
+        assert not tracemalloc.is_tracing()
+        first, second = RerunProfiler(True), RerunProfiler(True)
+        first.finish()
+        assert tracemalloc.is_tracing()
+        del second                          # a rerun cut short never calls finish()
+        gc.collect()
+        assert not tracemalloc.is_tracing()
+
+    def test_without_memory_tracing(self):
+        prof = RerunProfiler(True, trace_memory=False)
+        prof.mark("a")
+        assert prof.finish()["phases"][0]["peak_bytes"] is None
+
+
+class TestRollingFile:
+    def test_append_and_rotate(self, tmp_path):
+        path = str(tmp_path / "logs" / "reruns.jsonl")
+        for i in range(20):
+            append_rolling(path, {"i": i, "pad": "x" * 50}, max_bytes=300, backups=2)
+        assert os.path.exists(path + ".1")
+        assert os.path.exists(path + ".2")
+        assert not os.path.exists(path + ".3")
+        last = [json.loads(line) for line in open(path)]
+        assert last[-1]["i"] == 19
+
+
+def test_summarize():
+    records = [
+        {"phases": [{"phase": "a", "seconds": 0.001, "peak_bytes": 2048},
+                    {"phase": "b", "seconds": 0.010, "peak_bytes": 1024}]},
+        {"phases": [{"phase": "a", "seconds": 0.003, "peak_bytes": 1024},
+                    {"phase": "b", "seconds": 0.020, "peak_bytes": None}]},
+    ]
+    rows = summarize(records)
+    assert [r["Phase"] for r in rows] == ["b", "a"]
+    assert rows[1] == {"Phase": "a", "Runs": 2, "Mean ms": 2.0, "Max ms": 3.0, "Peak KiB": 2.0}
+    assert rows[0]["Peak KiB"] == 1.0
@@ -0,0 +1,159 @@
+"""Tests for ledger/query.py — indexed filter / sort / paginate queries."""
+import pytest
+from src.ledger.model import Ledger
+from src.ledger.query import LedgerIndex, normalize_filters
+from src.storage.sqlite_store import SQLiteStore, SQLiteLedger
+
+SPELLS = [
+    # spell_name, arcana, tier, efficiency, hybrid, cost
+    ("Gust",      "Zephyr",  "Expert",     "Standard",  False, "28.05"),
+    ("Fireball",  "Draoidh", "Master",     "Efficient", False, "66.0"),
+    ("Gale",      "Zephyr",  "Journeyman", "Optimal",   False, "3.6"),
+    ("Storm Fire", "Zephyr", "Master",     "Standard",  True,  "28.05"),
+    ("Flicker",   "Draoidh", "Novice",     "Standard",  False, "0.34"),
+    ("Gust",      "Zephyr",  "Expert",     "Standard",  False, "28.05"),
+]
+
+
+def _entries() -> list[dict]:
+    return [
+        {
+            "id": i, "spell_name": name, "arcana_name": arcana,
+            "spell_tier": tier, "efficiency": eff, "orders": 0, "quantity": 1,
+            "is_hybrid": hybrid, "exact_cost": cost,
+        }
+        for i, (name, arcana, tier, eff, hybrid, cost) in enumerate(SPELLS, start=1)
+    ]
+
+
+def _ids(rows) -> list[int]:
+    return [row["#"] for row in rows]
+
+
+@pytest.fixture
+def ledger():
+    ledger = Ledger(engine="cents")
+    for entry in _entries():
+        ledger.append(entry)
+    return ledger
+
+
+class TestFilters:
+    def test_no_filters_is_whole_ledger_in_cast_order(self, ledger):
+        rows, total = ledger.query(200.0)
+        assert total == 6
+        assert _ids(rows) == [1, 2, 3, 4, 5, 6]
+
+    def test_exact_match_is_case_insensitive(self, ledger):
+        rows, total = ledger.query(200.0, {"arcana_name": "zephyr"})
+        assert total == 4
+        assert _ids(rows) == [1, 3, 4, 6]
+
+    def test_filters_intersect(self, ledger):
+        rows, _ = ledger.query(200.0, {"arcana_name": "Zephyr", "spell_tier": "Master"})
+        assert _ids(rows) == [4]
+
+    def test_hybrid_filter(self, ledger):
+        assert _ids(ledger.query(200.0, {"is_hybrid": True})[0]) == [4]
+        assert len(ledger.query(200.0, {"is_hybrid": False})[0]) == 5
+
+    def test_search_is_substring_of_spell_name(self, ledger):
+        rows, _ = ledger.query(200.0, {"search": "FIRE"})
+        assert _ids(rows) == [2, 4]
+
+    def test_empty_values_are_ignored(self):
+        assert normalize_filters({"arcana_name": "", "spell_tier": None, "search": ""}) == {}
+
+    def test_unknown_filter_rejected(self, ledger):
+        with pytest.raises(ValueError):
+            ledger.query(200.0, {"orders": 3})
+
+    def test_no_match(self, ledger):
+        assert ledger.query(200.0, {"arcana_name": "Fathom"}) == ([], 0)
+
+
+class TestSortAndPage:
+    def test_sort_by_cost(self, ledger):
+        rows, _ = ledger.query(200.0, sort_by="cost")
+        assert _ids(rows) == [5, 3, 1, 4, 6, 2]
+
+    def test_descending_keeps_cast_order_on_ties(self, ledger):
+        rows, _ = ledger.query(200.0, sort_by="cost", descending=True)
+        assert _ids(rows) == [2, 1, 4, 6, 3, 5]
+
+    def test_tier_sorts_by_rank_not_name(self, ledger):
+        rows, _ = ledger.query(200.0, sort_by="spell_tier")
+        assert [row["Tier"] for row in rows] == [
+            "Novice", "Journeyman", "Expert", "Expert", "Master", "Master",
+        ]
+
+    def test_position_descending(self, ledger):
+        rows, _ = ledger.query(200.0, {"arcana_name": "Draoidh"}, descending=True)
+        assert _ids(rows) == [5, 2]
+
+    def test_unknown_sort_rejected(self, ledger):
+        with pytest.raises(ValueError):
+            ledger.query(200.0, sort_by="orders")
+
+    def test_pages(self, ledger):
+        first, total = ledger.query(200.0, offset=0, limit=4)
+        second, _ = ledger.query(200.0, offset=4, limit=4)
+        assert total == 6
+        assert _ids(first) + _ids(second) == [1, 2, 3, 4, 5, 6]
+
+
+class TestBalances:
+    def test_remaining_is_full_ledger_running_balance(self, ledger):
+        rows, _ = ledger.query(200.0, {"arcana_name": "Draoidh"})
+        # After #2: 200 − 28.05 − 66;  after #5: … − 3.6 − 28.05 − 0.34
+        assert [row["Remaining"] for row in rows] == ["105.95", "73.96"]
+
+    def test_rows_match_unfiltered_panel_rows(self, ledger):
+        rows, _ = ledger.query(200.0)
+        assert rows == ledger.page_rows(200.0, 0, 50)
+
+    def test_append_extends_cached_index(self, ledger):
+        index = ledger.index()
+        entry = {**_entries()[0], "id": 7, "spell_name": "Zephyr Lance"}
+        ledger.append(entry)
+        assert ledger.index() is index
+        rows, total = ledger.query(200.0, {"search": "lance"})
+        assert total == 1
+        assert rows[0]["Remaining"] == "17.86"
+
+    def test_distinct(self, ledger):
+        assert ledger.distinct("spell_tier") == ["Novice", "Journeyman", "Expert", "Master"]
+        assert ledger.distinct("arcana_name") == ["Draoidh", "Zephyr"]
+
+    def test_index_without_ledger(self):
+        index = LedgerIndex(_entries(), [2805, 6600, 360, 2805, 34, 2805])
+        rows, total = index.query(20000, {"efficiency": "standard"}, "cost", limit=2)
+        assert total == 4
+        assert _ids(rows) == [5, 1]
+
+
+class TestSQLiteParity:
+    """The SQLite backend answers every query exactly like the in-memory index."""
+
+    @pytest.fixture
+    def sqlite_ledger(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "mana.sqlite3"))
+        cid = store.create_character({"name": "Kirin", "highest_tier": "Master", "arcana": []})
+        ledger = SQLiteLedger(store, cid)
+        ledger.replace(_entries())
+        return ledger
+
+    @pytest.mark.parametrize("filters", [
+        {}, {"arcana_name": "Zephyr"}, {"is_hybrid": False, "spell_tier": "expert"},
+        {"search": "g"}, {"efficiency": "Standard", "search": "st"},
+    ])
+    @pytest.mark.parametrize("sort_by", ["position", "cost", "spell_name", "spell_tier", "efficiency"])
+    @pytest.mark.parametrize("descending", [False, True])
+    def test_same_page(self, ledger, sqlite_ledger, filters, sort_by, descending):
+        for offset in (0, 2):
+            expected = ledger.query(200.0, filters, sort_by, descending, offset, 3)
+            assert sqlite_ledger.query(200.0, filters, sort_by, descending, offset, 3) == expected
+
+    def test_same_distinct(self, ledger, sqlite_ledger):
+        for field in ("arcana_name", "spell_tier", "efficiency"):
+            assert sqlite_ledger.distinct(field) == ledger.distinct(field)
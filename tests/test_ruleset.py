@@ -0,0 +1,179 @@
+"""Tests for engine/ruleset.py — immutable rulesets and per-ruleset compiled caches."""
+import asyncio
+import json
+import pickle
+import threading
+from fractions import Fraction
+import pytest
+from src.engine.calc_cast import compute_cast_cost_batch, compute_cast_cost_with_quantity
+from src.engine.calc_cents import compute_cast_cost_cents, compute_hybrid_cost_cents
+from src.engine.calc_hybrid import compute_hybrid_cost
+from src.engine.calc_pool import compute_pool, compute_pool_batch
+from src.engine import ruleset as ruleset_module
+from src.engine.cost_table import COST_TABLE, cost_table
+from src.engine.ruleset import (
+    RULESETS,
+    SPREADSHEET_RULES,
+    WIKI_RULES,
+    Ruleset,
+    active_ruleset,
+    load_ruleset,
+    resolve_ruleset,
+    ruleset_from_dict,
+    use_ruleset,
+)
+from src.engine.tiers import Tier
+from src.ledger import afford as afford_module
+from src.ledger.afford import afford_index
+from src.ledger.macros import compile_macro
+
+HOUSE = WIKI_RULES.replace(
+    name="Grove House Rules",
+    tier_values={**WIKI_RULES.tier_values, "Master": 120},
+    orders_of_expression={0: 0, 1: "1/10", 2: "1/5"},
+)
+KIRIN = [{"name": "Draoidh", "tier": Tier.MASTER}, {"name": "Zephyr", "tier": Tier.MASTER}]
+STANDARD = {"tier": Tier.MASTER, "efficiency": "Standard"}
+
+
+class TestRuleset:
+    def test_immutable(self):
+        with pytest.raises(AttributeError):
+            WIKI_RULES.name = "Mine"
+        with pytest.raises(TypeError):
+            WIKI_RULES.tier_values["Master"] = 1
+
+    def test_content_hash_ignores_name_and_number_type(self):
+        assert SPREADSHEET_RULES.content_hash == WIKI_RULES.content_hash
+        floats = WIKI_RULES.replace(tier_values={k: float(v) for k, v in WIKI_RULES.tier_values.items()})
+        assert floats.content_hash == WIKI_RULES.content_hash
+        assert HOUSE.content_hash != WIKI_RULES.content_hash
+
+    def test_round_trips_through_json(self):
+        data = json.loads(json.dumps(HOUSE.to_dict()))
+        again = ruleset_from_dict(data)
+        assert again.name == HOUSE.name and again.content_hash == HOUSE.content_hash
+        assert pickle.loads(pickle.dumps(HOUSE)).content_hash == HOUSE.content_hash
+
+    def test_order_discount_caps(self):
+        assert HOUSE.order_discount(0) == 0
+        assert HOUSE.order_discount(2) == Fraction(1, 5)
+        assert HOUSE.order_discount(6) == HOUSE.max_discount == Fraction(1, 5)
+
+    @pytest.mark.parametrize("changes", [
+        {"tier_values": {"Master": 100}},
+        {"tier_values": {**WIKI_RULES.tier_values, "Expert": -1}},
+        {"novice_costs": {**WIKI_RULES.novice_costs, "Standard": 0}},
+        {"below_mult": {**WIKI_RULES.below_mult, "Efficient": 0.0}},
+        {"novice_costs": {**WIKI_RULES.novice_costs, "Standard": "1"}},
+        {"orders_of_expression": {0: 0, 2: "1/10"}},
+        {"orders_of_expression": {0: 0, 1: "3/2"}},
+        {"max_discount": "one third"},
+    ])
+    def test_rejects_malformed(self, changes):
+        with pytest.raises(ValueError):
+            WIKI_RULES.replace(**changes)
+
+    def test_resolve(self, tmp_path):
+        assert resolve_ruleset(None) is WIKI_RULES
+        assert resolve_ruleset("Spreadsheet") is SPREADSHEET_RULES
+        assert resolve_ruleset(HOUSE.to_dict()).content_hash == HOUSE.content_hash
+        with pytest.raises(ValueError):
+            resolve_ruleset("homebrew")
+        path = tmp_path / "house.json"
+        path.write_text(json.dumps(HOUSE.to_dict()))
+        assert load_ruleset(str(path)).content_hash == HOUSE.content_hash
+        assert load_ruleset("wiki") is RULESETS["wiki"]
+
+
+class TestCompiledCaches:
+    def test_default_table(self):
+        assert cost_table() is COST_TABLE is cost_table(WIKI_RULES)
+
+    def test_shared_by_content(self):
+        assert cost_table(SPREADSHEET_RULES) is COST_TABLE
+        assert cost_table(HOUSE) is cost_table(ruleset_from_dict(HOUSE.to_dict()))
+
+    def test_shared_cache_is_bounded(self):
+        for master in range(101, 101 + ruleset_module.MAX_COMPILED_TABLES + 10):
+            cost_table(WIKI_RULES.replace(tier_values={**WIKI_RULES.tier_values, "Master": master}))
+        assert len(ruleset_module._COMPILED) <= ruleset_module.MAX_COMPILED_TABLES
+        assert cost_table() is COST_TABLE          # the built-in keeps its own
+
+    def test_house_rules_leave_other_tables_alone(self):
+        before = dict(COST_TABLE.unrounded)
+        house = cost_table(HOUSE)
+        assert house.base[(Tier.MASTER, "Standard")] == 120.0
+        assert house.unrounded[(Tier.MASTER, "Standard", 2)] == 96.0
+        assert (Tier.MASTER, "Standard", 3) not in house.unrounded
+        assert COST_TABLE.unrounded == before
+
+
+class TestActiveRuleset:
+    def test_default_is_wiki(self):
+        assert active_ruleset() is WIKI_RULES
+
+    def test_prices_and_pools_follow_the_active_ruleset(self):
+        with use_ruleset(HOUSE):
+            assert compute_cast_cost_with_quantity(Tier.MASTER, Tier.MASTER) == 120.0
+            assert compute_cast_cost_with_quantity(Tier.MASTER, Tier.MASTER, orders=6) == 96.0
+            assert compute_cast_cost_cents(Tier.MASTER, Tier.MASTER, orders=1) == 10800
+            assert compute_cast_cost_batch(["Master", "Expert"]).tolist() == [120.0, 33.0]
+            assert compute_hybrid_cost(Tier.MASTER, STANDARD, STANDARD) == 160.0
+            assert compute_hybrid_cost_cents(Tier.MASTER, STANDARD, STANDARD) == 16000
+            assert compute_pool(Tier.MASTER, KIRIN)[0] == 240.0
+            assert compute_pool_batch([KIRIN], breakdowns=False)[0].tolist() == [240.0]
+        assert active_ruleset() is WIKI_RULES
+        assert compute_cast_cost_with_quantity(Tier.MASTER, Tier.MASTER) == 100.0
+        assert compute_pool(Tier.MASTER, KIRIN)[0] == 200.0
+
+    def test_threads_do_not_collide(self):
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def campaign(name, ruleset):
+            with use_ruleset(ruleset):
+                barrier.wait()
+                results[name] = [compute_cast_cost_with_quantity(Tier.MASTER, Tier.MASTER) for _ in range(200)]
+
+        threads = [threading.Thread(target=campaign, args=args)
+                   for args in (("wiki", WIKI_RULES), ("house", HOUSE))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert set(results["wiki"]) == {100.0} and set(results["house"]) == {120.0}
+
+    def test_tasks_do_not_collide(self):
+        async def campaign(ruleset):
+            with use_ruleset(ruleset):
+                await asyncio.sleep(0)
+                return compute_pool(Tier.MASTER, KIRIN)[0]
+
+        async def both():
+            return await asyncio.gather(campaign(HOUSE), campaign(WIKI_RULES))
+
+        assert asyncio.run(both()) == [240.0, 200.0]
+
+
+class TestDerivedCaches:
+    def test_afford_index_per_ruleset(self):
+        wiki = afford_index(Tier.MASTER)
+        with use_ruleset(HOUSE):
+            house = afford_index(Tier.MASTER)
+            assert house is afford_index(Tier.MASTER)
+        assert house is not wiki
+        assert len(house.costs) == 6 * 5 * 3 - 5 * 3    # no Ascendant, orders 0–2
+        assert house.max_quantity(24000, Tier.MASTER, "Standard", 0, "bundled") == 2
+
+    def test_afford_indexes_are_bounded(self):
+        for master in range(101, 101 + afford_module.MAX_CACHED_INDEXES + 5):
+            with use_ruleset(WIKI_RULES.replace(tier_values={**WIKI_RULES.tier_values, "Master": master})):
+                afford_index(Tier.EXPERT)
+        assert len(afford_module._INDEXES) == afford_module.MAX_CACHED_INDEXES
+
+    def test_macro_plans_per_ruleset(self):
+        macro = {"name": "Blast", "spells": [{"spell_name": "Blast", "tier": "Master"}]}
+        assert compile_macro(Tier.MASTER, macro)["cost_cents"] == 10000
+        with use_ruleset(HOUSE):
+            assert compile_macro(Tier.MASTER, macro)["cost_cents"] == 12000
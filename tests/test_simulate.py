@@ -0,0 +1,136 @@
+"""Tests for simulate.py — Monte Carlo encounter simulator."""
+import functools
+import json
+import random
+import numpy as np
+import pytest
+from src.engine.calc_cents import cost_to_cents
+from src.engine.tiers import Tier
+from src.ledger.pricing import price_cast
+from src.simulate import CHUNK_TRIALS, compile_profile, main, run_trials, simulate, summarize_simulation
+
+KIRIN = {
+    "name": "Kirin",
+    "highest_tier": "Master",
+    "arcana": [{"name": "Draoidh", "tier": "Master"}, {"name": "Zephyr", "tier": "Master"}],
+}
+
+PROFILE = {
+    "tiers": {"Expert": 3, "Master": 1, "Journeyman": 2},
+    "efficiencies": {"Standard": 2, "Optimal": 1, "Efficient": 1},
+    "orders": {"0": 1, "3": 1},
+    "quantities": {"1": 4, "2": 1},
+    "quantity_modes": {"bundled": 1, "per_cast": 1},
+    "hybrid": 0.1,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_price(tier, efficiency, orders, quantity, mode, hybrid_b) -> int:
+    hybrid_b = dict(hybrid_b) if hybrid_b else None
+    cost = price_cast(Tier.MASTER, tier, efficiency, orders, quantity, mode, "", bool(hybrid_b), hybrid_b)
+    return cost_to_cents(str(cost))
+
+
+def _price(tier, efficiency, orders, quantity=1, mode="bundled", hybrid_b=None) -> int:
+    return _cached_price(tier, efficiency, orders, quantity, mode, tuple(sorted(hybrid_b.items())) if hybrid_b else None)
+
+
+class TestCompile:
+    def test_costs_and_probabilities(self):
+        compiled = compile_profile("Master", {"tiers": {"Expert": 1, "Master": 3}, "orders": {"0": 1, "6": 1}})
+        assert compiled["costs"].tolist() == sorted(
+            [_price("Expert", "Standard", 0), _price("Expert", "Standard", 6),
+             _price("Master", "Standard", 0), _price("Master", "Standard", 6)]
+        )
+        assert np.allclose(np.diff(compiled["cdf"], prepend=0), [0.125, 0.125, 0.375, 0.375])
+
+    def test_outcomes_merged_by_cost(self):
+        # Quantity 1 costs the same under both rounding modes.
+        compiled = compile_profile("Master", {"quantity_modes": {"bundled": 1, "per_cast": 1}})
+        assert compiled["costs"].tolist() == [10000] and compiled["cdf"].tolist() == [1.0]
+
+    def test_hybrids_priced_as_the_form_does(self):
+        compiled = compile_profile("Master", {"tiers": {"Expert": 1}, "hybrid": 1})
+        assert compiled["costs"].tolist() == [_price("Expert", "Standard", 0, hybrid_b={"tier": "Expert", "efficiency": "Standard"})]
+
+    @pytest.mark.parametrize("profile", [
+        {"tiers": {"Ascendant": 1}},
+        {"efficiencies": {"Standard": 0}},
+        {"quantities": {"0": 1}},
+        {"hybrid": 1.5},
+    ])
+    def test_rejects_bad_profiles(self, profile):
+        with pytest.raises(ValueError):
+            compile_profile("Master", profile)
+
+    def test_negative_weight_rejected_beside_positive_ones(self):
+        with pytest.raises(ValueError, match="must not be negative"):
+            compile_profile("Master", {"orders": {"0": 1, "3": -1}})
+
+
+class TestTrials:
+    def test_single_outcome_is_exact(self):
+        compiled = compile_profile("Master", {"tiers": {"Expert": 1}, "orders": {"3": 1}})
+        cost = int(compiled["costs"][0])
+        casts, leftover = run_trials(20000, compiled, 50, seed=1)
+        assert (casts == 20000 // cost).all() and (leftover == 20000 % cost).all()
+
+    def test_pool_smaller_than_any_cast(self):
+        casts, leftover = run_trials(50, compile_profile("Master", {}), 10, seed=1)
+        assert (casts == 0).all() and (leftover == 50).all()
+
+    def test_matches_cast_by_cast_simulation(self):
+        result = simulate(KIRIN, PROFILE, trials=20000, seed=3, workers=1)
+        assert (result["leftover_cents"] >= 0).all()
+
+        rng = random.Random(3)
+        pick = lambda key: rng.choices(list(PROFILE[key]), list(PROFILE[key].values()))[0]
+        reference = []
+        for _ in range(1500):
+            left, casts = 20000, 0
+            while True:
+                tier, efficiency, orders = pick("tiers"), pick("efficiencies"), int(pick("orders"))
+                if rng.random() < PROFILE["hybrid"]:
+                    cost = _price(tier, efficiency, orders, hybrid_b={"tier": tier, "efficiency": pick("efficiencies")})
+                else:
+                    cost = _price(tier, efficiency, orders, int(pick("quantities")), pick("quantity_modes"))
+                if cost > left:
+                    break
+                left, casts = left - cost, casts + 1
+            reference.append(casts)
+        assert abs(result["casts"].mean() - np.mean(reference)) < 0.25
+
+    def test_mean_matches_exact_expectation(self):
+        # E[casts | b] = Σ p(c) · (1 + E[casts | b − c]) over the costs c ≤ b.
+        compiled = compile_profile("Master", PROFILE)
+        costs, probs = compiled["costs"], np.diff(compiled["cdf"], prepend=0)
+        expected = np.zeros(20001)
+        for budget in range(int(costs[0]), 20001):
+            fits = costs <= budget
+            expected[budget] = probs[fits] @ (1 + expected[budget - costs[fits]])
+        casts, _ = run_trials(20000, compiled, 40000, seed=5)
+        assert abs(casts.mean() - expected[20000]) < 4 * casts.std() / np.sqrt(len(casts))
+
+    def test_seeded_runs_repeat_across_workers(self):
+        trials = CHUNK_TRIALS + 500
+        serial = simulate(KIRIN, PROFILE, trials, seed=7, workers=1)
+        pooled = simulate(KIRIN, PROFILE, trials, seed=7, workers=2)
+        assert len(serial["casts"]) == trials
+        assert np.array_equal(serial["casts"], pooled["casts"])
+        assert np.array_equal(serial["leftover_cents"], pooled["leftover_cents"])
+
+
+class TestSummary:
+    def test_summary_and_cli(self, tmp_path, capsys):
+        summary = summarize_simulation(simulate(KIRIN, PROFILE, 2000, seed=1, workers=1))
+        assert summary["pool"] == 200.0 and summary["trials"] == 2000
+        assert sum(summary["casts_histogram"].values()) == 2000
+        assert summary["casts"]["min"] <= summary["casts"]["p50"] <= summary["casts"]["max"]
+        assert 0 <= summary["leftover"]["mean"] <= 200
+
+        character, profile = tmp_path / "kirin.json", tmp_path / "profile.json"
+        character.write_text(json.dumps({"character": KIRIN, "ledger": []}))
+        profile.write_text(json.dumps(PROFILE))
+        assert main([str(character), str(profile), "-n", "2000", "-j", "1", "--seed", "1"]) == 0
+        assert json.loads(capsys.readouterr().out) == summary
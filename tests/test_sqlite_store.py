@@ -0,0 +1,215 @@
+"""Tests for storage/sqlite_store.py — SQLite characters and paged ledgers."""
+import json
+import pytest
+import src.storage.sqlite_store as store_mod
+from src.ledger.model import Ledger
+from src.storage.sqlite_store import SQLiteStore, SQLiteLedger
+
+CHARACTER = {"name": "Kirin", "highest_tier": "Master", "arcana": [{"name": "Zephyr", "tier": "Master"}]}
+
+
+def _entry(id: int, cost: str) -> dict:
+    return {
+        "id": id, "spell_name": f"Gust {id}", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 3,
+        "quantity": 1, "is_hybrid": False, "exact_cost": cost,
+    }
+
+
+COSTS = ["28.05", "100.0", "9.9", "0.34", "34/100"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / "db" / "mana.sqlite3"))
+
+
+@pytest.fixture
+def ledger(store):
+    return SQLiteLedger(store, store.create_character(CHARACTER))
+
+
+class TestSQLiteStore:
+    def test_wal_mode(self, store):
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_connection_pooled_per_path(self, store):
+        assert SQLiteStore(store.path)._conn is store._conn
+
+    def test_character_round_trip(self, store):
+        cid = store.create_character(CHARACTER)
+        assert store.load_character(cid) == CHARACTER
+        store.save_character(cid, {**CHARACTER, "name": "Serapis"})
+        assert store.load_character(cid)["name"] == "Serapis"
+        assert store.list_characters() == [(cid, "Serapis")]
+
+    def test_missing_character(self, store):
+        assert store.load_character(999) is None
+
+    def test_delete_cascades_to_ledger(self, store, ledger):
+        ledger.append(_entry(1, "1.0"))
+        store.delete_character(ledger.character_id)
+        assert store.count_entries(ledger.character_id) == 0
+
+    def test_failed_write_rolls_back(self, store, ledger):
+        ledger.append(_entry(1, "1.0"))
+        with pytest.raises(ValueError):
+            ledger.append(_entry(None, "2.0"))   # entry_id is NOT NULL
+        assert len(ledger) == 1
+        assert ledger.version == 1
+
+    def test_taken_ids_get_the_next_free_id(self, store, ledger):
+        other = SQLiteLedger(store, ledger.character_id)
+        ledger.append(_entry(1, "1.0"))
+        other.append(_entry(1, "2.0"))           # both sessions had next_id 1
+        other.extend([_entry(2, "1.0"), _entry(2, "1.0")])
+        ledger.insert(0, _entry(1, "3.0"))
+        assert [e["id"] for e in ledger] == [5, 1, 2, 3, 4]
+        ledger.update(1, _entry(1, "4.0"))       # keeps its own id
+        assert ledger[1]["id"] == 1
+
+    def test_taken_ids_looked_up_in_one_query(self, store, ledger):
+        ledger.extend([_entry(i, "1.0") for i in range(1, 51)])
+        statements = []
+        store._conn.set_trace_callback(statements.append)
+        try:
+            ledger.extend([_entry(i, "1.0") for i in range(40, 60)])
+        finally:
+            store._conn.set_trace_callback(None)
+        assert sum("SELECT entry_id FROM ledger_entries" in q for q in statements) == 1
+        assert [e["id"] for e in ledger][50:] == list(range(51, 71))
+
+    def test_import_with_duplicate_ids(self, ledger):
+        ledger.replace([_entry(3, "1.0"), _entry(3, "2.0"), _entry(4, "1.0")])
+        assert [e["id"] for e in ledger] == [3, 4, 5]
+        assert ledger.remaining(10.0) == 6.0
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "mana.sqlite3")
+        store = SQLiteStore(path)
+        cid = store.create_character(CHARACTER)
+        SQLiteLedger(store, cid).append(_entry(1, "28.05"))
+        # Simulate a restart: drop the pooled connection and reconnect.
+        store._conn.close()
+        store_mod._POOL.clear()
+        reopened = SQLiteLedger(SQLiteStore(path), cid)
+        assert [e["id"] for e in reopened] == [1]
+        assert reopened.remaining(200.0) == 171.95
+
+
+class TestSQLiteLedger:
+    def test_mutations_bump_version(self, ledger):
+        v = ledger.version
+        ledger.append(_entry(1, "1.0"))
+        ledger.pop()
+        ledger.replace([_entry(1, "1.0")])
+        ledger.clear()
+        assert ledger.version == v + 4
+
+    def test_extend_is_one_transaction(self, ledger):
+        ledger.append(_entry(1, "1.0"))
+        v = ledger.version
+        ledger.extend([_entry(i, c) for i, c in enumerate(COSTS, 2)])
+        assert ledger.version == v + 1
+        assert [e["id"] for e in ledger] == [1, 2, 3, 4, 5, 6]
+        ledger.undo()
+        assert [e["id"] for e in ledger] == [1] and ledger.version == v + 2
+        ledger.redo()
+        assert ledger.remaining(200.0) == 60.37
+
+    def test_pop_and_getitem(self, ledger):
+        ledger.replace([_entry(i, c) for i, c in enumerate(COSTS, 1)])
+        assert ledger[0]["id"] == 1
+        assert ledger[-1]["id"] == 5
+        assert ledger.pop()["id"] == 5
+        assert len(ledger) == 4
+        with pytest.raises(IndexError):
+            ledger[10]
+
+    def test_pop_empty_raises(self, ledger):
+        with pytest.raises(IndexError):
+            ledger.pop()
+
+    def test_undo_redo(self, ledger):
+        ledger.replace([_entry(i, c) for i, c in enumerate(COSTS, 1)])
+        ledger.clear()
+        ledger.append(_entry(9, "1.0"))
+        ledger.undo()
+        ledger.undo()
+        assert [e["id"] for e in ledger] == [1, 2, 3, 4, 5]
+        ledger.redo()
+        assert len(ledger) == 0
+
+    def test_clear_keeps_the_replaced_rows_on_disk(self, store, ledger):
+        ledger.replace([_entry(i, c) for i, c in enumerate(COSTS, 1)])
+        ledger.clear()
+        assert ledger._undo[-1][0] == "replace"
+        assert all(isinstance(i, int) for i in ledger._undo[-1][1:])   # ids, not rows
+        ledger.undo()
+        ledger.undo()
+        assert len(ledger) == 0
+        ledger.redo()
+        ledger.redo()
+        assert len(ledger) == 0
+        ledger.undo()
+        assert [e["id"] for e in ledger] == [1, 2, 3, 4, 5]
+        assert ledger.remaining(200.0) == 61.37
+
+    def test_unused_snapshots_are_dropped(self, store, ledger):
+        def snapshots():
+            with store._read() as conn:
+                return conn.execute("SELECT COUNT(*) FROM ledger_snapshots").fetchone()[0]
+
+        ledger.replace([_entry(1, "1.0")])
+        ledger.clear()
+        assert snapshots() == 4
+        ledger.undo()
+        ledger.append(_entry(2, "2.0"))      # clears the redo of the clear
+        assert snapshots() == 2
+        SQLiteLedger(store, ledger.character_id).append(_entry(3, "3.0"))
+        assert not ledger.undo()             # history dropped with its snapshots
+        assert snapshots() == 0
+
+    def test_history_dropped_after_outside_write(self, store, ledger):
+        ledger.append(_entry(1, "1.0"))
+        SQLiteLedger(store, ledger.character_id).append(_entry(2, "2.0"))
+        assert not ledger.undo()
+        assert len(ledger) == 2
+
+    def test_next_id(self, ledger):
+        assert ledger.next_id() == 1
+        ledger.append(_entry(7, "1.0"))
+        assert ledger.next_id() == 8
+
+    def test_remaining_exact(self, ledger):
+        for i, c in enumerate(COSTS, 1):
+            ledger.append(_entry(i, c))
+        assert ledger.remaining(200.0) == 61.37
+
+    def test_remaining_empty(self, store):
+        assert SQLiteLedger(store, store.create_character(CHARACTER)).remaining(5.5) == 5.5
+
+    @pytest.mark.parametrize("offset,limit", [(0, 2), (1, 3), (4, 10), (9, 5)])
+    def test_pages_match_memory_ledger(self, ledger, offset, limit):
+        entries = [_entry(i, c) for i, c in enumerate(COSTS, 1)]
+        ledger.replace(entries)
+        memory = Ledger(entries, engine="cents")
+        assert ledger.page_rows(200.0, offset, limit) == memory.page_rows(200.0, offset, limit)
+
+    def test_exports_match_memory_ledger(self, ledger):
+        entries = [_entry(i, c) for i, c in enumerate(COSTS, 1)]
+        ledger.replace(entries)
+        memory = Ledger(entries, engine="cents")
+        assert ledger.export_json(CHARACTER, 200.0) == memory.export_json(CHARACTER, 200.0)
+        assert ledger.export_csv() == memory.export_csv()
+        assert json.loads(ledger.export_json(CHARACTER, 200.0))["ledger"] == entries
+
+    def test_streams_in_batches(self, store, ledger):
+        ledger.replace([_entry(i, "1.0") for i in range(1, 1202)])
+        assert [e["id"] for e in store.iter_entries(ledger.character_id, batch=500)] == list(range(1, 1202))
+
+    def test_two_handles_share_state(self, store, ledger):
+        other = SQLiteLedger(store, ledger.character_id)
+        ledger.append(_entry(1, "28.05"))
+        assert len(other) == 1
+        assert other.remaining(100.0) == 71.95
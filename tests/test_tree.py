@@ -0,0 +1,150 @@
+"""Tests for ledger/tree.py and mid-ledger corrections (insert / delete / update)."""
+import random
+from itertools import accumulate
+import pytest
+from src.ledger.model import Ledger
+from src.ledger.tree import CostTree
+from src.storage.sqlite_store import SQLiteStore, SQLiteLedger
+
+
+def _entry(entry_id: int, cost: str) -> dict:
+    return {
+        "id": entry_id, "spell_name": f"Spell {entry_id}", "arcana_name": "Zephyr",
+        "spell_tier": "Expert", "efficiency": "Standard", "orders": 0,
+        "quantity": 1, "is_hybrid": False, "exact_cost": cost,
+    }
+
+
+class TestCostTree:
+    def test_build_and_prefix(self):
+        cents = [2805, 10000, 990, 34, 2200]
+        tree = CostTree(cents)
+        assert len(tree) == 5
+        assert tree.total == sum(cents)
+        assert [tree.prefix(k) for k in range(6)] == list(accumulate(cents, initial=0))
+        assert list(tree) == cents
+        assert tree[2] == 990
+
+    def test_empty(self):
+        tree = CostTree()
+        assert len(tree) == 0 and tree.total == 0 and tree.prefix(0) == 0
+
+    def test_matches_list_under_random_edits(self):
+        rng = random.Random(7)
+        reference = [rng.randrange(1, 10_000) for _ in range(200)]
+        tree = CostTree(reference)
+        for _ in range(2000):
+            op = rng.random()
+            if op < 0.4:
+                k, c = rng.randrange(len(reference) + 1), rng.randrange(10_000)
+                tree.insert(k, c)
+                reference.insert(k, c)
+            elif op < 0.7 and reference:
+                k = rng.randrange(len(reference))
+                assert tree.delete(k) == reference.pop(k)
+            elif reference:
+                k, c = rng.randrange(len(reference)), rng.randrange(10_000)
+                tree.set(k, c)
+                reference[k] = c
+            k = rng.randrange(len(reference) + 1)
+            assert tree.prefix(k) == sum(reference[:k])
+        assert list(tree) == reference
+        assert tree.total == sum(reference)
+
+    def test_out_of_range(self):
+        tree = CostTree([1, 2])
+        with pytest.raises(IndexError):
+            tree.delete(2)
+        with pytest.raises(IndexError):
+            tree.insert(3, 5)
+        with pytest.raises(IndexError):
+            tree.prefix(-1)
+
+
+class TestLedgerCorrections:
+    @pytest.fixture(params=["float", "cents"])
+    def ledger(self, request):
+        return Ledger([_entry(i, c) for i, c in enumerate(["28.05", "100", "9.9"], start=1)],
+                      engine=request.param)
+
+    def test_insert_mid_ledger(self, ledger):
+        ledger.insert(1, _entry(4, "0.34"))
+        assert [e["id"] for e in ledger] == [1, 4, 2, 3]
+        assert ledger.balance_at_cents(200.0, 1) == 20000 - 2805 - 34
+        assert ledger.balance_at(200.0, 3) == 61.71
+
+    def test_delete_mid_ledger(self, ledger):
+        assert ledger.delete(1)["id"] == 2
+        assert [e["id"] for e in ledger] == [1, 3]
+        assert ledger.remaining(200.0) == 162.05
+
+    def test_update_reprices(self, ledger):
+        old = ledger.update(0, _entry(1, "1.05"))
+        assert old["exact_cost"] == "28.05"
+        assert ledger.balance_at_cents(200.0, 0) == 19895
+        assert ledger.remaining(200.0) == 89.05
+        assert "balances" not in ledger._memo         # read from the tree, not rebuilt
+
+    def test_corrections_bump_version_and_refresh_views(self, ledger):
+        rows = ledger.running_rows(200.0)
+        ledger.update(2, _entry(3, "0"))
+        assert ledger.version == 2
+        assert ledger.running_rows(200.0) is not rows
+        assert ledger.running_rows(200.0)[-1]["Remaining"] == "71.95"
+
+    def test_tree_kept_current_by_append_and_pop(self, ledger):
+        ledger.insert(0, _entry(4, "1"))
+        ledger.append(_entry(5, "2"))
+        ledger.pop()
+        ledger.append(_entry(6, "3"))
+        assert list(ledger.cost_tree()) == ledger.cents()
+        assert ledger.balances_cents(200.0)[-1] == ledger.balance_at_cents(200.0, len(ledger) - 1)
+
+    def test_tree_page_matches_running_rows(self, ledger):
+        for i in range(4, 30):
+            ledger.insert(i % 3, _entry(i, f"{i}.5"))
+        expected = ledger.running_rows(200.0)
+        ledger.cost_tree()
+        assert ledger.query(200.0, offset=5, limit=10)[0] == expected[5:15]
+        assert ledger.query(200.0, descending=True, limit=4)[0] == expected[::-1][:4]
+
+    def test_out_of_range(self, ledger):
+        with pytest.raises(IndexError):
+            ledger.delete(3)
+        with pytest.raises(IndexError):
+            ledger.insert(5, _entry(9, "1"))
+        with pytest.raises(IndexError):
+            ledger.balance_at(200.0, 3)
+
+
+class TestSQLiteCorrections:
+    @pytest.fixture
+    def ledger(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "mana.sqlite3"))
+        ledger = SQLiteLedger(store, store.create_character({"name": "Kirin"}))
+        ledger.replace([_entry(i, c) for i, c in enumerate(["28.05", "100", "9.9"], start=1)])
+        return ledger
+
+    def test_insert_delete_update(self, ledger):
+        ledger.insert(1, _entry(4, "0.34"))
+        ledger.insert(4, _entry(5, "1"))
+        assert [e["id"] for e in ledger] == [1, 4, 2, 3, 5]
+        assert ledger.delete(2)["id"] == 2
+        ledger.update(0, _entry(1, "1.05"))
+        assert [e["id"] for e in ledger] == [1, 4, 3, 5]
+        assert ledger.balance_at_cents(200.0, 1) == 20000 - 105 - 34
+        assert ledger.remaining(200.0) == 187.71
+
+    def test_matches_memory_ledger(self, ledger):
+        memory = Ledger(list(ledger), engine="cents")
+        for target in (ledger, memory):
+            target.insert(0, _entry(6, "3.3"))
+            target.delete(2)
+            target.update(1, _entry(7, "12"))
+        assert ledger.page_rows(200.0, 0, 10) == memory.running_rows(200.0)
+
+    def test_out_of_range(self, ledger):
+        with pytest.raises(IndexError):
+            ledger.delete(3)
+        with pytest.raises(IndexError):
+            ledger.update(-1, _entry(9, "1"))